@@ -12,7 +12,9 @@ from pathlib import Path
 import aiofiles
 from chia_rs.sized_ints import uint16, uint64
 
+from benchmarks.utils import report_timing
 from chia.server.address_manager import (
+    BUCKET_SIZE,
     NEW_BUCKETS_PER_ADDRESS,
     AddressManager,
     ExtendedPeerInfo,
@@ -61,8 +63,8 @@ def populate_address_manager(num_new: int = 500000, num_tried: int = 200000) ->
             epi.last_try = timestamp - rand.randint(0, 1000)
             bucket = epi.get_tried_bucket(am.key)
             pos = epi.get_bucket_position(am.key, False, bucket)
-            if am.tried_matrix[bucket][pos] == -1:
-                am.tried_matrix[bucket][pos] = node_id
+            if am.tried_matrix[bucket * BUCKET_SIZE + pos] == -1:
+                am._set_tried_matrix(bucket, pos, node_id)
                 am.tried_count += 1
         else:
             # make a new_table entry
@@ -72,8 +74,8 @@ def populate_address_manager(num_new: int = 500000, num_tried: int = 200000) ->
             for _ in range(ref_count):
                 bucket = epi.get_new_bucket(am.key)
                 pos = epi.get_bucket_position(am.key, True, bucket)
-                if am.new_matrix[bucket][pos] == -1:
-                    am.new_matrix[bucket][pos] = node_id
+                if am.new_matrix[bucket * BUCKET_SIZE + pos] == -1:
+                    am._set_new_matrix(bucket, pos, node_id)
                     am.new_count += 1
                     assigned = True
                     break
@@ -122,6 +124,8 @@ async def benchmark_serialize_deserialize(iterations: int = 5) -> None:
         print(f"\n=== Benchmark Summary ({iterations} iterations) ===")
         print(f"Average serialize time:   {total_serialize_time / iterations:.6f} seconds")
         print(f"Average deserialize time: {total_deserialize_time / iterations:.6f} seconds")
+        report_timing("serialize", total_serialize_time / iterations)
+        report_timing("deserialize", total_deserialize_time / iterations)
 
 
 async def main() -> None:
@@ -12,6 +12,7 @@ import click
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint32
 
+from benchmarks.utils import report_timing
 from chia.consensus.block_height_map import BlockHeightMap
 from chia.consensus.blockchain import Blockchain
 from chia.consensus.default_constants import DEFAULT_CONSTANTS
@@ -88,8 +89,10 @@ async def main(db_path: Path) -> None:
             assert gen is not None
 
         print(f"get_block_generator(): {timing / REPETITIONS:0.3f}s")
+        report_timing("get_block_generator", timing / REPETITIONS)
 
         blockchain.shut_down()
+        height_map.close()
 
 
 @click.command()
@@ -22,7 +22,7 @@ from chia_rs import (
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint8, uint16, uint32, uint64, uint128
 
-from benchmarks.utils import setup_db
+from benchmarks.utils import report_timing, setup_db
 from chia._tests.util.benchmarks import (
     clvm_generator,
     rand_class_group_element,
@@ -264,6 +264,7 @@ async def run_add_block_benchmark(version: int) -> None:
         if verbose:
             print("")
         print(f"{total_time:0.4f}s, add_full_block")
+        report_timing("add_full_block", total_time)
         all_test_time += total_time
 
         # === get_block_info() ===
@@ -282,6 +283,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_block_info")
+        report_timing("get_block_info", total_time)
         all_test_time += total_time
 
         # === get_generator() ===
@@ -298,6 +300,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_generator")
+        report_timing("get_generator", total_time)
         all_test_time += total_time
 
         # === get_full_block() ===
@@ -316,6 +319,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_full_block")
+        report_timing("get_full_block", total_time)
         all_test_time += total_time
 
         # === get_full_block_bytes() ===
@@ -333,6 +337,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_full_block_bytes")
+        report_timing("get_full_block_bytes", total_time)
         all_test_time += total_time
 
         # === get_generators_at() ===
@@ -349,6 +354,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_generators_at")
+        report_timing("get_generators_at", total_time)
         all_test_time += total_time
 
         # === get_full_blocks_at() ===
@@ -366,6 +372,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_full_blocks_at")
+        report_timing("get_full_blocks_at", total_time)
         all_test_time += total_time
 
         # === get_block_records_by_hash() ===
@@ -383,6 +390,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_block_records_by_hash")
+        report_timing("get_block_records_by_hash", total_time)
         all_test_time += total_time
 
         # === get_block_bytes_by_hash() ===
@@ -399,6 +407,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_block_bytes_by_hash")
+        report_timing("get_block_bytes_by_hash", total_time)
         all_test_time += total_time
 
         # === get_blocks_by_hash() ===
@@ -416,6 +425,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_blocks_by_hash")
+        report_timing("get_blocks_by_hash", total_time)
         all_test_time += total_time
 
         # === get_block_record() ===
@@ -433,6 +443,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_block_record")
+        report_timing("get_block_record", total_time)
         all_test_time += total_time
 
         # === get_block_records_in_range() ===
@@ -450,6 +461,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_block_records_in_range")
+        report_timing("get_block_records_in_range", total_time)
         all_test_time += total_time
 
         # === get_block_records_close_to_peak() ===
@@ -465,6 +477,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_block_records_close_to_peak")
+        report_timing("get_block_records_close_to_peak", total_time)
         all_test_time += total_time
 
         # === is_fully_compactified() ===
@@ -481,6 +494,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, is_fully_compactified")
+        report_timing("is_fully_compactified", total_time)
         all_test_time += total_time
 
         # === get_random_not_compactified() ===
@@ -496,6 +510,7 @@ async def run_add_block_benchmark(version: int) -> None:
         total_time += stop - start
 
         print(f"{total_time:0.4f}s, get_random_not_compactified")
+        report_timing("get_random_not_compactified", total_time)
         all_test_time += total_time
 
         print(f"all tests completed in {all_test_time:0.4f}s")
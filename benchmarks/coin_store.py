@@ -10,7 +10,7 @@ from time import monotonic
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint32, uint64
 
-from benchmarks.utils import setup_db
+from benchmarks.utils import report_timing, setup_db
 from chia._tests.util.benchmarks import rand_hash, rewards
 from chia.full_node.coin_store import CoinStore
 from chia.types.blockchain_format.coin import Coin
@@ -133,6 +133,7 @@ async def run_new_block_benchmark(version: int) -> None:
         if verbose:
             print("")
         print(f"{total_time:0.4f}s, MOSTLY ADDITIONS additions: {total_add} removals: {total_remove}")
+        report_timing("mostly_additions", total_time)
         all_test_time += total_time
 
         if verbose:
@@ -185,6 +186,7 @@ async def run_new_block_benchmark(version: int) -> None:
         if verbose:
             print("")
         print(f"{total_time:0.4f}s, MOSTLY REMOVALS additions: {total_add} removals: {total_remove}")
+        report_timing("mostly_removals", total_time)
         all_test_time += total_time
 
         if verbose:
@@ -232,6 +234,7 @@ async def run_new_block_benchmark(version: int) -> None:
         if verbose:
             print("")
         print(f"{total_time:0.4f}s, FULLBLOCKS additions: {total_add} removals: {total_remove}")
+        report_timing("full_blocks", total_time)
         all_test_time += total_time
 
         if verbose:
@@ -255,6 +258,7 @@ async def run_new_block_benchmark(version: int) -> None:
             f"{total_time:0.4f}s, GET RECORDS BY NAMES with spent {NUM_ITERS} "
             f"lookups found {found_coins} coins in total"
         )
+        report_timing("get_coin_records_by_names_include_spent", total_time)
         all_test_time += total_time
 
         if verbose:
@@ -278,6 +282,7 @@ async def run_new_block_benchmark(version: int) -> None:
             f"{total_time:0.4f}s, GET RECORDS BY NAMES without spent {NUM_ITERS} "
             f"lookups found {found_coins} coins in total"
         )
+        report_timing("get_coin_records_by_names_exclude_spent", total_time)
         all_test_time += total_time
 
         if verbose:
@@ -299,6 +304,7 @@ async def run_new_block_benchmark(version: int) -> None:
             f"{total_time:0.4f}s, GET COINS REMOVED AT HEIGHT {block_height - 1} blocks, "
             f"found {found_coins} coins in total"
         )
+        report_timing("get_coins_removed_at_height", total_time)
         all_test_time += total_time
         print(f"all tests completed in {all_test_time:0.4f}s")
 
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import random
+from time import perf_counter
+
+from chia_rs.sized_ints import uint32, uint64
+
+from benchmarks.utils import report_timing
+from chia.full_node.fee_estimate_store import FeeStore
+from chia.full_node.fee_estimation import MempoolItemInfo
+from chia.full_node.fee_tracker import FeeTracker
+
+random.seed(123456789)
+
+NUM_BLOCKS = 2000
+NUM_ESTIMATES = 200
+
+
+def main() -> None:
+    tracker = FeeTracker(FeeStore())
+    mempool: list[MempoolItemInfo] = []
+
+    block_time = 0.0
+    for height in range(1, NUM_BLOCKS + 1):
+        for _ in range(random.randint(0, 30)):
+            item = MempoolItemInfo(
+                uint64(random.randint(1_000_000, 10_000_000)),
+                uint64(random.randint(0, 100_000_000)),
+                tracker.latest_seen_height,
+            )
+            tracker.add_tx(item)
+            mempool.append(item)
+        random.shuffle(mempool)
+        num_included = random.randint(0, len(mempool))
+        included = mempool[:num_included]
+        mempool = mempool[num_included:]
+
+        start = perf_counter()
+        tracker.process_block(uint32(height), included)
+        block_time += perf_counter() - start
+
+    estimate_time = 0.0
+    for _ in range(NUM_ESTIMATES):
+        start = perf_counter()
+        tracker.estimate_fees()
+        estimate_time += perf_counter() - start
+
+    print(f"process_block: {block_time / NUM_BLOCKS * 1000:0.3f} ms per block ({NUM_BLOCKS} blocks)")
+    print(f"estimate_fees: {estimate_time / NUM_ESTIMATES * 1000:0.3f} ms per estimate ({NUM_ESTIMATES} estimates)")
+    report_timing("process_block", block_time / NUM_BLOCKS)
+    report_timing("estimate_fees", estimate_time / NUM_ESTIMATES)
+
+
+if __name__ == "__main__":
+    main()
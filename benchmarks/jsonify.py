@@ -3,13 +3,21 @@ from __future__ import annotations
 import random
 from time import perf_counter
 
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint32, uint64
+
+from benchmarks.utils import report_timing
 from chia._tests.util.test_full_block_utils import get_full_blocks
+from chia.util.json_util import dict_to_json_str
+from chia.wallet.transaction_record import TransactionRecordOld
 
 random.seed(123456789)
 
 
 def main() -> None:
     total_time = 0.0
+    response_time = 0.0
+    record_time = 0.0
     counter = 0
     for shard in [0, 1, 2, 3]:
         for block in get_full_blocks(shard):
@@ -17,9 +25,44 @@ def main() -> None:
             block.to_json_dict()
             end = perf_counter()
             total_time += end - start
+
+            # the RPC response of get_blocks
+            start = perf_counter()
+            dict_to_json_str({"blocks": [block.to_json_dict()], "success": True})
+            end = perf_counter()
+            response_time += end - start
+
+            # a python streamable, as returned by the wallet's get_transactions
+            coins = block.get_included_reward_coins()
+            record = TransactionRecordOld(
+                confirmed_at_height=uint32(block.height),
+                created_at_time=uint64(0),
+                to_puzzle_hash=bytes32.zeros,
+                amount=uint64(sum(c.amount for c in coins)),
+                fee_amount=uint64(0),
+                confirmed=True,
+                sent=uint32(0),
+                spend_bundle=None,
+                additions=coins,
+                removals=coins,
+                wallet_id=uint32(1),
+                sent_to=[],
+                trade_id=None,
+                type=uint32(0),
+                name=bytes32(random.randbytes(32)),
+                memos={},
+            )
+            start = perf_counter()
+            dict_to_json_str({"transactions": [record.to_json_dict()], "success": True})
+            end = perf_counter()
+            record_time += end - start
             counter += 1
 
     print(f"total time: {total_time:0.2f}s ({counter} iterations)")
+    print(f"response time: {response_time:0.2f}s, transaction record time: {record_time:0.4f}s")
+    report_timing("to_json_dict", total_time)
+    report_timing("dict_to_json_str", response_time)
+    report_timing("transaction_record", record_time)
 
 
 if __name__ == "__main__":
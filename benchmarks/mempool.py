@@ -12,6 +12,7 @@ from chia_rs import CoinRecord, SpendBundle
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint32, uint64
 
+from benchmarks.utils import report_timing
 from chia.consensus.coinbase import create_farmer_coin, create_pool_coin
 from chia.consensus.default_constants import DEFAULT_CONSTANTS
 from chia.full_node.mempool_manager import MempoolManager
@@ -198,6 +199,7 @@ async def run_mempool_benchmark() -> None:
                 await asyncio.gather(*tasks)
                 stop = monotonic()
             print(f"  time: {stop - start:0.4f}s")
+            report_timing(f"add_large_spend_bundles_{suffix}", stop - start)
             print(f"  per call: {(stop - start) / total_bundles * 1000:0.2f}ms")
 
         with MempoolManager(
@@ -222,6 +224,7 @@ async def run_mempool_benchmark() -> None:
                 await asyncio.gather(*tasks)
                 stop = monotonic()
             print(f"  time: {stop - start:0.4f}s")
+            report_timing(f"add_spend_bundles_{suffix}", stop - start)
             print(f"  per call: {(stop - start) / total_bundles * 1000:0.2f}ms")
 
             print("\nProfiling add_spend_bundle() with replace-by-fee")
@@ -237,6 +240,7 @@ async def run_mempool_benchmark() -> None:
                 await asyncio.gather(*tasks)
                 stop = monotonic()
             print(f"  time: {stop - start:0.4f}s")
+            report_timing(f"add_replacement_spend_bundles_{suffix}", stop - start)
             print(f"  per call: {(stop - start) / total_bundles * 1000:0.2f}ms")
 
             print("\nProfiling create_block_generator()")
@@ -246,6 +250,7 @@ async def run_mempool_benchmark() -> None:
                     mempool.create_block_generator(rec.header_hash, 2.0)
                 stop = monotonic()
             print(f"  time: {stop - start:0.4f}s")
+            report_timing(f"create_block_generator_{suffix}", stop - start)
             print(f"  per call: {(stop - start) / 10 * 1000:0.2f}ms")
 
             print("\nProfiling create_block_generator2()")
@@ -255,6 +260,7 @@ async def run_mempool_benchmark() -> None:
                     mempool.create_block_generator2(rec.header_hash, 2.0)
                 stop = monotonic()
             print(f"  time: {stop - start:0.4f}s")
+            report_timing(f"create_block_generator2_{suffix}", stop - start)
             print(f"  per call: {(stop - start) / 10 * 1000:0.2f}ms")
 
             print("\nProfiling new_peak() (optimized)")
@@ -271,6 +277,7 @@ async def run_mempool_benchmark() -> None:
                     await mempool.new_peak(rec, spends)
                 stop = monotonic()
             print(f"  time: {stop - start:0.4f}s")
+            report_timing(f"new_peak_{suffix}", stop - start)
             print(f"  per call: {(stop - start) / len(blocks) * 1000:0.2f}ms")
 
             print("\nProfiling new_peak() (reorg)")
@@ -287,6 +294,7 @@ async def run_mempool_benchmark() -> None:
                     await mempool.new_peak(rec, spends)
                 stop = monotonic()
             print(f"  time: {stop - start:0.4f}s")
+            report_timing(f"new_peak_reorg_{suffix}", stop - start)
             print(f"  per call: {(stop - start) / len(blocks) * 1000:0.2f}ms")
 
 
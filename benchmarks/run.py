@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import mean, variance
+from typing import Any, TextIO
+
+import click
+
+from benchmarks.utils import RESULTS_ENV, get_commit_hash
+
+# to run all the benchmarks, 3 times each, and store the results as a baseline:
+# python -m benchmarks.run --repeat 3 --output baseline.json
+# to compare a later run against that baseline:
+# python -m benchmarks.run --repeat 3 --baseline baseline.json
+
+_version = 1
+
+BENCHMARKS_DIR = Path(__file__).parent
+ROOT_DIR = BENCHMARKS_DIR.parent
+
+# arguments to keep the run time of a benchmark reasonable when run repeatedly
+BENCHMARK_ARGS: dict[str, list[str]] = {
+    "streamable": ["--runs", "10"],
+}
+
+# one-sided 95% critical values of Student's t distribution, by degrees of
+# freedom. Above 30 degrees of freedom, the normal approximation is used.
+T_CRITICAL_95 = [
+    6.314,
+    2.920,
+    2.353,
+    2.132,
+    2.015,
+    1.943,
+    1.895,
+    1.860,
+    1.833,
+    1.812,
+    1.796,
+    1.782,
+    1.771,
+    1.761,
+    1.753,
+    1.746,
+    1.740,
+    1.734,
+    1.729,
+    1.725,
+    1.721,
+    1.717,
+    1.714,
+    1.711,
+    1.708,
+    1.706,
+    1.703,
+    1.701,
+    1.699,
+    1.697,
+]
+Z_CRITICAL_95 = 1.645
+
+
+def discover_benchmarks() -> list[str]:
+    """
+    The benchmarks are the scripts in this directory reporting their timings
+    through report_timing().
+    """
+    return sorted(
+        path.stem
+        for path in BENCHMARKS_DIR.glob("*.py")
+        if path.stem not in {"__init__", "run", "utils"} and "report_timing(" in path.read_text()
+    )
+
+
+def run_benchmark(name: str, args: list[str], verbose: bool) -> dict[str, float]:
+    """
+    Runs a benchmark script in a scratch directory, and returns its timings,
+    prefixed by the name of the benchmark.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results_path = Path(tmp_dir) / "results.jsonl"
+        env = dict(os.environ)
+        env[RESULTS_ENV] = os.fspath(results_path)
+        env["PYTHONPATH"] = os.pathsep.join([os.fspath(ROOT_DIR), *env.get("PYTHONPATH", "").split(os.pathsep)])
+        subprocess.run(
+            [sys.executable, "-m", f"benchmarks.{name}", *args],
+            check=True,
+            cwd=tmp_dir,
+            env=env,
+            stdout=None if verbose else subprocess.DEVNULL,
+        )
+        timings: dict[str, float] = {}
+        if results_path.exists():
+            for line in results_path.read_text().splitlines():
+                record = json.loads(line)
+                timings[f"{name}/{record['name']}"] = float(record["seconds"])
+        return timings
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline: list[float]
+    current: list[float]
+    threshold: float
+
+    @property
+    def change(self) -> float:
+        """The relative change of the mean timing, in percent."""
+        baseline_mean = mean(self.baseline)
+        if baseline_mean == 0:
+            return 0.0
+        return (mean(self.current) - baseline_mean) / baseline_mean * 100
+
+    def significant(self) -> bool:
+        """
+        Whether the difference between the means is statistically significant,
+        according to a one-sided Welch's t-test at the 95% level. With a single
+        sample on either side there's nothing to test, and any difference
+        counts.
+        """
+        if len(self.baseline) < 2 or len(self.current) < 2:
+            return True
+        baseline_var = variance(self.baseline) / len(self.baseline)
+        current_var = variance(self.current) / len(self.current)
+        difference = abs(mean(self.current) - mean(self.baseline))
+        if baseline_var + current_var == 0:
+            return difference > 0
+        t = difference / math.sqrt(baseline_var + current_var)
+        dof = (baseline_var + current_var) ** 2 / (
+            baseline_var**2 / (len(self.baseline) - 1) + current_var**2 / (len(self.current) - 1)
+        )
+        critical = T_CRITICAL_95[max(1, int(dof)) - 1] if dof < len(T_CRITICAL_95) + 1 else Z_CRITICAL_95
+        return t > critical
+
+    @property
+    def status(self) -> str:
+        if abs(self.change) <= self.threshold or not self.significant():
+            return "ok"
+        return "REGRESSION" if self.change > 0 else "improvement"
+
+
+def compare_timings(
+    baseline: dict[str, list[float]], current: dict[str, list[float]], threshold: float
+) -> list[Comparison]:
+    return [
+        Comparison(name, baseline[name], current[name], threshold)
+        for name in sorted(current.keys())
+        if name in baseline and len(baseline[name]) > 0 and len(current[name]) > 0
+    ]
+
+
+def print_report(baseline: dict[str, list[float]], current: dict[str, list[float]], threshold: float) -> bool:
+    """
+    Prints the comparison of the current timings with the baseline. Returns
+    whether there were any regressions.
+    """
+    comparisons = compare_timings(baseline, current, threshold)
+    name_width = max([len(c.name) for c in comparisons] + [len("benchmark")])
+    print(f"\n{'benchmark':<{name_width}} | {'baseline s':>12} | {'current s':>12} | {'diff %':>8} | status")
+    for c in comparisons:
+        print(
+            f"{c.name:<{name_width}} | {mean(c.baseline):>12.6f} | {mean(c.current):>12.6f} | "
+            f"{c.change:>8.2f} | {c.status}"
+        )
+    for name in sorted(current.keys() - baseline.keys()):
+        print(f"{name}: not in the baseline")
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name}: not run")
+    regressions = [c.name for c in comparisons if c.status == "REGRESSION"]
+    if len(regressions) > 0:
+        print(f"\n{len(regressions)} regressions: {', '.join(regressions)}")
+    return len(regressions) > 0
+
+
+@click.command()
+@click.option("-b", "--benchmark", "names", multiple=True, help="Benchmarks to run (default: all)")
+@click.option("-r", "--repeat", default=3, help="Number of times to run each benchmark")
+@click.option("-o", "--output", type=click.File("w"), help="Write the results to a file, e.g. as a new baseline")
+@click.option("-c", "--baseline", type=click.File("r"), help="Compare to the results from a file")
+@click.option("-t", "--threshold", default=5.0, help="Ignore changes smaller than this, in percent")
+@click.option("--block-ref-db", type=click.Path(exists=True), help="Blockchain database for the block_ref benchmark")
+@click.option("-v", "--verbose", is_flag=True, default=False, help="Show the output of the benchmarks")
+def run(
+    names: tuple[str, ...],
+    repeat: int,
+    output: TextIO | None,
+    baseline: TextIO | None,
+    threshold: float,
+    block_ref_db: str | None,
+    verbose: bool,
+) -> None:
+    available = discover_benchmarks()
+    for name in names:
+        if name not in available:
+            raise click.BadParameter(f"unknown benchmark {name}, available: {', '.join(available)}")
+    args = dict(BENCHMARK_ARGS)
+    if block_ref_db is not None:
+        args["block_ref"] = [os.path.abspath(block_ref_db)]
+
+    timings: dict[str, list[float]] = {}
+    for name in names if len(names) > 0 else available:
+        if name == "block_ref" and block_ref_db is None:
+            print("skipping block_ref, it needs --block-ref-db")
+            continue
+        for i in range(repeat):
+            print(f"running {name} ({i + 1}/{repeat})")
+            for metric, seconds in run_benchmark(name, args.get(name, []), verbose).items():
+                timings.setdefault(metric, []).append(seconds)
+
+    results: dict[str, Any] = {
+        "version": _version,
+        "commit_hash": get_commit_hash(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timings": timings,
+    }
+    if output is not None:
+        json.dump(results, output, indent=2)
+    if baseline is not None:
+        baseline_results = json.load(baseline)
+        print(f"\ncompare: baseline {baseline_results['commit_hash']}, current {results['commit_hash']}")
+        if print_report(baseline_results["timings"], timings, threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
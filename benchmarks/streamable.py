@@ -15,7 +15,7 @@ from chia_rs import FullBlock
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint8, uint64
 
-from benchmarks.utils import get_commit_hash
+from benchmarks.utils import get_commit_hash, report_timing
 from chia._tests.util.benchmarks import rand_full_block, rand_hash
 from chia.util.streamable import Streamable, streamable
 
@@ -169,7 +169,7 @@ benchmark_parameter: dict[Data, BenchmarkParameter] = {
         FullBlock,
         rand_full_block,
         {
-            Mode.creation: None,
+            # FullBlock is implemented in rust, it has no fields to create it from
             Mode.to_bytes: ModeParameter(to_bytes),
             Mode.from_bytes: ModeParameter(FullBlock.from_bytes, to_bytes),
             Mode.to_json: ModeParameter(FullBlock.to_json_dict),
@@ -297,6 +297,7 @@ def run(data: Data, mode: Mode, runs: int, ms: int, live: bool, output: TextIO,
                     assert current_run == runs
                     bench_result = get_bench_results()
                     bench_results[current_data][current_mode] = bench_result.__dict__
+                    report_timing(f"{current_data.value}_{current_mode.value}", bench_result.us_per_iteration / 1e6)
                     print_results(current_mode.name, bench_result, True)
     json_output = json.dumps(bench_results)
     if output:
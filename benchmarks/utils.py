@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import contextlib
+import json
 import os
 import subprocess
 import sys
@@ -9,6 +10,10 @@ from pathlib import Path
 
 from chia.util.db_wrapper import DBWrapper2
 
+# When the benchmarks are run by benchmarks/run.py, this environment variable
+# names the file report_timing() appends the timings to.
+RESULTS_ENV = "CHIA_BENCHMARK_RESULTS"
+
 
 @contextlib.asynccontextmanager
 async def setup_db(name: str | os.PathLike[str], db_version: int) -> AsyncIterator[DBWrapper2]:
@@ -51,3 +56,15 @@ def get_commit_hash() -> str:
     except Exception:
         commit_hash += "-dirty"
     return commit_hash
+
+
+def report_timing(name: str, seconds: float) -> None:
+    """
+    Reports a timing to the benchmark runner, in addition to whatever the
+    benchmark prints itself. Does nothing when not run by the runner.
+    """
+    results_path = os.environ.get(RESULTS_ENV)
+    if results_path is None:
+        return
+    with open(results_path, "a") as f:
+        f.write(json.dumps({"name": name, "seconds": seconds}) + "\n")
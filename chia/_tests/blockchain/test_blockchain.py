@@ -3307,6 +3307,25 @@ class TestBodyValidation:
         preval_result: PreValidationResult = await future
         assert preval_result.error == Err.BAD_AGGREGATE_SIGNATURE.value
 
+        # unless the block is covered by an assume valid checkpoint, then the
+        # signature isn't validated, but everything else is
+        future = await pre_validate_block(
+            b.constants,
+            AugmentedBlockchain(b),
+            last_block,
+            b.pool,
+            None,
+            ValidationState(ssi, diff, None),
+            validate_signatures=False,
+        )
+        preval_result = await future
+        assert preval_result.error is None
+        assert not preval_result.validated_signature
+        fork_info = ForkInfo(last_block.height - 1, last_block.height - 1, last_block.prev_header_hash)
+        result, err, _ = await b.add_block(last_block, preval_result, ssi, fork_info, assume_valid=True)
+        assert err is None
+        assert result == AddBlockResult.NEW_PEAK
+
 
 def maybe_header_hash(block: BlockRecord | None) -> bytes32 | None:
     if block is None:
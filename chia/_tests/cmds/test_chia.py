@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import click
+from click.testing import CliRunner
+
+from chia.cmds.chia import LAZY_COMMANDS, cli
+
+
+def test_lazy_commands() -> None:
+    ctx = click.Context(cli)
+    assert set(LAZY_COMMANDS) <= set(cli.list_commands(ctx))
+    for name in LAZY_COMMANDS:
+        command = cli.get_command(ctx, name)
+        assert command is not None
+        assert command.name == name
+    assert cli.get_command(ctx, "not-a-command") is None
+
+
+def test_lazy_commands_help() -> None:
+    result = CliRunner().invoke(cli, ["--help"])
+    assert result.exit_code == 0
+    for name in ["keys", "show", "wallet", "version"]:
+        assert f"  {name} " in result.output
+    # beta is a hidden command
+    assert "beta" not in result.output
+
+
+def test_lazy_commands_not_imported() -> None:
+    # this needs a fresh interpreter, the command modules are likely to have
+    # been imported by other tests
+    script = (
+        "import sys\n"
+        "from chia.cmds.chia import cli\n"
+        "cli(['version'], standalone_mode=False)\n"
+        "print(sorted(m for m in ['chia.cmds.wallet', 'chia.cmds.data', 'chia.cmds.beta'] if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "[]"
@@ -27,7 +27,14 @@ from chia.daemon.keychain_server import (
     GetPublicKeysResponse,
     SetLabelRequest,
 )
-from chia.daemon.server import WebSocketServer, plotter_log_path, service_plotter
+from chia.daemon.server import (
+    PlotEvent,
+    StatusMessage,
+    WebSocketServer,
+    coalesce_status_messages,
+    plotter_log_path,
+    service_plotter,
+)
 from chia.plotters.plotters import call_plotters
 from chia.simulator.block_tools import BlockTools
 from chia.simulator.keyring import TempKeyring
@@ -2209,3 +2216,51 @@ async def test_non_text_message_logging(
         non_text_logs = [record for record in caplog.records if "Received non-text message" in record.message]
 
         assert len(non_text_logs) == 1, "Expected one 'Received non-text message' log entry"
+
+
+def test_coalesce_status_messages() -> None:
+    def plot_message(state: PlotEvent, plot_id: str, log: str) -> StatusMessage:
+        return StatusMessage(
+            service=service_plotter,
+            command="state_changed",
+            destination="wallet_ui",
+            origin=service_plotter,
+            data={"state": state, "queue": [{"id": plot_id, "log_new": log}]},
+        )
+
+    keyring = StatusMessage(
+        service="wallet_ui",
+        command="keyring_status_changed",
+        destination="wallet_ui",
+        origin="daemon",
+        data={"is_keyring_locked": False},
+    )
+    other_keyring = replace(keyring, data={"is_keyring_locked": True})
+    log_a_1 = plot_message(PlotEvent.LOG_CHANGED, "a", "1")
+    log_a_2 = plot_message(PlotEvent.LOG_CHANGED, "a", "2")
+    log_b = plot_message(PlotEvent.LOG_CHANGED, "b", "1")
+    state_a_1 = plot_message(PlotEvent.STATE_CHANGED, "a", "1")
+    state_a_2 = plot_message(PlotEvent.STATE_CHANGED, "a", "2")
+
+    assert coalesce_status_messages([]) == []
+    # identical messages are merged, the later ones win
+    assert coalesce_status_messages([keyring, other_keyring, keyring]) == [other_keyring, keyring]
+    # newer snapshots of the state of the same plots replace the older ones
+    assert coalesce_status_messages([state_a_1, log_b, state_a_2]) == [log_b, state_a_2]
+    # each plot log message carries the next chunk of the log, none of them
+    # are dropped, even when they're identical
+    messages = [log_a_1, log_b, state_a_1, log_a_2, log_a_2, state_a_2]
+    coalesced = coalesce_status_messages(messages)
+    assert coalesced == [log_a_1, log_b, log_a_2, log_a_2, state_a_2]
+
+    def log_of(messages: list[StatusMessage], plot_id: str) -> str:
+        return "".join(
+            item["log_new"]
+            for message in messages
+            if message.data["state"] == PlotEvent.LOG_CHANGED
+            for item in message.data["queue"]
+            if item["id"] == plot_id
+        )
+
+    for plot_id in ["a", "b"]:
+        assert log_of(coalesced, plot_id) == log_of(messages, plot_id)
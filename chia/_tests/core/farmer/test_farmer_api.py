@@ -78,7 +78,11 @@ async def test_farmer_responds_with_signed_values(farmer_one_harvester: FarmerOn
         new_signage_point.challenge_chain_sp,
         peer_id,
     )
-    setattr(farmer_api, "_process_respond_signatures", lambda res: signed_values)
+
+    async def process_respond_signatures(res: object) -> farmer_protocol.SignedValues:
+        return signed_values
+
+    setattr(farmer_api, "_process_respond_signatures", process_respond_signatures)
 
     signed_values_task: Task[Message | None] = await begin_task(farmer_api.request_signed_values(request_signed_values))
 
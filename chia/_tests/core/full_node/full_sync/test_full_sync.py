@@ -1,23 +1,35 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import logging
 import time
 
 import pytest
-from chia_rs import ConsensusConstants, FullBlock, SubEpochSummary
+from chia_rs import ConsensusConstants, FullBlock, G2Element, SubEpochSummary
 from chia_rs.sized_ints import uint16, uint32, uint64
 
 from chia._tests.conftest import ConsensusMode
+from chia._tests.core.full_node.test_full_node import find_reward_coin
 from chia._tests.core.node_height import node_height_between, node_height_exactly
 from chia._tests.util.time_out_assert import time_out_assert
+from chia.consensus.assume_valid import AssumeValid
+from chia.consensus.augmented_chain import AugmentedBlockchain
+from chia.consensus.block_body_validation import ForkInfo
+from chia.consensus.multiprocess_validation import pre_validate_block
+from chia.full_node.full_node import FullNode
 from chia.full_node.full_node_api import FullNodeAPI
 from chia.protocols import full_node_protocol
+from chia.protocols.outbound_message import Message, make_msg
+from chia.protocols.protocol_message_types import ProtocolMessageTypes
 from chia.protocols.shared_protocol import Capability
 from chia.server.server import ChiaServer
+from chia.server.ws_connection import WSChiaConnection
 from chia.simulator.block_tools import BlockTools
 from chia.types.peer_info import PeerInfo
+from chia.types.validation_state import ValidationState
 from chia.util.hash import std_hash
+from chia.util.recursive_replace import recursive_replace
 
 log = logging.getLogger(__name__)
 
@@ -481,3 +493,276 @@ async def test_bad_peak_cache_invalidation(
     block = blocks[-1]
     full_node_1.full_node.add_to_bad_peak_cache(block.header_hash, block.height)
     assert len(full_node_1.full_node.bad_peak_cache) == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("checkpoint_in_chain", [True, False])
+async def test_sync_assume_valid(
+    two_nodes: tuple[FullNodeAPI, FullNodeAPI, ChiaServer, ChiaServer, BlockTools],
+    self_hostname: str,
+    caplog: pytest.LogCaptureFixture,
+    checkpoint_in_chain: bool,
+) -> None:
+    full_node_1, full_node_2, server_1, server_2, bt = two_nodes
+    blocks = bt.get_consecutive_blocks(30, guarantee_transaction_block=True)
+    for block in blocks:
+        await full_node_1.full_node.add_block(block)
+    peak1 = full_node_1.full_node.blockchain.get_peak()
+    assert peak1 is not None
+
+    checkpoint = blocks[20]
+    header_hash = checkpoint.header_hash if checkpoint_in_chain else std_hash(b"not in chain")
+    full_node_2.full_node.assume_valid = AssumeValid(checkpoint.height, header_hash)
+
+    await server_2.start_client(PeerInfo(self_hostname, server_1.get_port()), None)
+    full_node_2.full_node.sync_store.peer_has_block(
+        peak1.header_hash, full_node_1.full_node.server.node_id, peak1.weight, peak1.height, True
+    )
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        await full_node_2.full_node.sync_from_fork_point(uint32(0), peak1.height, peak1.header_hash, [])
+    assert node_height_exactly(full_node_2, peak1.height)
+    skipped = "skipping signature validation up to the assume valid checkpoint" in caplog.text
+    assert skipped == checkpoint_in_chain
+    assert ("falling back to full validation" in caplog.text) != checkpoint_in_chain
+
+
+def chain_with_bad_signature(bt: BlockTools, num_blocks: int, bad_height: int) -> list[FullBlock]:
+    """
+    A chain of num_blocks blocks where the block at bad_height has an invalid
+    aggregate signature. Everything else about it is valid.
+    """
+    blocks = bt.get_consecutive_blocks(
+        bad_height, guarantee_transaction_block=True, farmer_reward_puzzle_hash=bt.pool_ph
+    )
+    wt = bt.get_pool_wallet_tool()
+    coin = find_reward_coin(blocks[-1], bt.pool_ph)
+    tx = wt.generate_signed_transaction(uint64(10), wt.get_new_puzzlehash(), coin)
+    blocks = bt.get_consecutive_blocks(
+        1, block_list_input=blocks, guarantee_transaction_block=True, transaction_data=tx
+    )
+
+    bad_block = recursive_replace(blocks[-1], "transactions_info.aggregated_signature", G2Element.generator())
+    assert bad_block.transactions_info is not None
+    bad_block = recursive_replace(
+        bad_block, "foliage_transaction_block.transactions_info_hash", bad_block.transactions_info.get_hash()
+    )
+    assert bad_block.foliage_transaction_block is not None
+    bad_block = recursive_replace(
+        bad_block, "foliage.foliage_transaction_block_hash", bad_block.foliage_transaction_block.get_hash()
+    )
+    new_m = bad_block.foliage.foliage_transaction_block_hash
+    assert new_m is not None
+    new_fsb_sig = bt.get_plot_signature(new_m, bad_block.reward_chain_block.proof_of_space.plot_public_key)
+    bad_block = recursive_replace(bad_block, "foliage.foliage_transaction_block_signature", new_fsb_sig)
+    assert bad_block.height == bad_height
+
+    return bt.get_consecutive_blocks(
+        num_blocks - bad_height - 1, block_list_input=[*blocks[:-1], bad_block], guarantee_transaction_block=True
+    )
+
+
+async def add_blocks_without_signatures(full_node: FullNode, blocks: list[FullBlock]) -> None:
+    # the blocks have to be added to the peer serving them without validating
+    # their signatures, like a node trusting the checkpoint would
+    b = full_node.blockchain
+    ssi = b.constants.SUB_SLOT_ITERS_STARTING
+    diff = b.constants.DIFFICULTY_STARTING
+    for block in blocks:
+        future = await pre_validate_block(
+            b.constants,
+            AugmentedBlockchain(b),
+            block,
+            b.pool,
+            None,
+            ValidationState(ssi, diff, None),
+            validate_signatures=False,
+        )
+        preval_result = await future
+        assert preval_result.error is None
+        fork_info = ForkInfo(block.height - 1, block.height - 1, block.prev_header_hash)
+        _, err, _ = await b.add_block(block, preval_result, ssi, fork_info, assume_valid=True)
+        assert err is None
+
+
+@pytest.mark.limit_consensus_modes(reason="save time")
+@pytest.mark.anyio
+@pytest.mark.parametrize("checkpoint_in_chain", [True, False])
+async def test_sync_assume_valid_bad_signature(
+    two_nodes: tuple[FullNodeAPI, FullNodeAPI, ChiaServer, ChiaServer, BlockTools],
+    self_hostname: str,
+    caplog: pytest.LogCaptureFixture,
+    checkpoint_in_chain: bool,
+) -> None:
+    full_node_1, full_node_2, server_1, server_2, bt = two_nodes
+    blocks = chain_with_bad_signature(bt, 30, 10)
+    await add_blocks_without_signatures(full_node_1.full_node, blocks)
+    peak1 = full_node_1.full_node.blockchain.get_peak()
+    assert peak1 is not None
+    assert peak1.height == 29
+    bad_block = blocks[10]
+
+    checkpoint = blocks[20]
+    header_hash = checkpoint.header_hash if checkpoint_in_chain else std_hash(b"not in chain")
+    full_node_2.full_node.assume_valid = AssumeValid(checkpoint.height, header_hash)
+
+    await server_2.start_client(PeerInfo(self_hostname, server_1.get_port()), None)
+    full_node_2.full_node.sync_store.peer_has_block(
+        peak1.header_hash, full_node_1.full_node.server.node_id, peak1.weight, peak1.height, True
+    )
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        await full_node_2.full_node.sync_from_fork_point(uint32(0), peak1.height, peak1.header_hash, [])
+    if checkpoint_in_chain:
+        # the bad signature is below the trusted checkpoint
+        assert node_height_exactly(full_node_2, peak1.height)
+    else:
+        # the signatures are validated, the chain is rejected at the bad block
+        peak2 = full_node_2.full_node.blockchain.get_peak()
+        assert peak2 is not None
+        assert peak2.height < bad_block.height
+        assert await full_node_2.full_node.block_store.get_full_block(bad_block.header_hash) is None
+        assert "sync from fork point failed" in caplog.text
+
+
+def lie_about_checkpoint(monkeypatch: pytest.MonkeyPatch, checkpoint_height: uint32, block: FullBlock) -> None:
+    # makes the peers answer request_block for the checkpoint height with
+    # `block`, whatever their chain contains
+    requests = FullNodeAPI.metadata.message_type_to_request
+    original = requests[ProtocolMessageTypes.request_block]
+
+    # the method registered for a request is passed the serialized message
+    async def request_block(
+        self: FullNodeAPI, request_bytes: bytes, peer: WSChiaConnection | None = None
+    ) -> Message | None:
+        request = full_node_protocol.RequestBlock.from_bytes(request_bytes)
+        if request.height == checkpoint_height:
+            return make_msg(ProtocolMessageTypes.respond_block, full_node_protocol.RespondBlock(block))
+        return await original.method(self, request, peer)
+
+    monkeypatch.setitem(
+        requests, ProtocolMessageTypes.request_block, dataclasses.replace(original, method=request_block)
+    )
+
+
+@pytest.mark.limit_consensus_modes(reason="save time")
+@pytest.mark.anyio
+async def test_sync_assume_valid_lying_peer(
+    two_nodes: tuple[FullNodeAPI, FullNodeAPI, ChiaServer, ChiaServer, BlockTools],
+    self_hostname: str,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    full_node_1, full_node_2, server_1, server_2, bt = two_nodes
+    # the checkpoint must be beyond the first batch of blocks, for the blocks
+    # below it to have been added by the time the lie is detected
+    batch_size = bt.constants.MAX_BLOCK_COUNT_PER_REQUESTS
+    blocks = chain_with_bad_signature(bt, batch_size + 20, 10)
+    await add_blocks_without_signatures(full_node_1.full_node, blocks)
+    peak1 = full_node_1.full_node.blockchain.get_peak()
+    assert peak1 is not None
+    bad_block = blocks[10]
+
+    # the checkpoint is a block of another chain, that the peer claims to have
+    other_block = bt.get_consecutive_blocks(1, seed=b"another chain")[0]
+    assert other_block.header_hash != blocks[0].header_hash
+    checkpoint_height = uint32(batch_size + 10)
+    full_node_2.full_node.assume_valid = AssumeValid(checkpoint_height, other_block.header_hash)
+
+    lie_about_checkpoint(monkeypatch, checkpoint_height, other_block)
+
+    await server_2.start_client(PeerInfo(self_hostname, server_1.get_port()), None)
+    full_node_2.full_node.sync_store.peer_has_block(
+        peak1.header_hash, full_node_1.full_node.server.node_id, peak1.weight, peak1.height, True
+    )
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        await full_node_2.full_node.sync_from_fork_point(uint32(0), peak1.height, peak1.header_hash, [])
+    assert "skipping signature validation up to the assume valid checkpoint" in caplog.text
+    assert "doesn't match the assume valid checkpoint" in caplog.text
+    assert full_node_2.full_node.assume_valid is None
+
+    # the blocks added without validating their signatures are removed
+    peak2 = full_node_2.full_node.blockchain.get_peak()
+    assert peak2 is not None
+    assert peak2.height == 0
+    assert await full_node_2.full_node.block_store.get_full_block(bad_block.header_hash) is None
+    assert full_node_2.full_node.blockchain.height_to_hash(bad_block.height) is None
+    assert await full_node_2.full_node.coin_store.get_coins_added_at_height(uint32(bad_block.height)) == []
+
+    # syncing again validates all signatures, the chain is rejected. The
+    # connection was closed, but localhost peers aren't banned
+    await server_2.start_client(PeerInfo(self_hostname, server_1.get_port()), None)
+    full_node_2.full_node.sync_store.peer_has_block(
+        peak1.header_hash, full_node_1.full_node.server.node_id, peak1.weight, peak1.height, True
+    )
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        await full_node_2.full_node.sync_from_fork_point(uint32(0), peak1.height, peak1.header_hash, [])
+    assert "sync from fork point failed" in caplog.text
+    peak2 = full_node_2.full_node.blockchain.get_peak()
+    assert peak2 is not None
+    assert peak2.height < bad_block.height
+
+
+@pytest.mark.limit_consensus_modes(reason="save time")
+@pytest.mark.anyio
+async def test_sync_assume_valid_peer_disconnects(
+    two_nodes: tuple[FullNodeAPI, FullNodeAPI, ChiaServer, ChiaServer, BlockTools],
+    self_hostname: str,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    full_node_1, full_node_2, server_1, server_2, bt = two_nodes
+    batch_size = bt.constants.MAX_BLOCK_COUNT_PER_REQUESTS
+    blocks = chain_with_bad_signature(bt, batch_size + 20, 10)
+    await add_blocks_without_signatures(full_node_1.full_node, blocks)
+    peak1 = full_node_1.full_node.blockchain.get_peak()
+    assert peak1 is not None
+    bad_block = blocks[10]
+
+    # the syncing node already has the blocks up to the fork point
+    fork_point = uint32(5)
+    for block in blocks[: fork_point + 1]:
+        await full_node_2.full_node.add_block(block)
+    assert node_height_exactly(full_node_2, fork_point)
+
+    # the peer claims to have the checkpoint, but disconnects before sending
+    # the batch of blocks containing it
+    other_block = bt.get_consecutive_blocks(1, seed=b"another chain")[0]
+    checkpoint_height = uint32(batch_size + 10)
+    full_node_2.full_node.assume_valid = AssumeValid(checkpoint_height, other_block.header_hash)
+    lie_about_checkpoint(monkeypatch, checkpoint_height, other_block)
+
+    requests = FullNodeAPI.metadata.message_type_to_request
+    original = requests[ProtocolMessageTypes.request_blocks]
+
+    async def request_blocks(
+        self: FullNodeAPI, request_bytes: bytes, peer: WSChiaConnection | None = None
+    ) -> Message | None:
+        request = full_node_protocol.RequestBlocks.from_bytes(request_bytes)
+        if request.end_height >= checkpoint_height:
+            assert peer is not None
+            await peer.close()
+            return None
+        return await original.method(self, request, peer)
+
+    monkeypatch.setitem(
+        requests, ProtocolMessageTypes.request_blocks, dataclasses.replace(original, method=request_blocks)
+    )
+
+    await server_2.start_client(PeerInfo(self_hostname, server_1.get_port()), None)
+    full_node_2.full_node.sync_store.peer_has_block(
+        peak1.header_hash, full_node_1.full_node.server.node_id, peak1.weight, peak1.height, True
+    )
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        await full_node_2.full_node.sync_from_fork_point(fork_point, peak1.height, peak1.header_hash, [])
+    assert "skipping signature validation up to the assume valid checkpoint" in caplog.text
+    assert "the sync ended before reaching the assume valid checkpoint" in caplog.text
+
+    # the blocks added without validating their signatures are removed, the
+    # peak is back where it was before the sync
+    assert node_height_exactly(full_node_2, fork_point)
+    assert await full_node_2.full_node.block_store.get_full_block(bad_block.header_hash) is None
+    assert full_node_2.full_node.blockchain.height_to_hash(bad_block.height) is None
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import contextlib
 import random
+import tempfile
 from collections.abc import AsyncIterator
 from pathlib import Path
 
@@ -20,11 +21,13 @@ async def create_ram_blockchain(
 ) -> AsyncIterator[tuple[DBWrapper2, Blockchain]]:
     uri = f"file:db_{random.randint(0, 99999999)}?mode=memory&cache=shared"
     async with DBWrapper2.managed(database=uri, uri=True, reader_count=1, db_version=2) as db_wrapper:
-        block_store = await BlockStore.create(db_wrapper)
-        coin_store = await CoinStore.create(db_wrapper)
-        height_map = await BlockHeightMap.create(Path("."), db_wrapper)
-        blockchain = await Blockchain.create(coin_store, block_store, height_map, consensus_constants, 2)
-        try:
-            yield db_wrapper, blockchain
-        finally:
-            blockchain.shut_down()
+        with tempfile.TemporaryDirectory() as blockchain_dir:
+            block_store = await BlockStore.create(db_wrapper)
+            coin_store = await CoinStore.create(db_wrapper)
+            height_map = await BlockHeightMap.create(Path(blockchain_dir), db_wrapper)
+            blockchain = await Blockchain.create(coin_store, block_store, height_map, consensus_constants, 2)
+            try:
+                yield db_wrapper, blockchain
+            finally:
+                blockchain.shut_down()
+                height_map.close()
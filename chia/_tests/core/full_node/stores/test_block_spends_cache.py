@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pytest
+from chia_rs import CoinSpend
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint8, uint32, uint64
+
+from chia._tests.util.db_connection import DBConnection
+from chia.full_node.block_spends_cache import BlockSpends, BlockSpendsCache, SpendWithConditions
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.serialized_program import SerializedProgram
+
+
+def make_block_spends(height: int) -> BlockSpends:
+    coin = Coin(bytes32([height] * 32), bytes32([1] * 32), uint64(height))
+    coin_spend = CoinSpend(coin, SerializedProgram.fromhex("80"), SerializedProgram.fromhex("ff80ffff018080"))
+    return BlockSpends(uint32(height), [SpendWithConditions(coin_spend, [(uint8(51), [b"\x01" * 32, b"\x64"])])])
+
+
+def test_block_spends_conversions() -> None:
+    block_spends = make_block_spends(3)
+    coin_spend = block_spends.spends[0].coin_spend
+    assert block_spends.block_spends() == [coin_spend]
+    assert block_spends.block_spends_with_conditions() == [
+        {"coin_spend": coin_spend, "conditions": [(51, [b"\x01" * 32, b"\x64"])]}
+    ]
+    assert BlockSpends.from_bytes(bytes(block_spends)) == block_spends
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("persist", [True, False])
+async def test_add_get_rollback(persist: bool) -> None:
+    async with DBConnection(2) as db_wrapper:
+        cache = await BlockSpendsCache.create(db_wrapper, capacity=10, persist=persist)
+        for height in range(1, 6):
+            await cache.add(bytes32([height] * 32), make_block_spends(height))
+
+        for height in range(1, 6):
+            assert await cache.get(bytes32([height] * 32)) == make_block_spends(height)
+        assert await cache.get(bytes32([42] * 32)) is None
+
+        await cache.rollback(3)
+        for height in range(1, 4):
+            assert await cache.get(bytes32([height] * 32)) == make_block_spends(height)
+        for height in range(4, 6):
+            assert await cache.get(bytes32([height] * 32)) is None
+
+
+@pytest.mark.anyio
+async def test_persisted_entries_survive_eviction() -> None:
+    async with DBConnection(2) as db_wrapper:
+        cache = await BlockSpendsCache.create(db_wrapper, capacity=1, persist=True)
+        await cache.add(bytes32([1] * 32), make_block_spends(1))
+        await cache.add(bytes32([2] * 32), make_block_spends(2))
+        assert len(cache.cache.cache) == 1
+
+        # a fresh cache (i.e. after a restart) still finds both
+        cache = await BlockSpendsCache.create(db_wrapper, capacity=1, persist=True)
+        assert await cache.get(bytes32([1] * 32)) == make_block_spends(1)
+        assert await cache.get(bytes32([2] * 32)) == make_block_spends(2)
+
+
+@pytest.mark.anyio
+async def test_memory_only() -> None:
+    async with DBConnection(2) as db_wrapper:
+        cache = await BlockSpendsCache.create(db_wrapper, capacity=1)
+        await cache.add(bytes32([1] * 32), make_block_spends(1))
+        await cache.add(bytes32([2] * 32), make_block_spends(2))
+        assert await cache.get(bytes32([1] * 32)) is None
+        assert await cache.get(bytes32([2] * 32)) == make_block_spends(2)
+
+        async with db_wrapper.reader_no_transaction() as conn:
+            async with conn.execute("SELECT name FROM sqlite_master WHERE name='block_spends'") as cursor:
+                assert await cursor.fetchone() is None
@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import cast
 
 import pytest
+import zstd
 
 # TODO: update after resolution in https://github.com/pytest-dev/pytest/issues/7469
 from _pytest.fixtures import SubRequest
@@ -23,13 +24,14 @@ from chia.consensus.block_height_map import BlockHeightMap
 from chia.consensus.blockchain import AddBlockResult, Blockchain
 from chia.consensus.default_constants import DEFAULT_CONSTANTS
 from chia.consensus.full_block_to_block_record import header_block_to_sub_block_record
-from chia.full_node.block_store import BlockStore
+from chia.full_node.block_store import BlockStore, uncompacted_fields
 from chia.full_node.coin_store import CoinStore
+from chia.full_node.db_counters import COMPACTIFIED_BLOCKS, UNCOMPACTIFIED_BLOCKS, count_rows
 from chia.full_node.full_block_utils import GeneratorBlockInfo
 from chia.simulator.block_tools import BlockTools
 from chia.simulator.wallet_tools import WalletTool
 from chia.types.blockchain_format.serialized_program import SerializedProgram
-from chia.types.blockchain_format.vdf import VDFProof
+from chia.types.blockchain_format.vdf import CompressibleVDFField, VDFProof
 from chia.util.casts import int_to_bytes
 from chia.util.db_wrapper import get_host_parameter_limit
 from chia.util.task_referencer import create_referenced_task
@@ -91,6 +93,9 @@ async def test_block_store(tmp_dir: Path, db_version: int, bt: BlockTools, use_c
             assert block == await store.get_full_block(block.header_hash)
             assert block == await store.get_full_block(block.header_hash)
             assert bytes(block) == await store.get_full_block_bytes(block.header_hash)
+            compressed_block = await store.get_compressed_full_block_bytes(block.header_hash)
+            assert compressed_block is not None
+            assert zstd.decompress(compressed_block) == bytes(block)
             assert GeneratorBlockInfo(
                 block.foliage.prev_block_hash, block.transactions_generator, block.transactions_generator_ref_list
             ) == await store.get_block_info(block.header_hash)
@@ -299,7 +304,10 @@ async def test_rollback(bt: BlockTools, tmp_dir: Path, use_cache: bool, default_
                     assert len(rows) == 1
                     assert not rows[0][0]
 
+        assert await block_store.count_uncompactified_blocks() == 10
         await block_store.rollback(5)
+        assert await block_store.count_uncompactified_blocks() == 6
+        assert await block_store.count_compactified_blocks() == 0
 
         count = 0
         async with db_wrapper.reader_no_transaction() as conn:
@@ -323,6 +331,41 @@ async def test_rollback(bt: BlockTools, tmp_dir: Path, use_cache: bool, default_
                     assert not rows[0][0]
 
 
+@pytest.mark.limit_consensus_modes(reason="save time")
+@pytest.mark.anyio
+async def test_delete_blocks_above(bt: BlockTools, tmp_dir: Path, use_cache: bool) -> None:
+    blocks = bt.get_consecutive_blocks(10, guarantee_transaction_block=True)
+
+    async with DBConnection(2) as db_wrapper:
+        coin_store = await CoinStore.create(db_wrapper)
+        block_store = await BlockStore.create(db_wrapper, use_cache=use_cache)
+        height_map = await BlockHeightMap.create(tmp_dir, db_wrapper)
+        bc = await Blockchain.create(coin_store, block_store, height_map, bt.constants, 2)
+        for block in blocks:
+            await _validate_and_add_block(bc, block)
+        assert len(await coin_store.get_coins_added_at_height(uint32(9))) > 0
+
+        await bc.rollback(uint32(5))
+        peak = bc.get_peak()
+        assert peak is not None
+        assert peak.header_hash == blocks[5].header_hash
+        assert await block_store.get_peak() == (blocks[5].header_hash, 5)
+        assert await block_store.count_uncompactified_blocks() == 6
+        for block in blocks[6:]:
+            assert await block_store.get_full_block(block.header_hash) is None
+            assert await block_store.get_block_record(block.header_hash) is None
+            assert bc.height_to_hash(block.height) is None
+            assert await coin_store.get_coins_added_at_height(block.height) == []
+
+        # the blocks aren't known anymore, they're validated again
+        for block in blocks[6:]:
+            await _validate_and_add_block(bc, block)
+        peak = bc.get_peak()
+        assert peak is not None
+        assert peak.header_hash == blocks[-1].header_hash
+        assert await block_store.count_uncompactified_blocks() == 10
+
+
 @pytest.mark.limit_consensus_modes(reason="save time")
 @pytest.mark.anyio
 async def test_count_compactified_blocks(bt: BlockTools, tmp_dir: Path, db_version: int, use_cache: bool) -> None:
@@ -406,6 +449,99 @@ async def test_replace_proof(bt: BlockTools, tmp_dir: Path, db_version: int, use
             assert b is not None
             assert b.challenge_chain_ip_proof == proof
 
+        async with db_wrapper.reader_no_transaction() as conn:
+            assert await block_store.count_compactified_blocks() == await count_rows(conn, COMPACTIFIED_BLOCKS)
+            assert await block_store.count_uncompactified_blocks() == await count_rows(conn, UNCOMPACTIFIED_BLOCKS)
+
+
+@pytest.mark.limit_consensus_modes(reason="save time")
+@pytest.mark.anyio
+async def test_uncompacted_proofs(
+    bt: BlockTools, tmp_dir: Path, db_version: int, use_cache: bool, default_400_blocks: list[FullBlock]
+) -> None:
+    blocks = bt.get_consecutive_blocks(10)
+    alt_blocks = default_400_blocks[:10]
+    compact_proof = VDFProof(uint8(0), b"", True)
+
+    def compactify(block: FullBlock) -> FullBlock:
+        sub_slots = [
+            sub_slot.replace(
+                proofs=sub_slot.proofs.replace(
+                    challenge_chain_slot_proof=compact_proof,
+                    infused_challenge_chain_slot_proof=(
+                        None if sub_slot.proofs.infused_challenge_chain_slot_proof is None else compact_proof
+                    ),
+                )
+            )
+            for sub_slot in block.finished_sub_slots
+        ]
+        return block.replace(
+            finished_sub_slots=sub_slots,
+            challenge_chain_sp_proof=None if block.challenge_chain_sp_proof is None else compact_proof,
+            challenge_chain_ip_proof=compact_proof,
+        )
+
+    def expected_proofs(blocks: list[FullBlock]) -> list[tuple[uint32, bytes32, CompressibleVDFField]]:
+        return sorted(
+            (block.height, block.header_hash, field) for block in blocks for field in uncompacted_fields(block)
+        )
+
+    async def get_all_proofs(block_store: BlockStore) -> list[tuple[uint32, bytes32, CompressibleVDFField]]:
+        # the ids go from 1 to the number of proofs
+        async with db_wrapper.reader_no_transaction() as conn:
+            async with conn.execute("SELECT COUNT(*), MIN(id), MAX(id) FROM uncompacted_proofs") as cursor:
+                row = await cursor.fetchone()
+        assert row is not None
+        assert (row[1], row[2]) == ((1, row[0]) if row[0] > 0 else (None, None))
+        return sorted(await block_store.get_random_uncompacted_proofs(100))
+
+    async with DBConnection(db_version) as db_wrapper:
+        coin_store = await CoinStore.create(db_wrapper)
+        block_store = await BlockStore.create(db_wrapper, use_cache=use_cache)
+        height_map = await BlockHeightMap.create(tmp_dir, db_wrapper)
+        bc = await Blockchain.create(coin_store, block_store, height_map, bt.constants, 2)
+        assert await block_store.get_random_uncompacted_proofs(100) == []
+        fork_info = ForkInfo(-1, -1, bt.constants.GENESIS_CHALLENGE)
+        for block, alt_block in zip(blocks, alt_blocks):
+            await _validate_and_add_block(bc, block)
+            await _validate_and_add_block(
+                bc, alt_block, expected_result=AddBlockResult.ADDED_AS_ORPHAN, fork_info=fork_info
+            )
+
+        # only the main chain's proofs are indexed
+        assert await get_all_proofs(block_store) == expected_proofs(blocks)
+        proofs = await block_store.get_random_uncompacted_proofs(3)
+        assert 0 < len({height for height, _, _ in proofs}) <= 3
+        proofs = await block_store.get_random_uncompacted_proofs(100, fields=[CompressibleVDFField.CC_IP_VDF])
+        assert sorted(proofs) == sorted(
+            (block.height, block.header_hash, CompressibleVDFField.CC_IP_VDF) for block in blocks
+        )
+
+        # the proofs of blocks leaving the main chain are removed, and added
+        # back when they're in it again
+        await block_store.rollback(4)
+        assert await get_all_proofs(block_store) == expected_proofs(blocks[:5])
+        await block_store.set_in_chain([(block.header_hash,) for block in blocks[5:]])
+        assert await get_all_proofs(block_store) == expected_proofs(blocks)
+
+        # the proofs replaced with compact ones are no longer returned, in
+        # particular those of fully compactified blocks
+        new_blocks = [block.replace(challenge_chain_ip_proof=compact_proof) for block in blocks[:5]]
+        new_blocks[0] = compactify(blocks[0])
+        await block_store.replace_proofs([*new_blocks, compactify(alt_blocks[5])])
+        blocks = new_blocks + blocks[5:]
+        assert await get_all_proofs(block_store) == expected_proofs(blocks)
+        assert blocks[0].header_hash not in {header_hash for _, header_hash, _ in expected_proofs(blocks)}
+        async with db_wrapper.reader_no_transaction() as conn:
+            assert await block_store.count_compactified_blocks() == await count_rows(conn, COMPACTIFIED_BLOCKS) == 1
+            assert await block_store.count_uncompactified_blocks() == await count_rows(conn, UNCOMPACTIFIED_BLOCKS)
+
+        # the proofs are indexed when upgrading an existing database
+        async with db_wrapper.writer_maybe_transaction() as conn:
+            await conn.execute("DROP TABLE uncompacted_proofs")
+        block_store = await BlockStore.create(db_wrapper, use_cache=use_cache)
+        assert await get_all_proofs(block_store) == expected_proofs(blocks)
+
 
 @pytest.mark.limit_consensus_modes(reason="save time")
 @pytest.mark.anyio
@@ -21,6 +21,7 @@ from chia.consensus.blockchain import AddBlockResult, Blockchain
 from chia.consensus.coinbase import create_farmer_coin, create_pool_coin
 from chia.full_node.block_store import BlockStore
 from chia.full_node.coin_store import CoinStore
+from chia.full_node.db_counters import UNSPENT_COINS, count_rows
 from chia.full_node.hint_store import HintStore
 from chia.simulator.block_tools import BlockTools, test_constants
 from chia.simulator.wallet_tools import WalletTool
@@ -281,6 +282,8 @@ async def test_rollback(db_version: int, bt: BlockTools) -> None:
         # The reorg will revert the creation and spend of many coins. It will also revert the spend (but not the
         # creation) of the selected coin.
         coin_changes = await coin_store.rollback_to_block(reorg_index)
+        async with db_wrapper.reader_no_transaction() as conn:
+            assert await coin_store.num_unspent() == await count_rows(conn, UNSPENT_COINS)
         changed_coins = {cr.coin for cr in coin_changes.values()}
         assert selected_coin.coin in changed_coins
         for coin_record in all_records:
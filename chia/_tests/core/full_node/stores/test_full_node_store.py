@@ -1229,6 +1229,47 @@ async def test_mark_requesting(
     assert store.is_requesting_unfinished_block(b, b) == (False, 0)
 
     assert len(store._unfinished_blocks) == 0
+    assert len(store._unfinished_blocks_by_height) == 0
+
+
+@pytest.mark.anyio
+async def test_unfinished_blocks_by_height(
+    bt: BlockTools,
+    seeded_random: random.Random,
+) -> None:
+    blocks = bt.get_consecutive_blocks(2, guarantee_transaction_block=True)
+    store = FullNodeStore(bt.constants)
+    unf = [make_unfinished_block(b, bt.constants) for b in blocks]
+    result = PreValidationResult(None, uint64(1), None, uint32(0))
+
+    # a block we've requested, but don't have yet
+    store.mark_requesting_unfinished_block(unf[1].partial_hash, unf[1].foliage.foliage_transaction_block_hash)
+    assert store.get_unfinished_blocks(uint32(0)) == []
+
+    variants = [
+        recursive_replace(unf[0], "foliage.foliage_transaction_block_hash", bytes32.random(seeded_random))
+        for _ in range(3)
+    ]
+    for variant in variants:
+        store.add_unfinished_block(uint32(2), variant, result)
+    store.add_unfinished_block(uint32(3), unf[1], result)
+
+    assert sorted(store.get_unfinished_blocks(uint32(2)), key=lambda b: b.get_hash()) == sorted(
+        variants, key=lambda b: b.get_hash()
+    )
+    assert store.get_unfinished_blocks(uint32(3)) == [unf[1]]
+    # receiving the block replaced the placeholder
+    assert set(store._unfinished_blocks_by_height) == {uint32(2), uint32(3)}
+
+    store.clear_unfinished_blocks_below(uint32(3))
+    assert store.get_unfinished_blocks(uint32(2)) == []
+    assert store.get_unfinished_blocks(uint32(3)) == [unf[1]]
+    assert store.get_unfinished_block(unf[0].partial_hash) is None
+    assert set(store._unfinished_blocks_by_height) == {uint32(3)}
+
+    store.remove_unfinished_block(unf[1].partial_hash)
+    assert store.get_unfinished_blocks(uint32(3)) == []
+    assert len(store._unfinished_blocks_by_height) == 0
 
 
 @pytest.mark.anyio
@@ -201,6 +201,16 @@ async def test_counts(db_version: int) -> None:
         count = await hint_store.count_hints()
         assert count == 2
 
+        # hints that already exist are not counted again
+        await hint_store.add_hints([*hints, (coin_id_0, hint_1)])
+        count = await hint_store.count_hints()
+        assert count == 3
+
+        # the count is persisted
+        hint_store = await HintStore.create(db_wrapper)
+        count = await hint_store.count_hints()
+        assert count == 3
+
 
 @pytest.mark.anyio
 async def test_limits(db_version: int) -> None:
@@ -18,6 +18,7 @@ from chia.server.address_manager import (
 from chia.server.address_manager_store import PeerDataSerialization
 from chia.types.peer_info import PeerInfo, TimestampedPeerInfo
 from chia.util.files import write_file_async
+from chia.util.hash import std_hash
 
 
 class AddressManagerTest(AddressManager):
@@ -584,6 +585,73 @@ class TestPeerManager:
         assert await self.check_retrieved_peers(wanted_peers, addrman2)
         peers_dat_filename.unlink()
 
+    @pytest.mark.anyio
+    async def test_journal(self, tmp_path: Path):
+        def tables(addrman: AddressManager) -> tuple[dict[int, str], dict[int, str]]:
+            new_table = {
+                pos: addrman.map_info[node_id].peer_info.host
+                for pos, node_id in enumerate(addrman.new_matrix)
+                if node_id != -1
+            }
+            tried_table = {
+                pos: addrman.map_info[node_id].peer_info.host
+                for pos, node_id in enumerate(addrman.tried_matrix)
+                if node_id != -1
+            }
+            return new_table, tried_table
+
+        addrman = AddressManagerTest()
+        now = math.floor(time.time())
+        source = PeerInfo("252.5.1.1", uint16(8333))
+        peers = [TimestampedPeerInfo(f"250.7.{i}.1", uint16(8444), uint64(now - 10000 - i)) for i in range(20)]
+        await addrman.add_to_new_table(peers[:10], source)
+        await addrman.mark_good(PeerInfo("250.7.1.1", uint16(8444)))
+
+        peers_dat_filename = tmp_path / "peers.dat"
+        journal_filename = tmp_path / "peers.dat.journal"
+        # the first save writes the peers file and starts the journal
+        await addrman.save(peers_dat_filename)
+        snapshot = peers_dat_filename.read_bytes()
+        assert journal_filename.read_bytes() == std_hash(snapshot)
+
+        # the changes are appended to the journal
+        await addrman.add_to_new_table(peers[10:], source)
+        await addrman.mark_good(PeerInfo("250.7.12.1", uint16(8444)))
+        await addrman.connect(PeerInfo("250.7.3.1", uint16(8444)), now)
+        await addrman.save(peers_dat_filename)
+        assert peers_dat_filename.read_bytes() == snapshot
+        journal_size = len(journal_filename.read_bytes())
+        assert journal_size > 32
+        # nothing changed, nothing to append
+        await addrman.save(peers_dat_filename)
+        assert len(journal_filename.read_bytes()) == journal_size
+
+        addrman2 = await AddressManager.create_address_manager(peers_dat_filename)
+        assert tables(addrman2) == tables(addrman)
+        assert addrman2.new_count == addrman.new_count
+        assert addrman2.tried_count == addrman.tried_count
+        assert addrman2.map_info[addrman2.map_addr["250.7.3.1"]].timestamp == now
+
+        # a partially written batch is ignored
+        with open(journal_filename, "ab") as f:
+            f.write(b"\x00\x00\x00\x05\x01")
+        addrman3 = await AddressManager.create_address_manager(peers_dat_filename)
+        assert tables(addrman3) == tables(addrman)
+
+        # compaction rewrites the peers file and resets the journal
+        addrman.journal_size = 2**32
+        await addrman.save(peers_dat_filename)
+        snapshot = peers_dat_filename.read_bytes()
+        assert journal_filename.read_bytes() == std_hash(snapshot)
+        addrman4 = await AddressManager.create_address_manager(peers_dat_filename)
+        assert tables(addrman4) == tables(addrman)
+
+        # a journal that doesn't belong to the peers file is removed
+        await write_file_async(peers_dat_filename, AddressManagerTest().serialize_bytes(), file_mode=0o644)
+        addrman5 = await AddressManager.create_address_manager(peers_dat_filename)
+        assert len(addrman5.map_info) == 0
+        assert not journal_filename.exists()
+
     @pytest.mark.anyio
     async def test_bad_ip_encoding(self, tmp_path: Path):
         addrman = AddressManagerTest()
@@ -627,9 +695,9 @@ class TestPeerManager:
         count = 0
         for bucket in range(NEW_BUCKET_COUNT):
             for i in range(BUCKET_SIZE):
-                if addrman.new_matrix[bucket][i] != -1:
+                if addrman.new_matrix[bucket * BUCKET_SIZE + i] != -1:
                     count += 1
-                    uint64(unique_ids[addrman.new_matrix[bucket][i]]).stream(new_table)
+                    uint64(unique_ids[addrman.new_matrix[bucket * BUCKET_SIZE + i]]).stream(new_table)
                     uint64(bucket).stream(new_table)
 
         # give ourselves a clue how long the new_table is
@@ -700,8 +768,8 @@ class TestPeerManager:
 
             for bucket in range(NEW_BUCKET_COUNT):
                 for i in range(BUCKET_SIZE):
-                    if address_manager.new_matrix[bucket][i] != -1:
-                        index = unique_ids[address_manager.new_matrix[bucket][i]]
+                    if address_manager.new_matrix[bucket * BUCKET_SIZE + i] != -1:
+                        index = unique_ids[address_manager.new_matrix[bucket * BUCKET_SIZE + i]]
                         new_table_entries.append((index, bucket))
 
             # Ensure the parent directory exists
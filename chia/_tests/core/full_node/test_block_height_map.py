@@ -103,6 +103,8 @@ class TestBlockHeightMap:
             for height in reversed(range(10)):
                 assert height_map.get_hash(uint32(height)) == gen_block_hash(height)
 
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_height_to_hash_long_chain(self, tmp_dir: Path, db_version: int) -> None:
         async with DBConnection(db_version) as db_wrapper:
@@ -117,6 +119,8 @@ class TestBlockHeightMap:
             for height in reversed(range(10000)):
                 assert height_map.get_hash(uint32(height)) == gen_block_hash(height)
 
+            height_map.close()
+
     @pytest.mark.parametrize("ses_every", [20, 1])
     @pytest.mark.anyio
     async def test_save_restore(self, ses_every: int, tmp_dir: Path, db_version: int) -> None:
@@ -137,7 +141,7 @@ class TestBlockHeightMap:
 
             await height_map.maybe_flush()
 
-            del height_map
+            height_map.close()
 
             # To ensure we're actually loading from cache, and not the DB, clear
             # the table (but we still need the peak). We need at least 20 blocks
@@ -159,6 +163,8 @@ class TestBlockHeightMap:
                     with pytest.raises(KeyError) as _:
                         height_map.get_ses(uint32(height))
 
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_restore_entire_chain(self, tmp_dir: Path, db_version: int) -> None:
         # this is a test where the height-to-hash and height-to-ses caches are
@@ -192,6 +198,8 @@ class TestBlockHeightMap:
                     with pytest.raises(KeyError) as _:
                         height_map.get_ses(uint32(height))
 
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_restore_ses_only(self, tmp_dir: Path, db_version: int) -> None:
         # this is a test where the height-to-hash is complete and correct but
@@ -203,7 +211,7 @@ class TestBlockHeightMap:
 
             height_map = await BlockHeightMap.create(tmp_dir, db_wrapper)
             await height_map.maybe_flush()
-            del height_map
+            height_map.close()
 
             # corrupt the sub epoch cache
             ses_cache = []
@@ -224,6 +232,8 @@ class TestBlockHeightMap:
                     with pytest.raises(KeyError) as _:
                         height_map.get_ses(uint32(height))
 
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_restore_extend(self, tmp_dir: Path, db_version: int) -> None:
         # test the case where the cache has fewer blocks than the DB, and that
@@ -246,7 +256,7 @@ class TestBlockHeightMap:
 
             await height_map.maybe_flush()
 
-            del height_map
+            height_map.close()
 
         async with DBConnection(db_version) as db_wrapper:
             await setup_db(db_wrapper)
@@ -264,6 +274,8 @@ class TestBlockHeightMap:
                     with pytest.raises(KeyError) as _:
                         height_map.get_ses(uint32(height))
 
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_height_to_hash_with_orphans(self, tmp_dir: Path, db_version: int) -> None:
         async with DBConnection(db_version) as db_wrapper:
@@ -279,6 +291,8 @@ class TestBlockHeightMap:
             for height in range(10):
                 assert height_map.get_hash(uint32(height)) == gen_block_hash(height)
 
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_height_to_hash_update(self, tmp_dir: Path, db_version: int) -> None:
         async with DBConnection(db_version) as db_wrapper:
@@ -299,6 +313,7 @@ class TestBlockHeightMap:
                 assert height_map.get_hash(uint32(height)) == gen_block_hash(height)
 
             assert height_map.get_hash(uint32(10)) == gen_block_hash(100)
+            height_map.close()
 
     @pytest.mark.anyio
     async def test_update_ses(self, tmp_dir: Path, db_version: int) -> None:
@@ -318,6 +333,7 @@ class TestBlockHeightMap:
 
             assert height_map.get_ses(uint32(10)) == gen_ses(10)
             assert height_map.get_hash(uint32(10)) == gen_block_hash(10)
+            height_map.close()
 
     @pytest.mark.anyio
     async def test_height_to_ses(self, tmp_dir: Path, db_version: int) -> None:
@@ -344,6 +360,8 @@ class TestBlockHeightMap:
             with pytest.raises(KeyError) as _:
                 height_map.get_ses(uint32(9))
 
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_rollback(self, tmp_dir: Path, db_version: int) -> None:
         async with DBConnection(db_version) as db_wrapper:
@@ -380,6 +398,8 @@ class TestBlockHeightMap:
             with pytest.raises(KeyError) as _:
                 height_map.get_ses(uint32(8))
 
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_rollback2(self, tmp_dir: Path, db_version: int) -> None:
         async with DBConnection(db_version) as db_wrapper:
@@ -411,6 +431,39 @@ class TestBlockHeightMap:
             with pytest.raises(KeyError) as _:
                 height_map.get_ses(uint32(8))
 
+            height_map.close()
+
+    @pytest.mark.anyio
+    async def test_rollback_extend(self, tmp_dir: Path, db_version: int) -> None:
+        async with DBConnection(db_version) as db_wrapper:
+            await setup_db(db_wrapper)
+            await setup_chain(db_wrapper, 10, ses_every=2)
+
+            height_map = await BlockHeightMap.create(tmp_dir, db_wrapper)
+            height_map.rollback(5)
+
+            # extend the chain from the fork point, past the old peak and past
+            # the end of the file
+            for height in range(6, 20000):
+                height_map.update_height(uint32(height), gen_block_hash(height + 65536), None)
+
+            for height in range(6):
+                assert height_map.get_hash(uint32(height)) == gen_block_hash(height)
+            for height in range(6, 20000):
+                assert height_map.get_hash(uint32(height)) == gen_block_hash(height + 65536)
+            assert not height_map.contains_height(uint32(20000))
+            assert os.path.getsize(tmp_dir / "height-to-hash") >= 20000 * 32
+
+            # the file is updated through the memory map, it's up to date
+            # without being flushed
+            with open(tmp_dir / "height-to-hash", "rb") as f:
+                heights = f.read()
+            for height in range(20000):
+                expected = gen_block_hash(height if height < 6 else height + 65536)
+                assert heights[height * 32 : height * 32 + 32] == expected
+
+            height_map.close()
+
     @pytest.mark.anyio
     async def test_cache_file_nothing_to_write(self, tmp_dir: Path, db_version: int) -> None:
         # This is a test where the height-to-hash data is entirely used from
@@ -418,7 +471,7 @@ class TestBlockHeightMap:
         async with DBConnection(db_version) as db_wrapper:
             await setup_db(db_wrapper)
             await setup_chain(db_wrapper, 10000, ses_every=20)
-            await BlockHeightMap.create(tmp_dir, db_wrapper)
+            (await BlockHeightMap.create(tmp_dir, db_wrapper)).close()
             # To ensure we're actually loading from cache, and not the DB, clear
             # the table.
             async with db_wrapper.writer_maybe_transaction() as conn:
@@ -428,7 +481,7 @@ class TestBlockHeightMap:
             with open(tmp_dir / "height-to-hash", "rb") as f:
                 heights = bytearray(f.read())
                 assert len(heights) == (10000 + 1) * 32
-            await BlockHeightMap.create(tmp_dir, db_wrapper)
+            (await BlockHeightMap.create(tmp_dir, db_wrapper)).close()
             # Make sure we didn't alter the cache (nothing new to write)
             with open(tmp_dir / "height-to-hash", "rb") as f:
                 # pytest doesn't behave very well comparing large buffers
@@ -450,7 +503,7 @@ class TestBlockHeightMap:
             await write_file_async(tmp_dir / "height-to-hash", heights)
             await setup_db(db_wrapper)
             await setup_chain(db_wrapper, 10000, ses_every=20)
-            await BlockHeightMap.create(tmp_dir, db_wrapper)
+            (await BlockHeightMap.create(tmp_dir, db_wrapper)).close()
             # We replaced the whole cache at this point so all values should be different
             with open(tmp_dir / "height-to-hash", "rb") as f:
                 new_heights = bytearray(f.read())
@@ -468,7 +521,7 @@ class TestBlockHeightMap:
         async with DBConnection(db_version) as db_wrapper:
             await setup_db(db_wrapper)
             await setup_chain(db_wrapper, 2000, ses_every=20)
-            await BlockHeightMap.create(tmp_dir, db_wrapper)
+            (await BlockHeightMap.create(tmp_dir, db_wrapper)).close()
         async with DBConnection(db_version) as db_wrapper:
             await setup_db(db_wrapper)
             # Add 2000 blocks to the chain
@@ -477,7 +530,7 @@ class TestBlockHeightMap:
             with open(tmp_dir / "height-to-hash", "rb") as f:
                 heights = f.read()
                 assert len(heights) == (2000 + 1) * 32
-            await BlockHeightMap.create(tmp_dir, db_wrapper)
+            (await BlockHeightMap.create(tmp_dir, db_wrapper)).close()
             # Make sure we properly wrote the additional data to the cache
             with open(tmp_dir / "height-to-hash", "rb") as f:
                 new_heights = f.read()
@@ -496,6 +549,7 @@ class TestBlockHeightMap:
             await setup_chain(db_wrapper, 2000, ses_every=20)
             bh = await BlockHeightMap.create(tmp_dir, db_wrapper)
             await bh.maybe_flush()
+            bh.close()
 
             # extend the cache file
             with open(tmp_dir / "height-to-hash", "r+b") as f:
@@ -504,6 +558,7 @@ class TestBlockHeightMap:
 
             bh = await BlockHeightMap.create(tmp_dir, db_wrapper)
             await bh.maybe_flush()
+            bh.close()
 
             with open(tmp_dir / "height-to-hash", "rb") as f:
                 new_heights = f.read()
@@ -534,6 +589,8 @@ async def test_empty_chain(tmp_dir: Path, db_version: int) -> None:
         with pytest.raises(AssertionError) as _:
             height_map.get_hash(uint32(0))
 
+        height_map.close()
+
 
 @pytest.mark.anyio
 async def test_peak_only_chain(tmp_dir: Path, db_version: int) -> None:
@@ -553,3 +610,5 @@ async def test_peak_only_chain(tmp_dir: Path, db_version: int) -> None:
 
         with pytest.raises(AssertionError) as _:
             height_map.get_hash(uint32(0))
+
+        height_map.close()
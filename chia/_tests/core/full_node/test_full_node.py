@@ -2464,6 +2464,61 @@ async def test_respond_compact_proof_message_limit(
     assert compactified == EXPECTED_COMPACTIFIED
 
 
+@pytest.mark.anyio
+@pytest.mark.limit_consensus_modes(reason="save time")
+async def test_compact_proof_batch_error(
+    one_node_one_block: tuple[FullNodeSimulator, ChiaServer, BlockTools], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    full_node_1, _, _ = one_node_one_block
+    full_node = full_node_1.full_node
+    peak = full_node.blockchain.get_peak()
+    assert peak is not None
+    monkeypatch.setattr(full_node.blockchain, "get_peak", lambda: peak.replace(height=uint32(10)))
+
+    async def can_accept_compact_proof(*args: object) -> bool:
+        return True
+
+    monkeypatch.setattr(full_node, "_can_accept_compact_proof", can_accept_compact_proof)
+
+    # the first write blocks until the other proofs are queued, which are
+    # then written in the same batch. Every write fails
+    batches: list[list[bytes32]] = []
+    release = asyncio.Event()
+
+    async def replace_proofs(proofs: list[tuple[VDFInfo, VDFProof, bytes32, CompressibleVDFField]]) -> list[bool]:
+        batches.append([header_hash for _, _, header_hash, _ in proofs])
+        if len(batches) == 1:
+            await release.wait()
+        raise ValueError("failed to write the batch")
+
+    monkeypatch.setattr(full_node, "_replace_proofs", replace_proofs)
+
+    # the tasks run in order, this one after the others have queued their proofs
+    async def release_when_queued() -> None:
+        assert len(batches) == 1
+        assert len(full_node._pending_compact_proofs) == 2
+        release.set()
+
+    vdf_info = VDFInfo(bytes32.random(), uint64(1000), ClassgroupElement.get_default_element())
+    vdf_proof = VDFProof(uint8(0), b"0" * 100, True)
+    proofs = [
+        timelord_protocol.RespondCompactProofOfTime(
+            vdf_info, vdf_proof, bytes32.random(), uint32(1), uint8(CompressibleVDFField.CC_EOS_VDF)
+        )
+        for _ in range(3)
+    ]
+    results = await asyncio.gather(
+        *(full_node.add_compact_proof_of_time(proof) for proof in proofs),
+        release_when_queued(),
+        return_exceptions=True,
+    )
+    assert batches == [[proofs[0].header_hash], [proofs[1].header_hash, proofs[2].header_hash]]
+    # the error reaches every proof of the failed batches
+    for result in results[:3]:
+        assert isinstance(result, ValueError)
+    assert full_node._pending_compact_proofs == []
+
+
 @pytest.mark.parametrize(
     argnames=["custom_capabilities", "expect_success"],
     argvalues=[
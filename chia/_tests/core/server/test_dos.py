@@ -37,7 +37,12 @@ def not_localhost(host: str) -> bool:
 
 class FakeRateLimiter:
     def process_msg_and_check(
-        self, message: Message, our_capabilities: list[Capability], peer_capabilities: list[Capability]
+        self,
+        message: Message,
+        our_capabilities: list[Capability],
+        peer_capabilities: list[Capability],
+        *,
+        data_size: int | None = None,
     ) -> str | None:
         return None
 
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import pytest
+import zstd
+from chia_rs.sized_ints import uint8, uint32
+
+from chia._tests.connection_utils import connect_and_get_peer
+from chia.full_node.full_node_api import FullNodeAPI
+from chia.protocols.full_node_protocol import RequestBlock, RequestBlocks, RespondBlock, RespondBlocks
+from chia.protocols.outbound_message import Message
+from chia.protocols.protocol_message_types import ProtocolMessageTypes
+from chia.protocols.shared_protocol import Capability
+from chia.server.message_compression import (
+    CompressedMessage,
+    compress_message,
+    decompress_message,
+    is_passthrough_compatible,
+    zstd_decompressed_size,
+)
+from chia.server.rate_limits import RateLimiter
+from chia.server.server import ChiaServer
+from chia.simulator.block_tools import BlockTools
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"a", bytes(300), bytes(range(256)) * 100, bytes(range(256)) * 20000],
+)
+def test_decompressed_size(data: bytes) -> None:
+    assert zstd_decompressed_size(zstd.compress(data)) == len(data)
+
+
+def test_decompressed_size_concatenated_frames() -> None:
+    blob = zstd.compress(b"foo" * 1000) + zstd.compress(b"bar") + zstd.compress(bytes(100000))
+    assert zstd_decompressed_size(blob) == len(zstd.decompress(blob)) == 103003
+
+
+@pytest.mark.parametrize("blob", [b"foo", zstd.compress(b"foobar")[:-1], zstd.compress(b"foo") + b"bar"])
+def test_decompressed_size_invalid(blob: bytes) -> None:
+    with pytest.raises(ValueError):
+        zstd_decompressed_size(blob)
+    assert not is_passthrough_compatible(blob)
+
+
+def test_roundtrip() -> None:
+    message = Message(uint8(ProtocolMessageTypes.respond_block.value), None, bytes(range(256)) * 100)
+    compressed = compress_message(message)
+    assert isinstance(compressed, CompressedMessage)
+    assert len(compressed.data) < len(message.data)
+    assert compressed.decompressed_size == len(message.data)
+    assert decompress_message(compressed) == message
+
+
+def test_decompress_too_large() -> None:
+    message = compress_message(Message(uint8(ProtocolMessageTypes.respond_block.value), None, bytes(1001)))
+    assert decompress_message(message, max_size=1001).data == bytes(1001)
+    with pytest.raises(ValueError, match="too large"):
+        decompress_message(message, max_size=1000)
+
+
+def test_decompress_invalid() -> None:
+    with pytest.raises(ValueError):
+        decompress_message(Message(uint8(ProtocolMessageTypes.respond_block.value), None, b"foobar"))
+
+
+def test_rate_limit_decompressed_size() -> None:
+    capabilities = [Capability.BASE, Capability.RATE_LIMITS_V2]
+    message = compress_message(Message(uint8(ProtocolMessageTypes.respond_block.value), None, bytes(3 * 1024 * 1024)))
+    # the compressed message is well within the limit, but it decompresses
+    # to more than the 2 MB allowed for respond_block
+    assert RateLimiter(incoming=False).process_msg_and_check(message, capabilities, capabilities) is None
+    assert (
+        RateLimiter(incoming=False).process_msg_and_check(
+            message, capabilities, capabilities, data_size=message.decompressed_size
+        )
+        is not None
+    )
+
+
+@pytest.mark.anyio
+async def test_request_blocks_compressed(
+    two_nodes: tuple[FullNodeAPI, FullNodeAPI, ChiaServer, ChiaServer, BlockTools], self_hostname: str
+) -> None:
+    full_node_1, _, server_1, server_2, bt = two_nodes
+    blocks = bt.get_consecutive_blocks(5)
+    for block in blocks:
+        await full_node_1.full_node.add_block(block)
+
+    # the connection from node 2 to node 1
+    peer = await connect_and_get_peer(server_2, server_1, self_hostname)
+    assert peer.compression_enabled()
+
+    # blocks are passed through compressed, as they're stored
+    msg = await full_node_1.request_block(RequestBlock(uint32(2), True), peer)
+    assert isinstance(msg, CompressedMessage)
+    assert decompress_message(msg).data == bytes(RespondBlock(blocks[2]))
+    msg = await full_node_1.request_blocks(RequestBlocks(uint32(0), uint32(4), True), peer)
+    assert isinstance(msg, CompressedMessage)
+    assert decompress_message(msg).data == bytes(RespondBlocks(uint32(0), uint32(4), blocks))
+
+    # without a peer supporting compression, the messages are not compressed
+    msg = await full_node_1.request_blocks(RequestBlocks(uint32(0), uint32(4), True))
+    assert msg is not None and not isinstance(msg, CompressedMessage)
+    assert msg.data == bytes(RespondBlocks(uint32(0), uint32(4), blocks))
+
+    response = await peer.call_api(FullNodeAPI.request_blocks, RequestBlocks(uint32(0), uint32(4), True))
+    assert response == RespondBlocks(uint32(0), uint32(4), blocks)
+    response = await peer.call_api(FullNodeAPI.request_block, RequestBlock(uint32(3), True))
+    assert response == RespondBlock(blocks[3])
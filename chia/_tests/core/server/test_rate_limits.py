@@ -534,3 +534,28 @@ async def test_unsolicited_responses(
     # make sure the connection is closed because of the unsolicited response
     # message
     await time_out_assert(5, lambda: a_con.closed)
+
+
+def test_rate_limits_table_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[list[Capability], list[Capability]]] = []
+
+    def mock_get_limits(
+        our_capabilities: list[Capability], peer_capabilities: list[Capability]
+    ) -> tuple[dict[ProtocolMessageTypes, RLSettings | Unlimited], RLSettings]:
+        calls.append((our_capabilities, peer_capabilities))
+        return get_rate_limits_to_use(our_capabilities, peer_capabilities)
+
+    import chia.server.rate_limits
+
+    monkeypatch.setattr(chia.server.rate_limits, "get_rate_limits_to_use", mock_get_limits)
+
+    r = RateLimiter(incoming=False, get_time=lambda: 0)
+    msg = make_msg(ProtocolMessageTypes.new_transaction, bytes([1] * 40))
+    for _ in range(10):
+        assert r.process_msg_and_check(msg, rl_v2, rl_v2) is None
+    assert calls == [(rl_v2, rl_v2)]
+
+    # the table is looked up again when the capabilities change
+    assert r.process_msg_and_check(msg, rl_v2, rl_v1) is None
+    assert calls == [(rl_v2, rl_v2), (rl_v2, rl_v1)]
+    assert r.get_rate_limits(rl_v2, rl_v1) == get_rate_limits_to_use(rl_v2, rl_v1)
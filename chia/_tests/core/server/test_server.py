@@ -7,7 +7,7 @@ from typing import ClassVar, cast
 
 import pytest
 from chia_rs.sized_bytes import bytes32
-from chia_rs.sized_ints import int16, uint32
+from chia_rs.sized_ints import int16, uint32, uint64
 from packaging.version import Version
 
 from chia import __version__
@@ -17,7 +17,7 @@ from chia._tests.util.setup_nodes import SimulatorsAndWalletsServices
 from chia._tests.util.time_out_assert import time_out_assert
 from chia.full_node.full_node_api import FullNodeAPI
 from chia.full_node.start_full_node import create_full_node_service
-from chia.protocols.full_node_protocol import RejectBlock, RequestBlock, RequestTransaction
+from chia.protocols.full_node_protocol import NewTransaction, RejectBlock, RequestBlock, RequestTransaction
 from chia.protocols.outbound_message import NodeType, make_msg
 from chia.protocols.protocol_message_types import ProtocolMessageTypes
 from chia.protocols.shared_protocol import Error, protocol_version
@@ -198,6 +198,25 @@ async def test_call_api_of_specific(
     assert isinstance(message, RejectBlock)
 
 
+@pytest.mark.anyio
+async def test_broadcast(
+    two_nodes: tuple[FullNodeAPI, FullNodeAPI, ChiaServer, ChiaServer, BlockTools], self_hostname: str
+) -> None:
+    _, _, server_1, server_2, _ = two_nodes
+    assert await server_1.start_client(PeerInfo(self_hostname, server_2.get_port()), None)
+
+    msg = make_msg(ProtocolMessageTypes.new_transaction, NewTransaction(bytes32.zeros, uint64(1), uint64(1)))
+    await server_1.send_to_all_if([msg], NodeType.FULL_NODE, lambda connection: False)
+    await server_1.send_to_all([msg], NodeType.FULL_NODE)
+
+    # the message is serialized once, and shared by all connections
+    assert msg.__dict__["encoded"] == bytes(msg)
+    metrics = server_1.broadcast_metrics[ProtocolMessageTypes.new_transaction]
+    assert metrics.count == 2
+    assert metrics.peers == 1
+    assert metrics.to_json_dict()["max_seconds"] >= metrics.to_json_dict()["average_seconds"]
+
+
 @pytest.mark.anyio
 async def test_call_api_of_specific_for_missing_peer(
     two_nodes: tuple[FullNodeAPI, FullNodeAPI, ChiaServer, ChiaServer, BlockTools],
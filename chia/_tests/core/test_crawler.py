@@ -3,8 +3,10 @@ from __future__ import annotations
 import logging
 import time
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import cast
 
+import aiosqlite
 import pytest
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint32, uint64, uint128
@@ -16,6 +18,7 @@ from chia.protocols.full_node_protocol import NewPeak
 from chia.protocols.outbound_message import make_msg
 from chia.protocols.protocol_message_types import ProtocolMessageTypes
 from chia.protocols.wallet_protocol import RequestChildren
+from chia.seeder.crawl_store import CrawlStore
 from chia.seeder.crawler_service import CrawlerService
 from chia.seeder.peer_record import PeerRecord, PeerReliability
 from chia.types.peer_info import PeerInfo
@@ -173,3 +176,63 @@ async def test_crawler_peer_cleanup(
     assert 4 == len(crawl_store.host_to_records)
     good_peers = await crawl_store.get_good_peers()
     assert set(good_peers) == {"10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"}, good_peers
+
+
+@pytest.mark.anyio
+async def test_crawl_store_peers_to_crawl(tmp_path: Path) -> None:
+    """
+    The peers selected for crawling are the ones that are due, and a peer isn't selected again until it's due again.
+    Only the peers that changed are written to the DB.
+    """
+    async with aiosqlite.connect(tmp_path / "crawler.db") as db:
+        crawl_store = await CrawlStore.create(db)
+        now = int(time.time())
+        peer_addresses = ["10.0.0.1", "10.0.0.2", "10.0.0.3", "2001:db8::1"]
+        for idx, peer_address in enumerate(peer_addresses):
+            peer_record = PeerRecord(
+                peer_address,
+                peer_address,
+                uint32(8444),
+                False,
+                # the third peer was tried recently
+                uint64(now - 10 if idx == 2 else 0),
+                uint32(0),
+                uint64(0),
+                uint64(now),
+                uint64(now),
+                "undefined",
+                uint64(0),
+                tls_version="unknown",
+            )
+            crawl_store.maybe_add_peer(peer_record, PeerReliability(peer_address))
+
+        peers = await crawl_store.get_peers_to_crawl(10, 100)
+        assert {peer.peer_id for peer in peers} == {"10.0.0.1", "10.0.0.2", "2001:db8::1"}
+        # they were just selected
+        assert await crawl_store.get_peers_to_crawl(10, 100) == []
+
+        # batches are limited in size, for IPv4 and IPv6 separately
+        crawl_store.host_to_selected_time.clear()
+        crawl_store.rebuild_crawl_queue()
+        peers = await crawl_store.get_peers_to_crawl(1, 1)
+        assert len(peers) == 2
+        assert "2001:db8::1" in {peer.peer_id for peer in peers}
+
+        # a peer that failed to connect and got banned isn't crawled until the ban expires
+        reliability = await crawl_store.get_peer_reliability("10.0.0.3")
+        reliability.ban_till = now + 3600
+        await crawl_store.peer_failed_to_connect(crawl_store.host_to_records["10.0.0.3"])
+        assert crawl_store.host_to_eligible_time["10.0.0.3"] > now + 3600
+
+        await crawl_store.load_to_db()
+        assert len(crawl_store.dirty_peers) == 0
+        async with db.execute("SELECT COUNT(*) FROM peer_records") as cursor:
+            row = await cursor.fetchone()
+        assert row is not None and row[0] == len(peer_addresses)
+
+        await crawl_store.update_best_timestamp("10.0.0.1", uint64(now + 1))
+        assert crawl_store.dirty_peers == {"10.0.0.1"}
+        await crawl_store.load_to_db()
+        await crawl_store.unload_from_db()
+        assert crawl_store.host_to_records["10.0.0.1"].best_timestamp == now + 1
+        assert crawl_store.host_to_records["10.0.0.3"].try_count == 1
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import sqlite3
+import tempfile
 from contextlib import closing
 from pathlib import Path
 from typing import Any
@@ -11,6 +12,7 @@ from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint32, uint64
 
 from chia._tests.util.temp_file import TempFile
+from chia.cmds.db_counters_func import check_counters
 from chia.cmds.db_validate_func import validate_v2
 from chia.consensus.block_body_validation import ForkInfo
 from chia.consensus.block_height_map import BlockHeightMap
@@ -19,7 +21,8 @@ from chia.consensus.default_constants import DEFAULT_CONSTANTS
 from chia.consensus.multiprocess_validation import PreValidationResult
 from chia.full_node.block_store import BlockStore
 from chia.full_node.coin_store import CoinStore
-from chia.simulator.block_tools import test_constants
+from chia.full_node.db_counters import UNCOMPACTIFIED_BLOCKS, UNSPENT_COINS
+from chia.simulator.block_tools import BlockTools, test_constants
 from chia.util.db_wrapper import DBWrapper2
 
 
@@ -140,18 +143,20 @@ async def make_db(db_file: Path, blocks: list[FullBlock]) -> None:
 
         block_store = await BlockStore.create(db_wrapper)
         coin_store = await CoinStore.create(db_wrapper)
-        height_map = await BlockHeightMap.create(Path("."), db_wrapper)
-
-        bc = await Blockchain.create(coin_store, block_store, height_map, test_constants, reserved_cores=0)
-        sub_slot_iters = test_constants.SUB_SLOT_ITERS_STARTING
-        for block in blocks:
-            if block.height != 0 and len(block.finished_sub_slots) > 0:
-                if block.finished_sub_slots[0].challenge_chain.new_sub_slot_iters is not None:
-                    sub_slot_iters = block.finished_sub_slots[0].challenge_chain.new_sub_slot_iters
-            results = PreValidationResult(None, uint64(1), None, uint32(0))
-            fork_info = ForkInfo(block.height - 1, block.height - 1, block.prev_header_hash)
-            _, err, _ = await bc.add_block(block, results, sub_slot_iters=sub_slot_iters, fork_info=fork_info)
-            assert err is None
+        with tempfile.TemporaryDirectory() as blockchain_dir:
+            height_map = await BlockHeightMap.create(Path(blockchain_dir), db_wrapper)
+
+            bc = await Blockchain.create(coin_store, block_store, height_map, test_constants, reserved_cores=0)
+            sub_slot_iters = test_constants.SUB_SLOT_ITERS_STARTING
+            for block in blocks:
+                if block.height != 0 and len(block.finished_sub_slots) > 0:
+                    if block.finished_sub_slots[0].challenge_chain.new_sub_slot_iters is not None:
+                        sub_slot_iters = block.finished_sub_slots[0].challenge_chain.new_sub_slot_iters
+                results = PreValidationResult(None, uint64(1), None, uint32(0))
+                fork_info = ForkInfo(block.height - 1, block.height - 1, block.prev_header_hash)
+                _, err, _ = await bc.add_block(block, results, sub_slot_iters=sub_slot_iters, fork_info=fork_info)
+                assert err is None
+            height_map.close()
 
 
 @pytest.mark.anyio
@@ -171,3 +176,22 @@ async def test_db_validate_default_1000_blocks(
             default_1000_blocks[0].foliage.prev_block_hash.hex()
         )
         validate_v2(db_file, config=default_config, validate_blocks=True)
+
+
+@pytest.mark.anyio
+async def test_db_check_counters(bt: BlockTools) -> None:
+    with TempFile() as db_file:
+        await make_db(db_file, bt.get_consecutive_blocks(10))
+        assert check_counters(db_file, fix=False) == {}
+
+        with closing(sqlite3.connect(db_file)) as conn:
+            conn.execute("UPDATE counters SET value=value+1 WHERE name=?", (UNSPENT_COINS,))
+            conn.execute("UPDATE counters SET value=0 WHERE name=?", (UNCOMPACTIFIED_BLOCKS,))
+            conn.commit()
+
+        mismatches = check_counters(db_file, fix=True)
+        assert set(mismatches.keys()) == {UNSPENT_COINS, UNCOMPACTIFIED_BLOCKS}
+        stored, actual = mismatches[UNCOMPACTIFIED_BLOCKS]
+        assert stored == 0
+        assert actual > 0
+        assert check_counters(db_file, fix=False) == {}
@@ -30,6 +30,7 @@ from chia.farmer.farmer_rpc_api import (
 )
 from chia.farmer.farmer_rpc_client import FarmerRpcClient
 from chia.farmer.farmer_service import FarmerService
+from chia.farmer.pool_stats import POOL_STATS_BUCKET_SECONDS
 from chia.harvester.harvester_service import HarvesterService
 from chia.plot_sync.receiver import Receiver, get_list_or_len
 from chia.protocols import farmer_protocol
@@ -240,8 +241,8 @@ async def test_farmer_get_pool_state(
     since_24h = (now - (23 * 60 * 60), 93049817)
     for p2_singleton_puzzle_hash, pool_dict in farmer_api.farmer.pool_state.items():
         for key in ["points_found_24h", "points_acknowledged_24h"]:
-            pool_dict[key].insert(0, since_24h)
-            pool_dict[key].insert(0, before_24h)
+            pool_dict[key].add(*before_24h)
+            pool_dict[key].add(*since_24h)
 
     sp = farmer_protocol.NewSignagePoint(
         std_hash(b"1"), std_hash(b"2"), std_hash(b"3"), uint64(1), uint64(1000000), uint8(2), uint32(1), uint32(0)
@@ -250,7 +251,13 @@ async def test_farmer_get_pool_state(
     client_pool_state = await farmer_rpc_client.get_pool_state()
     for pool_dict in client_pool_state["pool_state"]:
         for key in ["points_found_24h", "points_acknowledged_24h"]:
-            assert pool_dict[key][0] == list(since_24h)
+            # the entries are summed in buckets of POOL_STATS_BUCKET_SECONDS
+            bucket_start, points = pool_dict[key][0]
+            assert since_24h[0] - POOL_STATS_BUCKET_SECONDS < bucket_start <= since_24h[0]
+            assert points == since_24h[1]
+            # and counted
+            assert pool_dict[key.replace("_24h", "_count_24h")] == [[bucket_start, 1]]
+        assert pool_dict["valid_partials_count_24h"] == []
 
 
 @pytest.mark.anyio
@@ -239,6 +239,12 @@ async def test1(
         assert len(block_spends) == 3
         assert sorted(block_spends, key=str) == sorted(coin_spends, key=str)
 
+        # the decoded spends are now cached, and served from the cache
+        cached_spends = await full_node_api_1.full_node.block_spends_cache.get(block.header_hash)
+        assert cached_spends is not None
+        assert sorted(cached_spends.block_spends(), key=str) == sorted(coin_spends, key=str)
+        assert sorted(await client.get_block_spends(block.header_hash), key=str) == sorted(coin_spends, key=str)
+
         block_spends_with_conditions = await client.get_block_spends_with_conditions(block.header_hash)
         assert block_spends_with_conditions is not None
         assert len(block_spends_with_conditions) == 3
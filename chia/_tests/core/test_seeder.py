@@ -17,6 +17,7 @@ from dns.rdatatype import A as A_TYPE
 from dns.rdtypes.IN.A import A
 from dns.rdtypes.IN.AAAA import AAAA
 from dns.rrset import RRset
+from dnslib import DNSRecord
 
 from chia.seeder.dns_server import DNSServer
 from chia.seeder.peer_record import PeerRecord, PeerReliability
@@ -418,3 +419,37 @@ async def test_static_peers_with_hostnames(
     assert len(answer) == 1
     expected = "2001:db8::5" if request_type == dns.rdatatype.AAAA else "1.2.3.4"
     assert answer[0].to_text() == expected
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("request_type", [dns.rdatatype.A, dns.rdatatype.AAAA, dns.rdatatype.ANY])
+@pytest.mark.parametrize("use_edns", [True, False])
+async def test_packed_responses(
+    seeder_service: DNSServer, request_type: dns.rdatatype.RdataType, use_edns: bool
+) -> None:
+    """
+    The responses packed ahead of time are the same as the ones built for each query, and rotate through the peers.
+    """
+    seeder_service.reliable_peers_v4, seeder_service.reliable_peers_v6 = get_addresses(1)
+    # DNS names are case insensitive, and the question's case is preserved in the response
+    domain = seeder_service.domain.upper()
+    query = dns.message.make_query(domain, request_type, use_edns=use_edns)
+    request = DNSRecord.parse(query.to_wire())
+
+    seeder_service.packed_responses = {}
+    expected = [await seeder_service.dns_response(request) for _ in range(5)]
+    assert all(isinstance(reply, DNSRecord) for reply in expected)
+
+    seeder_service.pack_responses()
+    for reply in expected:
+        assert isinstance(reply, DNSRecord)
+        packed_reply = await seeder_service.dns_response(request)
+        reply_packed = reply.pack()
+        if not use_edns and len(reply_packed) > 512:
+            # these have to be truncated
+            assert isinstance(packed_reply, DNSRecord)
+            continue
+        assert isinstance(packed_reply, bytes)
+        # the name compression may differ, so compare the parsed responses
+        assert str(DNSRecord.parse(packed_reply)).lower() == str(reply).lower()
+        assert DNSRecord.parse(packed_reply).q.qname.label == (b"SEEDER", b"EXAMPLE", b"COM")
@@ -10,7 +10,7 @@ from typing import Any, ClassVar, Literal, get_args, get_type_hints
 import pytest
 from chia_rs import FullBlock, G1Element, SubEpochChallengeSegment
 from chia_rs.sized_bytes import bytes4, bytes32
-from chia_rs.sized_ints import uint8, uint32, uint64
+from chia_rs.sized_ints import int8, uint8, uint32, uint64
 from clvm_tools import binutils
 
 from chia.protocols.wallet_protocol import RespondRemovals
@@ -564,6 +564,54 @@ def test_basic() -> None:
     assert a == TestClass.from_bytes(b)
 
 
+def test_generated_functions() -> None:
+    @streamable
+    @dataclass(frozen=True)
+    class TestClass(Streamable):
+        a: uint8
+        b: int8
+        c: bytes32
+        d: list[list[bytes4 | None]]
+        e: tuple[bool, str, bytes, G1Element]
+        f: dict[uint32, str]
+        g: IntegerEnum
+        h: TestClassRecursive1 | None
+        i: list[TestClassRecursive1]
+
+    # the values are converted (and copied) when creating the object
+    d: list[Any] = [[b"abcd", None], []]
+    a = TestClass(
+        3,  # type: ignore[arg-type]
+        int8(-2),
+        bytes32([5] * 32),
+        d,
+        (True, "hello", b"goodbye", G1Element()),
+        {uint32(1): "foo"},
+        IntegerEnum.A,
+        None,
+        [TestClassRecursive1([uint32(6)])],
+    )
+    assert type(a.a) is uint8
+    assert type(a.d[0][0]) is bytes4
+    assert a.d is not d
+
+    # the generated functions stream and parse the same way as the generic
+    # functions of the fields
+    f = io.BytesIO()
+    for streamable_field in TestClass.streamable_fields():
+        streamable_field.stream_function(getattr(a, streamable_field.name), f)
+    assert bytes(a) == f.getvalue()
+    f.seek(0)
+    parsed: dict[str, Any] = {sf.name: sf.parse_function(f) for sf in TestClass.streamable_fields()}
+    assert a == TestClass(**parsed)
+    assert a == TestClass.from_bytes(bytes(a))
+
+    # and to json like the generic recurse_jsonify()
+    assert a.to_json_dict() == {f.name: recurse_jsonify(getattr(a, f.name), recurse_jsonify) for f in fields(a)}
+    assert a.to_json_dict()["h"] is None
+    assert a.to_json_dict()["i"] == [{"a": [6]}]
+
+
 def test_variable_size() -> None:
     @streamable
     @dataclass(frozen=True)
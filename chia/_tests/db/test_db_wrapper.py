@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import functools
 from collections.abc import Callable
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
@@ -198,6 +199,41 @@ async def test_partial_failure() -> None:
     assert values == [42, 1337, 1, 42]
 
 
+@pytest.mark.anyio
+async def test_on_rollback() -> None:
+    rolled_back: list[str] = []
+
+    def callback(name: str) -> Callable[[], None]:
+        return functools.partial(rolled_back.append, name)
+
+    async with DBConnection(2) as db_wrapper:
+        await setup_table(db_wrapper)
+        # a committed transaction doesn't call its callbacks
+        async with db_wrapper.writer():
+            db_wrapper.on_rollback(callback("committed"))
+        with pytest.raises(UniqueError):
+            async with db_wrapper.writer():
+                first = callback("first")
+                db_wrapper.on_rollback(first)
+                db_wrapper.on_rollback(first)
+                # a sub-transaction that's rolled back calls its own callbacks
+                with contextlib.suppress(UniqueError):
+                    async with db_wrapper.writer():
+                        db_wrapper.on_rollback(callback("inner failure"))
+                        raise UniqueError
+                assert rolled_back == ["inner failure"]
+                # one that succeeds leaves them to the outer transaction
+                async with db_wrapper.writer():
+                    async with db_wrapper.writer_maybe_transaction():
+                        db_wrapper.on_rollback(callback("inner success"))
+                assert rolled_back == ["inner failure"]
+                raise UniqueError
+        assert rolled_back == ["inner failure", "first", "inner success"]
+
+        with pytest.raises(AssertionError):
+            db_wrapper.on_rollback(callback("no transaction"))
+
+
 @pytest.mark.anyio
 async def test_readers_nests(get_reader_method: GetReaderMethod) -> None:
     async with DBConnection(2) as db_wrapper:
@@ -20,8 +20,9 @@ from chia import __version__
 from chia._tests.conftest import HarvesterFarmerEnvironment
 from chia._tests.util.misc import DataCase, Marks, datacases
 from chia.consensus.default_constants import DEFAULT_CONSTANTS
-from chia.farmer.farmer import UPDATE_POOL_FARMER_INFO_INTERVAL, Farmer, increment_pool_stats, strip_old_entries
+from chia.farmer.farmer import UPDATE_POOL_FARMER_INFO_INTERVAL, Farmer, increment_pool_stats
 from chia.farmer.farmer_service import FarmerService
+from chia.farmer.pool_stats import RecentEvents, RollingSum
 from chia.harvester.harvester_service import HarvesterService
 from chia.pools.pool_config import PoolWalletConfig
 from chia.protocols import farmer_protocol, harvester_protocol
@@ -40,17 +41,6 @@ from chia.util.hash import std_hash
 log = logging.getLogger(__name__)
 
 
-class StripOldEntriesCase:
-    pairs: list[tuple[float, int]]
-    before: float
-    expected_result: list[tuple[float, int]]
-
-    def __init__(self, pairs: list[tuple[float, int]], before: float, expected_result: list[tuple[float, int]]):
-        self.pairs = pairs
-        self.before = before
-        self.expected_result = expected_result
-
-
 class IncrementPoolStatsCase:
     pool_states: dict[bytes32, Any]
     p2_singleton_puzzle_hash: bytes32
@@ -70,11 +60,13 @@ class IncrementPoolStatsCase:
         expected_result: Any,
     ):
         prepared_p2_singleton_puzzle_hash = std_hash(b"11223344")
+        stats_24h = RollingSum()
+        stats_24h.add(1689491043, 1)
         self.pool_states = {
             prepared_p2_singleton_puzzle_hash: {
                 "p2_singleton_puzzle_hash": prepared_p2_singleton_puzzle_hash.hex(),
                 "xxx_since_start": 1,
-                "xxx_24h": [(1689491043, 1)],
+                "xxx_24h": stats_24h,
                 "current_difficulty": 1,
             }
         }
@@ -229,21 +221,6 @@ class NewProofOfSpaceCase:
         )
 
 
-@pytest.mark.parametrize(
-    argnames="case",
-    argvalues=[
-        pytest.param(StripOldEntriesCase([], 0, []), id="no_params"),
-        pytest.param(StripOldEntriesCase([(1689491043.3493967, 1)], 1689491044, []), id="stripped"),
-        pytest.param(
-            StripOldEntriesCase([(1689491043.3493967, 1)], 1689491043, [(1689491043.3493967, 1)]),
-            id="not_stripped",
-        ),
-    ],
-)
-def test_strip_old_entries(case: StripOldEntriesCase) -> None:
-    assert strip_old_entries(case.pairs, case.before) == case.expected_result
-
-
 @pytest.mark.parametrize(
     argnames="case",
     argvalues=[
@@ -268,7 +245,7 @@ def test_strip_old_entries(case: StripOldEntriesCase) -> None:
                 {
                     "p2_singleton_puzzle_hash": std_hash(b"11223344").hex(),
                     "xxx_since_start": 1,
-                    "xxx_24h": [(1689491043, 1)],
+                    "xxx_24h": [(1689490800, 1)],
                     "current_difficulty": 1,
                 },
             ),
@@ -284,7 +261,7 @@ def test_strip_old_entries(case: StripOldEntriesCase) -> None:
                 {
                     "p2_singleton_puzzle_hash": std_hash(b"11223344").hex(),
                     "xxx_since_start": 2,
-                    "xxx_24h": [(1689491043, 1), (1689491044, 2)],
+                    "xxx_24h": [(1689490800, 3)],
                     "current_difficulty": 1,
                 },
             ),
@@ -300,7 +277,7 @@ def test_strip_old_entries(case: StripOldEntriesCase) -> None:
                 {
                     "p2_singleton_puzzle_hash": std_hash(b"11223344").hex(),
                     "xxx_since_start": 2,
-                    "xxx_24h": [(1689491043, 1), (1689491044, 1)],
+                    "xxx_24h": [(1689490800, 2)],
                     "current_difficulty": 1,
                 },
             ),
@@ -310,13 +287,13 @@ def test_strip_old_entries(case: StripOldEntriesCase) -> None:
             IncrementPoolStatsCase(
                 std_hash(b"11223344"),
                 "xxx",
-                1689577444,
+                1689577800,
                 1,
                 None,
                 {
                     "p2_singleton_puzzle_hash": std_hash(b"11223344").hex(),
                     "xxx_since_start": 2,
-                    "xxx_24h": [(1689577444, 1)],
+                    "xxx_24h": [(1689577800, 1)],
                     "current_difficulty": 1,
                 },
             ),
@@ -331,7 +308,8 @@ def test_increment_pool_stats(case: IncrementPoolStatsCase) -> None:
     if case.expected_result is None:
         assert case.p2_singleton_puzzle_hash not in case.pool_states
     else:
-        assert case.pool_states[case.p2_singleton_puzzle_hash] == case.expected_result
+        pool_state = case.pool_states[case.p2_singleton_puzzle_hash]
+        assert {**pool_state, "xxx_24h": pool_state["xxx_24h"].entries(case.current_time)} == case.expected_result
 
 
 @pytest.mark.parametrize(
@@ -395,7 +373,7 @@ def test_increment_pool_stats(case: IncrementPoolStatsCase) -> None:
                     "stale_partials_since_start": 0,
                     "stale_partials_24h": [],
                     "missing_partials_since_start": 1,
-                    "missing_partials_24h": [None],
+                    "missing_partials_24h": [None],  # there was no difficulty to add up
                 },
             ),
             id="empty_current_difficulty",
@@ -602,24 +580,24 @@ async def test_farmer_new_proof_of_space_for_pool_stats(
     farmer_api.farmer.pool_state[p2_singleton_puzzle_hash] = {
         "p2_singleton_puzzle_hash": p2_singleton_puzzle_hash.hex(),
         "points_found_since_start": 0,
-        "points_found_24h": [],
+        "points_found_24h": RollingSum(),
         "points_acknowledged_since_start": 0,
-        "points_acknowledged_24h": [],
+        "points_acknowledged_24h": RollingSum(),
         "next_farmer_update": 0,
         "next_pool_info_update": 0,
         "current_points": 0,
         "current_difficulty": case.pool_difficulty,
-        "pool_errors_24h": [],
+        "pool_errors_24h": RecentEvents(),
         "valid_partials_since_start": 0,
-        "valid_partials_24h": [],
+        "valid_partials_24h": RollingSum(),
         "invalid_partials_since_start": 0,
-        "invalid_partials_24h": [],
+        "invalid_partials_24h": RollingSum(),
         "insufficient_partials_since_start": 0,
-        "insufficient_partials_24h": [],
+        "insufficient_partials_24h": RollingSum(),
         "stale_partials_since_start": 0,
-        "stale_partials_24h": [],
+        "stale_partials_24h": RollingSum(),
         "missing_partials_since_start": 0,
-        "missing_partials_24h": [],
+        "missing_partials_24h": RollingSum(),
         "authentication_token_timeout": case.authentication_token_timeout,
         "plot_count": 0,
         "pool_config": case.pool_config,
@@ -644,9 +622,11 @@ async def test_farmer_new_proof_of_space_for_pool_stats(
         assert farmer_api.farmer.pool_state[p2_singleton_puzzle_hash][name] == case.expected_pool_state[name]
 
     def assert_stats_24h(name: str) -> None:
-        assert len(farmer_api.farmer.pool_state[p2_singleton_puzzle_hash][name]) == len(case.expected_pool_state[name])
-        for i, stat in enumerate(farmer_api.farmer.pool_state[p2_singleton_puzzle_hash][name]):
-            assert stat[1] == case.expected_pool_state[name][i]
+        stats = farmer_api.farmer.pool_state[p2_singleton_puzzle_hash][name]
+        # all of the events fall in the same bucket, which counts them
+        expected = case.expected_pool_state[name]
+        assert [total for _, total in stats] == ([sum(value or 0 for value in expected)] if expected else [])
+        assert stats.count() == len(expected)
 
     def assert_pool_errors_24h() -> None:
         assert len(farmer_api.farmer.pool_state[p2_singleton_puzzle_hash]["pool_errors_24h"]) == len(
@@ -690,6 +670,9 @@ class DummyPoolResponse:
 
         return json.dumps(json_dict)
 
+    async def read(self) -> bytes:
+        return (await self.text()).encode()
+
     async def __aenter__(self) -> Self:
         return self
 
@@ -749,24 +732,24 @@ def create_valid_pos(farmer: Farmer) -> tuple[farmer_protocol.NewSignagePoint, P
     farmer.pool_state[p2_singleton_puzzle_hash] = {
         "p2_singleton_puzzle_hash": p2_singleton_puzzle_hash.hex(),
         "points_found_since_start": 0,
-        "points_found_24h": [],
+        "points_found_24h": RollingSum(),
         "points_acknowledged_since_start": 0,
-        "points_acknowledged_24h": [],
+        "points_acknowledged_24h": RollingSum(),
         "next_farmer_update": 0,
         "next_pool_info_update": 0,
         "current_points": 0,
         "current_difficulty": case.pool_difficulty,
-        "pool_errors_24h": [],
+        "pool_errors_24h": RecentEvents(),
         "valid_partials_since_start": 0,
-        "valid_partials_24h": [],
+        "valid_partials_24h": RollingSum(),
         "invalid_partials_since_start": 0,
-        "invalid_partials_24h": [],
+        "invalid_partials_24h": RollingSum(),
         "insufficient_partials_since_start": 0,
-        "insufficient_partials_24h": [],
+        "insufficient_partials_24h": RollingSum(),
         "stale_partials_since_start": 0,
-        "stale_partials_24h": [],
+        "stale_partials_24h": RollingSum(),
         "missing_partials_since_start": 0,
-        "missing_partials_24h": [],
+        "missing_partials_24h": RollingSum(),
         "authentication_token_timeout": case.authentication_token_timeout,
         "plot_count": 0,
         "pool_config": case.pool_config,
@@ -914,9 +897,10 @@ async def test_farmer_pool_response(
         assert farmer_api.farmer.pool_state[p2_singleton_puzzle_hash][name] == expected_pool_state[name]
 
     def assert_stats_24h(name: str) -> None:
-        assert len(farmer_api.farmer.pool_state[p2_singleton_puzzle_hash][name]) == len(expected_pool_state[name])
-        for i, stat in enumerate(farmer_api.farmer.pool_state[p2_singleton_puzzle_hash][name]):
-            assert stat[1] == expected_pool_state[name][i]
+        stats = farmer_api.farmer.pool_state[p2_singleton_puzzle_hash][name]
+        expected = expected_pool_state[name]
+        assert [total for _, total in stats] == ([sum(expected)] if expected else [])
+        assert stats.count() == len(expected)
 
     def assert_pool_errors_24h() -> None:
         assert len(farmer_api.farmer.pool_state[p2_singleton_puzzle_hash]["pool_errors_24h"]) == len(
@@ -974,24 +958,24 @@ def make_pool_state(p2_singleton_puzzle_hash: bytes32, overrides: dict[str, Any]
     pool_info = {
         "p2_singleton_puzzle_hash": p2_singleton_puzzle_hash.hex(),
         "points_found_since_start": 0,
-        "points_found_24h": [],
+        "points_found_24h": RollingSum(),
         "points_acknowledged_since_start": 0,
-        "points_acknowledged_24h": [],
+        "points_acknowledged_24h": RollingSum(),
         "next_farmer_update": 0,
         "next_pool_info_update": 0,
         "current_points": 0,
         "current_difficulty": None,
-        "pool_errors_24h": [],
+        "pool_errors_24h": RecentEvents(),
         "valid_partials_since_start": 0,
-        "valid_partials_24h": [],
+        "valid_partials_24h": RollingSum(),
         "invalid_partials_since_start": 0,
-        "invalid_partials_24h": [],
+        "invalid_partials_24h": RollingSum(),
         "insufficient_partials_since_start": 0,
-        "insufficient_partials_24h": [],
+        "insufficient_partials_24h": RollingSum(),
         "stale_partials_since_start": 0,
-        "stale_partials_24h": [],
+        "stale_partials_24h": RollingSum(),
         "missing_partials_since_start": 0,
-        "missing_partials_24h": [],
+        "missing_partials_24h": RollingSum(),
         "authentication_token_timeout": None,
         "plot_count": 0,
     }
@@ -1019,6 +1003,9 @@ class DummyPoolInfoResponse:
 
         return json.dumps(self.pool_info)
 
+    async def read(self) -> bytes:
+        return (await self.text()).encode()
+
     async def __aenter__(self) -> Self:
         return self
 
@@ -1282,3 +1269,39 @@ async def test_farmer_additional_headers_on_partial_submit(
     await farmer_api.new_proof_of_space(new_pos, peer)
 
     mock_http_post.assert_called_once_with(ANY, json=ANY, ssl=ANY, headers=case.expected_headers)
+
+
+@pytest.mark.anyio
+async def test_farmer_verified_proofs_cache(
+    mocker: MockerFixture,
+    farmer_one_harvester: tuple[list[HarvesterService], FarmerService, BlockTools],
+) -> None:
+    _, farmer_service, _ = farmer_one_harvester
+    farmer = farmer_service._api.farmer
+
+    sp, pos, _ = create_valid_pos(farmer)
+    verify = mocker.patch("chia.farmer.farmer.verify_and_get_quality_string", side_effect=verify_and_get_quality_string)
+    for _ in range(3):
+        quality_string = await farmer.verify_proof_of_space(
+            pos,
+            sp.challenge_hash,
+            sp.challenge_chain_sp,
+            height=uint32(1),
+            prev_transaction_block_height=uint32(1),
+        )
+        assert quality_string is not None
+    # the proof is only verified once, the following calls hit the cache
+    assert verify.call_count == 1
+
+    # invalid proofs aren't cached
+    invalid_pos = pos.replace(proof=bytes(len(pos.proof)))
+    for _ in range(2):
+        quality_string = await farmer.verify_proof_of_space(
+            invalid_pos,
+            sp.challenge_hash,
+            sp.challenge_chain_sp,
+            height=uint32(1),
+            prev_transaction_block_height=uint32(1),
+        )
+        assert quality_string is None
+    assert verify.call_count == 3
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+
+import aiohttp
+import pytest
+from pytest_mock import MockerFixture
+from typing_extensions import Self
+
+from chia._tests.util.misc import RecordingWebServer
+from chia.farmer import pool_client
+from chia.farmer.pool_client import PoolClient
+
+
+@pytest.mark.anyio
+async def test_pool_client_reuses_connections(recording_web_server: RecordingWebServer) -> None:
+    web_server = recording_web_server.web_server
+    client = PoolClient(f"http://{web_server.hostname}:{web_server.listen_port}")
+    try:
+        for i in range(3):
+            resp = await client.request("POST", "/partial", json={"response": {"new_difficulty": i}})
+            assert resp.ok
+            assert json.loads(await resp.text()) == {"new_difficulty": i}
+        resp = await client.post_partial(json={})
+        assert json.loads(await resp.text()) == {"success": True}
+
+        assert len(recording_web_server.requests) == 4
+        transports = {request.transport for request in recording_web_server.requests}
+        assert len(transports) == 1
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_pool_client_proxies(recording_web_server: RecordingWebServer) -> None:
+    # only GET requests go through the proxies configured in the environment
+    web_server = recording_web_server.web_server
+    client = PoolClient(f"http://{web_server.hostname}:{web_server.listen_port}")
+    try:
+        await client.request("POST", "/partial", json={})
+        assert list(client.sessions) == [False]
+        await client.request("GET", "/pool_info")
+        assert client.sessions[True].trust_env
+        assert not client.sessions[False].trust_env
+    finally:
+        await client.close()
+    assert client.sessions == {}
+
+
+class DummyResponse:
+    def __init__(self, status: int) -> None:
+        self.status = status
+
+    async def read(self) -> bytes:
+        return b""
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        pass
+
+
+@pytest.mark.anyio
+async def test_pool_client_retries_partials(mocker: MockerFixture) -> None:
+    mocker.patch.object(pool_client, "PARTIAL_RETRY_DELAY", 0)
+    client = PoolClient("https://pool.invalid")
+    try:
+        post = mocker.patch("aiohttp.ClientSession.post", side_effect=[DummyResponse(503), DummyResponse(200)])
+        resp = await client.post_partial(json={})
+        assert resp.status == 200
+        assert post.call_count == 2
+
+        # a pool error isn't retried
+        post = mocker.patch("aiohttp.ClientSession.post", side_effect=[DummyResponse(500), DummyResponse(200)])
+        resp = await client.post_partial(json={})
+        assert resp.status == 500
+        assert post.call_count == 1
+
+        # an unreachable pool is only retried a few times
+        post = mocker.patch("aiohttp.ClientSession.post", side_effect=aiohttp.ServerDisconnectedError())
+        with pytest.raises(aiohttp.ServerDisconnectedError):
+            await client.post_partial(json={})
+        assert post.call_count == pool_client.PARTIAL_SUBMIT_ATTEMPTS
+    finally:
+        await client.close()
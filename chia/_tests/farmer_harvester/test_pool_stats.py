@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from chia.farmer.pool_stats import RecentEvents, RollingSum
+
+
+def test_rolling_sum() -> None:
+    stats = RollingSum(window=100, bucket_seconds=10)
+    assert stats.entries(now=0) == []
+    stats.add(1001, 2)
+    stats.add(1009, 3)
+    stats.add(1010)
+    stats.add(1011, None)
+    assert stats.entries(now=1011) == [(1000, 5), (1010, 1)]
+    assert stats.total(now=1011) == 6
+    # the values are counted too, including the one that had nothing to add
+    assert stats.count_entries(now=1011) == [(1000, 2), (1010, 2)]
+    assert stats.count(now=1011) == 4
+
+    # the buckets age out of the window, once they're entirely before it
+    assert stats.entries(now=1105) == [(1000, 5), (1010, 1)]
+    assert stats.entries(now=1110) == [(1010, 1)]
+    # and are reused
+    stats.add(1110, 7)
+    assert stats.starts.count(1000) == 0
+    assert stats.entries(now=1110) == [(1010, 1), (1110, 7)]
+    stats.add(1200, 4)
+    assert stats.entries(now=1200) == [(1110, 7), (1200, 4)]
+    assert stats.count_entries(now=1200) == [(1110, 1), (1200, 1)]
+    # too old for the window
+    stats.add(1090, 1)
+    assert stats.entries(now=1200) == [(1110, 7), (1200, 4)]
+    assert stats.to_json_dict() == stats.entries()
+
+
+def test_recent_events() -> None:
+    events = RecentEvents(window=100, max_events=3)
+    events.add(1000, {"error_code": 1})
+    events.add(1050, {"error_code": 2})
+    assert events.entries(now=1050) == [(1000, {"error_code": 1}), (1050, {"error_code": 2})]
+    assert events.entries(now=1101) == [(1050, {"error_code": 2})]
+    for i in range(3, 6):
+        events.add(1100 + i, {"error_code": i})
+    assert [value["error_code"] for _, value in events.entries(now=1110)] == [3, 4, 5]
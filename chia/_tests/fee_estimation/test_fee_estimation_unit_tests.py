@@ -6,10 +6,11 @@ import pytest
 from chia_rs.sized_ints import uint32, uint64
 
 from chia.full_node.bitcoin_fee_estimator import create_bitcoin_fee_estimator
+from chia.full_node.fee_estimate_store import FeeStore
 from chia.full_node.fee_estimation import FeeBlockInfo, MempoolItemInfo
 from chia.full_node.fee_estimator_constants import INFINITE_FEE_RATE, INITIAL_STEP
 from chia.full_node.fee_estimator_interface import FeeEstimatorInterface
-from chia.full_node.fee_tracker import get_bucket_index, init_buckets
+from chia.full_node.fee_tracker import FeeTracker, get_bucket_index, init_buckets
 from chia.types.fee_rate import FeeRateV2
 from chia.util.math import make_monotonically_decreasing
 
@@ -85,6 +86,31 @@ def test_steady_fee_pressure() -> None:
         assert es_after.mojos_per_clvm_cost == block_estimates[idx].mojos_per_clvm_cost
 
 
+def test_fee_tracker_backup_roundtrip() -> None:
+    fee_store = FeeStore()
+    tracker = FeeTracker(fee_store)
+    for height in range(1, 100):
+        for fee in (1000, 5000, 20000):
+            tracker.add_tx(MempoolItemInfo(uint64(10_000_000), uint64(fee), uint32(height - 1)))
+        items = make_block(uint32(height), height % 7, uint64(10_000_000), uint64(height * 100), height % 5)
+        tracker.process_block(uint32(height), items)
+    tracker.shutdown()
+    backup = fee_store.get_stored_fee_data()
+    assert backup is not None
+
+    restored = FeeTracker(fee_store)
+    for stat, restored_stat in zip(
+        (tracker.short_horizon, tracker.med_horizon, tracker.long_horizon),
+        (restored.short_horizon, restored.med_horizon, restored.long_horizon),
+    ):
+        assert restored_stat.confirmed_average == stat.confirmed_average
+        assert restored_stat.failed_average == stat.failed_average
+        assert restored_stat.tx_ct_avg == stat.tx_ct_avg
+        assert restored_stat.m_fee_rate_avg == stat.m_fee_rate_avg
+    restored.shutdown()
+    assert fee_store.get_stored_fee_data() == backup
+
+
 def test_init_buckets() -> None:
     buckets = init_buckets()
     assert len(buckets) > 1
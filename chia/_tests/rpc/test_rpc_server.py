@@ -46,8 +46,7 @@ class TestRpcApi:
     service_name: str = service_name
 
     async def _state_changed(self, change: str, change_data: dict[str, Any] | None = None) -> list[WsRpcMessage]:
-        # just here to satisfy the complete protocol
-        return []  # pragma: no cover
+        return []
 
     def get_routes(self) -> dict[str, Endpoint]:
         return {
@@ -318,3 +317,32 @@ async def test_get_connections_server_none_raises(server: RpcServer[TestRpcApi])
 
     with pytest.raises(ValueError, match="Global connections is not set"):
         await server.get_connections({})
+
+
+@pytest.mark.anyio
+async def test_await_closed_cancels_connections_refresh(server: RpcServer[TestRpcApi]) -> None:
+    sent_messages: list[str] = []
+
+    class MockWebSocket:
+        closed = False
+
+        async def send_str(self, data: str) -> None:
+            sent_messages.append(data)  # pragma: no cover
+
+        async def close(self) -> None:
+            self.closed = True
+
+    server.websocket = MockWebSocket()  # type: ignore[assignment]
+
+    # a burst of connection changes schedules a single refresh
+    await server._state_changed("add_connection", None)
+    await server._state_changed("close_connection", None)
+    tasks = set(server.connections_refresh_tasks)
+    assert len(tasks) == 1
+
+    # the refresh is cancelled before it's sent
+    server.close()
+    await server.await_closed()
+    assert all(task.cancelled() for task in tasks)
+    assert server.connections_refresh_tasks == set()
+    assert sent_messages == []
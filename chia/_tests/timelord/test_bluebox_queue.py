@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint8, uint32, uint64
+
+from chia.protocols.timelord_protocol import RequestCompactProofOfTime
+from chia.timelord.bluebox_queue import BlueboxQueue
+from chia.types.blockchain_format.classgroup import ClassgroupElement
+from chia.types.blockchain_format.vdf import VDFInfo
+
+
+def make_request(height: int, field_vdf: int) -> RequestCompactProofOfTime:
+    vdf_info = VDFInfo(bytes32.zeros, uint64(1000), ClassgroupElement.get_default_element())
+    return RequestCompactProofOfTime(vdf_info, bytes32.zeros, uint32(height), uint8(field_vdf))
+
+
+def test_bluebox_queue_pop() -> None:
+    queue = BlueboxQueue()
+    assert queue.pop(1) is None
+
+    queue.add(100, make_request(1, 1))
+    queue.add(101, make_request(2, 2))
+    queue.add(102, make_request(3, 1))
+    queue.add(103, make_request(4, 3))
+    assert len(queue) == 4
+
+    # the oldest request for the field is picked
+    request = queue.pop(1)
+    assert request is not None and request.height == 1
+    request = queue.pop(3)
+    assert request is not None and request.height == 4
+    # nothing for this field, the oldest request of any field is picked
+    request = queue.pop(4)
+    assert request is not None and request.height == 2
+    request = queue.pop(2)
+    assert request is not None and request.height == 3
+    assert len(queue) == 0
+    assert queue.pop(1) is None
+
+
+def test_bluebox_queue_age_out() -> None:
+    queue = BlueboxQueue(max_age=5)
+    queue.add(100, make_request(1, 1))
+    queue.add(103, make_request(2, 2))
+    queue.add(104, make_request(3, 1))
+    assert len(queue) == 3
+
+    # work from the previous batch is dropped when new work comes in
+    queue.add(106, make_request(4, 4))
+    assert len(queue) == 3
+    assert [request.height for _, request in queue.by_field_vdf[1]] == [3]
+
+    queue.add(120, make_request(5, 1))
+    assert len(queue) == 1
+    request = queue.pop(2)
+    assert request is not None and request.height == 5
@@ -13,6 +13,7 @@ from chia.timelord.timelord import Timelord
 from chia.timelord.timelord_service import TimelordService
 from chia.timelord.types import Chain
 from chia.types.blockchain_format.classgroup import ClassgroupElement
+from chia.util.task_referencer import create_referenced_task
 
 
 @pytest.mark.anyio
@@ -92,6 +93,8 @@ def _make_timelord_stub(ip_whitelist: list[str]) -> Timelord:
     tl.max_free_clients = 10
     tl.ip_whitelist = ip_whitelist
     tl.lock = asyncio.Lock()
+    tl.new_work = asyncio.Condition(tl.lock)
+    tl.has_new_work = False
     return tl
 
 
@@ -139,3 +142,19 @@ class TestHandleClient:
         assert len(tl.free_clients) == 3
         overflow_writer.close.assert_called_once()
         overflow_writer.wait_closed.assert_awaited_once()
+
+    @pytest.mark.anyio
+    async def test_accepted_client_wakes_up_waiting_loop(self) -> None:
+        tl = _make_timelord_stub(ip_whitelist=["127.0.0.1"])
+
+        async def wait_for_client() -> None:
+            async with tl.lock:
+                await tl._wait_for_work(lambda: len(tl.free_clients) > 0)
+
+        waiter = create_referenced_task(wait_for_client())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await tl._handle_client(MagicMock(spec=asyncio.StreamReader), _make_mock_writer(ip="127.0.0.1"))
+        await asyncio.wait_for(waiter, timeout=5)
+        assert tl.has_new_work
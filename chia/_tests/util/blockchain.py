@@ -3,6 +3,7 @@ from __future__ import annotations
 import contextlib
 import os
 import pickle  # noqa: S403  # TODO: use explicit serialization instead of pickle
+import tempfile
 from collections.abc import AsyncIterator
 from pathlib import Path
 
@@ -25,16 +26,19 @@ async def create_blockchain(
 ) -> AsyncIterator[tuple[Blockchain, DBWrapper2]]:
     db_uri = generate_in_memory_db_uri()
     async with DBWrapper2.managed(database=db_uri, uri=True, reader_count=1, db_version=db_version) as wrapper:
-        coin_store = await CoinStore.create(wrapper)
-        store = await BlockStore.create(wrapper)
-        path = Path(".")
-        height_map = await BlockHeightMap.create(path, wrapper)
-        bc1 = await Blockchain.create(coin_store, store, height_map, constants, 3, single_threaded=True, log_coins=True)
-        try:
-            assert bc1.get_peak() is None
-            yield bc1, wrapper
-        finally:
-            bc1.shut_down()
+        with tempfile.TemporaryDirectory() as blockchain_dir:
+            coin_store = await CoinStore.create(wrapper)
+            store = await BlockStore.create(wrapper)
+            height_map = await BlockHeightMap.create(Path(blockchain_dir), wrapper)
+            bc1 = await Blockchain.create(
+                coin_store, store, height_map, constants, 3, single_threaded=True, log_coins=True
+            )
+            try:
+                assert bc1.get_peak() is None
+                yield bc1, wrapper
+            finally:
+                bc1.shut_down()
+                height_map.close()
 
 
 def persistent_blocks(
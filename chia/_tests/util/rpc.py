@@ -12,6 +12,7 @@ async def validate_get_routes(client: RpcClient, api: RpcApiProtocol) -> None:
     routes_server = [
         "/get_network_info",
         "/get_connections",
+        "/get_broadcast_metrics",
         "/open_connection",
         "/close_connection",
         "/stop_node",
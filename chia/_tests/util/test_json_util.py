@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+from chia_rs import G1Element
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint8, uint16, uint64
+
+from chia.types.blockchain_format.coin import Coin
+from chia.util.json_util import EnhancedJSONEncoder, dict_to_json_str
+from chia.util.streamable import VersionedBlob
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        {"b": 1, "a": [True, 1.5, "x", None], "c": {"z": uint64(2), "y": uint8(3)}},
+        [bytes32([1] * 32), b"\x00\x01", G1Element()],
+        {"coin": Coin(bytes32([2] * 32), bytes32([3] * 32), uint64(4)), "blob": VersionedBlob(uint16(1), b"abc")},
+        {"records": [VersionedBlob(uint16(i), bytes([i])) for i in range(3)], "success": True},
+    ],
+)
+def test_dict_to_json_str(value: Any) -> None:
+    # the shared encoder, with its cached conversions, works like a new one
+    for _ in range(2):
+        assert dict_to_json_str(value) == json.dumps(value, cls=EnhancedJSONEncoder, sort_keys=True)
+
+
+def test_dict_to_json_str_unsupported() -> None:
+    with pytest.raises(TypeError):
+        dict_to_json_str({"a": object()})
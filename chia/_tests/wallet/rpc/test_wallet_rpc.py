@@ -107,6 +107,7 @@ from chia.wallet.wallet_request_types import (
     CATSetName,
     CATSpend,
     CheckDeleteKey,
+    CheckOffersValidity,
     CheckOfferValidity,
     ClawbackPuzzleDecoratorOverride,
     CombineCoins,
@@ -1625,6 +1626,11 @@ async def test_offer_endpoints(wallet_environments: WalletTestFramework, wallet_
     offer_validity_response = await env_1.rpc_client.check_offer_validity(CheckOfferValidity(offer=offer.to_bech32()))
     assert offer_validity_response.id == offer.name()
     assert offer_validity_response.valid
+    offers_validity_response = await env_1.rpc_client.check_offers_validity(
+        CheckOffersValidity(offers=[offer.to_bech32(), offer.to_bech32()])
+    )
+    assert offers_validity_response.ids == [offer.name(), offer.name()]
+    assert offers_validity_response.valid == [True, True]
 
     all_offers = (await env_1.rpc_client.get_all_offers(GetAllOffers(file_contents=True))).trade_records
     assert len(all_offers) == 1
@@ -1758,6 +1764,13 @@ async def test_offer_endpoints(wallet_environments: WalletTestFramework, wallet_
 
     await time_out_assert(15, is_trade_confirmed, True, env_1.rpc_client, offer)
 
+    # the offer has been taken, so it's no longer valid (once the cached
+    # result is cleared by the next peak)
+    async def is_offer_valid(client: WalletRpcClient, offer: Offer) -> bool:
+        return (await client.check_offer_validity(CheckOfferValidity(offer=offer.to_bech32()))).valid
+
+    await time_out_assert(15, is_offer_valid, False, env_1.rpc_client, offer)
+
     # Test trade sorting
     def only_ids(trades: list[TradeRecord]) -> list[bytes32]:
         return [t.trade_id for t in trades]
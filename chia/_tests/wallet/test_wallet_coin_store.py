@@ -264,6 +264,81 @@ async def test_get_unspent_coins_for_wallet() -> None:
         assert await store.get_unspent_coins_for_wallet(1, coin_type=CoinType.CLAWBACK) == {record_8}
 
 
+@pytest.mark.anyio
+async def test_unspent_coin_index(seeded_random: random.Random) -> None:
+    async with DBConnection(1) as db_wrapper:
+        store = await WalletCoinStore.create(db_wrapper)
+
+        async def check_index(wallet_id: int) -> None:
+            index = await store.get_unspent_coin_index(wallet_id)
+            # the index must match what's in the database
+            fresh_store = await WalletCoinStore.create(db_wrapper)
+            assert index.records == (await fresh_store.get_unspent_coin_index(wallet_id)).records
+            by_amount = index.by_amount()
+            assert [name for name, _ in by_amount] == [cr.coin.name() for _, cr in by_amount]
+            assert [cr.coin.amount for _, cr in by_amount] == sorted(
+                (cr.coin.amount for cr in index.records.values()), reverse=True
+            )
+
+        # load the (empty) indexes first, to have them updated as coins are
+        # added
+        await check_index(1)
+        await check_index(2)
+
+        records = [
+            record(
+                Coin(bytes32.random(seeded_random), bytes32.random(seeded_random), uint64(seeded_random.randint(1, 9))),
+                confirmed=i,
+                spent=0,
+            )
+            for i in range(1, 21)
+        ]
+        for r in records:
+            await store.add_coin_record(replace(r, wallet_id=1))
+        await check_index(1)
+        assert len(await store.get_unspent_coin_index(1)) == 20
+
+        # move a coin to another wallet
+        await store.add_coin_record(replace(records[0], wallet_id=2))
+        await check_index(1)
+        await check_index(2)
+        assert len(await store.get_unspent_coin_index(2)) == 1
+
+        await store.set_spent(records[1].coin.name(), uint32(25))
+        await store.delete_coin_record(records[2].coin.name())
+        await store.add_coin_record(replace(records[3], wallet_id=1, spent=True, spent_block_height=uint32(26)))
+        await check_index(1)
+        assert len(await store.get_unspent_coin_index(1)) == 16
+
+        await store.rollback_to_block(15)
+        await check_index(1)
+        await check_index(2)
+        assert len(await store.get_unspent_coin_index(1)) == 13
+
+        # changes made in a transaction that's rolled back are dropped from
+        # the index too, however far up the rollback is
+        class Rollback(Exception):
+            pass
+
+        with pytest.raises(Rollback):
+            async with db_wrapper.writer():
+                async with db_wrapper.writer():
+                    await store.set_spent(records[4].coin.name(), uint32(27))
+                    await store.add_coin_record(replace(records[19], wallet_id=1))
+                await store.get_unspent_coin_index(2)
+                assert len(await store.get_unspent_coin_index(1)) == 13
+                raise Rollback
+        await check_index(1)
+        await check_index(2)
+        assert len(await store.get_unspent_coin_index(1)) == 13
+
+        # and kept once they're committed
+        async with db_wrapper.writer():
+            await store.set_spent(records[4].coin.name(), uint32(27))
+        await check_index(1)
+        assert len(await store.get_unspent_coin_index(1)) == 12
+
+
 @pytest.mark.anyio
 async def test_get_all_unspent_coins() -> None:
     async with DBConnection(1) as db_wrapper:
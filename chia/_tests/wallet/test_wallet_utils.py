@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 from collections.abc import Collection
+from typing import Any, ClassVar, cast
 
 import pytest
 from chia_rs import Coin, CoinState
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint32, uint64
 
+from chia.protocols.wallet_protocol import RejectHeaderBlocks, RequestHeaderBlocks
+from chia.server.ws_connection import WSChiaConnection
 from chia.wallet.util.peer_request_cache import PeerRequestCache
-from chia.wallet.util.wallet_sync_utils import sort_coin_states
+from chia.wallet.util.wallet_sync_utils import prefetch_header_blocks, request_and_validate_removals, sort_coin_states
 
 coin_states = [
     CoinState(Coin(bytes32(b"\00" * 32), bytes32(b"\00" * 32), uint64(1)), None, None),
@@ -153,3 +156,44 @@ def test_rollback_race_cache() -> None:
     cache.rollback_race_cache(fork_height=-1)
     expected_race_cache.clear()
     assert_race_cache(cache, expected_race_cache)
+
+
+@pytest.mark.anyio
+async def test_removals_in_block_cache() -> None:
+    cache = PeerRequestCache()
+    header_hash = bytes32(b"\01" * 32)
+    coin_name = bytes32(b"\02" * 32)
+    assert not cache.in_removals_in_block(header_hash, coin_name)
+    cache.add_to_removals_in_block(header_hash, coin_name, uint32(10))
+    assert cache.in_removals_in_block(header_hash, coin_name)
+    assert not cache.in_removals_in_block(header_hash, bytes32(b"\03" * 32))
+
+    class NoRequestsPeer:
+        async def call_api(self, *args: Any) -> None:
+            raise AssertionError("unexpected request")
+
+    # a cached removal is not requested again
+    peer = cast(WSChiaConnection, NoRequestsPeer())
+    assert await request_and_validate_removals(peer, cache, uint32(10), header_hash, coin_name, bytes32.zeros)
+
+    cache.clear_after_height(10)
+    assert cache.in_removals_in_block(header_hash, coin_name)
+    cache.clear_after_height(9)
+    assert not cache.in_removals_in_block(header_hash, coin_name)
+
+
+@pytest.mark.anyio
+async def test_prefetch_header_blocks_ranges() -> None:
+    requests: list[tuple[int, int]] = []
+
+    class RecordingPeer:
+        peer_capabilities: ClassVar[list[Any]] = []
+
+        async def call_api(self, request_method: Any, message: RequestHeaderBlocks) -> RejectHeaderBlocks:
+            requests.append((message.start_height, message.end_height))
+            return RejectHeaderBlocks(message.start_height, message.end_height)
+
+    peer = cast(WSChiaConnection, RecordingPeer())
+    heights = {uint32(h) for h in [5, 1, 30, 32, 33, 100]}
+    await prefetch_header_blocks(peer, PeerRequestCache(), heights)
+    assert sorted(requests) == [(1, 32), (33, 33), (100, 100)]
@@ -89,13 +89,21 @@ class FullNodeApiStub(ApiProtocol, Protocol):
         """Handle proof of weight response."""
         ...
 
-    @metadata.request(reply_types=[ProtocolMessageTypes.respond_block, ProtocolMessageTypes.reject_block])
-    async def request_block(self, request: full_node_protocol.RequestBlock) -> Message | None:
+    @metadata.request(
+        peer_required=True, reply_types=[ProtocolMessageTypes.respond_block, ProtocolMessageTypes.reject_block]
+    )
+    async def request_block(
+        self, request: full_node_protocol.RequestBlock, peer: WSChiaConnection | None = None
+    ) -> Message | None:
         """Handle block request."""
         ...
 
-    @metadata.request(reply_types=[ProtocolMessageTypes.respond_blocks, ProtocolMessageTypes.reject_blocks])
-    async def request_blocks(self, request: full_node_protocol.RequestBlocks) -> Message | None:
+    @metadata.request(
+        peer_required=True, reply_types=[ProtocolMessageTypes.respond_blocks, ProtocolMessageTypes.reject_blocks]
+    )
+    async def request_blocks(
+        self, request: full_node_protocol.RequestBlocks, peer: WSChiaConnection | None = None
+    ) -> Message | None:
         """Handle blocks request."""
         ...
 
@@ -1,32 +1,13 @@
 from __future__ import annotations
 
+import importlib
 from io import TextIOWrapper
+from typing import Any
 
 import click
 
 from chia import __version__
-from chia.cmds.beta import beta_cmd
 from chia.cmds.cmd_classes import ChiaCliContext
-from chia.cmds.completion import completion
-from chia.cmds.configure import configure_cmd
-from chia.cmds.data import data_cmd
-from chia.cmds.db import db_cmd
-from chia.cmds.dev.main import dev_cmd
-from chia.cmds.farm import farm_cmd
-from chia.cmds.init import init_cmd
-from chia.cmds.keys import keys_cmd
-from chia.cmds.netspace import netspace_cmd
-from chia.cmds.passphrase import passphrase_cmd
-from chia.cmds.peer import peer_cmd
-from chia.cmds.plotnft import plotnft_cmd
-from chia.cmds.plots import plots_cmd
-from chia.cmds.plotters import plotters_cmd
-from chia.cmds.rpc import rpc_cmd
-from chia.cmds.show import show_cmd
-from chia.cmds.solver import solver_cmd
-from chia.cmds.start import start_cmd
-from chia.cmds.stop import stop_cmd
-from chia.cmds.wallet import wallet_cmd
 from chia.ssl.ssl_check import check_ssl
 from chia.util.default_root import DEFAULT_KEYS_ROOT_PATH, resolve_root_path
 from chia.util.errors import KeychainCurrentPassphraseIsInvalid
@@ -37,8 +18,64 @@ CONTEXT_SETTINGS = {
     "show_default": True,
 }
 
+# the subcommands of `chia`, and the "module:attribute" they're defined by. A
+# subcommand's module (and everything it imports) is only imported when the
+# subcommand is invoked, or when the list of subcommands is needed, e.g. for
+# `chia --help`
+LAZY_COMMANDS = {
+    "keys": "chia.cmds.keys:keys_cmd",
+    "plots": "chia.cmds.plots:plots_cmd",
+    "wallet": "chia.cmds.wallet:wallet_cmd",
+    "plotnft": "chia.cmds.plotnft:plotnft_cmd",
+    "configure": "chia.cmds.configure:configure_cmd",
+    "init": "chia.cmds.init:init_cmd",
+    "rpc": "chia.cmds.rpc:rpc_cmd",
+    "show": "chia.cmds.show:show_cmd",
+    "solver": "chia.cmds.solver:solver_cmd",
+    "start": "chia.cmds.start:start_cmd",
+    "stop": "chia.cmds.stop:stop_cmd",
+    "netspace": "chia.cmds.netspace:netspace_cmd",
+    "farm": "chia.cmds.farm:farm_cmd",
+    "plotters": "chia.cmds.plotters:plotters_cmd",
+    "db": "chia.cmds.db:db_cmd",
+    "peer": "chia.cmds.peer:peer_cmd",
+    "data": "chia.cmds.data:data_cmd",
+    "passphrase": "chia.cmds.passphrase:passphrase_cmd",
+    "beta": "chia.cmds.beta:beta_cmd",
+    "completion": "chia.cmds.completion:completion",
+    "dev": "chia.cmds.dev.main:dev_cmd",
+}
+
+
+class LazyGroup(click.Group):
+    """
+    A click group whose subcommands, listed in `lazy_commands`, are imported
+    the first time they're looked up.
+    """
+
+    def __init__(self, *args: Any, lazy_commands: dict[str, str] | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = {} if lazy_commands is None else dict(lazy_commands)
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.lazy_commands:
+            self.add_command(self._load_command(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name: str) -> click.Command:
+        module_name, attribute = self.lazy_commands.pop(cmd_name).split(":")
+        command = getattr(importlib.import_module(module_name), attribute)
+        if not isinstance(command, click.Command):
+            raise ValueError(f"{module_name}.{attribute} is not a click command")
+        return command
+
 
 @click.group(
+    cls=LazyGroup,
+    lazy_commands=LAZY_COMMANDS,
     help=f"\n  Manage chia blockchain infrastructure ({__version__})\n",
     epilog="Try 'chia start node', 'chia netspace -d 192', or 'chia show -s'",
     context_settings=CONTEXT_SETTINGS,
@@ -119,29 +156,6 @@ def run_daemon_cmd(ctx: click.Context, wait_for_unlock: bool) -> None:
     asyncio.run(async_run_daemon(ChiaCliContext.set_default(ctx).root_path, wait_for_unlock=wait_for_unlock))
 
 
-cli.add_command(keys_cmd)
-cli.add_command(plots_cmd)
-cli.add_command(wallet_cmd)
-cli.add_command(plotnft_cmd)
-cli.add_command(configure_cmd)
-cli.add_command(init_cmd)
-cli.add_command(rpc_cmd)
-cli.add_command(show_cmd)
-cli.add_command(solver_cmd)
-cli.add_command(start_cmd)
-cli.add_command(stop_cmd)
-cli.add_command(netspace_cmd)
-cli.add_command(farm_cmd)
-cli.add_command(plotters_cmd)
-cli.add_command(db_cmd)
-cli.add_command(peer_cmd)
-cli.add_command(data_cmd)
-cli.add_command(passphrase_cmd)
-cli.add_command(beta_cmd)
-cli.add_command(completion)
-cli.add_command(dev_cmd)
-
-
 def main() -> None:
     cli()
 
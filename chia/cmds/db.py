@@ -6,6 +6,7 @@ import click
 
 from chia.cmds.cmd_classes import ChiaCliContext
 from chia.cmds.db_backup_func import db_backup_func
+from chia.cmds.db_counters_func import db_check_counters_func
 from chia.cmds.db_upgrade_func import db_upgrade_func
 from chia.cmds.db_validate_func import db_validate_func
 
@@ -71,6 +72,21 @@ def db_validate_cmd(ctx: click.Context, in_db_path: str | None, validate_blocks:
         print(f"FAILED: {e}")
 
 
+@db_cmd.command("check-counters", help="check the row counters maintained in the (v2) blockchain database")
+@click.option("--db", "in_db_path", default=None, type=click.Path(), help="Specifies which database file to check")
+@click.option("--fix", default=False, is_flag=True, help="correct any inconsistent counters")
+@click.pass_context
+def db_check_counters_cmd(ctx: click.Context, in_db_path: str | None, fix: bool) -> None:
+    try:
+        db_check_counters_func(
+            ChiaCliContext.set_default(ctx).root_path,
+            None if in_db_path is None else Path(in_db_path),
+            fix=fix,
+        )
+    except RuntimeError as e:
+        print(f"FAILED: {e}")
+
+
 @db_cmd.command("backup", help="backup the blockchain database using VACUUM INTO command")
 @click.option("--backup_file", "db_backup_file", default=None, type=click.Path(), help="Specifies the backup file")
 @click.option("--no_indexes", default=False, is_flag=True, help="Create backup without indexes")
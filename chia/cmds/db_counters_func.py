@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from chia.util.config import load_config
+from chia.util.path import path_from_root
+
+
+def db_check_counters_func(
+    root_path: Path,
+    in_db_path: Path | None = None,
+    *,
+    fix: bool,
+) -> None:
+    config: dict[str, Any] = load_config(root_path, "config.yaml")
+    if in_db_path is None:
+        full_node_config = config["full_node"]
+        selected_network: str = full_node_config["selected_network"]
+        db_pattern: str = full_node_config["database_path"]
+        db_path_replaced: str = db_pattern.replace("CHALLENGE", selected_network)
+        in_db_path = path_from_root(root_path, db_path_replaced)
+
+    mismatches = check_counters(in_db_path, fix=fix)
+    if len(mismatches) > 0 and not fix:
+        raise RuntimeError(f"{len(mismatches)} inconsistent counters. Run with --fix to correct them")
+
+    print(f"\n\nDATABASE COUNTERS ARE CONSISTENT: {in_db_path}\n")
+
+
+def check_counters(in_path: Path, *, fix: bool) -> dict[str, tuple[int, int]]:
+    """
+    Compares the counters maintained by the full node against the actual row
+    counts. Returns a dict mapping the name of each inconsistent counter to
+    its (stored, actual) values. If fix is set, those counters are corrected.
+    """
+    import sqlite3
+    from contextlib import closing
+
+    from chia.full_node.db_counters import COUNTER_QUERIES
+
+    if not in_path.exists():
+        print(f"input file doesn't exist. {in_path}")
+        raise RuntimeError(f"can't find {in_path}")
+
+    mismatches: dict[str, tuple[int, int]] = {}
+    print(f"opening file: {in_path}")
+    with closing(sqlite3.connect(in_path)) as in_db:
+        for name, query in COUNTER_QUERIES.items():
+            try:
+                with closing(in_db.execute("SELECT value FROM counters WHERE name=?", (name,))) as cursor:
+                    row = cursor.fetchone()
+            except sqlite3.OperationalError:
+                raise RuntimeError("Database is missing counters table. Start the full node to create it")
+            if row is None:
+                print(f"{name}: not initialized")
+                continue
+            stored = int(row[0])
+
+            with closing(in_db.execute(query)) as cursor:
+                actual = int(cursor.fetchone()[0])
+
+            if stored == actual:
+                print(f"{name}: {stored}")
+                continue
+
+            print(f"{name}: {stored} (actual: {actual})")
+            mismatches[name] = (stored, actual)
+            if fix:
+                in_db.execute("UPDATE counters SET value=? WHERE name=?", (actual, name))
+
+        if fix:
+            in_db.commit()
+
+    return mismatches
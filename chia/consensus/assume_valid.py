@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint32
+
+
+@dataclass(frozen=True)
+class AssumeValid:
+    """
+    A checkpoint block the node operator trusts to be in the main chain. When
+    syncing a chain that contains it, the aggregate signatures of the
+    checkpoint block and its ancestors aren't validated. All other consensus
+    and coin set checks still are.
+    """
+
+    height: uint32
+    header_hash: bytes32
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any] | None) -> AssumeValid | None:
+        """
+        The checkpoint from the "assume_valid" section of the full node
+        config, or None if it's not set.
+        """
+        if config is None or config.get("header_hash") in {None, ""}:
+            return None
+        return cls(uint32(config["height"]), bytes32.from_hexstr(config["header_hash"]))
@@ -197,6 +197,7 @@ async def validate_block_body(
     fork_info: ForkInfo,
     *,
     log_coins: bool = False,
+    assume_valid: bool = False,
 ) -> Err | None:
     """
     This assumes the header block has been completely validated.
@@ -209,6 +210,8 @@ async def validate_block_body(
     fork_info specifies the fork context of this block. In case the block
         extends the main chain, it can be empty, but if the block extends a fork
         of the main chain, the fork info is mandatory in order to validate the block.
+    assume_valid is set if the block is covered by an assume valid checkpoint,
+        in which case its signature may not have been validated.
     """
     if isinstance(block, FullBlock):
         assert height == block.height
@@ -376,7 +379,7 @@ async def validate_block_body(
 
         # 8. The CLVM program must not return any errors
         assert conds is not None
-        assert conds.validated_signature
+        assert conds.validated_signature or assume_valid
 
         if prev_transaction_block_height >= constants.HARD_FORK2_HEIGHT:
             if not is_canonical_serialization(bytes(block.transactions_generator)):
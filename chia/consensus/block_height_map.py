@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import logging
+import mmap
+import os
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -16,6 +18,10 @@ from chia.util.streamable import Streamable, streamable
 
 log = logging.getLogger(__name__)
 
+# when the height-to-hash file needs to grow, it's grown by this many bytes
+# beyond what's needed, to not have to remap it for every new block
+HEIGHT_TO_HASH_GROWTH = 32 * 10000
+
 
 @streamable
 @dataclass(frozen=True)
@@ -33,7 +39,13 @@ class BlockHeightMap(BlockHeightMapProtocol):
     # this buffer contains all block hashes that are part of the current peak
     # ordered by height. i.e. __height_to_hash[0..32] is the genesis hash
     # __height_to_hash[32..64] is the hash for height 1 and so on
-    __height_to_hash: bytearray
+    # It's the height-to-hash file, memory mapped. The OS pages it in as it's
+    # needed, and shares it with other processes mapping the same file. It's
+    # None until the file is mapped
+    __height_to_hash: mmap.mmap | None
+
+    # the number of bytes of __height_to_hash in use, the file may be larger
+    __size: int
 
     # All sub-epoch summaries that have been included in the blockchain from the beginning until and including the peak
     # (height_included, SubEpochSummary). Note: ONLY for the blocks in the path to the peak
@@ -44,11 +56,6 @@ class BlockHeightMap(BlockHeightMapProtocol):
     # disk
     __counter: int
 
-    # this is the lowest height whose hash has been updated since the last flush
-    # to disk. When it's time to write to disk, we can start flushing from this
-    # offset
-    __first_dirty: int
-
     # the file we're saving the height-to-hash cache to
     __height_to_hash_filename: Path
 
@@ -63,8 +70,8 @@ class BlockHeightMap(BlockHeightMapProtocol):
         self.db = db
 
         self.__counter = 0
-        self.__first_dirty = 0
-        self.__height_to_hash = bytearray()
+        self.__height_to_hash = None
+        self.__size = 0
         self.__sub_epoch_summaries = {}
         suffix = "" if (selected_network is None or selected_network == "mainnet") else f"-{selected_network}"
         self.__height_to_hash_filename = blockchain_dir / f"height-to-hash{suffix}"
@@ -86,13 +93,6 @@ class BlockHeightMap(BlockHeightMapProtocol):
                     log.info("blockchain database is missing blocks. Not loading height-to-hash or sub-epoch-summaries")
                     return self
 
-        try:
-            async with aiofiles.open(self.__height_to_hash_filename, "rb") as f:
-                self.__height_to_hash = bytearray(await f.read())
-        except Exception as e:
-            # it's OK if this file doesn't exist, we can rebuild it
-            log.info(f"Failed to load height-to-hash: {e}")
-
         try:
             async with aiofiles.open(self.__ses_filename, "rb") as f:
                 self.__sub_epoch_summaries = {k: v for (k, v) in SesCache.from_bytes(await f.read()).content}
@@ -104,16 +104,11 @@ class BlockHeightMap(BlockHeightMapProtocol):
         prev_hash: bytes32 = row[1]
         height = row[2]
 
-        # allocate memory for height to hash map
-        # this may also truncate it, if thie file on disk had an invalid size
-        new_size = (height + 1) * 32
-        size = len(self.__height_to_hash)
-        if size > new_size:
-            del self.__height_to_hash[new_size:]
-        else:
-            self.__height_to_hash += bytearray([0] * (new_size - size))
-
-        self.__first_dirty = height + 1
+        # map the height-to-hash file, growing it if it's too small. It's OK if
+        # it doesn't exist, we can rebuild it. Anything in it beyond the peak is
+        # ignored
+        self.__size = (height + 1) * 32
+        self.__map_file(self.__size)
 
         if self.get_hash(height) != peak:
             self.__set_hash(height, peak)
@@ -121,10 +116,7 @@ class BlockHeightMap(BlockHeightMapProtocol):
         if row[3] is not None:
             self.__sub_epoch_summaries[height] = row[3]
 
-        log.info(
-            f"Loaded sub-epoch-summaries: {len(self.__sub_epoch_summaries)} "
-            f"height-to-hash: {len(self.__height_to_hash) // 32}"
-        )
+        log.info(f"Loaded sub-epoch-summaries: {len(self.__sub_epoch_summaries)} height-to-hash: {self.__size // 32}")
 
         # prepopulate the height -> hash mapping
         # run this unconditionally in to ensure both the height-to-hash and sub
@@ -138,36 +130,57 @@ class BlockHeightMap(BlockHeightMapProtocol):
     def update_height(self, height: uint32, header_hash: bytes32, ses: SubEpochSummary | None) -> None:
         # we're only updating the last hash. If we've reorged, we already rolled
         # back, making this the new peak
-        assert height * 32 <= len(self.__height_to_hash)
+        assert height * 32 <= self.__size
         self.__set_hash(height, header_hash)
+        self.__size = max(self.__size, (height + 1) * 32)
         if ses is not None:
             self.__sub_epoch_summaries[height] = bytes(ses)
 
     async def maybe_flush(self) -> None:
+        # the height-to-hash file is updated in place, through the memory map.
+        # It's written back before the sub epoch summaries, so the summaries
+        # on disk are never ahead of it. _load_blocks_from() relies on that
         if self.__counter < 1000:
             return
 
-        assert (len(self.__height_to_hash) % 32) == 0
-        offset = self.__first_dirty * 32
+        if self.__height_to_hash is not None:
+            self.__height_to_hash.flush()
 
         ses_buf = bytes(SesCache([(k, v) for (k, v) in self.__sub_epoch_summaries.items()]))
 
         self.__counter = 0
 
-        try:
-            async with aiofiles.open(self.__height_to_hash_filename, "r+b") as f:
-                map_buf = self.__height_to_hash[offset:].copy()
-                await f.seek(offset)
-                await f.write(map_buf)
-        except Exception:
-            # if the file doesn't exist, write the whole buffer
-            async with aiofiles.open(self.__height_to_hash_filename, "wb") as f:
-                map_buf = self.__height_to_hash.copy()
-                await f.write(map_buf)
-
-        self.__first_dirty = len(self.__height_to_hash) // 32
         await write_file_async(self.__ses_filename, ses_buf)
 
+    def close(self) -> None:
+        """
+        Writes back and unmaps the height-to-hash file. The map can't be used
+        after this.
+        """
+        if self.__height_to_hash is not None:
+            self.__height_to_hash.flush()
+            self.__height_to_hash.close()
+            self.__height_to_hash = None
+        self.__size = 0
+
+    def __map_file(self, min_size: int) -> None:
+        """
+        (Re)maps the height-to-hash file, growing it to `min_size` bytes first
+        if it's smaller.
+        """
+        # the file can't be resized while it's mapped, on Windows
+        if self.__height_to_hash is not None:
+            self.__height_to_hash.close()
+            self.__height_to_hash = None
+        # this creates the file if it doesn't exist
+        with open(self.__height_to_hash_filename, "a+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < min_size:
+                f.truncate(min_size)
+                size = min_size
+            if size > 0:
+                self.__height_to_hash = mmap.mmap(f.fileno(), size)
+
     # load height-to-hash map entries from the DB starting at height back in
     # time until we hit a match in the existing map, at which point we can
     # assume all previous blocks have already been populated
@@ -229,17 +242,20 @@ class BlockHeightMap(BlockHeightMapProtocol):
 
     def __set_hash(self, height: int, block_hash: bytes32) -> None:
         idx = height * 32
+        if self.__height_to_hash is None or idx + 32 > len(self.__height_to_hash):
+            self.__map_file(idx + 32 + HEIGHT_TO_HASH_GROWTH)
+        assert self.__height_to_hash is not None
         self.__height_to_hash[idx : idx + 32] = block_hash
         self.__counter += 1
-        self.__first_dirty = min(self.__first_dirty, height)
 
     def get_hash(self, height: uint32) -> bytes32:
         idx = height * 32
-        assert idx + 32 <= len(self.__height_to_hash)
+        assert idx + 32 <= self.__size
+        assert self.__height_to_hash is not None
         return bytes32(self.__height_to_hash[idx : idx + 32])
 
     def contains_height(self, height: uint32) -> bool:
-        return height * 32 < len(self.__height_to_hash)
+        return height * 32 < self.__size
 
     def rollback(self, fork_height: int) -> None:
         # fork height may be -1, in which case all blocks are different and we
@@ -253,8 +269,9 @@ class BlockHeightMap(BlockHeightMapProtocol):
         for height in heights_to_delete:
             del self.__sub_epoch_summaries[height]
 
-        del self.__height_to_hash[(fork_height + 1) * 32 :]
-        self.__first_dirty = min(self.__first_dirty, fork_height + 1)
+        # the hashes past the fork are left in the file, they're overwritten as
+        # the new chain grows
+        self.__size = min(self.__size, (fork_height + 1) * 32)
 
         if len(heights_to_delete) > 0:
             log.log(
@@ -299,6 +299,8 @@ class Blockchain:
         fork_info: ForkInfo,
         prev_ses_block: BlockRecord | None = None,
         block_record: BlockRecord | None = None,
+        *,
+        assume_valid: bool = False,
     ) -> tuple[AddBlockResult, Err | None, StateChangeSummary | None]:
         """
         This method must be called under the blockchain lock
@@ -312,6 +314,8 @@ class Blockchain:
             pre_validation_result: A result of successful pre validation
             fork_info: Information about the fork chain this block is part of,
                to make validation more efficient. This is an in-out parameter.
+            assume_valid: The block is covered by an assume valid checkpoint,
+               so its aggregate signature may not have been validated.
 
         Returns:
             The result of adding the block to the blockchain (NEW_PEAK, ADDED_AS_ORPHAN, INVALID_BLOCK,
@@ -388,7 +392,7 @@ class Blockchain:
         assert fork_info.peak_height == block.height - 1
         assert block.height == 0 or fork_info.peak_hash == block.prev_header_hash
 
-        assert block.transactions_generator is None or pre_validation_result.validated_signature
+        assert block.transactions_generator is None or pre_validation_result.validated_signature or assume_valid
         error_code = await validate_block_body(
             self.constants,
             self,
@@ -398,6 +402,7 @@ class Blockchain:
             pre_validation_result.conds,
             fork_info,
             log_coins=self._log_coins,
+            assume_valid=assume_valid,
         )
         if error_code is not None:
             return AddBlockResult.INVALID_BLOCK, error_code, None
@@ -481,6 +486,33 @@ class Blockchain:
         else:
             return AddBlockResult.ADDED_AS_ORPHAN, None, None
 
+    async def rollback(self, fork_height: uint32) -> None:
+        """
+        Makes the block at fork_height the peak again. Unlike a reorg, the
+        blocks above it in the main chain are deleted from the database. It's
+        for blocks that turn out not to be trustworthy after they were added,
+        if they're received again, they're validated again.
+        """
+        peak_height = self._peak_height
+        if peak_height is None or fork_height >= peak_height:
+            return
+        header_hash = self.height_to_hash(fork_height)
+        assert header_hash is not None
+        async with self.block_store.transaction():
+            await self.coin_store.rollback_to_block(fork_height)
+            await self.block_store.delete_blocks_above(fork_height)
+            await self.block_store.set_peak(header_hash)
+        for height in range(fork_height + 1, peak_height + 1):
+            for removed_hash in self.__heights_in_cache.pop(uint32(height), set()):
+                del self.__block_records[removed_hash]
+        self.__height_map.rollback(fork_height)
+        self._peak_height = fork_height
+        # the block records leading up to the new peak may have been evicted
+        # from the cache
+        await self.warmup(fork_height)
+        await self.__height_map.maybe_flush()
+        log.warning(f"rolled back the blockchain from height {peak_height} to {fork_height}")
+
     # only to be called under short fork points
     # under deep reorgs this can cause OOM
     async def _reconsider_peak(
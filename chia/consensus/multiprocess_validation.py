@@ -10,6 +10,7 @@ from concurrent.futures import Executor
 from dataclasses import dataclass
 
 from chia_rs import (
+    DONT_VALIDATE_SIGNATURE,
     BlockRecord,
     ConsensusConstants,
     FullBlock,
@@ -59,11 +60,15 @@ class PreValidationResult(Streamable):
 
 # this layer of abstraction is here to let wallet tests monkeypatch it
 def _run_block(
-    block: FullBlock, prev_generators: list[bytes], prev_tx_height: uint32, constants: ConsensusConstants
+    block: FullBlock,
+    prev_generators: list[bytes],
+    prev_tx_height: uint32,
+    constants: ConsensusConstants,
+    extra_flags: int = 0,
 ) -> tuple[int | None, SpendBundleConditions | None]:
     assert block.transactions_generator is not None
     assert block.transactions_info is not None
-    flags = get_flags_for_height_and_constants(prev_tx_height, constants)
+    flags = get_flags_for_height_and_constants(prev_tx_height, constants) | extra_flags
     if block.height >= constants.HARD_FORK_HEIGHT:
         run_block = run_block_generator2
     else:
@@ -86,6 +91,7 @@ def _pre_validate_block(
     prev_generators: list[bytes] | None,
     conds: SpendBundleConditions | None,
     expected_vs: ValidationState,
+    validate_signatures: bool = True,
 ) -> PreValidationResult:
     """
     Args:
@@ -96,6 +102,8 @@ def _pre_validate_block(
         conds:
         expected_vs: The validation state that we calculate for the next block
             if it's validated.
+        validate_signatures: When False, the aggregate signature isn't
+            validated, and the result's validated_signature is False.
     """
 
     try:
@@ -122,20 +130,24 @@ def _pre_validate_block(
                 sp_index=block.reward_chain_block.signage_point_index,
                 finished_sub_slots=len(block.finished_sub_slots),
             )
-            err, conds = _run_block(block, prev_generators, prev_tx_height, constants)
+            if validate_signatures:
+                err, conds = _run_block(block, prev_generators, prev_tx_height, constants)
+            else:
+                err, conds = _run_block(
+                    block, prev_generators, prev_tx_height, constants, extra_flags=DONT_VALIDATE_SIGNATURE
+                )
 
             assert (err is None) != (conds is None)
             if err is not None:
                 validation_time = time.monotonic() - validation_start
                 return PreValidationResult(uint16(err), None, None, uint32(validation_time * 1000))
             assert conds is not None
-            assert conds.validated_signature is True
+            assert conds.validated_signature is validate_signatures
             removals_and_additions = tx_removals_and_additions(conds)
         elif block.is_transaction_block():
             # This is a transaction block with just reward coins.
             removals_and_additions = ([], [])
 
-        assert conds is None or conds.validated_signature is True
         required_iters, error = validate_finished_header_block(
             constants,
             blockchain,
@@ -170,6 +182,7 @@ async def pre_validate_block(
     vs: ValidationState,
     *,
     wp_summaries: list[SubEpochSummary] | None = None,
+    validate_signatures: bool = True,
 ) -> Awaitable[PreValidationResult]:
     """
     This method must be called under the blockchain lock
@@ -193,7 +206,9 @@ async def pre_validate_block(
             for the next block. It includes subslot iterators, difficulty and
             the previous sub epoch summary (ses) block.
         wp_summaries:
-        validate_signatures:
+        validate_signatures: Set to False to skip the validation of the
+            aggregate signature of the block, for blocks covered by an assume
+            valid checkpoint. Every other check is still performed.
     """
     prev_b: BlockRecord | None = None
 
@@ -277,6 +292,7 @@ async def pre_validate_block(
         previous_generators,
         conds,
         copy.copy(vs),
+        validate_signatures,
     )
 
     if block_rec.sub_epoch_summary_included is not None:
@@ -91,6 +91,11 @@ class PlotState(str, Enum):
     FINISHED = "FINISHED"
 
 
+# how long the state changed messages are collected, to drop the ones
+# superseded by later messages
+STATE_CHANGED_COALESCE_WINDOW = 0.05
+
+
 class PlotEvent(str, Enum):
     LOG_CHANGED = "log_changed"
     STATE_CHANGED = "state_changed"
@@ -173,6 +178,45 @@ class StatusMessage:
     def create_payload(self) -> str:
         return create_payload(command=self.command, data=self.data, origin=self.origin, destination=self.destination)
 
+    def superseded_by(self, other: StatusMessage) -> bool:
+        """
+        Whether sending the other (later) message makes sending this one
+        pointless: it's identical, or it's a newer snapshot of the state of the
+        same plots in the plot queue. The plot log messages aren't snapshots,
+        each one carries the next chunk of the log, so they're never dropped.
+        """
+        if (self.service, self.command, self.destination, self.origin) != (
+            other.service,
+            other.command,
+            other.destination,
+            other.origin,
+        ):
+            return False
+        if self.data.get("state") == PlotEvent.LOG_CHANGED or other.data.get("state") == PlotEvent.LOG_CHANGED:
+            return False
+        if self.data == other.data:
+            return True
+        if self.command != "state_changed" or "queue" not in self.data or "queue" not in other.data:
+            return False
+        return (
+            self.data.get("state") == PlotEvent.STATE_CHANGED
+            and other.data.get("state") == PlotEvent.STATE_CHANGED
+            and [item.get("id") for item in self.data["queue"]] == [item.get("id") for item in other.data["queue"]]
+        )
+
+
+def coalesce_status_messages(messages: list[StatusMessage]) -> list[StatusMessage]:
+    """
+    Drops the messages superseded by a later message in the list, keeping the
+    order of the remaining ones.
+    """
+    result: list[StatusMessage] = []
+    for message in reversed(messages):
+        if not any(message.superseded_by(later) for later in result):
+            result.append(message)
+    result.reverse()
+    return result
+
 
 class WebSocketServer:
     def __init__(
@@ -342,22 +386,26 @@ class WebSocketServer:
         return ws
 
     async def send_all_responses(self, connections: set[WebSocketResponse], response: str) -> None:
-        for connection in connections.copy():
-            try:
-                await connection.send_str(response)
-            except Exception as e:
-                service_names = self.remove_connection(connection)
-                if len(service_names) == 0:
-                    service_names = ["Unknown"]
+        # send to all the connections at once, so a slow one doesn't hold up
+        # the others
+        await asyncio.gather(*(self.send_response(connection, response) for connection in connections.copy()))
 
-                if isinstance(e, ConnectionResetError):
-                    self.log.info(f"Peer disconnected. Closing websocket with {service_names}")
-                else:
-                    tb = traceback.format_exc()
-                    self.log.error(f"Unexpected exception trying to send to {service_names} (websocket: {e} {tb})")
-                    self.log.info(f"Closing websocket with {service_names}")
+    async def send_response(self, connection: WebSocketResponse, response: str) -> None:
+        try:
+            await connection.send_str(response)
+        except Exception as e:
+            service_names = self.remove_connection(connection)
+            if len(service_names) == 0:
+                service_names = ["Unknown"]
 
-                await connection.close()
+            if isinstance(e, ConnectionResetError):
+                self.log.info(f"Peer disconnected. Closing websocket with {service_names}")
+            else:
+                tb = traceback.format_exc()
+                self.log.error(f"Unexpected exception trying to send to {service_names} (websocket: {e} {tb})")
+                self.log.info(f"Closing websocket with {service_names}")
+
+            await connection.close()
 
     def remove_connection(self, websocket: WebSocketResponse) -> list[str]:
         """Returns a list of service names from which the connection was removed"""
@@ -771,8 +819,14 @@ class WebSocketServer:
                     consume=True,
                     message="Unexpected exception, continuing:",
                 ):
-                    message = await self.state_changed_msg_queue.get()
-                    await self._state_changed(message)
+                    messages = [await self.state_changed_msg_queue.get()]
+                    # plotting and keyring changes come in bursts, wait a little
+                    # to merge the updates superseding each other
+                    await asyncio.sleep(STATE_CHANGED_COALESCE_WINDOW)
+                    while not self.state_changed_msg_queue.empty():
+                        messages.append(self.state_changed_msg_queue.get_nowait())
+                    for message in coalesce_status_messages(messages):
+                        await self._state_changed(message)
 
     async def _state_changed(self, message: StatusMessage) -> None:
         """If id is None, send the whole state queue"""
@@ -780,14 +834,21 @@ class WebSocketServer:
             return None
 
         websockets = self.connections[message.service]
-        for websocket in websockets.copy():
-            try:
-                await websocket.send_str(message.create_payload())
-            except Exception as e:
-                tb = traceback.format_exc()
-                self.log.error(f"Unexpected exception trying to send to websocket: {e} {tb}")
-                websockets.remove(websocket)
-                await websocket.close()
+        payload = message.create_payload()
+        await asyncio.gather(
+            *(self._send_state_changed(websockets, websocket, payload) for websocket in websockets.copy())
+        )
+
+    async def _send_state_changed(
+        self, websockets: set[WebSocketResponse], websocket: WebSocketResponse, payload: str
+    ) -> None:
+        try:
+            await websocket.send_str(payload)
+        except Exception as e:
+            tb = traceback.format_exc()
+            self.log.error(f"Unexpected exception trying to send to websocket: {e} {tb}")
+            websockets.discard(websocket)
+            await websocket.close()
 
     def state_changed(self, service: str, message: dict[str, Any]) -> None:
         self.state_changed_msg_queue.put_nowait(
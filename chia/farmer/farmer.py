@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import contextlib
+import functools
 import json
 import logging
 import sys
@@ -13,12 +15,13 @@ from math import floor
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar, cast
 
-import aiohttp
 from chia_rs import AugSchemeMPL, ConsensusConstants, G1Element, G2Element, PrivateKey, ProofOfSpace
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint8, uint16, uint32, uint64
 
 from chia.daemon.keychain_proxy import KeychainProxy, connect_to_keychain_and_validate, wrap_local_keychain
+from chia.farmer.pool_client import PoolClient
+from chia.farmer.pool_stats import RecentEvents, RollingSum
 from chia.plot_sync.delta import Delta
 from chia.plot_sync.receiver import Receiver
 from chia.pools.pool_config import PoolWalletConfig, load_pool_config, update_pool_url
@@ -37,9 +40,9 @@ from chia.protocols.pool_protocol import (
 )
 from chia.protocols.protocol_message_types import ProtocolMessageTypes
 from chia.rpc.rpc_server import StateChangedProtocol, default_get_connections
-from chia.server.server import ChiaServer, ssl_context_for_root
+from chia.server.server import ChiaServer
 from chia.server.ws_connection import WSChiaConnection
-from chia.ssl.create_ssl import get_mozilla_ca_crt
+from chia.types.blockchain_format.proof_of_space import verify_and_get_quality_string
 from chia.util.bech32m import decode_puzzle_hash, encode_puzzle_hash
 from chia.util.byte_types import hexstr_to_bytes
 from chia.util.config import config_path_for_filename, load_config, lock_and_load_config, save_config
@@ -47,6 +50,7 @@ from chia.util.errors import KeychainProxyConnectionFailure
 from chia.util.hash import std_hash
 from chia.util.keychain import Keychain
 from chia.util.logging import TimedDuplicateFilter
+from chia.util.lru_cache import LRUCache
 from chia.util.profiler import profile_task
 from chia.util.task_referencer import create_referenced_task
 from chia.wallet.derive_keys import (
@@ -65,6 +69,11 @@ log = logging.getLogger(__name__)
 UPDATE_POOL_INFO_INTERVAL: int = 3600
 UPDATE_POOL_INFO_FAILURE_RETRY_INTERVAL: int = 120
 UPDATE_POOL_FARMER_INFO_INTERVAL: int = 300
+# Harvesters send the same proof for every signage point with the same hash,
+# and it's needed again for the signatures. The quality strings of the most
+# recently verified proofs are kept, so they're not verified over and over.
+VERIFIED_PROOFS_CACHE_SIZE: int = 1000
+PROOF_VERIFICATION_THREADS: int = 2
 
 
 @dataclass(frozen=True)
@@ -73,16 +82,6 @@ class GetPoolInfoResult:
     new_pool_url: str | None
 
 
-def strip_old_entries(pairs: list[tuple[float, Any]], before: float) -> list[tuple[float, Any]]:
-    for index, [timestamp, points] in enumerate(pairs):
-        if timestamp >= before:
-            if index == 0:
-                return pairs
-            if index > 0:
-                return pairs[index:]
-    return []
-
-
 def increment_pool_stats(
     pool_states: dict[bytes32, Any],
     p2_singleton_puzzlehash: bytes32,
@@ -97,16 +96,7 @@ def increment_pool_stats(
     if f"{name}_since_start" in pool_state:
         pool_state[f"{name}_since_start"] += count
     if f"{name}_24h" in pool_state:
-        if value is None:
-            pool_state[f"{name}_24h"].append((uint32(current_time), pool_state["current_difficulty"]))
-        else:
-            pool_state[f"{name}_24h"].append((uint32(current_time), value))
-
-        # Age out old 24h information for every signage point regardless
-        # of any failures.  Note that this still lets old data remain if
-        # the client isn't receiving signage points.
-        cutoff_24h = current_time - (24 * 60 * 60)
-        pool_state[f"{name}_24h"] = strip_old_entries(pairs=pool_state[f"{name}_24h"], before=cutoff_24h)
+        pool_state[f"{name}_24h"].add(current_time, pool_state["current_difficulty"] if value is None else value)
     return
 
 
@@ -171,6 +161,9 @@ class Farmer:
         # From p2_singleton_puzzle_hash to pool state dict
         self.pool_state: dict[bytes32, dict[str, Any]] = {}
 
+        # From pool url to the client used for all the requests to that pool
+        self.pool_clients: dict[str, PoolClient] = {}
+
         # From p2_singleton to auth PrivateKey
         self.authentication_keys: dict[bytes32, PrivateKey] = {}
 
@@ -182,6 +175,16 @@ class Farmer:
         # Use to find missing signage points. (new_signage_point, time)
         self.prev_signage_point: tuple[uint64, farmer_protocol.NewSignagePoint] | None = None
 
+        # Proofs of space are verified off the event loop, which keeps handling
+        # signage points and signature requests in the meantime
+        self.proof_verification_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=PROOF_VERIFICATION_THREADS, thread_name_prefix="farmer-pos-"
+        )
+        # (proof, challenge hash, sp hash, peak height, last tx height) to the quality string
+        self.verified_proofs: LRUCache[tuple[ProofOfSpace, bytes32, bytes32, uint32, uint32], bytes32] = LRUCache(
+            VERIFIED_PROOFS_CACHE_SIZE
+        )
+
     @contextlib.asynccontextmanager
     async def manage(self) -> AsyncIterator[None]:
         async def start_task() -> None:
@@ -212,11 +215,15 @@ class Farmer:
                 await self.cache_clear_task
             if self.update_pool_state_task is not None:
                 await self.update_pool_state_task
+            for pool_client in self.pool_clients.values():
+                await pool_client.close()
+            self.pool_clients = {}
             if self.keychain_proxy is not None:
                 proxy = self.keychain_proxy
                 self.keychain_proxy = None
                 await proxy.close()
                 await asyncio.sleep(0.5)  # https://docs.aiohttp.org/en/stable/client_advanced.html#graceful-shutdown
+            self.proof_verification_executor.shutdown(wait=True)
             self.started = False
 
     def get_connections(self, request_node_type: NodeType | None) -> list[dict[str, Any]]:
@@ -346,29 +353,68 @@ class Farmer:
         if receiver.initial_sync() or harvester_updated:
             self.state_changed("harvester_update", receiver.to_dict(True))
 
+    async def verify_proof_of_space(
+        self,
+        proof: ProofOfSpace,
+        challenge_hash: bytes32,
+        sp_hash: bytes32,
+        *,
+        height: uint32,
+        prev_transaction_block_height: uint32,
+    ) -> bytes32 | None:
+        """
+        Returns the quality string of a valid proof of space, or None if it's
+        invalid. See verify_and_get_quality_string().
+        """
+        key = (proof, challenge_hash, sp_hash, height, prev_transaction_block_height)
+        quality_string = self.verified_proofs.get(key)
+        if quality_string is not None:
+            return quality_string
+        quality_string = await asyncio.get_running_loop().run_in_executor(
+            self.proof_verification_executor,
+            functools.partial(
+                verify_and_get_quality_string,
+                proof,
+                self.constants,
+                challenge_hash,
+                sp_hash,
+                height=height,
+                prev_transaction_block_height=prev_transaction_block_height,
+            ),
+        )
+        if quality_string is not None:
+            self.verified_proofs.put(key, quality_string)
+        return quality_string
+
+    def get_pool_client(self, pool_url: str) -> PoolClient:
+        pool_client = self.pool_clients.get(pool_url)
+        if pool_client is None:
+            pool_client = PoolClient(pool_url)
+            self.pool_clients[pool_url] = pool_client
+        return pool_client
+
     async def _pool_get_pool_info(self, pool_config: PoolWalletConfig) -> GetPoolInfoResult | None:
         try:
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                url = f"{pool_config.pool_url}/pool_info"
-                async with session.get(url, ssl=ssl_context_for_root(get_mozilla_ca_crt(), log=self.log)) as resp:
-                    if resp.ok:
-                        response: dict[str, Any] = json.loads(await resp.text())
-                        self.log.info(f"GET /pool_info response: {response}")
-                        new_pool_url: str | None = None
-                        response_url_str = f"{resp.url}"
-                        if (
-                            response_url_str != url
-                            and len(resp.history) > 0
-                            and all(r.status in {301, 308} for r in resp.history)
-                        ):
-                            new_pool_url = response_url_str.replace("/pool_info", "")
-
-                        return GetPoolInfoResult(pool_info=response, new_pool_url=new_pool_url)
-                    else:
-                        self.handle_failed_pool_response(
-                            pool_config.p2_singleton_puzzle_hash,
-                            f"Error in GET /pool_info {pool_config.pool_url}, {resp.status}",
-                        )
+            url = f"{pool_config.pool_url}/pool_info"
+            resp = await self.get_pool_client(pool_config.pool_url).request("GET", "/pool_info")
+            if resp.ok:
+                response: dict[str, Any] = json.loads(await resp.text())
+                self.log.info(f"GET /pool_info response: {response}")
+                new_pool_url: str | None = None
+                response_url_str = f"{resp.url}"
+                if (
+                    response_url_str != url
+                    and len(resp.history) > 0
+                    and all(r.status in {301, 308} for r in resp.history)
+                ):
+                    new_pool_url = response_url_str.replace("/pool_info", "")
+
+                return GetPoolInfoResult(pool_info=response, new_pool_url=new_pool_url)
+            else:
+                self.handle_failed_pool_response(
+                    pool_config.p2_singleton_puzzle_hash,
+                    f"Error in GET /pool_info {pool_config.pool_url}, {resp.status}",
+                )
 
         except Exception as e:
             self.handle_failed_pool_response(
@@ -393,31 +439,26 @@ class Farmer:
             "signature": bytes(signature).hex(),
         }
         try:
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.get(
-                    f"{pool_config.pool_url}/farmer",
-                    params=get_farmer_params,
-                    ssl=ssl_context_for_root(get_mozilla_ca_crt(), log=self.log),
-                ) as resp:
-                    if resp.ok:
-                        response: dict[str, Any] = json.loads(await resp.text())
-                        log_level = logging.INFO
-                        if "error_code" in response:
-                            log_level = logging.WARNING
-                            increment_pool_stats(
-                                self.pool_state,
-                                pool_config.p2_singleton_puzzle_hash,
-                                "pool_errors",
-                                time.time(),
-                                value=response,
-                            )
-                        self.log.log(log_level, f"GET /farmer response: {response}")
-                        return response
-                    else:
-                        self.handle_failed_pool_response(
-                            pool_config.p2_singleton_puzzle_hash,
-                            f"Error in GET /farmer {pool_config.pool_url}, {resp.status}",
-                        )
+            resp = await self.get_pool_client(pool_config.pool_url).request("GET", "/farmer", params=get_farmer_params)
+            if resp.ok:
+                response: dict[str, Any] = json.loads(await resp.text())
+                log_level = logging.INFO
+                if "error_code" in response:
+                    log_level = logging.WARNING
+                    increment_pool_stats(
+                        self.pool_state,
+                        pool_config.p2_singleton_puzzle_hash,
+                        "pool_errors",
+                        time.time(),
+                        value=response,
+                    )
+                self.log.log(log_level, f"GET /farmer response: {response}")
+                return response
+            else:
+                self.handle_failed_pool_response(
+                    pool_config.p2_singleton_puzzle_hash,
+                    f"Error in GET /farmer {pool_config.pool_url}, {resp.status}",
+                )
         except Exception as e:
             self.handle_failed_pool_response(
                 pool_config.p2_singleton_puzzle_hash, f"Exception in GET /farmer {pool_config.pool_url}, {e}"
@@ -441,31 +482,28 @@ class Farmer:
         post_farmer_request = PostFarmerRequest(post_farmer_payload, signature)
         self.log.debug(f"POST /farmer request {post_farmer_request}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{pool_config.pool_url}/farmer",
-                    json=post_farmer_request.to_json_dict(),
-                    ssl=ssl_context_for_root(get_mozilla_ca_crt(), log=self.log),
-                ) as resp:
-                    if resp.ok:
-                        response: dict[str, Any] = json.loads(await resp.text())
-                        log_level = logging.INFO
-                        if "error_code" in response:
-                            log_level = logging.WARNING
-                            increment_pool_stats(
-                                self.pool_state,
-                                pool_config.p2_singleton_puzzle_hash,
-                                "pool_errors",
-                                time.time(),
-                                value=response,
-                            )
-                        self.log.log(log_level, f"POST /farmer response: {response}")
-                        return response
-                    else:
-                        self.handle_failed_pool_response(
-                            pool_config.p2_singleton_puzzle_hash,
-                            f"Error in POST /farmer {pool_config.pool_url}, {resp.status}",
-                        )
+            resp = await self.get_pool_client(pool_config.pool_url).request(
+                "POST", "/farmer", json=post_farmer_request.to_json_dict()
+            )
+            if resp.ok:
+                response: dict[str, Any] = json.loads(await resp.text())
+                log_level = logging.INFO
+                if "error_code" in response:
+                    log_level = logging.WARNING
+                    increment_pool_stats(
+                        self.pool_state,
+                        pool_config.p2_singleton_puzzle_hash,
+                        "pool_errors",
+                        time.time(),
+                        value=response,
+                    )
+                self.log.log(log_level, f"POST /farmer response: {response}")
+                return response
+            else:
+                self.handle_failed_pool_response(
+                    pool_config.p2_singleton_puzzle_hash,
+                    f"Error in POST /farmer {pool_config.pool_url}, {resp.status}",
+                )
         except Exception as e:
             self.handle_failed_pool_response(
                 pool_config.p2_singleton_puzzle_hash, f"Exception in POST /farmer {pool_config.pool_url}, {e}"
@@ -489,30 +527,27 @@ class Farmer:
         put_farmer_request = PutFarmerRequest(put_farmer_payload, signature)
         self.log.debug(f"PUT /farmer request {put_farmer_request}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.put(
-                    f"{pool_config.pool_url}/farmer",
-                    json=put_farmer_request.to_json_dict(),
-                    ssl=ssl_context_for_root(get_mozilla_ca_crt(), log=self.log),
-                ) as resp:
-                    if resp.ok:
-                        response: dict[str, Any] = json.loads(await resp.text())
-                        log_level = logging.INFO
-                        if "error_code" in response:
-                            log_level = logging.WARNING
-                            increment_pool_stats(
-                                self.pool_state,
-                                pool_config.p2_singleton_puzzle_hash,
-                                "pool_errors",
-                                time.time(),
-                                value=response,
-                            )
-                        self.log.log(log_level, f"PUT /farmer response: {response}")
-                    else:
-                        self.handle_failed_pool_response(
-                            pool_config.p2_singleton_puzzle_hash,
-                            f"Error in PUT /farmer {pool_config.pool_url}, {resp.status}",
-                        )
+            resp = await self.get_pool_client(pool_config.pool_url).request(
+                "PUT", "/farmer", json=put_farmer_request.to_json_dict()
+            )
+            if resp.ok:
+                response: dict[str, Any] = json.loads(await resp.text())
+                log_level = logging.INFO
+                if "error_code" in response:
+                    log_level = logging.WARNING
+                    increment_pool_stats(
+                        self.pool_state,
+                        pool_config.p2_singleton_puzzle_hash,
+                        "pool_errors",
+                        time.time(),
+                        value=response,
+                    )
+                self.log.log(log_level, f"PUT /farmer response: {response}")
+            else:
+                self.handle_failed_pool_response(
+                    pool_config.p2_singleton_puzzle_hash,
+                    f"Error in PUT /farmer {pool_config.pool_url}, {resp.status}",
+                )
         except Exception as e:
             self.handle_failed_pool_response(
                 pool_config.p2_singleton_puzzle_hash, f"Exception in PUT /farmer {pool_config.pool_url}, {e}"
@@ -530,6 +565,11 @@ class Farmer:
         config = load_config(self._root_path, "config.yaml")
 
         pool_config_list: list[PoolWalletConfig] = load_pool_config(self._root_path)
+        # close the clients of the pools we're no longer farming to
+        pool_urls = {pool_config.pool_url for pool_config in pool_config_list}
+        for pool_url in list(self.pool_clients.keys()):
+            if pool_url not in pool_urls:
+                await self.pool_clients.pop(pool_url).close()
         for pool_config in pool_config_list:
             p2_singleton_puzzle_hash = pool_config.p2_singleton_puzzle_hash
 
@@ -544,24 +584,24 @@ class Farmer:
                     self.pool_state[p2_singleton_puzzle_hash] = {
                         "p2_singleton_puzzle_hash": p2_singleton_puzzle_hash.hex(),
                         "points_found_since_start": 0,
-                        "points_found_24h": [],
+                        "points_found_24h": RollingSum(),
                         "points_acknowledged_since_start": 0,
-                        "points_acknowledged_24h": [],
+                        "points_acknowledged_24h": RollingSum(),
                         "next_farmer_update": 0,
                         "next_pool_info_update": 0,
                         "current_points": 0,
                         "current_difficulty": None,
-                        "pool_errors_24h": [],
+                        "pool_errors_24h": RecentEvents(),
                         "valid_partials_since_start": 0,
-                        "valid_partials_24h": [],
+                        "valid_partials_24h": RollingSum(),
                         "invalid_partials_since_start": 0,
-                        "invalid_partials_24h": [],
+                        "invalid_partials_24h": RollingSum(),
                         "insufficient_partials_since_start": 0,
-                        "insufficient_partials_24h": [],
+                        "insufficient_partials_24h": RollingSum(),
                         "stale_partials_since_start": 0,
-                        "stale_partials_24h": [],
+                        "stale_partials_24h": RollingSum(),
                         "missing_partials_since_start": 0,
-                        "missing_partials_24h": [],
+                        "missing_partials_24h": RollingSum(),
                         "authentication_token_timeout": None,
                         "plot_count": 0,
                         "pool_config": pool_config,
@@ -5,7 +5,6 @@ import logging
 import time
 from typing import TYPE_CHECKING, Any, ClassVar
 
-import aiohttp
 from chia_rs import AugSchemeMPL, G2Element, PlotParam, PoolTarget, PrivateKey, ProofOfSpace
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint8, uint16, uint32, uint64
@@ -13,7 +12,7 @@ from packaging.version import Version
 
 from chia import __version__
 from chia.consensus.pot_iterations import calculate_iterations_quality, calculate_sp_interval_iters
-from chia.farmer.farmer import Farmer, increment_pool_stats, strip_old_entries
+from chia.farmer.farmer import Farmer, increment_pool_stats
 from chia.harvester.harvester_api import HarvesterAPI
 from chia.protocols import farmer_protocol, harvester_protocol
 from chia.protocols.farmer_protocol import DeclareProofOfSpace, SignedValues
@@ -37,14 +36,11 @@ from chia.protocols.pool_protocol import (
 from chia.protocols.protocol_message_types import ProtocolMessageTypes
 from chia.protocols.solver_protocol import SolverInfo, SolverResponse
 from chia.server.api_protocol import ApiMetadata
-from chia.server.server import ssl_context_for_root
 from chia.server.ws_connection import WSChiaConnection
-from chia.ssl.create_ssl import get_mozilla_ca_crt
 from chia.types.blockchain_format.proof_of_space import (
     calculate_prefix_bits,
     generate_plot_public_key,
     generate_taproot_sk,
-    verify_and_get_quality_string,
 )
 
 
@@ -99,9 +95,8 @@ class FarmerAPI:
 
         sps = self.farmer.sps[new_proof_of_space.sp_hash]
         for sp in sps:
-            computed_quality_string = verify_and_get_quality_string(
+            computed_quality_string = await self.farmer.verify_proof_of_space(
                 new_proof_of_space.proof,
-                self.farmer.constants,
                 new_proof_of_space.challenge_hash,
                 new_proof_of_space.sp_hash,
                 height=sp.peak_height,
@@ -361,87 +356,83 @@ class FarmerAPI:
                 )
                 self.farmer.log.debug(f"POST /partial request {post_partial_request}")
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.post(
-                            f"{pool_url}/partial",
-                            json=post_partial_request.to_json_dict(),
-                            ssl=ssl_context_for_root(get_mozilla_ca_crt(), log=self.farmer.log),
-                            headers={
-                                "User-Agent": f"Chia Blockchain v.{__version__}",
-                                "chia-farmer-version": __version__,
-                                "chia-harvester-version": peer.version,
-                            },
-                        ) as resp:
-                            if not resp.ok:
-                                self.farmer.log.error(f"Error sending partial to {pool_url}, {resp.status}")
-                                increment_pool_stats(
-                                    self.farmer.pool_state,
-                                    p2_singleton_puzzle_hash,
-                                    "invalid_partials",
-                                    time.time(),
-                                )
-                                return
-
-                            pool_response: dict[str, Any] = json.loads(await resp.text())
-                            self.farmer.log.info(f"Pool response: {pool_response}")
-                            if "error_code" in pool_response:
-                                self.farmer.log.error(
-                                    f"Error in pooling: {pool_response['error_code'], pool_response['error_message']}"
-                                )
-
-                                increment_pool_stats(
-                                    self.farmer.pool_state,
-                                    p2_singleton_puzzle_hash,
-                                    "pool_errors",
-                                    time.time(),
-                                    value=pool_response,
-                                )
-
-                                if pool_response["error_code"] == PoolErrorCode.TOO_LATE.value:
-                                    increment_pool_stats(
-                                        self.farmer.pool_state,
-                                        p2_singleton_puzzle_hash,
-                                        "stale_partials",
-                                        time.time(),
-                                    )
-                                elif pool_response["error_code"] == PoolErrorCode.PROOF_NOT_GOOD_ENOUGH.value:
-                                    self.farmer.log.error(
-                                        "Partial not good enough, forcing pool farmer update to "
-                                        "get our current difficulty."
-                                    )
-                                    increment_pool_stats(
-                                        self.farmer.pool_state,
-                                        p2_singleton_puzzle_hash,
-                                        "insufficient_partials",
-                                        time.time(),
-                                    )
-                                    pool_state_dict["next_farmer_update"] = 0
-                                    await self.farmer.update_pool_state()
-                                else:
-                                    increment_pool_stats(
-                                        self.farmer.pool_state,
-                                        p2_singleton_puzzle_hash,
-                                        "invalid_partials",
-                                        time.time(),
-                                    )
-                                return
+                    resp = await self.farmer.get_pool_client(pool_url).post_partial(
+                        json=post_partial_request.to_json_dict(),
+                        headers={
+                            "User-Agent": f"Chia Blockchain v.{__version__}",
+                            "chia-farmer-version": __version__,
+                            "chia-harvester-version": peer.version,
+                        },
+                    )
+                    if not resp.ok:
+                        self.farmer.log.error(f"Error sending partial to {pool_url}, {resp.status}")
+                        increment_pool_stats(
+                            self.farmer.pool_state,
+                            p2_singleton_puzzle_hash,
+                            "invalid_partials",
+                            time.time(),
+                        )
+                        return
+
+                    pool_response: dict[str, Any] = json.loads(await resp.text())
+                    self.farmer.log.info(f"Pool response: {pool_response}")
+                    if "error_code" in pool_response:
+                        self.farmer.log.error(
+                            f"Error in pooling: {pool_response['error_code'], pool_response['error_message']}"
+                        )
+
+                        increment_pool_stats(
+                            self.farmer.pool_state,
+                            p2_singleton_puzzle_hash,
+                            "pool_errors",
+                            time.time(),
+                            value=pool_response,
+                        )
 
+                        if pool_response["error_code"] == PoolErrorCode.TOO_LATE.value:
+                            increment_pool_stats(
+                                self.farmer.pool_state,
+                                p2_singleton_puzzle_hash,
+                                "stale_partials",
+                                time.time(),
+                            )
+                        elif pool_response["error_code"] == PoolErrorCode.PROOF_NOT_GOOD_ENOUGH.value:
+                            self.farmer.log.error(
+                                "Partial not good enough, forcing pool farmer update to get our current difficulty."
+                            )
                             increment_pool_stats(
                                 self.farmer.pool_state,
                                 p2_singleton_puzzle_hash,
-                                "valid_partials",
+                                "insufficient_partials",
                                 time.time(),
                             )
-                            new_difficulty = pool_response["new_difficulty"]
+                            pool_state_dict["next_farmer_update"] = 0
+                            await self.farmer.update_pool_state()
+                        else:
                             increment_pool_stats(
                                 self.farmer.pool_state,
                                 p2_singleton_puzzle_hash,
-                                "points_acknowledged",
+                                "invalid_partials",
                                 time.time(),
-                                new_difficulty,
-                                new_difficulty,
                             )
-                            pool_state_dict["current_difficulty"] = new_difficulty
+                        return
+
+                    increment_pool_stats(
+                        self.farmer.pool_state,
+                        p2_singleton_puzzle_hash,
+                        "valid_partials",
+                        time.time(),
+                    )
+                    new_difficulty = pool_response["new_difficulty"]
+                    increment_pool_stats(
+                        self.farmer.pool_state,
+                        p2_singleton_puzzle_hash,
+                        "points_acknowledged",
+                        time.time(),
+                        new_difficulty,
+                        new_difficulty,
+                    )
+                    pool_state_dict["current_difficulty"] = new_difficulty
                 except Exception as e:
                     self.farmer.log.error(f"Error connecting to pool: {e}")
 
@@ -472,7 +463,7 @@ class FarmerAPI:
                         "pool_url": pool_url,
                         "current_difficulty": pool_state_dict["current_difficulty"],
                         "points_acknowledged_since_start": pool_state_dict["points_acknowledged_since_start"],
-                        "points_acknowledged_24h": pool_state_dict["points_acknowledged_24h"],
+                        "points_acknowledged_24h": pool_state_dict["points_acknowledged_24h"].entries(),
                     },
                 )
 
@@ -588,7 +579,7 @@ class FarmerAPI:
 
     @metadata.request()
     async def respond_signatures(self, response: harvester_protocol.RespondSignatures) -> None:
-        request = self._process_respond_signatures(response)
+        request = await self._process_respond_signatures(response)
         if request is None:
             return None
 
@@ -678,17 +669,6 @@ class FarmerAPI:
             self.farmer.sps[new_signage_point.challenge_chain_sp].remove(new_signage_point)
 
             raise exception
-        finally:
-            # Age out old 24h information for every signage point regardless
-            # of any failures.  Note that this still lets old data remain if
-            # the client isn't receiving signage points.
-            cutoff_24h = time.time() - (24 * 60 * 60)
-            for p2_singleton_puzzle_hash, pool_dict in self.farmer.pool_state.items():
-                for key in ["points_found_24h", "points_acknowledged_24h"]:
-                    if key not in pool_dict:
-                        continue
-
-                    pool_dict[key] = strip_old_entries(pairs=pool_dict[key], before=cutoff_24h)
 
         now = uint64(time.time())
         self.farmer.cache_add_time[new_signage_point.challenge_chain_sp] = now
@@ -740,7 +720,7 @@ class FarmerAPI:
             return None
 
         # Use the same processing as for unsolicited respond signature requests
-        signed_values = self._process_respond_signatures(response)
+        signed_values = await self._process_respond_signatures(response)
         if signed_values is None:
             return None
         assert isinstance(signed_values, SignedValues)
@@ -797,7 +777,7 @@ class FarmerAPI:
     async def plot_sync_done(self, message: PlotSyncDone, peer: WSChiaConnection) -> None:
         await self.farmer.plot_sync_receivers[peer.peer_node_id].sync_done(message)
 
-    def _process_respond_signatures(
+    async def _process_respond_signatures(
         self, response: harvester_protocol.RespondSignatures
     ) -> DeclareProofOfSpace | SignedValues | None:
         """
@@ -828,9 +808,8 @@ class FarmerAPI:
         assert pospace is not None
         include_taproot: bool = pospace.pool_contract_puzzle_hash is not None
 
-        computed_quality_string = verify_and_get_quality_string(
+        computed_quality_string = await self.farmer.verify_proof_of_space(
             pospace,
-            self.farmer.constants,
             response.challenge_hash,
             response.sp_hash,
             height=peak_height,
@@ -10,6 +10,7 @@ from chia_rs.sized_ints import uint32
 from typing_extensions import Protocol
 
 from chia.farmer.farmer import Farmer
+from chia.farmer.pool_stats import RollingSum
 from chia.plot_sync.receiver import Receiver
 from chia.protocols.harvester_protocol import Plot
 from chia.protocols.outbound_message import NodeType
@@ -310,6 +311,11 @@ class FarmerRpcApi:
         pools_list = []
         for p2_singleton_puzzle_hash, pool_dict in self.service.pool_state.items():
             pool_state = pool_dict.copy()
+            for key, value in pool_dict.items():
+                if isinstance(value, RollingSum):
+                    # the `*_24h` lists are (bucket start, sum of values) pairs, this is how many values each
+                    # bucket holds, e.g. the number of partials rather than their total difficulty
+                    pool_state[f"{key.removesuffix('_24h')}_count_24h"] = value.count_entries()
             pool_state["plot_count"] = self.get_pool_contract_puzzle_hash_plot_count(p2_singleton_puzzle_hash)
             pools_list.append(pool_state)
         return {"pool_state": pools_list}
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import ssl
+from typing import Any
+
+import aiohttp
+
+from chia.server.server import ssl_context_for_root
+from chia.ssl.create_ssl import get_mozilla_ca_crt
+
+log = logging.getLogger(__name__)
+
+# the maximum number of requests in flight to a pool, further requests wait
+# for their turn
+MAX_CONCURRENT_REQUESTS = 16
+# partials are only worth anything to the pool shortly after the signage
+# point, so a failed submission is only retried a few times, quickly
+PARTIAL_SUBMIT_ATTEMPTS = 3
+PARTIAL_RETRY_DELAY = 1.0
+# the responses of a proxy or load balancer in front of a pool that's
+# temporarily unavailable
+RETRY_STATUSES = {502, 503, 504}
+
+
+class PoolClient:
+    """
+    The HTTP client for a single pool. The requests to the pool share
+    sessions, so their connections (and TLS sessions) are kept open and reused
+    instead of being set up for every request. GET requests go through the
+    proxies configured in the environment, the requests sending data to the
+    pool don't, so they use separate sessions.
+    """
+
+    def __init__(self, pool_url: str, max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS) -> None:
+        self.pool_url = pool_url
+        self.max_concurrent_requests = max_concurrent_requests
+        self.ssl_context: ssl.SSLContext = ssl_context_for_root(get_mozilla_ca_crt(), log=log)
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        # keyed by whether the session uses the proxies from the environment
+        self.sessions: dict[bool, aiohttp.ClientSession] = {}
+
+    def get_session(self, trust_env: bool) -> aiohttp.ClientSession:
+        session = self.sessions.get(trust_env)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrent_requests),
+                trust_env=trust_env,
+            )
+            self.sessions[trust_env] = session
+        return session
+
+    async def close(self) -> None:
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions = {}
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> aiohttp.ClientResponse:
+        """
+        Sends a request to the pool. The response is returned with its body
+        already read, and its connection back in the pool.
+        """
+        async with self.semaphore:
+            session = self.get_session(trust_env=method == "GET")
+            send = {"GET": session.get, "POST": session.post, "PUT": session.put}[method]
+            async with send(f"{self.pool_url}{path}", ssl=self.ssl_context, **kwargs) as resp:
+                await resp.read()
+        return resp
+
+    async def post_partial(self, **kwargs: Any) -> aiohttp.ClientResponse:
+        """
+        Submits a partial, retrying with a backoff when the pool can't be
+        reached or is temporarily unavailable.
+        """
+        attempt = 1
+        while True:
+            try:
+                resp = await self.request("POST", "/partial", **kwargs)
+                if attempt >= PARTIAL_SUBMIT_ATTEMPTS or resp.status not in RETRY_STATUSES:
+                    return resp
+                log.info(f"{self.pool_url} is unavailable ({resp.status}), retrying partial")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= PARTIAL_SUBMIT_ATTEMPTS:
+                    raise
+                log.info(f"Error sending partial to {self.pool_url}, retrying: {e}")
+            await asyncio.sleep(PARTIAL_RETRY_DELAY * 2 ** (attempt - 1))
+            attempt += 1
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+
+# The farmer reports some pool statistics over the last 24 hours. Rather than
+# keeping (and aging out) an entry per event, which for a large farmer at a low
+# pool difficulty is tens of thousands of entries a day per pool, the values
+# are summed in fixed time buckets.
+POOL_STATS_WINDOW = 24 * 60 * 60
+POOL_STATS_BUCKET_SECONDS = 5 * 60
+# the pool errors can't be summed, only the most recent ones are kept
+MAX_RECENT_EVENTS = 1000
+
+
+class RollingSum:
+    """
+    The sum of the values recorded over the last `window` seconds, in a ring of
+    `window / bucket_seconds` buckets. It's reported as a list of
+    (bucket start time, sum) pairs, in the same shape as the list of
+    (timestamp, value) pairs it replaces. Each bucket also counts the values
+    recorded in it, since a bucket is no longer a single event.
+    """
+
+    def __init__(self, window: int = POOL_STATS_WINDOW, bucket_seconds: int = POOL_STATS_BUCKET_SECONDS) -> None:
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        num_buckets = window // bucket_seconds + 1
+        # the start time of each bucket, -1 if it's unused
+        self.starts: list[int] = [-1] * num_buckets
+        self.sums: list[int] = [0] * num_buckets
+        self.counts: list[int] = [0] * num_buckets
+
+    def add(self, timestamp: float, value: int | None = 1) -> None:
+        start = int(timestamp) // self.bucket_seconds * self.bucket_seconds
+        index = (start // self.bucket_seconds) % len(self.starts)
+        if self.starts[index] != start:
+            if self.starts[index] > start:
+                # older than anything this bucket holds, it's outside of the window
+                return
+            self.starts[index] = start
+            self.sums[index] = 0
+            self.counts[index] = 0
+        self.counts[index] += 1
+        if value is not None:
+            self.sums[index] += value
+
+    def entries(self, now: float | None = None) -> list[tuple[int, int]]:
+        if now is None:
+            now = time.time()
+        cutoff = now - self.window
+        return sorted(
+            (start, total)
+            for start, total in zip(self.starts, self.sums)
+            if start >= 0 and start + self.bucket_seconds > cutoff
+        )
+
+    def count_entries(self, now: float | None = None) -> list[tuple[int, int]]:
+        if now is None:
+            now = time.time()
+        cutoff = now - self.window
+        return sorted(
+            (start, count)
+            for start, count in zip(self.starts, self.counts)
+            if start >= 0 and start + self.bucket_seconds > cutoff
+        )
+
+    def total(self, now: float | None = None) -> int:
+        return sum(total for _, total in self.entries(now))
+
+    def count(self, now: float | None = None) -> int:
+        return sum(count for _, count in self.count_entries(now))
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return iter(self.entries())
+
+    def to_json_dict(self) -> list[tuple[int, int]]:
+        return self.entries()
+
+
+class RecentEvents:
+    """
+    The (timestamp, value) pairs recorded over the last `window` seconds, up to
+    the `max_events` most recent ones.
+    """
+
+    def __init__(self, window: int = POOL_STATS_WINDOW, max_events: int = MAX_RECENT_EVENTS) -> None:
+        self.window = window
+        self.events: deque[tuple[int, Any]] = deque(maxlen=max_events)
+
+    def add(self, timestamp: float, value: Any) -> None:
+        self.events.append((int(timestamp), value))
+        self.age_out(timestamp)
+
+    def age_out(self, now: float) -> None:
+        cutoff = now - self.window
+        while len(self.events) > 0 and self.events[0][0] < cutoff:
+            self.events.popleft()
+
+    def entries(self, now: float | None = None) -> list[tuple[int, Any]]:
+        self.age_out(time.time() if now is None else now)
+        return list(self.events)
+
+    def __iter__(self) -> Iterator[tuple[int, Any]]:
+        return iter(self.entries())
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    def to_json_dict(self) -> list[tuple[int, Any]]:
+        return self.entries()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+from concurrent.futures import Executor
+from typing import Any
+
+import typing_extensions
+from chia_rs import CoinSpend, ConsensusConstants, FullBlock, get_spends_for_trusted_block_with_conditions
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint8, uint32
+
+from chia.consensus.blockchain import Blockchain
+from chia.consensus.get_block_generator import get_block_generator
+from chia.full_node.hard_fork_utils import get_flags
+from chia.util.db_wrapper import DBWrapper2
+from chia.util.lru_cache import LRUCache
+from chia.util.streamable import Streamable, streamable
+
+log = logging.getLogger(__name__)
+
+
+@streamable
+@dataclasses.dataclass(frozen=True)
+class SpendWithConditions(Streamable):
+    coin_spend: CoinSpend
+    conditions: list[tuple[uint8, list[bytes]]]
+
+
+@streamable
+@dataclasses.dataclass(frozen=True)
+class BlockSpends(Streamable):
+    """
+    The decoded spends of a transaction block, as returned by
+    get_spends_for_trusted_block_with_conditions(). Both the get_block_spends
+    and get_block_spends_with_conditions RPCs are served from this.
+    """
+
+    height: uint32
+    spends: list[SpendWithConditions]
+
+    def block_spends(self) -> list[CoinSpend]:
+        return [spend.coin_spend for spend in self.spends]
+
+    def block_spends_with_conditions(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "coin_spend": spend.coin_spend,
+                "conditions": [(int(opcode), args) for opcode, args in spend.conditions],
+            }
+            for spend in self.spends
+        ]
+
+
+async def compute_block_spends(
+    constants: ConsensusConstants,
+    blockchain: Blockchain,
+    block: FullBlock,
+    executor: Executor,
+) -> BlockSpends | None:
+    """
+    Runs the block generator (in the executor) and returns its decoded spends.
+    Returns None if the block is not a transaction block.
+    """
+    block_generator = await get_block_generator(blockchain.lookup_block_generators, block)
+    if block_generator is None:
+        return None
+
+    flags = await get_flags(constants=constants, blocks=blockchain, block=block)
+    spends = await asyncio.get_running_loop().run_in_executor(
+        executor,
+        get_spends_for_trusted_block_with_conditions,
+        constants,
+        block_generator.program,
+        block_generator.generator_refs,
+        flags,
+    )
+    return BlockSpends(
+        block.height,
+        [
+            SpendWithConditions(
+                spend["coin_spend"],
+                [(uint8(opcode), args) for opcode, args in spend["conditions"]],
+            )
+            for spend in spends
+        ],
+    )
+
+
+@typing_extensions.final
+@dataclasses.dataclass
+class BlockSpendsCache:
+    """
+    Caches the decoded spends of blocks, by header hash. The spends of a block
+    never change, so the generator only needs to be run once per block. Entries
+    are kept in an in-memory LRU and, optionally, in the block_spends table of
+    the blockchain database. Entries above the fork point are dropped on reorg.
+    """
+
+    cache: LRUCache[bytes32, BlockSpends]
+    db_wrapper: DBWrapper2 | None = None
+
+    @classmethod
+    async def create(cls, db_wrapper: DBWrapper2, *, capacity: int, persist: bool = False) -> BlockSpendsCache:
+        self = cls(LRUCache(capacity))
+        if not persist:
+            return self
+
+        if db_wrapper.db_version != 2:
+            raise RuntimeError(f"BlockSpendsCache does not support database schema v{db_wrapper.db_version}")
+
+        self.db_wrapper = db_wrapper
+        async with self.db_wrapper.writer_maybe_transaction() as conn:
+            log.info("DB: Creating block spends cache tables and indexes.")
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS block_spends(header_hash blob PRIMARY KEY, height bigint, spends blob)"
+            )
+            log.info("DB: Creating index block_spends_height")
+            await conn.execute("CREATE INDEX IF NOT EXISTS block_spends_height on block_spends(height)")
+        return self
+
+    async def get(self, header_hash: bytes32) -> BlockSpends | None:
+        cached = self.cache.get(header_hash)
+        if cached is not None or self.db_wrapper is None:
+            return cached
+
+        async with self.db_wrapper.reader_no_transaction() as conn:
+            async with conn.execute("SELECT spends FROM block_spends WHERE header_hash=?", (header_hash,)) as cursor:
+                row = await cursor.fetchone()
+        if row is None:
+            return None
+
+        block_spends = BlockSpends.from_bytes(row[0])
+        self.cache.put(header_hash, block_spends)
+        return block_spends
+
+    async def add(self, header_hash: bytes32, block_spends: BlockSpends) -> None:
+        self.cache.put(header_hash, block_spends)
+        if self.db_wrapper is None:
+            return
+
+        async with self.db_wrapper.writer_maybe_transaction() as conn:
+            await conn.execute(
+                "INSERT OR REPLACE INTO block_spends VALUES(?, ?, ?)",
+                (header_hash, block_spends.height, bytes(block_spends)),
+            )
+
+    async def rollback(self, height: int) -> None:
+        """
+        Drops all entries for blocks above the specified height, i.e. the
+        blocks that were reorged out of the main chain.
+        """
+        for header_hash, block_spends in list(self.cache.cache.items()):
+            if block_spends.height > height:
+                self.cache.remove(header_hash)
+
+        if self.db_wrapper is None:
+            return
+
+        async with self.db_wrapper.writer_maybe_transaction() as conn:
+            await conn.execute("DELETE FROM block_spends WHERE height>?", (height,))
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import dataclasses
 import logging
+import random
 import sqlite3
+from collections.abc import Collection
 from contextlib import AbstractAsyncContextManager
 
 import aiosqlite
@@ -12,14 +14,29 @@ from chia_rs import BlockRecord, FullBlock, SubEpochChallengeSegment, SubEpochSe
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint32
 
+from chia.full_node.db_counters import (
+    COMPACTIFIED_BLOCKS,
+    UNCOMPACTIFIED_BLOCKS,
+    add_to_counter,
+    create_counters,
+    get_counter,
+)
 from chia.full_node.full_block_utils import GeneratorBlockInfo, block_info_from_block, generator_from_block
+from chia.types.blockchain_format.vdf import CompressibleVDFField, VDFProof
 from chia.util.batches import to_batches
-from chia.util.db_wrapper import DBWrapper2, execute_fetchone
+from chia.util.db_wrapper import SQLITE_MAX_VARIABLE_NUMBER, DBWrapper2, execute_fetchone
 from chia.util.errors import Err
 from chia.util.lru_cache import LRUCache
 
 log = logging.getLogger(__name__)
 
+# the number of blocks parsed at a time when indexing the uncompacted proofs of
+# an existing database
+INDEX_UNCOMPACTED_PROOFS_BATCH_SIZE = 1000
+# get_random_uncompacted_proofs() looks at up to this many proofs per block
+# it's asked for, before returning fewer blocks
+MAX_UNCOMPACTED_PROOFS_SAMPLED = 100
+
 
 def decompress(block_bytes: bytes) -> FullBlock:
     return FullBlock.from_bytes(zstd.decompress(block_bytes))
@@ -35,6 +52,29 @@ def decompress_blob(block_bytes: bytes) -> bytes:
     return ret
 
 
+def is_compact(proof: VDFProof) -> bool:
+    return proof.witness_type == 0 and proof.normalized_to_identity
+
+
+def uncompacted_fields(block: FullBlock) -> set[CompressibleVDFField]:
+    """
+    The VDF fields of the block with at least one proof that isn't compact
+    yet. It's empty if, and only if, the block is fully compactified.
+    """
+    fields: set[CompressibleVDFField] = set()
+    for sub_slot in block.finished_sub_slots:
+        if not is_compact(sub_slot.proofs.challenge_chain_slot_proof):
+            fields.add(CompressibleVDFField.CC_EOS_VDF)
+        icc_proof = sub_slot.proofs.infused_challenge_chain_slot_proof
+        if icc_proof is not None and not is_compact(icc_proof):
+            fields.add(CompressibleVDFField.ICC_EOS_VDF)
+    if block.challenge_chain_sp_proof is not None and not is_compact(block.challenge_chain_sp_proof):
+        fields.add(CompressibleVDFField.CC_SP_VDF)
+    if not is_compact(block.challenge_chain_ip_proof):
+        fields.add(CompressibleVDFField.CC_IP_VDF)
+    return fields
+
+
 @typing_extensions.final
 @dataclasses.dataclass
 class BlockStore:
@@ -98,37 +138,200 @@ class BlockStore:
             await conn.execute(
                 "CREATE INDEX IF NOT EXISTS main_chain ON full_blocks(height, in_main_chain) WHERE in_main_chain=1"
             )
+            await create_counters(conn, [COMPACTIFIED_BLOCKS, UNCOMPACTIFIED_BLOCKS])
+
+            # The VDF proofs of the main chain that aren't compact yet, one row
+            # per block and field, for the blueboxes to work on. Like the
+            # counters, it's maintained along with the full_blocks table, so it
+            # doesn't have to be searched for uncompacted blocks. The ids are
+            # kept dense (1 to the number of rows), so the proofs can be sampled
+            # uniformly by picking random ids.
+            async with conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='uncompacted_proofs'"
+            ) as cursor:
+                has_uncompacted_proofs = await cursor.fetchone() is not None
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS uncompacted_proofs("
+                "id integer PRIMARY KEY, header_hash blob, field_vdf tinyint, height bigint)"
+            )
+            await conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uncompacted_proofs_hash"
+                " ON uncompacted_proofs(header_hash, field_vdf)"
+            )
+            await conn.execute("CREATE INDEX IF NOT EXISTS uncompacted_proofs_height ON uncompacted_proofs(height)")
+            if not has_uncompacted_proofs:
+                await self._index_uncompacted_proofs(conn)
 
         return self
 
+    async def _index_uncompacted_proofs(self, conn: aiosqlite.Connection) -> None:
+        # this is the one time we need to look at all the uncompacted blocks
+        # of the main chain, when upgrading an existing database
+        total = await get_counter(conn, UNCOMPACTIFIED_BLOCKS)
+        log.info(f"DB: Indexing the uncompacted proofs of {total} blocks")
+        height = -1
+        done = 0
+        while True:
+            async with conn.execute(
+                "SELECT height, block FROM full_blocks WHERE in_main_chain=1 AND is_fully_compactified=0 AND height>? "
+                "ORDER BY height LIMIT ?",
+                (height, INDEX_UNCOMPACTED_PROOFS_BATCH_SIZE),
+            ) as cursor:
+                rows = list(await cursor.fetchall())
+            if len(rows) == 0:
+                break
+            await self._add_uncompacted_proofs(conn, [decompress(row[1]) for row in rows])
+            height = int(rows[-1][0])
+            done += len(rows)
+            log.info(f"DB: Indexed the uncompacted proofs of {done}/{total} blocks, up to height {height}")
+
+    async def _add_uncompacted_proofs(self, conn: aiosqlite.Connection, blocks: list[FullBlock]) -> None:
+        # the ids are assigned in sequence, after the highest one
+        await conn.executemany(
+            "INSERT OR IGNORE INTO uncompacted_proofs(header_hash, field_vdf, height) VALUES(?, ?, ?)",
+            [
+                (block.header_hash, int(field_vdf), block.height)
+                for block in blocks
+                for field_vdf in uncompacted_fields(block)
+            ],
+        )
+
+    async def _remove_uncompacted_proofs(self, conn: aiosqlite.Connection, ids: list[int]) -> None:
+        # the last row is moved into the gap left by each row removed, to keep
+        # the ids dense. Going from the highest id down, the row moved is
+        # never one that's yet to be removed
+        for row_id in sorted(ids, reverse=True):
+            await conn.execute("DELETE FROM uncompacted_proofs WHERE id=?", (row_id,))
+            await conn.execute(
+                "UPDATE uncompacted_proofs SET id=? WHERE id=(SELECT MAX(id) FROM uncompacted_proofs) AND id>?",
+                (row_id, row_id),
+            )
+
+    async def _update_main_chain_counters(
+        self, conn: aiosqlite.Connection, rows: list[tuple[int, int]], sign: int
+    ) -> None:
+        # rows are (is_fully_compactified, count) of blocks entering (sign=1)
+        # or leaving (sign=-1) the main chain
+        for is_fully_compactified, count in rows:
+            name = COMPACTIFIED_BLOCKS if is_fully_compactified else UNCOMPACTIFIED_BLOCKS
+            await add_to_counter(conn, name, sign * count)
+
     async def rollback(self, height: int) -> None:
         async with self.db_wrapper.writer_maybe_transaction() as conn:
-            await conn.execute("UPDATE full_blocks SET in_main_chain=0 WHERE height>? AND in_main_chain=1", (height,))
+            await self._leave_main_chain(
+                conn, height, "UPDATE full_blocks SET in_main_chain=0 WHERE height>? AND in_main_chain=1"
+            )
+
+    async def delete_blocks_above(self, height: int) -> None:
+        """
+        Like rollback(), but the blocks of the main chain above `height` are
+        deleted rather than kept as orphans. They're blocks that can't be
+        trusted, and must be validated again if they're received again.
+        """
+        async with self.db_wrapper.writer_maybe_transaction() as conn:
+            await self._leave_main_chain(conn, height, "DELETE FROM full_blocks WHERE height>? AND in_main_chain=1")
+        self.block_cache.cache.clear()
+
+    async def _leave_main_chain(self, conn: aiosqlite.Connection, height: int, query: str) -> None:
+        # `query` takes the blocks above `height` out of the main chain
+        async with conn.execute(
+            "SELECT is_fully_compactified, COUNT(*) FROM full_blocks "
+            "WHERE height>? AND in_main_chain=1 GROUP BY is_fully_compactified",
+            (height,),
+        ) as cursor:
+            rows = [(int(row[0]), int(row[1])) for row in await cursor.fetchall()]
+        await conn.execute(query, (height,))
+        await self._update_main_chain_counters(conn, rows, -1)
+        async with conn.execute("SELECT id FROM uncompacted_proofs WHERE height>?", (height,)) as cursor:
+            ids = [int(row[0]) for row in await cursor.fetchall()]
+        await self._remove_uncompacted_proofs(conn, ids)
 
     async def set_in_chain(self, header_hashes: list[tuple[bytes32]]) -> None:
         async with self.db_wrapper.writer_maybe_transaction() as conn:
+            # only blocks that aren't already in the main chain affect the
+            # counters and the uncompacted proofs
+            compactified: dict[int, int] = {}
+            uncompacted: list[bytes32] = []
+            for batch in to_batches(header_hashes, SQLITE_MAX_VARIABLE_NUMBER):
+                async with conn.execute(
+                    "SELECT header_hash, is_fully_compactified FROM full_blocks "
+                    f"WHERE in_main_chain=0 AND header_hash in ({'?,' * (len(batch.entries) - 1)}?)",
+                    [header_hash for (header_hash,) in batch.entries],
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        compactified[int(row[1])] = compactified.get(int(row[1]), 0) + 1
+                        if row[1] == 0:
+                            uncompacted.append(bytes32(row[0]))
             async with await conn.executemany(
                 "UPDATE full_blocks SET in_main_chain=1 WHERE header_hash=?", header_hashes
             ) as cursor:
                 if cursor.rowcount != len(header_hashes):
                     raise RuntimeError(f"The blockchain database is corrupt. All of {header_hashes} should exist")
+            await self._update_main_chain_counters(conn, list(compactified.items()), 1)
+
+            # the blocks were usually just added, and are still in the cache
+            blocks: list[FullBlock] = []
+            not_cached: list[bytes32] = []
+            for header_hash in uncompacted:
+                block = self.block_cache.get(header_hash)
+                if block is None:
+                    not_cached.append(header_hash)
+                else:
+                    blocks.append(block)
+            for hash_batch in to_batches(not_cached, SQLITE_MAX_VARIABLE_NUMBER):
+                async with conn.execute(
+                    f"SELECT block FROM full_blocks WHERE header_hash in ({'?,' * (len(hash_batch.entries) - 1)}?)",
+                    hash_batch.entries,
+                ) as cursor:
+                    blocks.extend(decompress(row[0]) for row in await cursor.fetchall())
+            await self._add_uncompacted_proofs(conn, blocks)
 
     async def replace_proof(self, header_hash: bytes32, block: FullBlock) -> None:
         assert header_hash == block.header_hash
+        await self.replace_proofs([block])
 
-        block_bytes: bytes = compress(block)
-
-        self.block_cache.put(header_hash, block)
+    async def replace_proofs(self, blocks: list[FullBlock]) -> None:
+        """
+        Stores these new versions of existing blocks, with some proofs replaced
+        by compact ones, all in a single transaction. Each block must only
+        appear once.
+        """
+        for block in blocks:
+            self.block_cache.put(block.header_hash, block)
 
         async with self.db_wrapper.writer_maybe_transaction() as conn:
-            await conn.execute(
+            # the counters only track blocks in the main chain
+            previous: dict[bytes32, int] = {}
+            for batch in to_batches(blocks, SQLITE_MAX_VARIABLE_NUMBER):
+                async with conn.execute(
+                    "SELECT header_hash, is_fully_compactified FROM full_blocks "
+                    "WHERE in_main_chain=1 AND header_hash in "
+                    f"({'?,' * (len(batch.entries) - 1)}?)",
+                    [block.header_hash for block in batch.entries],
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        previous[bytes32(row[0])] = int(row[1])
+            await conn.executemany(
                 "UPDATE full_blocks SET block=?,is_fully_compactified=? WHERE header_hash=?",
-                (
-                    block_bytes,
-                    int(block.is_fully_compactified()),
-                    header_hash,
-                ),
+                [(compress(block), int(block.is_fully_compactified()), block.header_hash) for block in blocks],
             )
+            ids: list[int] = []
+            for batch in to_batches(blocks, SQLITE_MAX_VARIABLE_NUMBER):
+                async with conn.execute(
+                    f"SELECT id FROM uncompacted_proofs WHERE header_hash in ({'?,' * (len(batch.entries) - 1)}?)",
+                    [block.header_hash for block in batch.entries],
+                ) as cursor:
+                    ids.extend(int(row[0]) for row in await cursor.fetchall())
+            await self._remove_uncompacted_proofs(conn, ids)
+            await self._add_uncompacted_proofs(conn, [block for block in blocks if block.header_hash in previous])
+            changes: dict[int, int] = {}
+            for block in blocks:
+                was_fully_compactified = previous.get(block.header_hash)
+                is_fully_compactified = int(block.is_fully_compactified())
+                if was_fully_compactified is not None and was_fully_compactified != is_fully_compactified:
+                    changes[was_fully_compactified] = changes.get(was_fully_compactified, 0) - 1
+                    changes[is_fully_compactified] = changes.get(is_fully_compactified, 0) + 1
+            await self._update_main_chain_counters(conn, list(changes.items()), 1)
 
     async def add_full_block(self, header_hash: bytes32, block: FullBlock, block_record: BlockRecord) -> None:
         self.block_cache.put(header_hash, block)
@@ -231,6 +434,20 @@ class BlockStore:
 
         return None
 
+    async def get_compressed_full_block_bytes(self, header_hash: bytes32) -> bytes | None:
+        """
+        Returns the block exactly as it's stored in the database, i.e. zstd
+        compressed. This bypasses the block cache.
+        """
+        async with self.db_wrapper.reader_no_transaction() as conn:
+            async with conn.execute("SELECT block from full_blocks WHERE header_hash=?", (header_hash,)) as cursor:
+                row = await cursor.fetchone()
+        if row is not None:
+            ret: bytes = row[0]
+            return ret
+
+        return None
+
     async def get_full_blocks_at(self, heights: list[uint32]) -> list[FullBlock]:
         """
         Returns all blocks at the given heights, including orphans.
@@ -553,28 +770,56 @@ class BlockStore:
 
         return heights
 
-    async def count_compactified_blocks(self) -> int:
-        # DB V2 has an index on is_fully_compactified only for blocks in the main chain
+    async def get_random_uncompacted_proofs(
+        self, number: int, fields: Collection[CompressibleVDFField] | None = None
+    ) -> list[tuple[uint32, bytes32, CompressibleVDFField]]:
+        """
+        Returns the (height, header hash, field) of the uncompacted proofs of up
+        to `number` random main chain blocks, only looking at the proofs of
+        `fields` if it's set. Rather than sorting all of the uncompacted proofs
+        randomly, random proofs are looked up by id, and their blocks picked.
+        """
+        field_filter = "" if fields is None else f" AND field_vdf IN ({','.join(str(int(f)) for f in fields)})"
+        limit = self.db_wrapper.host_parameter_limit
+        number = min(number, limit)
         async with self.db_wrapper.reader_no_transaction() as conn:
+            row = await execute_fetchone(conn, "SELECT MAX(id) FROM uncompacted_proofs")
+            count = 0 if row is None or row[0] is None else int(row[0])
+            # sample more proofs than needed, as some of them are of the same
+            # block, or of fields that were filtered out. Give up on finding
+            # `number` blocks after looking at enough proofs
+            header_hashes: dict[bytes32, None] = {}
+            sampled = 0
+            while len(header_hashes) < number and sampled < min(count, MAX_UNCOMPACTED_PROOFS_SAMPLED * number):
+                ids = random.sample(range(1, count + 1), min(count, limit, 2 * number))
+                sampled += len(ids)
+                async with conn.execute(
+                    f"SELECT header_hash FROM uncompacted_proofs WHERE id IN ({'?,' * (len(ids) - 1)}?){field_filter}",
+                    ids,
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        header_hashes[bytes32(row[0])] = None
+                if len(ids) == count:
+                    # they were all looked at
+                    break
+            selected = list(header_hashes)
+            random.shuffle(selected)
+            selected = selected[:number]
+            if len(selected) == 0:
+                return []
             async with conn.execute(
-                "select count(*) from full_blocks where is_fully_compactified=1 and in_main_chain=1"
+                "SELECT height, header_hash, field_vdf FROM uncompacted_proofs "
+                f"WHERE header_hash IN ({'?,' * (len(selected) - 1)}?){field_filter}",
+                selected,
             ) as cursor:
-                row = await cursor.fetchone()
+                return [
+                    (uint32(row[0]), bytes32(row[1]), CompressibleVDFField(row[2])) for row in await cursor.fetchall()
+                ]
 
-        assert row is not None
-
-        [count] = row
-        return int(count)
+    async def count_compactified_blocks(self) -> int:
+        async with self.db_wrapper.reader_no_transaction() as conn:
+            return await get_counter(conn, COMPACTIFIED_BLOCKS)
 
     async def count_uncompactified_blocks(self) -> int:
-        # DB V2 has an index on is_fully_compactified only for blocks in the main chain
         async with self.db_wrapper.reader_no_transaction() as conn:
-            async with conn.execute(
-                "select count(*) from full_blocks where is_fully_compactified=0 and in_main_chain=1"
-            ) as cursor:
-                row = await cursor.fetchone()
-
-        assert row is not None
-
-        [count] = row
-        return int(count)
+            return await get_counter(conn, UNCOMPACTIFIED_BLOCKS)
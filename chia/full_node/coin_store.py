@@ -13,6 +13,7 @@ from chia_rs import CoinRecord, CoinState
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint32, uint64
 
+from chia.full_node.db_counters import UNSPENT_COINS, add_to_counter, create_counters, get_counter
 from chia.types.blockchain_format.coin import Coin
 from chia.types.mempool_item import UnspentLineageInfo
 from chia.util.batches import to_batches
@@ -91,16 +92,13 @@ class CoinStore:
             if has_ff_unspent_idx:
                 self._unspent_lineage_for_ph_idx = "coin_record_ph_ff_unspent_idx"
 
+            await create_counters(conn, [UNSPENT_COINS])
+
         return self
 
     async def num_unspent(self) -> int:
         async with self.db_wrapper.reader_no_transaction() as conn:
-            async with conn.execute("SELECT COUNT(*) FROM coin_record WHERE spent_index <= 0") as cursor:
-                row = await cursor.fetchone()
-        if row is not None:
-            count: int = row[0]
-            return count
-        return 0
+            return await get_counter(conn, UNSPENT_COINS)
 
     async def new_block(
         self,
@@ -159,6 +157,8 @@ class CoinStore:
 
         async with self.db_wrapper.writer_maybe_transaction() as conn:
             await conn.executemany("INSERT INTO coin_record VALUES(?, ?, ?, ?, ?, ?, ?, ?)", db_values_to_insert)
+            # all new coins are unspent
+            await add_to_counter(conn, UNSPENT_COINS, len(db_values_to_insert))
         await self._set_spent(tx_removals, height)
 
         end = time.monotonic()
@@ -572,7 +572,10 @@ class CoinStore:
                 "coin_parent, amount, timestamp, coin_name FROM coin_record WHERE confirmed_index>?",
                 (block_index,),
             )
+            deleted_unspent = 0
             for row in rows:
+                if row[1] <= 0:
+                    deleted_unspent += 1
                 coin = self.row_to_coin(row)
                 spent_index = uint32(0) if row[1] <= 0 else uint32(row[1])
                 record = CoinRecord(coin, uint32(0), spent_index, row[2] != 0, uint64(0))
@@ -599,7 +602,7 @@ class CoinStore:
             # spent and has the same puzzle hash and amount, we set its
             # spent_index to -1 as a potential fast forward singleton unspent
             # otherwise we set it to 0 as a normal unspent.
-            await conn.execute(
+            async with conn.execute(
                 """
                 UPDATE coin_record INDEXED BY coin_spent_index
                 SET spent_index = CASE
@@ -620,7 +623,9 @@ class CoinStore:
                 WHERE spent_index > ?
                 """,
                 (block_index,),
-            )
+            ) as cursor:
+                # the coins spent in the reverted blocks are now unspent again
+                await add_to_counter(conn, UNSPENT_COINS, cursor.rowcount - deleted_unspent)
         return coin_changes
 
     # Update coin_record to be spent in DB
@@ -646,6 +651,7 @@ class CoinStore:
                 raise ValueError(
                     f"Invalid operation to set spent, total updates {rows_updated} expected {len(coin_names)}"
                 )
+            await add_to_counter(conn, UNSPENT_COINS, -rows_updated)
 
     # Lookup the most recent unspent lineage that matches a puzzle hash
     async def get_unspent_lineage_info_for_puzzle_hash(self, puzzle_hash: bytes32) -> UnspentLineageInfo | None:
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import logging
+
+import aiosqlite
+
+log = logging.getLogger(__name__)
+
+# Counting rows in the large blockchain tables requires a full table (or
+# index) scan. The metrics we report (and poll) are instead maintained
+# incrementally by the stores, in the counters table. Each counter is
+# updated in the same transaction as the rows it's counting, so they stay
+# consistent across rollbacks and restarts.
+
+# the number of rows in the hints table
+HINTS = "hints"
+# the number of unspent coins in the coin_record table
+UNSPENT_COINS = "unspent_coins"
+# the number of fully compactified and not fully compactified blocks in the
+# main chain
+COMPACTIFIED_BLOCKS = "compactified_blocks"
+UNCOMPACTIFIED_BLOCKS = "uncompactified_blocks"
+
+# the queries computing the real values of the counters, used to initialize
+# them and to check them
+COUNTER_QUERIES: dict[str, str] = {
+    HINTS: "SELECT COUNT(*) FROM hints",
+    UNSPENT_COINS: "SELECT COUNT(*) FROM coin_record WHERE spent_index <= 0",
+    COMPACTIFIED_BLOCKS: "SELECT COUNT(*) FROM full_blocks WHERE is_fully_compactified=1 AND in_main_chain=1",
+    UNCOMPACTIFIED_BLOCKS: "SELECT COUNT(*) FROM full_blocks WHERE is_fully_compactified=0 AND in_main_chain=1",
+}
+
+
+async def count_rows(conn: aiosqlite.Connection, name: str) -> int:
+    async with conn.execute(COUNTER_QUERIES[name]) as cursor:
+        row = await cursor.fetchone()
+    assert row is not None
+    return int(row[0])
+
+
+async def create_counters(conn: aiosqlite.Connection, names: list[str]) -> None:
+    """
+    Creates the counters table, if needed, and initializes any of the named
+    counters that don't exist yet with the current count. That's the one time
+    we need to count the rows, when upgrading an existing database.
+    """
+    await conn.execute("CREATE TABLE IF NOT EXISTS counters(name text PRIMARY KEY, value bigint)")
+    for name in names:
+        async with conn.execute("SELECT 1 FROM counters WHERE name=?", (name,)) as cursor:
+            if await cursor.fetchone() is not None:
+                continue
+        log.info(f"DB: Initializing counter {name}")
+        await conn.execute("INSERT INTO counters VALUES(?, ?)", (name, await count_rows(conn, name)))
+
+
+async def get_counter(conn: aiosqlite.Connection, name: str) -> int:
+    async with conn.execute("SELECT value FROM counters WHERE name=?", (name,)) as cursor:
+        row = await cursor.fetchone()
+    if row is None:
+        raise KeyError(f"counter {name} does not exist")
+    return int(row[0])
+
+
+async def add_to_counter(conn: aiosqlite.Connection, name: str, delta: int) -> None:
+    if delta == 0:
+        return
+    await conn.execute("UPDATE counters SET value=value+? WHERE name=?", (delta, name))
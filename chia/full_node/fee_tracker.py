@@ -146,18 +146,19 @@ class FeeStat:  # TxConfirmStats
         self.m_fee_rate_avg[bucket_index] += fee_rate
 
     def update_moving_averages(self) -> None:
-        for j in range(len(self.buckets)):
-            for i in range(len(self.confirmed_average)):
-                self.confirmed_average[i][j] *= self.decay
-                self.failed_average[i][j] *= self.decay
-
-            self.tx_ct_avg[j] *= self.decay
-            self.m_fee_rate_avg[j] *= self.decay
+        # this runs for every block, so rows are decayed whole, rather than
+        # element by element
+        decay = self.decay
+        self.confirmed_average = [[value * decay for value in row] for row in self.confirmed_average]
+        self.failed_average = [[value * decay for value in row] for row in self.failed_average]
+        self.tx_ct_avg = [value * decay for value in self.tx_ct_avg]
+        self.m_fee_rate_avg = [value * decay for value in self.m_fee_rate_avg]
 
     def clear_current(self, block_height: uint32) -> None:
-        for i in range(len(self.buckets)):
-            self.old_unconfirmed_txs[i] += self.unconfirmed_txs[block_height % len(self.unconfirmed_txs)][i]
-            self.unconfirmed_txs[block_height % len(self.unconfirmed_txs)][i] = 0
+        block_index = block_height % len(self.unconfirmed_txs)
+        current = self.unconfirmed_txs[block_index]
+        self.old_unconfirmed_txs = [old + count for old, count in zip(self.old_unconfirmed_txs, current)]
+        self.unconfirmed_txs[block_index] = [0] * len(self.buckets)
 
     def new_mempool_tx(self, block_height: uint32, fee_rate: float) -> int:
         bucket_index: int = get_bucket_index(self.buckets, fee_rate)
@@ -191,43 +192,23 @@ class FeeStat:  # TxConfirmStats
                 self.failed_average[i][bucket_index] += 1
 
     def create_backup(self) -> FeeStatBackup:
-        str_tx_ct_abg: list[str] = []
-        str_confirmed_average: list[list[str]] = []
-        str_failed_average: list[list[str]] = []
-        str_m_fee_rate_avg: list[str] = []
-        for i in range(self.max_periods):
-            str_i_list_conf = []
-            for j in range(len(self.confirmed_average[i])):
-                str_i_list_conf.append(float.hex(float(self.confirmed_average[i][j])))
-
-            str_confirmed_average.append(str_i_list_conf)
-
-            str_i_list_fail = []
-            for j in range(len(self.failed_average[i])):
-                str_i_list_fail.append(float.hex(float(self.failed_average[i][j])))
-
-            str_failed_average.append(str_i_list_fail)
-
-        for i in range(len(self.tx_ct_avg)):
-            str_tx_ct_abg.append(float.hex(float(self.tx_ct_avg[i])))
-
-        for i in range(len(self.m_fee_rate_avg)):
-            str_m_fee_rate_avg.append(float.hex(float(self.m_fee_rate_avg[i])))
+        str_confirmed_average = [[float.hex(float(value)) for value in row] for row in self.confirmed_average]
+        str_failed_average = [[float.hex(float(value)) for value in row] for row in self.failed_average]
+        str_tx_ct_abg = [float.hex(float(value)) for value in self.tx_ct_avg]
+        str_m_fee_rate_avg = [float.hex(float(value)) for value in self.m_fee_rate_avg]
 
         return FeeStatBackup(self.type, str_tx_ct_abg, str_confirmed_average, str_failed_average, str_m_fee_rate_avg)
 
     def import_backup(self, backup: FeeStatBackup) -> None:
-        for i in range(self.max_periods):
-            for j in range(len(self.confirmed_average[i])):
-                self.confirmed_average[i][j] = float.fromhex(backup.confirmed_average[i][j])
-            for j in range(len(self.failed_average[i])):
-                self.failed_average[i][j] = float.fromhex(backup.failed_average[i][j])
-
-        for i in range(len(self.tx_ct_avg)):
-            self.tx_ct_avg[i] = float.fromhex(backup.tx_ct_avg[i])
-
-        for i in range(len(self.m_fee_rate_avg)):
-            self.m_fee_rate_avg[i] = float.fromhex(backup.m_fee_rate_avg[i])
+        num_buckets = len(self.buckets)
+        self.confirmed_average = [
+            [float.fromhex(backup.confirmed_average[i][j]) for j in range(num_buckets)] for i in range(self.max_periods)
+        ]
+        self.failed_average = [
+            [float.fromhex(backup.failed_average[i][j]) for j in range(num_buckets)] for i in range(self.max_periods)
+        ]
+        self.tx_ct_avg = [float.fromhex(backup.tx_ct_avg[j]) for j in range(num_buckets)]
+        self.m_fee_rate_avg = [float.fromhex(backup.m_fee_rate_avg[j]) for j in range(num_buckets)]
 
     # See TxConfirmStats::EstimateMedianVal in https://github.com/bitcoin/bitcoin/blob/master/src/policy/fees.cpp
     def estimate_median_val(
@@ -252,7 +233,6 @@ class FeeStat:  # TxConfirmStats
         best_far_bucket = max_bucket_index
 
         found_answer = False
-        bins = len(self.unconfirmed_txs)
         new_bucket_range = True
         passing = True
         pass_bucket: BucketResult = BucketResult(
@@ -271,30 +251,41 @@ class FeeStat:  # TxConfirmStats
             in_mempool=0.0,
             left_mempool=0.0,
         )
+        if period_target - 1 < 0 or period_target - 1 >= len(self.confirmed_average):
+            return EstimateResult(
+                requested_time=uint64(conf_target * SECONDS_PER_BLOCK),
+                pass_bucket=pass_bucket,
+                fail_bucket=fail_bucket,
+                median=-1.0,
+            )
+
+        confirmed = self.confirmed_average[period_target - 1]
+        failed = self.failed_average[period_target - 1]
+        if len(confirmed) != len(self.buckets):
+            raise RuntimeError(f"confirmed_average has {len(confirmed)} buckets, expected {len(self.buckets)}")
+
+        # The number of transactions in each bucket that have been in the
+        # mempool for at least conf_target blocks. These are summed up for
+        # all buckets at once, rather than one bucket at a time
+        bins = len(self.unconfirmed_txs)
+        in_mempool = self.old_unconfirmed_txs
+        waiting = [
+            self.unconfirmed_txs[(block_height - conf_ct) % bins] for conf_ct in range(conf_target, self.max_confirms)
+        ]
+        if len(waiting) > 0:
+            in_mempool = [old + sum(counts) for old, counts in zip(in_mempool, zip(*waiting))]
+
         for bucket in range(max_bucket_index, -1, -1):
             if new_bucket_range:
                 cur_near_bucket = bucket
                 new_bucket_range = False
 
             cur_far_bucket = bucket
-            if period_target - 1 < 0 or period_target - 1 >= len(self.confirmed_average):
-                return EstimateResult(
-                    requested_time=uint64(conf_target * SECONDS_PER_BLOCK),
-                    pass_bucket=pass_bucket,
-                    fail_bucket=fail_bucket,
-                    median=-1.0,
-                )
-
-            ca_len = len(self.confirmed_average[period_target - 1])
-            if bucket < 0 or bucket >= ca_len:
-                raise RuntimeError(f"bucket index ({bucket}) out of range (0, {ca_len})")
-
-            n_conf += self.confirmed_average[period_target - 1][bucket]
+
+            n_conf += confirmed[bucket]
             total_num += self.tx_ct_avg[bucket]
-            fail_num += self.failed_average[period_target - 1][bucket]
-            for conf_ct in range(conf_target, self.max_confirms):
-                extra_num += self.unconfirmed_txs[(block_height - conf_ct) % bins][bucket]
-            extra_num += self.old_unconfirmed_txs[bucket]
+            fail_num += failed[bucket]
+            extra_num += in_mempool[bucket]
 
             # If we have enough transaction data points in this range of buckets,
             # we can test for success
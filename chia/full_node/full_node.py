@@ -11,6 +11,7 @@ import sqlite3
 import time
 import traceback
 from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing.context import BaseContext
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar, TextIO, cast, final
@@ -37,6 +38,7 @@ from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint8, uint32, uint64, uint128
 from packaging.version import Version
 
+from chia.consensus.assume_valid import AssumeValid
 from chia.consensus.augmented_chain import AugmentedBlockchain
 from chia.consensus.block_body_validation import ForkInfo
 from chia.consensus.block_creation import unfinished_block_to_full_block
@@ -51,6 +53,7 @@ from chia.consensus.make_sub_epoch_summary import next_sub_epoch_summary
 from chia.consensus.multiprocess_validation import PreValidationResult, pre_validate_block
 from chia.consensus.pot_iterations import calculate_sp_iters
 from chia.consensus.signage_point import SignagePoint
+from chia.full_node.block_spends_cache import BlockSpendsCache, compute_block_spends
 from chia.full_node.block_store import BlockStore
 from chia.full_node.check_fork_next_block import check_fork_next_block
 from chia.full_node.coin_store import CoinStore
@@ -144,6 +147,12 @@ class FullNode:
     sync_store: SyncStore = dataclasses.field(default_factory=SyncStore)
     uncompact_task: asyncio.Task[None] | None = None
     compact_vdf_requests: set[bytes32] = dataclasses.field(default_factory=set)
+    # compact proofs of time accepted, waiting to be written in the next batch.
+    # Each one's future is set to whether it was replaced, or to the exception
+    # writing the batch failed with
+    _pending_compact_proofs: list[tuple[timelord_protocol.RespondCompactProofOfTime, asyncio.Future[bool]]] = (
+        dataclasses.field(default_factory=list)
+    )
     # TODO: Logging isn't setup yet so the log entries related to parsing the
     #       config would end up on stdout if handled here.
     multiprocessing_context: BaseContext | None = None
@@ -159,6 +168,8 @@ class FullNode:
     _add_transaction_semaphore: asyncio.Semaphore | None = None
     _db_wrapper: DBWrapper2 | None = None
     _hint_store: HintStore | None = None
+    _block_spends_cache: BlockSpendsCache | None = None
+    _block_spends_executor: ThreadPoolExecutor | None = None
     _block_store: BlockStore | None = None
     _coin_store: CoinStoreProtocol | None = None
     _mempool_manager: MempoolManager | None = None
@@ -170,6 +181,9 @@ class FullNode:
     bad_peak_cache: dict[bytes32, uint32] = dataclasses.field(default_factory=dict)
     wallet_sync_task: asyncio.Task[None] | None = None
     _bls_cache: BLSCache = dataclasses.field(default_factory=lambda: BLSCache(50000))
+    # the opt-in checkpoint, below which the block signatures aren't validated
+    # during long sync
+    assume_valid: AssumeValid | None = None
 
     @property
     def server(self) -> ChiaServer:
@@ -202,6 +216,7 @@ class FullNode:
             log=logging.getLogger(name),
             db_path=db_path,
             wallet_sync_queue=asyncio.Queue(),
+            assume_valid=AssumeValid.from_config(config.get("assume_valid")),
         )
 
     @contextlib.asynccontextmanager
@@ -260,6 +275,13 @@ class FullNode:
 
             self._block_store = await BlockStore.create(self.db_wrapper)
             self._hint_store = await HintStore.create(self.db_wrapper)
+            self._block_spends_cache = await BlockSpendsCache.create(
+                self.db_wrapper,
+                capacity=self.config.get("block_spends_cache_size", 100),
+                persist=self.config.get("block_spends_cache_db", False),
+            )
+            if self.config.get("block_spends_cache_prepopulate", False):
+                self._block_spends_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="node-spends-")
             self._coin_store = await CoinStore.create(self.db_wrapper)
             self.log.info("Initializing blockchain from disk")
             start_time = time.monotonic()
@@ -372,6 +394,8 @@ class FullNode:
                         self.uncompact_task.cancel()
                     if self._transaction_queue_task is not None:
                         self._transaction_queue_task.cancel()
+                    if self._block_spends_executor is not None:
+                        self._block_spends_executor.shutdown(wait=False, cancel_futures=True)
                     cancel_task_safe(task=self.wallet_sync_task, log=self.log)
                     for one_tx_task in self._tx_task_list:
                         if not one_tx_task.done():
@@ -400,6 +424,7 @@ class FullNode:
                                 self.log.info(f"Awaiting long sync task {one_sync_task.get_name()}")
                                 await one_sync_task
                     await asyncio.gather(*self._segment_task_list, return_exceptions=True)
+                    height_map.close()
 
     @property
     def block_store(self) -> BlockStore:
@@ -446,6 +471,11 @@ class FullNode:
         assert self._hint_store is not None
         return self._hint_store
 
+    @property
+    def block_spends_cache(self) -> BlockSpendsCache:
+        assert self._block_spends_cache is not None
+        return self._block_spends_cache
+
     @property
     def new_peak_sem(self) -> LimitedSemaphore:
         assert self._new_peak_sem is not None
@@ -1188,6 +1218,11 @@ class FullNode:
         # chain.
         blockchain = AugmentedBlockchain(self.blockchain)
         peers_with_peak: list[WSChiaConnection] = self.get_peers_with_peak(peak_hash)
+        # the blocks up to and including this height are covered by the assume
+        # valid checkpoint, their signatures aren't validated
+        assume_valid_height = await self.get_assume_valid_height(
+            peers_with_peak, fork_point_height, target_peak_sb_height
+        )
 
         async def fetch_blocks(output_queue: asyncio.Queue[tuple[WSChiaConnection, list[FullBlock]] | None]) -> None:
             # the rate limit for respond_blocks is 100 messages / 60 seconds.
@@ -1336,6 +1371,7 @@ class FullNode:
                                 [block],
                                 vs,
                                 summaries,
+                                validate_signatures=block.height > assume_valid_height,
                             )
                         )
                     start = time.monotonic()
@@ -1349,12 +1385,19 @@ class FullNode:
                 # finished signal with None
                 await output_queue.put(None)
 
+        # the blocks up to assume_valid_height are only trusted once the
+        # checkpoint block itself has been received. If the sync ends before
+        # that, the blocks it added without validating their signatures, from
+        # this height up, are removed again
+        unchecked_height: int | None = None
+        checkpoint_verified = False
+
         async def ingest_blocks(
             input_queue: asyncio.Queue[
                 tuple[WSChiaConnection, ValidationState, list[Awaitable[PreValidationResult]], list[FullBlock]] | None
             ],
         ) -> None:
-            nonlocal fork_info
+            nonlocal fork_info, unchecked_height, checkpoint_verified
             block_rate = 0.0
             block_rate_time = time.monotonic()
             block_rate_height = -1
@@ -1371,6 +1414,28 @@ class FullNode:
                     block_rate_height = start_height
 
                 pre_validation_results = list(await asyncio.gather(*futures))
+                # only a sync that skips signature validation depends on the
+                # checkpoint being in the chain
+                if (
+                    self.assume_valid is not None
+                    and assume_valid_height >= 0
+                    and start_height <= self.assume_valid.height <= end_height
+                ):
+                    checkpoint = blocks[self.assume_valid.height - start_height]
+                    if checkpoint.header_hash != self.assume_valid.header_hash:
+                        # the peer made us believe its chain contains the
+                        # checkpoint. Don't trust the checkpoint anymore, the
+                        # next sync falls back to full validation
+                        self.log.error(
+                            f"block {checkpoint.height} {checkpoint.header_hash.hex()} doesn't match the assume "
+                            f"valid checkpoint {self.assume_valid.header_hash.hex()}, disabling assume valid"
+                        )
+                        self.assume_valid = None
+                        await peer.close(CONSENSUS_ERROR_BAN_SECONDS)
+                        raise ValueError(f"Block at assume valid height {checkpoint.height} doesn't match checkpoint")
+                    checkpoint_verified = True
+                if unchecked_height is None and start_height <= assume_valid_height:
+                    unchecked_height = start_height
                 # The ValidationState object (vs) is an in-out parameter. the add_block_batch()
                 # call will update it
                 state_change_summary, err = await self.add_prevalidated_blocks(
@@ -1380,6 +1445,7 @@ class FullNode:
                     fork_info,
                     peer.peer_info,
                     vs,
+                    assume_valid_height=assume_valid_height,
                 )
                 if err is not None:
                     await peer.close(CONSENSUS_ERROR_BAN_SECONDS)
@@ -1438,6 +1504,21 @@ class FullNode:
                 _, _, futures, _ = result
                 await asyncio.gather(*futures)
 
+            if unchecked_height is not None and not checkpoint_verified:
+                # the sync failed, was cancelled or the peer disconnected
+                # before the checkpoint was reached. The blocks added by this
+                # sync so far are removed, to be validated fully. The blocks
+                # below them were there before the sync (skip_blocks() only
+                # skips those), and the genesis block has no signature to skip
+                await asyncio.gather(ingest_task, return_exceptions=True)
+                rollback_height = uint32(max(unchecked_height - 1, 0))
+                self.log.warning(
+                    f"the sync ended before reaching the assume valid checkpoint, removing the blocks "
+                    f"above height {rollback_height} whose signatures weren't validated"
+                )
+                await self.blockchain.rollback(rollback_height)
+                await self.block_spends_cache.rollback(rollback_height)
+
     def get_peers_with_peak(self, peak_hash: bytes32) -> list[WSChiaConnection]:
         peer_ids: set[bytes32] = self.sync_store.get_peers_that_have_peak([peak_hash])
         if len(peer_ids) == 0:
@@ -1445,6 +1526,38 @@ class FullNode:
             return []
         return [c for c in self.server.all_connections.values() if c.peer_node_id in peer_ids]
 
+    async def get_assume_valid_height(
+        self, peers_with_peak: list[WSChiaConnection], fork_point_height: int, target_peak_height: int
+    ) -> int:
+        """
+        Returns the height up to which the signatures of the blocks being synced
+        don't need to be validated, or -1 if they all do. That's only the case
+        if the chain we're syncing contains the assume valid checkpoint, which
+        we ask the peers for. It's also checked once the sync reaches the
+        checkpoint height.
+        """
+        if self.assume_valid is None:
+            return -1
+        if fork_point_height > self.assume_valid.height or target_peak_height < self.assume_valid.height:
+            return -1
+        for peer in peers_with_peak:
+            response = await peer.call_api(
+                FullNodeAPI.request_block, full_node_protocol.RequestBlock(self.assume_valid.height, False)
+            )
+            if isinstance(response, RespondBlock):
+                if response.block.header_hash == self.assume_valid.header_hash:
+                    self.log.info(
+                        f"skipping signature validation up to the assume valid checkpoint "
+                        f"at height {self.assume_valid.height}"
+                    )
+                    return int(self.assume_valid.height)
+                break
+        self.log.warning(
+            f"the chain being synced doesn't contain the assume valid checkpoint "
+            f"{self.assume_valid.header_hash.hex()}, falling back to full validation"
+        )
+        return -1
+
     async def _wallets_sync_task_handler(self) -> None:
         while not self._shut_down:
             try:
@@ -1583,6 +1696,8 @@ class FullNode:
         blocks_to_validate: list[FullBlock],
         vs: ValidationState,
         wp_summaries: list[SubEpochSummary] | None = None,
+        *,
+        validate_signatures: bool = True,
     ) -> Sequence[Awaitable[PreValidationResult]]:
         """
         This is a thin wrapper over pre_validate_block().
@@ -1594,6 +1709,8 @@ class FullNode:
                 parameter. It will be updated to be the validation state for the next
                 batch of blocks.
             wp_summaries:
+            validate_signatures: Set to False for blocks covered by the assume
+                valid checkpoint.
         """
         # Validates signatures in multiprocessing since they take a while, and we don't have cached transactions
         # for these blocks (unlike during normal operation where we validate one at a time)
@@ -1611,6 +1728,7 @@ class FullNode:
                     None,
                     vs,
                     wp_summaries=wp_summaries,
+                    validate_signatures=validate_signatures,
                 )
             )
         return ret
@@ -1623,6 +1741,8 @@ class FullNode:
         fork_info: ForkInfo,
         peer_info: PeerInfo,
         vs: ValidationState,  # in-out parameter
+        *,
+        assume_valid_height: int = -1,
     ) -> tuple[StateChangeSummary | None, Err | None]:
         agg_state_change_summary: StateChangeSummary | None = None
         block_record = await self.blockchain.get_block_record_from_db(blocks_to_validate[0].prev_header_hash)
@@ -1656,6 +1776,7 @@ class FullNode:
                 fork_info,
                 prev_ses_block=vs.prev_ses_block,
                 block_record=block_rec,
+                assume_valid=block.height <= assume_valid_height,
             )
             if error is None:
                 blockchain.remove_extra_block(header_hash)
@@ -1748,7 +1869,9 @@ class FullNode:
             peak: BlockRecord | None = self.blockchain.get_peak()
             peak_fb: FullBlock | None = await self.blockchain.get_full_peak()
             if peak_fb is not None:
-                if fork_point is None:
+                # a failed sync may have rolled the chain back below its fork
+                # point
+                if fork_point is None or fork_point > peak_fb.height:
                     fork_point = uint32(max(peak_fb.height - 1, 0))
                 assert peak is not None
                 state_change_summary = StateChangeSummary(peak, fork_point, [], [], [], [])
@@ -1893,6 +2016,7 @@ class FullNode:
             fork_hash: bytes32 | None = self.blockchain.height_to_hash(state_change_summary.fork_height)
             assert fork_hash is not None
             fork_block = await self.blockchain.get_block_record_from_db(fork_hash)
+            await self.block_spends_cache.rollback(state_change_summary.fork_height)
 
         fns_peak_result: FullNodeStorePeakResult = self.full_node_store.new_peak(
             record,
@@ -1993,6 +2117,8 @@ class FullNode:
         if self.sync_store.get_sync_mode() is False:
             await self.send_peak_to_timelords(block)
             await self.broadcast_removed_tx(ppp_result.mempool_removals)
+            if self._block_spends_executor is not None and block.transactions_generator is not None:
+                create_referenced_task(self._prepopulate_block_spends(block, self._block_spends_executor))
 
             # Tell full nodes about the new peak
             msg = make_msg(
@@ -2032,6 +2158,15 @@ class FullNode:
 
         self._state_changed("new_peak")
 
+    async def _prepopulate_block_spends(self, block: FullBlock, executor: ThreadPoolExecutor) -> None:
+        try:
+            block_spends = await compute_block_spends(self.constants, self.blockchain, block, executor)
+            # the block may have been reorged out while we were running its generator
+            if block_spends is not None and self.blockchain.height_to_hash(block.height) == block.header_hash:
+                await self.block_spends_cache.add(block.header_hash, block_spends)
+        except Exception as e:
+            self.log.warning(f"Failed to pre-populate block spends for {block.header_hash.hex()}: {e}")
+
     async def add_block(
         self,
         block: FullBlock,
@@ -3060,20 +3195,17 @@ class FullNode:
             self.log.info(f"Duplicate compact proof. Height: {height}. Header hash: {header_hash}.")
         return is_new_proof
 
-    # returns True if we ended up replacing the proof, and False otherwise
-    async def _replace_proof(
+    def _apply_compact_proof(
         self,
+        block: FullBlock,
         vdf_info: VDFInfo,
         vdf_proof: VDFProof,
-        header_hash: bytes32,
         field_vdf: CompressibleVDFField,
-    ) -> bool:
-        block = await self.block_store.get_full_block(header_hash)
-        if block is None:
-            return False
-
-        new_block = None
-
+    ) -> FullBlock | None:
+        """
+        Returns the block with the proof of `vdf_info` replaced by `vdf_proof`,
+        or None if the block doesn't have `vdf_info` in `field_vdf`.
+        """
         if field_vdf == CompressibleVDFField.CC_EOS_VDF:
             for index, sub_slot in enumerate(block.finished_sub_slots):
                 if sub_slot.challenge_chain.challenge_chain_end_of_slot_vdf == vdf_info:
@@ -3081,8 +3213,7 @@ class FullNode:
                     new_subslot = sub_slot.replace(proofs=new_proofs)
                     new_finished_subslots = block.finished_sub_slots
                     new_finished_subslots[index] = new_subslot
-                    new_block = block.replace(finished_sub_slots=new_finished_subslots)
-                    break
+                    return block.replace(finished_sub_slots=new_finished_subslots)
         if field_vdf == CompressibleVDFField.ICC_EOS_VDF:
             for index, sub_slot in enumerate(block.finished_sub_slots):
                 if (
@@ -3093,27 +3224,57 @@ class FullNode:
                     new_subslot = sub_slot.replace(proofs=new_proofs)
                     new_finished_subslots = block.finished_sub_slots
                     new_finished_subslots[index] = new_subslot
-                    new_block = block.replace(finished_sub_slots=new_finished_subslots)
-                    break
+                    return block.replace(finished_sub_slots=new_finished_subslots)
         if field_vdf == CompressibleVDFField.CC_SP_VDF:
             if block.reward_chain_block.challenge_chain_sp_vdf == vdf_info:
                 assert block.challenge_chain_sp_proof is not None
-                new_block = block.replace(challenge_chain_sp_proof=vdf_proof)
+                return block.replace(challenge_chain_sp_proof=vdf_proof)
         if field_vdf == CompressibleVDFField.CC_IP_VDF:
             if block.reward_chain_block.challenge_chain_ip_vdf == vdf_info:
-                new_block = block.replace(challenge_chain_ip_proof=vdf_proof)
-        if new_block is None:
-            return False
+                return block.replace(challenge_chain_ip_proof=vdf_proof)
+        return None
+
+    # returns, for each proof, True if we ended up replacing it, and False
+    # otherwise. All the proofs of a block are applied to it before it's
+    # written back, and all the blocks are written in one transaction
+    async def _replace_proofs(
+        self, proofs: list[tuple[VDFInfo, VDFProof, bytes32, CompressibleVDFField]]
+    ) -> list[bool]:
+        blocks: dict[bytes32, FullBlock | None] = {}
+        new_blocks: dict[bytes32, FullBlock] = {}
+        replaced: list[bool] = []
+        for vdf_info, vdf_proof, header_hash, field_vdf in proofs:
+            if header_hash not in blocks:
+                blocks[header_hash] = await self.block_store.get_full_block(header_hash)
+            block = new_blocks.get(header_hash, blocks[header_hash])
+            new_block = None if block is None else self._apply_compact_proof(block, vdf_info, vdf_proof, field_vdf)
+            if new_block is not None:
+                new_blocks[header_hash] = new_block
+            replaced.append(new_block is not None)
+        if len(new_blocks) == 0:
+            return replaced
         async with self.db_wrapper.writer():
             try:
-                await self.block_store.replace_proof(header_hash, new_block)
-                return True
+                await self.block_store.replace_proofs(list(new_blocks.values()))
             except BaseException as e:
+                heights = sorted(block.height for block in new_blocks.values())
                 self.log.error(
-                    f"_replace_proof error while adding block {block.header_hash} height {block.height},"
+                    f"_replace_proofs error while adding blocks at heights {heights},"
                     f" rolling back: {e} {traceback.format_exc()}"
                 )
                 raise
+        return replaced
+
+    # returns True if we ended up replacing the proof, and False otherwise
+    async def _replace_proof(
+        self,
+        vdf_info: VDFInfo,
+        vdf_proof: VDFProof,
+        header_hash: bytes32,
+        field_vdf: CompressibleVDFField,
+    ) -> bool:
+        [replaced] = await self._replace_proofs([(vdf_info, vdf_proof, header_hash, field_vdf)])
+        return replaced
 
     async def add_compact_proof_of_time(self, request: timelord_protocol.RespondCompactProofOfTime) -> None:
         peak = self.blockchain.get_peak()
@@ -3126,9 +3287,35 @@ class FullNode:
             request.vdf_info, request.vdf_proof, request.height, request.header_hash, field_vdf
         ):
             return None
+        # the proofs accepted while a batch is being written are written
+        # together, in the next batch. By the time we hold the lock, ours has
+        # been written, either by us or by whoever took it in their batch
+        result: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._pending_compact_proofs.append((request, result))
         async with self.blockchain.compact_proof_lock:
-            replaced = await self._replace_proof(request.vdf_info, request.vdf_proof, request.header_hash, field_vdf)
-        if not replaced:
+            if not result.done():
+                batch = self._pending_compact_proofs
+                self._pending_compact_proofs = []
+                try:
+                    replaced = await self._replace_proofs(
+                        [
+                            (r.vdf_info, r.vdf_proof, r.header_hash, CompressibleVDFField(int(r.field_vdf)))
+                            for r, _ in batch
+                        ]
+                    )
+                except Exception as e:
+                    # every proof in the batch failed with it
+                    for _, f in batch:
+                        f.set_exception(e)
+                except BaseException:
+                    # we were cancelled, the others' proofs are left for the
+                    # next batch
+                    self._pending_compact_proofs[:0] = [(r, f) for r, f in batch if f is not result]
+                    raise
+                else:
+                    for (_, f), was_replaced in zip(batch, replaced):
+                        f.set_result(was_replaced)
+        if not await result:
             self.log.error(f"Could not replace compact proof: {request.height}")
             return None
         self.log.info(f"Replaced compact proof at height {request.height}")
@@ -3287,78 +3474,44 @@ class FullNode:
                 connected_timelords = self.server.get_connections(NodeType.TIMELORD)
 
                 total_target_uncompact_proofs = target_uncompact_proofs * max(1, len(connected_timelords))
-                heights = await self.block_store.get_random_not_compactified(total_target_uncompact_proofs)
+                if sanitize_weight_proof_only:
+                    # weight proofs mostly need the end of slot proofs, those
+                    # blocks come first
+                    proofs = await self.block_store.get_random_uncompacted_proofs(
+                        total_target_uncompact_proofs,
+                        fields=(CompressibleVDFField.CC_EOS_VDF, CompressibleVDFField.ICC_EOS_VDF),
+                    )
+                    found = len({header_hash for _, header_hash, _ in proofs})
+                    if found < total_target_uncompact_proofs:
+                        proofs += await self.block_store.get_random_uncompacted_proofs(
+                            total_target_uncompact_proofs - found
+                        )
+                else:
+                    proofs = await self.block_store.get_random_uncompacted_proofs(total_target_uncompact_proofs)
+                fields_by_block: dict[bytes32, set[CompressibleVDFField]] = {}
+                for _, header_hash, field_vdf in proofs:
+                    fields_by_block.setdefault(header_hash, set()).add(field_vdf)
+                heights = sorted({height for height, _, _ in proofs})
                 self.log.info("Heights found for bluebox to compact: [%s]", ", ".join(map(str, heights)))
 
-                for h in heights:
-                    headers = await self.blockchain.get_header_blocks_in_range(h, h, tx_filter=False)
-                    records: dict[bytes32, BlockRecord] = {}
-                    if sanitize_weight_proof_only:
-                        records = await self.blockchain.get_block_records_in_range(h, h)
-                    for header in headers.values():
-                        expected_header_hash = self.blockchain.height_to_hash(header.height)
-                        if header.header_hash != expected_header_hash:
-                            continue
-                        if sanitize_weight_proof_only:
-                            assert header.header_hash in records
-                            record = records[header.header_hash]
-                        for sub_slot in header.finished_sub_slots:
-                            if (
-                                sub_slot.proofs.challenge_chain_slot_proof.witness_type > 0
-                                or not sub_slot.proofs.challenge_chain_slot_proof.normalized_to_identity
-                            ):
-                                broadcast_list.append(
-                                    timelord_protocol.RequestCompactProofOfTime(
-                                        sub_slot.challenge_chain.challenge_chain_end_of_slot_vdf,
-                                        header.header_hash,
-                                        header.height,
-                                        uint8(CompressibleVDFField.CC_EOS_VDF),
-                                    )
-                                )
-                            if sub_slot.proofs.infused_challenge_chain_slot_proof is not None and (
-                                sub_slot.proofs.infused_challenge_chain_slot_proof.witness_type > 0
-                                or not sub_slot.proofs.infused_challenge_chain_slot_proof.normalized_to_identity
-                            ):
-                                assert sub_slot.infused_challenge_chain is not None
-                                broadcast_list.append(
-                                    timelord_protocol.RequestCompactProofOfTime(
-                                        sub_slot.infused_challenge_chain.infused_challenge_chain_end_of_slot_vdf,
-                                        header.header_hash,
-                                        header.height,
-                                        uint8(CompressibleVDFField.ICC_EOS_VDF),
-                                    )
-                                )
-                        # Running in 'sanitize_weight_proof_only' ignores CC_SP_VDF and CC_IP_VDF
-                        # unless this is a challenge block.
-                        if sanitize_weight_proof_only:
-                            if not record.is_challenge_block(self.constants):
-                                continue
-                        if header.challenge_chain_sp_proof is not None and (
-                            header.challenge_chain_sp_proof.witness_type > 0
-                            or not header.challenge_chain_sp_proof.normalized_to_identity
-                        ):
-                            assert header.reward_chain_block.challenge_chain_sp_vdf is not None
-                            broadcast_list.append(
-                                timelord_protocol.RequestCompactProofOfTime(
-                                    header.reward_chain_block.challenge_chain_sp_vdf,
-                                    header.header_hash,
-                                    header.height,
-                                    uint8(CompressibleVDFField.CC_SP_VDF),
-                                )
-                            )
-
-                        if (
-                            header.challenge_chain_ip_proof.witness_type > 0
-                            or not header.challenge_chain_ip_proof.normalized_to_identity
-                        ):
-                            broadcast_list.append(
-                                timelord_protocol.RequestCompactProofOfTime(
-                                    header.reward_chain_block.challenge_chain_ip_vdf,
-                                    header.header_hash,
-                                    header.height,
-                                    uint8(CompressibleVDFField.CC_IP_VDF),
-                                )
-                            )
+                header_hashes = list(fields_by_block.keys())
+                blocks = await self.block_store.get_blocks_by_hash(header_hashes)
+                records: dict[bytes32, BlockRecord] = {}
+                if sanitize_weight_proof_only:
+                    records = {
+                        record.header_hash: record
+                        for record in await self.block_store.get_block_records_by_hash(header_hashes)
+                    }
+                for block in blocks:
+                    expected_header_hash = self.blockchain.height_to_hash(block.height)
+                    if block.header_hash != expected_header_hash:
+                        continue
+                    fields = fields_by_block[block.header_hash]
+                    # Running in 'sanitize_weight_proof_only' ignores CC_SP_VDF and CC_IP_VDF
+                    # unless this is a challenge block.
+                    if sanitize_weight_proof_only and not records[block.header_hash].is_challenge_block(self.constants):
+                        fields -= {CompressibleVDFField.CC_SP_VDF, CompressibleVDFField.CC_IP_VDF}
+                    broadcast_list.extend(compact_proof_requests(block, fields))
 
                 broadcast_list_chunks: list[list[timelord_protocol.RequestCompactProofOfTime]] = []
                 for index in range(0, len(broadcast_list), target_uncompact_proofs):
@@ -3390,6 +3543,74 @@ class FullNode:
             self.log.error(f"Exception Stack: {error_stack}")
 
 
+def compact_proof_requests(
+    block: FullBlock, fields: set[CompressibleVDFField]
+) -> list[timelord_protocol.RequestCompactProofOfTime]:
+    """
+    The requests to the blueboxes for the uncompacted proofs of `fields` in
+    the block.
+    """
+    requests: list[timelord_protocol.RequestCompactProofOfTime] = []
+    for sub_slot in block.finished_sub_slots:
+        if CompressibleVDFField.CC_EOS_VDF in fields and (
+            sub_slot.proofs.challenge_chain_slot_proof.witness_type > 0
+            or not sub_slot.proofs.challenge_chain_slot_proof.normalized_to_identity
+        ):
+            requests.append(
+                timelord_protocol.RequestCompactProofOfTime(
+                    sub_slot.challenge_chain.challenge_chain_end_of_slot_vdf,
+                    block.header_hash,
+                    block.height,
+                    uint8(CompressibleVDFField.CC_EOS_VDF),
+                )
+            )
+        if (
+            CompressibleVDFField.ICC_EOS_VDF in fields
+            and sub_slot.proofs.infused_challenge_chain_slot_proof is not None
+            and (
+                sub_slot.proofs.infused_challenge_chain_slot_proof.witness_type > 0
+                or not sub_slot.proofs.infused_challenge_chain_slot_proof.normalized_to_identity
+            )
+        ):
+            assert sub_slot.infused_challenge_chain is not None
+            requests.append(
+                timelord_protocol.RequestCompactProofOfTime(
+                    sub_slot.infused_challenge_chain.infused_challenge_chain_end_of_slot_vdf,
+                    block.header_hash,
+                    block.height,
+                    uint8(CompressibleVDFField.ICC_EOS_VDF),
+                )
+            )
+    if (
+        CompressibleVDFField.CC_SP_VDF in fields
+        and block.challenge_chain_sp_proof is not None
+        and (
+            block.challenge_chain_sp_proof.witness_type > 0 or not block.challenge_chain_sp_proof.normalized_to_identity
+        )
+    ):
+        assert block.reward_chain_block.challenge_chain_sp_vdf is not None
+        requests.append(
+            timelord_protocol.RequestCompactProofOfTime(
+                block.reward_chain_block.challenge_chain_sp_vdf,
+                block.header_hash,
+                block.height,
+                uint8(CompressibleVDFField.CC_SP_VDF),
+            )
+        )
+    if CompressibleVDFField.CC_IP_VDF in fields and (
+        block.challenge_chain_ip_proof.witness_type > 0 or not block.challenge_chain_ip_proof.normalized_to_identity
+    ):
+        requests.append(
+            timelord_protocol.RequestCompactProofOfTime(
+                block.reward_chain_block.challenge_chain_ip_vdf,
+                block.header_hash,
+                block.height,
+                uint8(CompressibleVDFField.CC_IP_VDF),
+            )
+        )
+    return requests
+
+
 async def node_next_block_check(
     peer: WSChiaConnection, potential_peek: uint32, blockchain: BlockchainInterface
 ) -> bool:
@@ -10,6 +10,7 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, ClassVar, cast
 
 import anyio
+import zstd
 from chia_rs import (
     AugSchemeMPL,
     BlockRecord,
@@ -62,6 +63,7 @@ from chia.protocols.wallet_protocol import (
     RespondSESInfo,
 )
 from chia.server.api_protocol import ApiMetadata
+from chia.server.message_compression import CompressedMessage, is_passthrough_compatible
 from chia.server.server import ChiaServer
 from chia.server.ws_connection import WSChiaConnection
 from chia.types.block_protocol import BlockInfo
@@ -373,8 +375,12 @@ class FullNodeAPI:
         self.log.warning("Received proof of weight too late.")
         return None
 
-    @metadata.request(reply_types=[ProtocolMessageTypes.respond_block, ProtocolMessageTypes.reject_block])
-    async def request_block(self, request: full_node_protocol.RequestBlock) -> Message | None:
+    @metadata.request(
+        peer_required=True, reply_types=[ProtocolMessageTypes.respond_block, ProtocolMessageTypes.reject_block]
+    )
+    async def request_block(
+        self, request: full_node_protocol.RequestBlock, peer: WSChiaConnection | None = None
+    ) -> Message | None:
         if not self.full_node.blockchain.contains_height(request.height):
             reject = RejectBlock(request.height)
             msg = make_msg(ProtocolMessageTypes.reject_block, reject)
@@ -383,6 +389,13 @@ class FullNodeAPI:
         if header_hash is None:
             return make_msg(ProtocolMessageTypes.reject_block, RejectBlock(request.height))
 
+        if request.include_transaction_block and peer is not None and peer.compression_enabled():
+            # RespondBlock is just the serialized block, so the block can be
+            # sent exactly as it's compressed in the database
+            compressed_block = await self.full_node.block_store.get_compressed_full_block_bytes(header_hash)
+            if compressed_block is not None and is_passthrough_compatible(compressed_block):
+                return CompressedMessage(uint8(ProtocolMessageTypes.respond_block.value), None, compressed_block)
+
         block: FullBlock | None = await self.full_node.block_store.get_full_block(header_hash)
         if block is not None:
             if not request.include_transaction_block and block.transactions_generator is not None:
@@ -390,8 +403,12 @@ class FullNodeAPI:
             return make_msg(ProtocolMessageTypes.respond_block, full_node_protocol.RespondBlock(block))
         return make_msg(ProtocolMessageTypes.reject_block, RejectBlock(request.height))
 
-    @metadata.request(reply_types=[ProtocolMessageTypes.respond_blocks, ProtocolMessageTypes.reject_blocks])
-    async def request_blocks(self, request: full_node_protocol.RequestBlocks) -> Message | None:
+    @metadata.request(
+        peer_required=True, reply_types=[ProtocolMessageTypes.respond_blocks, ProtocolMessageTypes.reject_blocks]
+    )
+    async def request_blocks(
+        self, request: full_node_protocol.RequestBlocks, peer: WSChiaConnection | None = None
+    ) -> Message | None:
         # note that we treat the request range as *inclusive*, but we check the
         # size before we bump end_height. So MAX_BLOCK_COUNT_PER_REQUESTS is off
         # by one
@@ -408,6 +425,11 @@ class FullNodeAPI:
                 msg = make_msg(ProtocolMessageTypes.reject_blocks, reject)
                 return msg
 
+        if request.include_transaction_block and peer is not None and peer.compression_enabled():
+            compressed_msg = await self.compressed_respond_blocks(request)
+            if compressed_msg is not None:
+                return compressed_msg
+
         if not request.include_transaction_block:
             blocks: list[FullBlock] = []
             for i in range(request.start_height, request.end_height + 1):
@@ -452,6 +474,33 @@ class FullNodeAPI:
 
         return msg
 
+    async def compressed_respond_blocks(self, request: full_node_protocol.RequestBlocks) -> Message | None:
+        """
+        Builds a compressed RespondBlocks message out of the blocks as they're
+        compressed in the database, without decompressing them. A sequence of
+        zstd frames decompresses to the concatenation of their contents, so we
+        only need to compress the header fields. Returns None if any of the
+        blocks can't be passed through, and the message should be built the
+        regular way.
+        """
+        frames: list[bytes] = [
+            zstd.compress(
+                uint32(request.start_height).stream_to_bytes()
+                + uint32(request.end_height).stream_to_bytes()
+                + uint32(request.end_height - request.start_height + 1).stream_to_bytes()
+            )
+        ]
+        for i in range(request.start_height, request.end_height + 1):
+            header_hash_i = self.full_node.blockchain.height_to_hash(uint32(i))
+            if header_hash_i is None:
+                return None
+            compressed_block = await self.full_node.block_store.get_compressed_full_block_bytes(header_hash_i)
+            if compressed_block is None or not is_passthrough_compatible(compressed_block):
+                return None
+            frames.append(compressed_block)
+
+        return CompressedMessage(uint8(ProtocolMessageTypes.respond_blocks.value), None, b"".join(frames))
+
     @metadata.request(peer_required=True)
     async def reject_block(
         self,
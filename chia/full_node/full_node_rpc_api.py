@@ -15,8 +15,6 @@ from chia_rs import (
     PlotParam,
     SpendBundle,
     SpendBundleConditions,
-    get_spends_for_trusted_block,
-    get_spends_for_trusted_block_with_conditions,
     run_block_generator2,
 )
 from chia_rs import get_puzzle_and_solution_for_coin2 as get_puzzle_and_solution_for_coin
@@ -26,6 +24,7 @@ from chia_rs.sized_ints import uint32, uint64, uint128
 from chia.consensus.blockchain import Blockchain, BlockchainMutexPriority
 from chia.consensus.get_block_generator import get_block_generator
 from chia.consensus.pos_quality import UI_ACTUAL_SPACE_CONSTANT_FACTOR
+from chia.full_node.block_spends_cache import BlockSpends, compute_block_spends
 from chia.full_node.fee_estimator_interface import FeeEstimatorInterface
 from chia.full_node.full_node import FullNode
 from chia.full_node.hard_fork_utils import get_flags
@@ -503,10 +502,14 @@ class FullNodeRpcApi:
             records.append(record)
         return {"block_records": records}
 
-    async def get_block_spends(self, request: dict[str, Any]) -> EndpointResult:
+    async def _get_block_spends(self, request: dict[str, Any]) -> BlockSpends | None:
         if "header_hash" not in request:
             raise RpcError.simple(RpcErrorCodes.NO_HEADER_HASH_IN_REQUEST, "No header_hash in request")
         header_hash = bytes32.from_hexstr(request["header_hash"])
+        block_spends = await self.service.block_spends_cache.get(header_hash)
+        if block_spends is not None:
+            return block_spends
+
         full_block: FullBlock | None = await self.service.block_store.get_full_block(header_hash)
         if full_block is None:
             raise RpcError(
@@ -516,50 +519,25 @@ class FullNodeRpcApi:
                 structured_message="Block not found",
             )
 
-        block_generator = await get_block_generator(self.service.blockchain.lookup_block_generators, full_block)
-        if block_generator is None:  # if block is not a transaction block.
-            return {"block_spends": []}
-
-        flags = await get_flags(constants=self.service.constants, blocks=self.service.blockchain, block=full_block)
-
-        spends = await asyncio.get_running_loop().run_in_executor(
-            self.executor,
-            get_spends_for_trusted_block,
-            self.service.constants,
-            block_generator.program,
-            block_generator.generator_refs,
-            flags,
+        block_spends = await compute_block_spends(
+            self.service.constants, self.service.blockchain, full_block, self.executor
         )
+        # only blocks in the main chain are cached, orphaned blocks would never be invalidated
+        if block_spends is not None and self.service.blockchain.height_to_hash(full_block.height) == header_hash:
+            await self.service.block_spends_cache.add(header_hash, block_spends)
+        return block_spends
 
-        return spends
+    async def get_block_spends(self, request: dict[str, Any]) -> EndpointResult:
+        block_spends = await self._get_block_spends(request)
+        if block_spends is None:  # if block is not a transaction block.
+            return {"block_spends": []}
+        return {"block_spends": block_spends.block_spends()}
 
     async def get_block_spends_with_conditions(self, request: dict[str, Any]) -> EndpointResult:
-        if "header_hash" not in request:
-            raise RpcError.simple(RpcErrorCodes.NO_HEADER_HASH_IN_REQUEST, "No header_hash in request")
-        header_hash = bytes32.from_hexstr(request["header_hash"])
-        full_block: FullBlock | None = await self.service.block_store.get_full_block(header_hash)
-        if full_block is None:
-            raise RpcError(
-                RpcErrorCodes.BLOCK_NOT_FOUND,
-                f"Block {header_hash.hex()} not found",
-                data={"header_hash": header_hash.hex()},
-                structured_message="Block not found",
-            )
-
-        block_generator = await get_block_generator(self.service.blockchain.lookup_block_generators, full_block)
-        if block_generator is None:  # if block is not a transaction block.
+        block_spends = await self._get_block_spends(request)
+        if block_spends is None:  # if block is not a transaction block.
             return {"block_spends_with_conditions": []}
-
-        flags = await get_flags(constants=self.service.constants, blocks=self.service.blockchain, block=full_block)
-        spends_with_conditions = await asyncio.get_running_loop().run_in_executor(
-            self.executor,
-            get_spends_for_trusted_block_with_conditions,
-            self.service.constants,
-            block_generator.program,
-            block_generator.generator_refs,
-            flags,
-        )
-        return {"block_spends_with_conditions": spends_with_conditions}
+        return {"block_spends_with_conditions": block_spends.block_spends_with_conditions()}
 
     async def get_block_record_by_height(self, request: dict[str, Any]) -> EndpointResult:
         if "height" not in request:
@@ -72,28 +72,33 @@ def find_best_block(
 
     # if there are unfinished blocks with foliage (i.e. not None) we prefer
     # those, so drop the first element
-    all_blocks = [e for e in all_blocks if include_block(e)]
-    all_blocks = sorted(all_blocks)
+    foliage_hashes = [foliage_hash for foliage_hash, entry in all_blocks if include_block((foliage_hash, entry))]
 
     # we may have filtered out some blocks that we have only requested, but not
     # yet received.
-    if len(all_blocks) == 0:
+    if len(foliage_hashes) == 0:
         return None, None
 
-    return all_blocks[0][0], all_blocks[0][1].unfinished_block
+    # we've already filtered out the None keys, but min() doesn't know that
+    best = min(foliage_hashes)  # type: ignore[type-var]
+    return best, result[best].unfinished_block
 
 
-def _maybe_evict_worst_unfinished_block(inner: dict[bytes32 | None, UnfinishedBlockEntry]) -> None:
+def _maybe_evict_worst_unfinished_block(
+    inner: dict[bytes32 | None, UnfinishedBlockEntry],
+) -> UnfinishedBlockEntry | None:
+    """
+    Returns the evicted entry, if any
+    """
     if len(inner) <= MAX_UNFINISHED_BLOCKS_PER_REWARD_HASH:
-        return
+        return None
     # None foliage hash is considered worst since the block quality is unknown
     if None in inner:
-        del inner[None]
-        return
+        return inner.pop(None)
     # we've already checked for None keys. At this point we know there won't be
     # any, but max() doesn't like that the type is still Optional[Bytes32]
     worst_key = max(inner.keys())  # type: ignore[type-var]
-    del inner[worst_key]
+    return inner.pop(worst_key)
 
 
 class FullNodeStore:
@@ -121,11 +126,24 @@ class FullNodeStore:
     # protocol, where all we get is the reward block hash.
     _unfinished_blocks: dict[bytes32, dict[bytes32 | None, UnfinishedBlockEntry]]
 
+    # The reward hashes of the unfinished blocks in _unfinished_blocks, by
+    # height. Blocks we've requested, but not received yet, are at height 0
+    _unfinished_blocks_by_height: dict[uint32, set[bytes32]]
+
     # Finished slots and sps from the peak's slot onwards
     # We store all 32 SPs for each slot, starting as 32 Nones and filling them as we go
     # Also stores the total iters at the end of slot
     # For the first sub-slot, EndOfSlotBundle is None
-    finished_sub_slots: list[tuple[EndOfSubSlotBundle | None, list[SignagePoint | None], uint128]]
+    _finished_sub_slots: list[tuple[EndOfSubSlotBundle | None, list[SignagePoint | None], uint128]]
+
+    # The index in _finished_sub_slots of each sub slot, by its challenge chain
+    # hash. The first sub-slot (without an EndOfSlotBundle) is indexed by the
+    # genesis challenge
+    _sub_slots_by_challenge: dict[bytes32, int]
+
+    # The signage points in _finished_sub_slots, by the hash of their
+    # challenge chain VDF output
+    _signage_points_by_cc_output: dict[bytes32, SignagePoint]
 
     # These caches maintain objects which depend on infused blocks in the reward chain, that we
     # might receive before the blocks themselves. The dict keys are the reward chain challenge hashes.
@@ -159,7 +177,10 @@ class FullNodeStore:
         self.candidate_backup_blocks = {}
         self.seen_unfinished_blocks = LRUSet(1000)
         self._unfinished_blocks = {}
-        self.finished_sub_slots = []
+        self._unfinished_blocks_by_height = {}
+        self._finished_sub_slots = []
+        self._sub_slots_by_challenge = {}
+        self._signage_points_by_cc_output = {}
         self.future_eos_cache = {}
         self.future_sp_cache = {}
         self.future_ip_cache = {}
@@ -175,6 +196,55 @@ class FullNodeStore:
         self.serialized_wp_message = None
         self.serialized_wp_message_tip = None
 
+    @property
+    def finished_sub_slots(self) -> list[tuple[EndOfSubSlotBundle | None, list[SignagePoint | None], uint128]]:
+        return self._finished_sub_slots
+
+    @finished_sub_slots.setter
+    def finished_sub_slots(
+        self, sub_slots: list[tuple[EndOfSubSlotBundle | None, list[SignagePoint | None], uint128]]
+    ) -> None:
+        self.clear_slots()
+        for sub_slot, sps, total_iters in sub_slots:
+            self._add_sub_slot(sub_slot, sps, total_iters)
+
+    def _add_sub_slot(
+        self, sub_slot: EndOfSubSlotBundle | None, sps: list[SignagePoint | None], total_iters: uint128
+    ) -> None:
+        cc_hash = self.constants.GENESIS_CHALLENGE if sub_slot is None else sub_slot.challenge_chain.get_hash()
+        self._sub_slots_by_challenge.setdefault(cc_hash, len(self._finished_sub_slots))
+        self._finished_sub_slots.append((sub_slot, sps, total_iters))
+        for sp in sps:
+            if sp is not None:
+                assert sp.cc_vdf is not None
+                self._signage_points_by_cc_output[sp.cc_vdf.output.get_hash()] = sp
+
+    def _find_sub_slot(
+        self, challenge_hash: bytes32
+    ) -> tuple[EndOfSubSlotBundle | None, list[SignagePoint | None], uint128] | None:
+        index = self._sub_slots_by_challenge.get(challenge_hash)
+        if index is None:
+            return None
+        return self._finished_sub_slots[index]
+
+    def _index_unfinished_block(self, reward_block_hash: bytes32, height: uint32) -> None:
+        self._unfinished_blocks_by_height.setdefault(height, set()).add(reward_block_hash)
+
+    def _unindex_unfinished_block(self, reward_block_hash: bytes32, height: uint32) -> None:
+        """
+        Removes reward_block_hash from the height index, unless there's still an
+        unfinished block at this height with that reward block hash
+        """
+        entries = self._unfinished_blocks.get(reward_block_hash)
+        if entries is not None and any(ube.height == height for ube in entries.values()):
+            return
+        hashes = self._unfinished_blocks_by_height.get(height)
+        if hashes is None:
+            return
+        hashes.discard(reward_block_hash)
+        if len(hashes) == 0:
+            del self._unfinished_blocks_by_height[height]
+
     def is_requesting_unfinished_block(
         self, reward_block_hash: bytes32, foliage_hash: bytes32 | None
     ) -> tuple[bool, int]:
@@ -197,7 +267,10 @@ class FullNodeStore:
     def mark_requesting_unfinished_block(self, reward_block_hash: bytes32, foliage_hash: bytes32 | None) -> None:
         ents = self._unfinished_blocks.setdefault(reward_block_hash, {})
         ents.setdefault(foliage_hash, UnfinishedBlockEntry(None, None, uint32(0)))
-        _maybe_evict_worst_unfinished_block(ents)
+        self._index_unfinished_block(reward_block_hash, uint32(0))
+        evicted = _maybe_evict_worst_unfinished_block(ents)
+        if evicted is not None:
+            self._unindex_unfinished_block(reward_block_hash, evicted.height)
 
     def remove_requesting_unfinished_block(self, reward_block_hash: bytes32, foliage_hash: bytes32 | None) -> None:
         reward_ents = self._unfinished_blocks.get(reward_block_hash)
@@ -213,6 +286,7 @@ class FullNodeStore:
         del reward_ents[foliage_hash]
         if len(reward_ents) == 0:
             del self._unfinished_blocks[reward_block_hash]
+        self._unindex_unfinished_block(reward_block_hash, foliage_ent.height)
 
     def add_candidate_block(
         self, quality_string: bytes32, height: uint32, unfinished_block: UnfinishedBlock, backup: bool = False
@@ -261,10 +335,16 @@ class FullNodeStore:
     ) -> None:
         partial_hash = unfinished_block.partial_hash
         entry = self._unfinished_blocks.setdefault(partial_hash, {})
-        entry[unfinished_block.foliage.foliage_transaction_block_hash] = UnfinishedBlockEntry(
-            unfinished_block, result, height
-        )
-        _maybe_evict_worst_unfinished_block(entry)
+        foliage_hash = unfinished_block.foliage.foliage_transaction_block_hash
+        old_entry = entry.get(foliage_hash)
+        entry[foliage_hash] = UnfinishedBlockEntry(unfinished_block, result, height)
+        self._index_unfinished_block(partial_hash, height)
+        if old_entry is not None and old_entry.height != height:
+            # this replaces the placeholder of a block we requested
+            self._unindex_unfinished_block(partial_hash, old_entry.height)
+        evicted = _maybe_evict_worst_unfinished_block(entry)
+        if evicted is not None:
+            self._unindex_unfinished_block(partial_hash, evicted.height)
 
     def get_unfinished_block(self, unfinished_reward_hash: bytes32) -> UnfinishedBlock | None:
         result = self._unfinished_blocks.get(unfinished_reward_hash, None)
@@ -326,30 +406,32 @@ class FullNodeStore:
     # returns all unfinished blocks for the specified height
     def get_unfinished_blocks(self, height: uint32) -> list[UnfinishedBlock]:
         ret: list[UnfinishedBlock] = []
-        for entry in self._unfinished_blocks.values():
-            for ube in entry.values():
+        for partial_hash in self._unfinished_blocks_by_height.get(height, ()):
+            for ube in self._unfinished_blocks[partial_hash].values():
                 if ube.height == height and ube.unfinished_block is not None:
                     ret.append(ube.unfinished_block)
         return ret
 
     def clear_unfinished_blocks_below(self, height: uint32) -> None:
-        del_partial: list[bytes32] = []
-        for partial_hash, entry in self._unfinished_blocks.items():
-            del_foliage: list[bytes32 | None] = []
-            for foliage_hash, ube in entry.items():
-                if ube.height < height:
-                    del_foliage.append(foliage_hash)
-            for fh in del_foliage:
-                del entry[fh]
-            if len(entry) == 0:
-                del_partial.append(partial_hash)
-        for ph in del_partial:
-            del self._unfinished_blocks[ph]
+        del_heights = [h for h in self._unfinished_blocks_by_height if h < height]
+        for h in del_heights:
+            for partial_hash in self._unfinished_blocks_by_height.pop(h):
+                entry = self._unfinished_blocks.get(partial_hash)
+                if entry is None:
+                    continue
+                del_foliage = [foliage_hash for foliage_hash, ube in entry.items() if ube.height < height]
+                for fh in del_foliage:
+                    del entry[fh]
+                if len(entry) == 0:
+                    del self._unfinished_blocks[partial_hash]
 
     # TODO: this should be removed. It's only used by a test
     def remove_unfinished_block(self, partial_reward_hash: bytes32) -> None:
-        if partial_reward_hash in self._unfinished_blocks:
-            del self._unfinished_blocks[partial_reward_hash]
+        entry = self._unfinished_blocks.pop(partial_reward_hash, None)
+        if entry is None:
+            return
+        for ube in entry.values():
+            self._unindex_unfinished_block(partial_reward_hash, ube.height)
 
     def add_to_future_ip(self, infusion_point: timelord_protocol.NewInfusionPointVDF) -> None:
         ch: bytes32 = infusion_point.reward_chain_ip_vdf.challenge
@@ -402,18 +484,23 @@ class FullNodeStore:
             self.future_sp_cache.pop(k, [])
 
     def clear_slots(self) -> None:
-        self.finished_sub_slots.clear()
+        self._finished_sub_slots = []
+        self._sub_slots_by_challenge.clear()
+        self._signage_points_by_cc_output.clear()
 
     def get_sub_slot(self, challenge_hash: bytes32) -> tuple[EndOfSubSlotBundle, int, uint128] | None:
         assert len(self.finished_sub_slots) >= 1
-        for index, (sub_slot, _, total_iters) in enumerate(self.finished_sub_slots):
-            if sub_slot is not None and sub_slot.challenge_chain.get_hash() == challenge_hash:
-                return sub_slot, index, total_iters
-        return None
+        index = self._sub_slots_by_challenge.get(challenge_hash)
+        if index is None:
+            return None
+        sub_slot, _, total_iters = self._finished_sub_slots[index]
+        if sub_slot is None:
+            return None
+        return sub_slot, index, total_iters
 
     def initialize_genesis_sub_slot(self) -> None:
         self.clear_slots()
-        self.finished_sub_slots = [(None, [None] * self.constants.NUM_SPS_SUB_SLOT, uint128(0))]
+        self._add_sub_slot(None, [None] * self.constants.NUM_SPS_SUB_SLOT, uint128(0))
 
     def new_finished_sub_slot(
         self,
@@ -675,7 +762,7 @@ class FullNodeStore:
             if eos.reward_chain.infused_challenge_chain_sub_slot_hash is not None:
                 return None
 
-        self.finished_sub_slots.append((eos, [None] * self.constants.NUM_SPS_SUB_SLOT, total_iters))
+        self._add_sub_slot(eos, [None] * self.constants.NUM_SPS_SUB_SLOT, total_iters)
 
         new_cc_hash = eos.challenge_chain.get_hash()
         self.recent_eos.put(new_cc_hash, (eos, time.time()))
@@ -820,8 +907,14 @@ class FullNodeStore:
                         self.add_to_future_sp(signage_point, index)
                         return False
 
+                old_sp = sp_arr[index]
+                if old_sp is not None:
+                    assert old_sp.cc_vdf is not None
+                    self._signage_points_by_cc_output.pop(old_sp.cc_vdf.output.get_hash(), None)
                 sp_arr[index] = signage_point
-                self.recent_signage_points.put(signage_point.cc_vdf.output.get_hash(), (signage_point, time.time()))
+                cc_output_hash = signage_point.cc_vdf.output.get_hash()
+                self._signage_points_by_cc_output[cc_output_hash] = signage_point
+                self.recent_signage_points.put(cc_output_hash, (signage_point, time.time()))
                 return True
         self.add_to_future_sp(signage_point, index)
         return False
@@ -831,56 +924,43 @@ class FullNodeStore:
         if cc_signage_point == self.constants.GENESIS_CHALLENGE:
             return SignagePoint(None, None, None, None)
 
-        for sub_slot, sps, _ in self.finished_sub_slots:
-            if sub_slot is not None and sub_slot.challenge_chain.get_hash() == cc_signage_point:
-                return SignagePoint(None, None, None, None)
-            for sp in sps:
-                if sp is not None:
-                    assert sp.cc_vdf is not None
-                    if sp.cc_vdf.output.get_hash() == cc_signage_point:
-                        return sp
-        return None
+        # the start of a sub slot
+        if cc_signage_point in self._sub_slots_by_challenge:
+            return SignagePoint(None, None, None, None)
+        return self._signage_points_by_cc_output.get(cc_signage_point)
 
     def get_signage_point_by_index_and_cc_output(
         self, cc_signage_point: bytes32, challenge: bytes32, index: uint8
     ) -> SignagePoint | None:
         assert len(self.finished_sub_slots) >= 1
-        for sub_slot, sps, _ in self.finished_sub_slots:
-            if sub_slot is not None:
-                cc_hash = sub_slot.challenge_chain.get_hash()
-            else:
-                cc_hash = self.constants.GENESIS_CHALLENGE
-            if cc_hash == challenge:
-                if index == 0:
-                    # first SP in the sub slot
-                    return SignagePoint(None, None, None, None)
-                sp: SignagePoint | None = sps[index]
-                if sp is None:
-                    return None
-                assert sp.cc_vdf is not None
-                if sp.cc_vdf.output.get_hash() == cc_signage_point:
-                    return sp
+        found = self._find_sub_slot(challenge)
+        if found is None:
+            return None
+        if index == 0:
+            # first SP in the sub slot
+            return SignagePoint(None, None, None, None)
+        sp: SignagePoint | None = found[1][index]
+        if sp is None:
+            return None
+        assert sp.cc_vdf is not None
+        if sp.cc_vdf.output.get_hash() == cc_signage_point:
+            return sp
         return None
 
     def get_signage_point_by_index(
         self, challenge_hash: bytes32, index: uint8, last_rc_infusion: bytes32
     ) -> SignagePoint | None:
         assert len(self.finished_sub_slots) >= 1
-        for sub_slot, sps, _ in self.finished_sub_slots:
-            if sub_slot is not None:
-                cc_hash = sub_slot.challenge_chain.get_hash()
-            else:
-                cc_hash = self.constants.GENESIS_CHALLENGE
-
-            if cc_hash == challenge_hash:
-                if index == 0:
-                    return SignagePoint(None, None, None, None)
-                sp: SignagePoint | None = sps[index]
-                if sp is not None:
-                    assert sp.rc_vdf is not None
-                    if sp.rc_vdf.challenge == last_rc_infusion:
-                        return sp
-                return None
+        found = self._find_sub_slot(challenge_hash)
+        if found is None:
+            return None
+        if index == 0:
+            return SignagePoint(None, None, None, None)
+        sp: SignagePoint | None = found[1][index]
+        if sp is not None:
+            assert sp.rc_vdf is not None
+            if sp.rc_vdf.challenge == last_rc_infusion:
+                return sp
         return None
 
     def have_newer_signage_point(self, challenge_hash: bytes32, index: uint8, last_rc_infusion: bytes32) -> bool:
@@ -888,27 +968,17 @@ class FullNodeStore:
         Returns true if we have a signage point at this index which is based on a newer infusion.
         """
         assert len(self.finished_sub_slots) >= 1
-        for sub_slot, sps, _ in self.finished_sub_slots:
-            if sub_slot is not None:
-                cc_hash = sub_slot.challenge_chain.get_hash()
-            else:
-                cc_hash = self.constants.GENESIS_CHALLENGE
-
-            if cc_hash == challenge_hash:
-                found_rc_hash = False
-                for i in range(index):
-                    sp: SignagePoint | None = sps[i]
-                    if sp is not None and sp.rc_vdf is not None and sp.rc_vdf.challenge == last_rc_infusion:
-                        found_rc_hash = True
-                sp = sps[index]
-                if (
-                    found_rc_hash
-                    and sp is not None
-                    and sp.rc_vdf is not None
-                    and sp.rc_vdf.challenge != last_rc_infusion
-                ):
-                    return True
-        return False
+        found = self._find_sub_slot(challenge_hash)
+        if found is None:
+            return False
+        sps = found[1]
+        found_rc_hash = False
+        for i in range(index):
+            sp: SignagePoint | None = sps[i]
+            if sp is not None and sp.rc_vdf is not None and sp.rc_vdf.challenge == last_rc_infusion:
+                found_rc_hash = True
+        sp = sps[index]
+        return found_rc_hash and sp is not None and sp.rc_vdf is not None and sp.rc_vdf.challenge != last_rc_infusion
 
     def new_peak(
         self,
@@ -975,10 +1045,10 @@ class FullNodeStore:
             prev_sub_slot_total_iters = peak.sp_sub_slot_total_iters(self.constants)
             if sp_sub_slot is not None or prev_sub_slot_total_iters == 0:
                 assert peak.overflow or prev_sub_slot_total_iters
-                self.finished_sub_slots.append((sp_sub_slot, sp_sub_slot_sps, prev_sub_slot_total_iters))
+                self._add_sub_slot(sp_sub_slot, sp_sub_slot_sps, prev_sub_slot_total_iters)
 
             ip_sub_slot_total_iters = peak.ip_sub_slot_total_iters(self.constants)
-            self.finished_sub_slots.append((ip_sub_slot, ip_sub_slot_sps, ip_sub_slot_total_iters))
+            self._add_sub_slot(ip_sub_slot, ip_sub_slot_sps, ip_sub_slot_total_iters)
 
         new_eos: EndOfSubSlotBundle | None = None
         new_sps: list[tuple[uint8, SignagePoint]] = []
@@ -6,6 +6,7 @@ import logging
 import typing_extensions
 from chia_rs.sized_bytes import bytes32
 
+from chia.full_node.db_counters import HINTS, add_to_counter, create_counters, get_counter
 from chia.util.batches import to_batches
 from chia.util.db_wrapper import SQLITE_MAX_VARIABLE_NUMBER, DBWrapper2
 
@@ -29,6 +30,7 @@ class HintStore:
             await conn.execute("CREATE TABLE IF NOT EXISTS hints(coin_id blob, hint blob, UNIQUE (coin_id, hint))")
             log.info("DB: Creating index hint_index")
             await conn.execute("CREATE INDEX IF NOT EXISTS hint_index on hints(hint)")
+            await create_counters(conn, [HINTS])
         return self
 
     async def get_coin_ids(self, hint: bytes, *, max_items: int = 50000) -> list[bytes32]:
@@ -80,14 +82,10 @@ class HintStore:
                 "INSERT OR IGNORE INTO hints VALUES(?, ?)",
                 coin_hint_list,
             )
+            # hints that already exist are ignored, and not counted
+            await add_to_counter(conn, HINTS, cursor.rowcount)
             await cursor.close()
 
     async def count_hints(self) -> int:
         async with self.db_wrapper.reader_no_transaction() as conn:
-            async with conn.execute("select count(*) from hints") as cursor:
-                row = await cursor.fetchone()
-
-        assert row is not None
-
-        [count] = row
-        return int(count)
+            return await get_counter(conn, HINTS)
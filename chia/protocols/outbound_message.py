@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import IntEnum
+from functools import cached_property
 from typing import SupportsBytes
 
 from chia_rs.sized_ints import uint8, uint16
@@ -30,6 +31,12 @@ class Message(Streamable):
     # Message data for that type
     data: bytes
 
+    @cached_property
+    def encoded(self) -> bytes:
+        # Messages are immutable and the same message is commonly broadcast to
+        # many peers, so it's only serialized once
+        return bytes(self)
+
 
 def make_msg(msg_type: ProtocolMessageTypes, data: bytes | SupportsBytes) -> Message:
     return Message(uint8(msg_type.value), None, bytes(data))
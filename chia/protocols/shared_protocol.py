@@ -48,6 +48,10 @@ class Capability(IntEnum):
     # Signals support for Hard Fork 2
     HARD_FORK_2 = 6
 
+    # Large messages (blocks, unfinished blocks and weight proofs) are sent zstd
+    # compressed. This is only used when both peers support it
+    COMPRESSED_MESSAGES = 7
+
 
 # These are the default capabilities used in all outgoing handshakes.
 # "1" means the capability is supported and enabled.
@@ -59,9 +63,12 @@ _capabilities: list[tuple[uint16, str]] = [
 _mempool_updates = [
     (uint16(Capability.MEMPOOL_UPDATES.value), "1"),
 ]
+_compressed_messages = [
+    (uint16(Capability.COMPRESSED_MESSAGES.value), "1"),
+]
 
 default_capabilities = {
-    NodeType.FULL_NODE: _capabilities + _mempool_updates,
+    NodeType.FULL_NODE: _capabilities + _mempool_updates + _compressed_messages,
     NodeType.HARVESTER: _capabilities,
     NodeType.FARMER: _capabilities,
     NodeType.TIMELORD: _capabilities,
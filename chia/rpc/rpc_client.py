@@ -125,6 +125,9 @@ class RpcClient:
             connection["node_id"] = hexstr_to_bytes(connection["node_id"])
         return response["connections"]
 
+    async def get_broadcast_metrics(self) -> dict:
+        return await self.fetch("get_broadcast_metrics", {})
+
     async def open_connection(self, host: str, port: int) -> dict:
         return await self.fetch("open_connection", {"host": host, "port": int(port)})
 
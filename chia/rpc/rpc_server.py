@@ -7,7 +7,7 @@ import logging
 import sys
 import traceback
 from collections.abc import AsyncIterator, Awaitable, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from ssl import SSLContext
 from types import MethodType
@@ -50,6 +50,9 @@ from chia.util.ws_message import (
 
 log = logging.getLogger(__name__)
 max_message_size = 50 * 1024 * 1024  # 50MB
+# how long to wait for more connection changes before sending the connections
+# to the UI
+CONNECTIONS_REFRESH_DELAY = 0.2
 
 
 EndpointResult = dict[str, Any]
@@ -162,6 +165,9 @@ class RpcServer(Generic[_T_RpcApiProtocol]):
     websocket: ClientWebSocketResponse | None = None
     client_session: ClientSession | None = None
     prefer_ipv6: bool = False
+    # a connections refresh is scheduled and hasn't started yet
+    connections_refresh_pending: bool = False
+    connections_refresh_tasks: set[asyncio.Task[None]] = field(default_factory=set)
 
     @classmethod
     def create(
@@ -211,6 +217,9 @@ class RpcServer(Generic[_T_RpcApiProtocol]):
             self.webserver.close()
 
     async def await_closed(self) -> None:
+        for task in self.connections_refresh_tasks:
+            task.cancel()
+        await asyncio.gather(*self.connections_refresh_tasks, return_exceptions=True)
         if self.websocket is not None:
             await self.websocket.close()
         if self.client_session is not None:
@@ -226,26 +235,41 @@ class RpcServer(Generic[_T_RpcApiProtocol]):
             return None
         payloads: list[WsRpcMessage] = await self.rpc_api._state_changed(change, change_data)
 
-        if change in {"add_connection", "close_connection", "peer_changed_peak"}:
-            data = await self.get_connections({})
-            if data is not None:
-                payload = create_payload_dict(
-                    "get_connections",
-                    data,
-                    self.service_name,
-                    "wallet_ui",
-                )
-                payloads.append(payload)
+        if change in {"add_connection", "close_connection", "peer_changed_peak"} and not (
+            self.connections_refresh_pending or self.shut_down
+        ):
+            # connection changes come in bursts, e.g. every peer announcing a
+            # new peak, a single refresh covers all of them. The tasks are kept
+            # until they finish, for await_closed() to cancel them
+            self.connections_refresh_pending = True
+            task = create_referenced_task(self._send_connections())
+            self.connections_refresh_tasks.add(task)
+            task.add_done_callback(self.connections_refresh_tasks.discard)
         for payload in payloads:
-            if "success" not in payload["data"]:
-                payload["data"]["success"] = True
-            if self.websocket is None or self.websocket.closed:
+            if not await self._send_payload(payload):
                 return None
-            try:
-                await self.websocket.send_str(dict_to_json_str(payload))
-            except Exception:
-                tb = traceback.format_exc()
-                log.warning(f"Sending data failed. Exception {tb}.")
+
+    async def _send_connections(self) -> None:
+        await asyncio.sleep(CONNECTIONS_REFRESH_DELAY)
+        # any change from now on needs a new refresh
+        self.connections_refresh_pending = False
+        if self.websocket is None or self.websocket.closed:
+            return None
+        data = await self.get_connections({})
+        await self._send_payload(create_payload_dict("get_connections", data, self.service_name, "wallet_ui"))
+
+    async def _send_payload(self, payload: WsRpcMessage) -> bool:
+        """Returns False if there's no websocket to send to"""
+        if "success" not in payload["data"]:
+            payload["data"]["success"] = True
+        if self.websocket is None or self.websocket.closed:
+            return False
+        try:
+            await self.websocket.send_str(dict_to_json_str(payload))
+        except Exception:
+            tb = traceback.format_exc()
+            log.warning(f"Sending data failed. Exception {tb}.")
+        return True
 
     def state_changed(self, change: str, change_data: dict[str, Any] | None = None) -> None:
         if self.websocket is None or self.websocket.closed:
@@ -290,6 +314,16 @@ class RpcServer(Generic[_T_RpcApiProtocol]):
         con_info = self.rpc_api.service.get_connections(request_node_type=request_node_type)
         return {"connections": con_info}
 
+    async def get_broadcast_metrics(self, request: dict[str, Any]) -> EndpointResult:
+        if self.rpc_api.service.server is None:
+            raise ValueError("Global connections is not set")
+        metrics = self.rpc_api.service.server.broadcast_metrics
+        return {
+            "broadcast_metrics": {
+                message_type.name: message_metrics.to_json_dict() for message_type, message_metrics in metrics.items()
+            }
+        }
+
     async def open_connection(self, request: dict[str, Any]) -> EndpointResult:
         host = request["host"]
         port = request["port"]
@@ -466,6 +500,7 @@ class RpcServer(Generic[_T_RpcApiProtocol]):
     _routes: ClassVar[dict[str, Callable[..., Awaitable[object]]]] = {
         "/get_network_info": get_network_info,
         "/get_connections": get_connections,
+        "/get_broadcast_metrics": get_broadcast_metrics,
         "/open_connection": open_connection,
         "/close_connection": close_connection,
         "/stop_node": stop_node,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import heapq
 import ipaddress
 import logging
 import random
@@ -15,6 +16,59 @@ from chia.seeder.peer_record import PeerRecord, PeerReliability
 log = logging.getLogger(__name__)
 
 
+# a peer isn't selected again for this many seconds after being selected
+SELECTION_COOLDOWN = 120
+# a peer isn't crawled again for this many seconds after it was last tried
+# (or connected)
+RETRY_DELAY_V4 = 1000
+RETRY_DELAY_V6 = 600
+
+
+def is_ipv6(peer_id: str) -> bool:
+    try:
+        ipaddress.IPv6Address(peer_id)
+    except ValueError:
+        return False
+    return True
+
+
+@dataclass
+class EligiblePeers:
+    """
+    The peers that may be crawled now, supporting O(1) removal and sampling
+    in O(sample size).
+    """
+
+    peer_ids: list[str] = field(default_factory=list)
+    index: dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.peer_ids)
+
+    def __contains__(self, peer_id: str) -> bool:
+        return peer_id in self.index
+
+    def add(self, peer_id: str) -> None:
+        if peer_id in self.index:
+            return
+        self.index[peer_id] = len(self.peer_ids)
+        self.peer_ids.append(peer_id)
+
+    def remove(self, peer_id: str) -> None:
+        idx = self.index.pop(peer_id, None)
+        if idx is None:
+            return
+        last = self.peer_ids.pop()
+        if last != peer_id:
+            self.peer_ids[idx] = last
+            self.index[last] = idx
+
+    def sample(self, count: int) -> list[str]:
+        if count >= len(self.peer_ids):
+            return list(self.peer_ids)
+        return random.sample(self.peer_ids, count)
+
+
 @dataclass
 class CrawlStore:
     crawl_db: aiosqlite.Connection
@@ -24,6 +78,17 @@ class CrawlStore:
     banned_peers: int = 0
     ignored_peers: int = 0
     reliable_peers: int = 0
+    # Changes are only kept in memory until the end of the crawl round, when
+    # the peers that changed are written to the DB in one transaction.
+    dirty_peers: set[str] = field(default_factory=set)
+    # The peers that aren't eligible to be crawled yet, in a heap ordered by
+    # the time they become eligible. Entries are invalidated lazily, an entry
+    # is stale unless its time matches host_to_eligible_time.
+    crawl_queue: list[tuple[float, str]] = field(default_factory=list)
+    host_to_eligible_time: dict[str, float] = field(default_factory=dict)
+    eligible_v4: EligiblePeers = field(default_factory=EligiblePeers)
+    eligible_v6: EligiblePeers = field(default_factory=EligiblePeers)
+    host_is_v6: dict[str, bool] = field(default_factory=dict)
 
     @classmethod
     async def create(cls, connection: aiosqlite.Connection) -> CrawlStore:
@@ -79,64 +144,88 @@ class CrawlStore:
         return self
 
     def maybe_add_peer(self, peer_record: PeerRecord, peer_reliability: PeerReliability) -> None:
+        added = False
         if peer_record.peer_id not in self.host_to_records:
             self.host_to_records[peer_record.peer_id] = peer_record
+            added = True
         if peer_reliability.peer_id not in self.host_to_reliability:
             self.host_to_reliability[peer_reliability.peer_id] = peer_reliability
+            added = True
+        if added:
+            self.dirty_peers.add(peer_record.peer_id)
+            self.schedule_peer(peer_record.peer_id)
 
     async def add_peer(self, peer_record: PeerRecord, peer_reliability: PeerReliability, save_db: bool = False) -> None:
         if not save_db:
             self.host_to_records[peer_record.peer_id] = peer_record
             self.host_to_reliability[peer_reliability.peer_id] = peer_reliability
+            self.dirty_peers.add(peer_record.peer_id)
+            self.schedule_peer(peer_record.peer_id)
             return
 
         added_timestamp = int(time.time())
         cursor = await self.crawl_db.execute(
             "INSERT OR REPLACE INTO peer_records VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                peer_record.peer_id,
-                peer_record.ip_address,
-                peer_record.port,
-                int(peer_record.connected),
-                peer_record.last_try_timestamp,
-                peer_record.try_count,
-                peer_record.connected_timestamp,
-                added_timestamp,
-                peer_record.best_timestamp,
-                peer_record.version,
-                peer_record.handshake_time,
-                peer_record.tls_version,
-            ),
+            peer_record_row(peer_record, added_timestamp),
         )
         await cursor.close()
         cursor = await self.crawl_db.execute(
             "INSERT OR REPLACE INTO peer_reliability"
             " VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                peer_reliability.peer_id,
-                peer_reliability.ignore_till,
-                peer_reliability.ban_till,
-                peer_reliability.stat_2h.weight,
-                peer_reliability.stat_2h.count,
-                peer_reliability.stat_2h.reliability,
-                peer_reliability.stat_8h.weight,
-                peer_reliability.stat_8h.count,
-                peer_reliability.stat_8h.reliability,
-                peer_reliability.stat_1d.weight,
-                peer_reliability.stat_1d.count,
-                peer_reliability.stat_1d.reliability,
-                peer_reliability.stat_1w.weight,
-                peer_reliability.stat_1w.count,
-                peer_reliability.stat_1w.reliability,
-                peer_reliability.stat_1m.weight,
-                peer_reliability.stat_1m.count,
-                peer_reliability.stat_1m.reliability,
-                peer_reliability.tries,
-                peer_reliability.successes,
-            ),
+            peer_reliability_row(peer_reliability),
         )
         await cursor.close()
 
+    def get_eligible_time(self, peer_id: str) -> float | None:
+        """
+        Returns the time from which the peer can be crawled, or None if it
+        isn't a complete peer (it's missing its record or reliability).
+        """
+        record = self.host_to_records.get(peer_id)
+        reliability = self.host_to_reliability.get(peer_id)
+        if record is None or reliability is None:
+            return None
+        delta_time = RETRY_DELAY_V6 if self.host_is_v6[peer_id] else RETRY_DELAY_V4
+        eligible_time = float(max(record.last_try_timestamp, record.connected_timestamp) + delta_time)
+        # peers we never tried to connect to are crawled even if ignored or banned
+        if record.last_try_timestamp != 0 or record.connected_timestamp != 0:
+            eligible_time = max(eligible_time, reliability.ignore_till + 1, reliability.ban_till + 1)
+        last_selected = self.host_to_selected_time.get(peer_id)
+        if last_selected is not None:
+            eligible_time = max(eligible_time, last_selected + SELECTION_COOLDOWN)
+        return eligible_time
+
+    def schedule_peer(self, peer_id: str) -> None:
+        """
+        (Re)computes when the peer becomes eligible to be crawled, and queues
+        it. Must be called whenever its record, reliability or selection time
+        changes.
+        """
+        if peer_id not in self.host_is_v6:
+            self.host_is_v6[peer_id] = is_ipv6(peer_id)
+        eligible_time = self.get_eligible_time(peer_id)
+        if eligible_time == self.host_to_eligible_time.get(peer_id):
+            return
+        self.unschedule_peer(peer_id)
+        if eligible_time is None:
+            return
+        self.host_to_eligible_time[peer_id] = eligible_time
+        heapq.heappush(self.crawl_queue, (eligible_time, peer_id))
+
+    def unschedule_peer(self, peer_id: str) -> None:
+        # any entry left in crawl_queue is now stale
+        self.host_to_eligible_time.pop(peer_id, None)
+        self.eligible_v4.remove(peer_id)
+        self.eligible_v6.remove(peer_id)
+
+    def rebuild_crawl_queue(self) -> None:
+        self.crawl_queue = []
+        self.host_to_eligible_time = {}
+        self.eligible_v4 = EligiblePeers()
+        self.eligible_v6 = EligiblePeers()
+        for peer_id in self.host_to_reliability:
+            self.schedule_peer(peer_id)
+
     async def get_peer_reliability(self, peer_id: str) -> PeerReliability:
         return self.host_to_reliability[peer_id]
 
@@ -184,63 +273,29 @@ class CrawlStore:
             await self.peer_failed_to_connect(record)
 
     async def get_peers_to_crawl(self, min_batch_size: int, max_batch_size: int) -> list[PeerRecord]:
-        now = int(time.time())
-        records = []
-        records_v6 = []
-        counter = 0
-        self.ignored_peers = 0
-        self.banned_peers = 0
-        for peer_id, reliability in self.host_to_reliability.items():
-            add = False
-            counter += 1
-            if reliability.ignore_till < now and reliability.ban_till < now:
-                add = True
-            elif reliability.ban_till >= now:
-                self.banned_peers += 1
-            elif reliability.ignore_till >= now:
-                self.ignored_peers += 1
-            record = self.host_to_records[peer_id]
-            if record.last_try_timestamp == 0 and record.connected_timestamp == 0:
-                add = True
-            if peer_id in self.host_to_selected_time:
-                last_selected = self.host_to_selected_time[peer_id]
-                if time.time() - last_selected < 120:
-                    add = False
-            if add:
-                v6 = True
-                try:
-                    _ = ipaddress.IPv6Address(peer_id)
-                except ValueError:
-                    v6 = False
-                delta_time = 600 if v6 else 1000
-                if now - record.last_try_timestamp >= delta_time and now - record.connected_timestamp >= delta_time:
-                    if not v6:
-                        records.append(record)
-                    else:
-                        records_v6.append(record)
-
-        batch_size = max(min_batch_size, len(records) // 10)
+        now = time.time()
+        while len(self.crawl_queue) > 0 and self.crawl_queue[0][0] <= now:
+            eligible_time, peer_id = heapq.heappop(self.crawl_queue)
+            if self.host_to_eligible_time.get(peer_id) != eligible_time:
+                continue
+            if self.host_is_v6[peer_id]:
+                self.eligible_v6.add(peer_id)
+            else:
+                self.eligible_v4.add(peer_id)
+
+        batch_size = max(min_batch_size, len(self.eligible_v4) // 10)
         batch_size = min(batch_size, max_batch_size)
-        if len(records) > batch_size:
-            random.shuffle(records)
-            records = records[:batch_size]
-        if len(records_v6) > batch_size:
-            random.shuffle(records_v6)
-            records_v6 = records_v6[:batch_size]
-        records += records_v6
-        for record in records:
-            self.host_to_selected_time[record.peer_id] = time.time()
+        selected = self.eligible_v4.sample(batch_size) + self.eligible_v6.sample(batch_size)
+        records = [self.host_to_records[peer_id] for peer_id in selected]
+        for peer_id in selected:
+            self.host_to_selected_time[peer_id] = time.time()
+            self.schedule_peer(peer_id)
         return records
 
     def get_ipv6_peers(self) -> int:
         counter = 0
         for peer_id in self.host_to_reliability:
-            v6 = True
-            try:
-                _ = ipaddress.IPv6Address(peer_id)
-            except ValueError:
-                v6 = False
-            if v6:
+            if is_ipv6(peer_id):
                 counter += 1
         return counter
 
@@ -257,13 +312,28 @@ class CrawlStore:
         return self.reliable_peers
 
     async def load_to_db(self) -> None:
-        log.warning("Saving peers to DB...")
-        for peer_id in list(self.host_to_reliability.keys()):
+        log.warning(f"Saving {len(self.dirty_peers)} changed peers to DB...")
+        added_timestamp = int(time.time())
+        record_rows = []
+        reliability_rows = []
+        for peer_id in self.dirty_peers:
             if peer_id in self.host_to_reliability and peer_id in self.host_to_records:
-                reliability = self.host_to_reliability[peer_id]
-                record = self.host_to_records[peer_id]
-                await self.add_peer(record, reliability, True)
+                record_rows.append(peer_record_row(self.host_to_records[peer_id], added_timestamp))
+                reliability_rows.append(peer_reliability_row(self.host_to_reliability[peer_id]))
+        cursor = await self.crawl_db.executemany(
+            "INSERT OR REPLACE INTO peer_records VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", record_rows
+        )
+        await cursor.close()
+        cursor = await self.crawl_db.executemany(
+            "INSERT OR REPLACE INTO peer_reliability"
+            " VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            reliability_rows,
+        )
+        await cursor.close()
         await self.crawl_db.commit()
+        # only forget the changes once they're committed, so a failed save is
+        # retried in full
+        self.dirty_peers.clear()
         log.warning(" - Done saving peers to DB")
 
     async def unload_from_db(self) -> None:
@@ -312,13 +382,24 @@ class CrawlStore:
             )
             self.host_to_records[peer.peer_id] = peer
         log.warning("  - Done loading peer records...")
+        self.dirty_peers = set()
+        self.rebuild_crawl_queue()
 
     # Crawler -> DNS.
     async def load_reliable_peers_to_db(self) -> None:
+        now = int(time.time())
         peers = []
+        # the banned and ignored peers are counted here, since we go through
+        # all the peers anyway
+        self.banned_peers = 0
+        self.ignored_peers = 0
         for peer_id, reliability in self.host_to_reliability.items():
             if reliability.is_reliable():
                 peers.append(peer_id)
+            if reliability.ban_till >= now:
+                self.banned_peers += 1
+            elif reliability.ignore_till >= now:
+                self.ignored_peers += 1
         self.reliable_peers = len(peers)
         log.warning("Deleting old good_peers from DB...")
         cursor = await self.crawl_db.execute(
@@ -327,12 +408,11 @@ class CrawlStore:
         await cursor.close()
         log.warning(" - Done deleting old good_peers...")
         log.warning("Saving new good_peers to DB...")
-        for peer_id in peers:
-            cursor = await self.crawl_db.execute(
-                "INSERT OR REPLACE INTO good_peers VALUES(?)",
-                (peer_id,),
-            )
-            await cursor.close()
+        cursor = await self.crawl_db.executemany(
+            "INSERT OR REPLACE INTO good_peers VALUES(?)",
+            [(peer_id,) for peer_id in peers],
+        )
+        await cursor.close()
         await self.crawl_db.commit()
         log.warning(" - Done saving new good_peers to DB...")
 
@@ -419,3 +499,49 @@ class CrawlStore:
 
             if peer_id in self.host_to_reliability:
                 del self.host_to_reliability[peer_id]
+
+            self.dirty_peers.discard(peer_id)
+            self.host_is_v6.pop(peer_id, None)
+            self.unschedule_peer(peer_id)
+
+
+def peer_record_row(peer_record: PeerRecord, added_timestamp: int) -> tuple[object, ...]:
+    return (
+        peer_record.peer_id,
+        peer_record.ip_address,
+        peer_record.port,
+        int(peer_record.connected),
+        peer_record.last_try_timestamp,
+        peer_record.try_count,
+        peer_record.connected_timestamp,
+        added_timestamp,
+        peer_record.best_timestamp,
+        peer_record.version,
+        peer_record.handshake_time,
+        peer_record.tls_version,
+    )
+
+
+def peer_reliability_row(peer_reliability: PeerReliability) -> tuple[object, ...]:
+    return (
+        peer_reliability.peer_id,
+        peer_reliability.ignore_till,
+        peer_reliability.ban_till,
+        peer_reliability.stat_2h.weight,
+        peer_reliability.stat_2h.count,
+        peer_reliability.stat_2h.reliability,
+        peer_reliability.stat_8h.weight,
+        peer_reliability.stat_8h.count,
+        peer_reliability.stat_8h.reliability,
+        peer_reliability.stat_1d.weight,
+        peer_reliability.stat_1d.count,
+        peer_reliability.stat_1d.reliability,
+        peer_reliability.stat_1w.weight,
+        peer_reliability.stat_1w.count,
+        peer_reliability.stat_1w.reliability,
+        peer_reliability.stat_1m.weight,
+        peer_reliability.stat_1m.count,
+        peer_reliability.stat_1m.reliability,
+        peer_reliability.tries,
+        peer_reliability.successes,
+    )
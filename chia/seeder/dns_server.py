@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import signal
+import struct
 import sys
 import traceback
 from collections.abc import AsyncIterator, Awaitable, Callable
@@ -16,7 +17,22 @@ from typing import Any
 
 import aiosqlite
 import dns.asyncresolver
-from dnslib import AAAA, EDNS0, NS, QTYPE, RCODE, RD, RR, SOA, A, DNSError, DNSHeader, DNSQuestion, DNSRecord
+from dnslib import (
+    AAAA,
+    EDNS0,
+    NS,
+    QTYPE,
+    RCODE,
+    RD,
+    RR,
+    SOA,
+    A,
+    DNSError,
+    DNSHeader,
+    DNSLabel,
+    DNSQuestion,
+    DNSRecord,
+)
 
 from chia.seeder.crawl_store import CrawlStore
 from chia.server.signal_handlers import SignalHandlers
@@ -28,7 +44,18 @@ from chia.util.task_referencer import create_referenced_task
 
 SERVICE_NAME = "seeder"
 log = logging.getLogger(__name__)
-DnsCallback = Callable[[DNSRecord], Awaitable[DNSRecord]]
+# The callback either returns a DNSRecord, or an already packed response.
+DnsCallback = Callable[[DNSRecord], Awaitable[DNSRecord | bytes]]
+# The answers to A, AAAA and ANY queries for the domain are packed ahead of
+# time. This is the maximum number of packed responses per query type, each
+# one holding the next set of peers.
+MAX_PACKED_RESPONSES = 1024
+# The number of peers in the answer for each query type we pack ahead of time.
+PACKED_RESPONSE_PEERS: dict[int, tuple[int, int]] = {
+    QTYPE.A: (32, 0),
+    QTYPE.AAAA: (0, 32),
+    QTYPE.ANY: (16, 16),
+}
 
 
 # DNS snippet taken from: https://gist.github.com/pklaus/b5a7876d4d2cf7271873
@@ -59,7 +86,7 @@ class UDPDNSServerProtocol(asyncio.DatagramProtocol):
 
     callback: DnsCallback
     transport: asyncio.DatagramTransport | None = field(init=False, default=None)
-    data_queue: asyncio.Queue[tuple[DNSRecord, tuple[str, int]]] = field(default_factory=asyncio.Queue)
+    data_queue: asyncio.Queue[tuple[DNSRecord | bytes, tuple[str, int]]] = field(default_factory=asyncio.Queue)
     queue_task: asyncio.Task[None] | None = field(init=False, default=None)
 
     def start(self) -> None:
@@ -95,14 +122,18 @@ class UDPDNSServerProtocol(asyncio.DatagramProtocol):
             try:
                 edns_max_size = 0
                 reply, caller = await self.data_queue.get()
-                if len(reply.ar) > 0 and reply.ar[0].rtype == QTYPE.OPT:
-                    edns_max_size = reply.ar[0].edns_len
+                if isinstance(reply, bytes):
+                    # packed responses are only used when they fit
+                    reply_packed = reply
+                else:
+                    if len(reply.ar) > 0 and reply.ar[0].rtype == QTYPE.OPT:
+                        edns_max_size = reply.ar[0].edns_len
 
-                reply_packed = reply.pack()
+                    reply_packed = reply.pack()
 
-                if len(reply_packed) > max(512, edns_max_size):  # 512 is the default max size for DNS:
-                    log.debug(f"DNS response to {caller} is too large, truncating.")
-                    reply_packed = reply.truncate().pack()
+                    if len(reply_packed) > max(512, edns_max_size):  # 512 is the default max size for DNS:
+                        log.debug(f"DNS response to {caller} is too large, truncating.")
+                        reply_packed = reply.truncate().pack()
 
                 self.transport.sendto(reply_packed, caller)
                 log.debug(f"Sent UDP DNS response to {caller}, of size {len(reply_packed)}.")
@@ -224,11 +255,11 @@ class TCPDNSServerProtocol(asyncio.BufferedProtocol):
             log.error(f"Exception while responding to TCP DNS request: {e}. Traceback: {traceback.format_exc()}.")
 
 
-def dns_response_to_tcp(data: DNSRecord) -> bytes:
+def dns_response_to_tcp(data: DNSRecord | bytes) -> bytes:
     """
-    Converts a DNSRecord response to a TCP DNS response, by adding a 2 byte length field to the start.
+    Converts a DNSRecord (or packed) response to a TCP DNS response, by adding a 2 byte length field to the start.
     """
-    dns_response = data.pack()
+    dns_response = data if isinstance(data, bytes) else data.pack()
     dns_response_length = len(dns_response).to_bytes(2, byteorder="big")
     return bytes(dns_response_length + dns_response)
 
@@ -255,7 +286,7 @@ def parse_dns_request(data: bytes) -> DNSRecord | None:
     return dns_request
 
 
-async def get_dns_reply(callback: DnsCallback, dns_request: DNSRecord) -> DNSRecord:
+async def get_dns_reply(callback: DnsCallback, dns_request: DNSRecord) -> DNSRecord | bytes:
     """
     This function calls the callback, and returns SERVFAIL if the callback raises an exception.
     """
@@ -300,6 +331,10 @@ class DNSServer:
     resolver: dns.asyncresolver.Resolver | None = field(init=False)
     pointer_v4: int = 0
     pointer_v6: int = 0
+    # query type -> the packed responses (after the question section) and
+    # their answer and authority record counts
+    packed_responses: dict[int, list[tuple[bytes, int, int]]] = field(default_factory=dict)
+    packed_pointers: dict[int, int] = field(default_factory=dict)
 
     def __post_init__(self) -> None:
         """
@@ -475,6 +510,66 @@ class DNSServer:
                 f" IPv4 count - {len(self.reliable_peers_v4)}"
                 f" IPv6 count - {len(self.reliable_peers_v6)}"
             )
+            self.pack_responses()
+
+    def pack_responses(self) -> None:
+        """
+        Packs the responses to the A, AAAA and ANY queries for our domain, for
+        each set of peers that get_peers_to_respond() would rotate through.
+        The packing is done by dnslib, for a question with our domain name.
+        Since the rest of the response only refers to that name (through
+        compression pointers), it's valid for any question with the same name,
+        whatever its case.
+        """
+        packed_responses: dict[int, list[tuple[bytes, int, int]]] = {}
+        question_length = len(encode_name(DNSLabel(self.domain).label)) + 4
+        for question_type, (ipv4_count, ipv6_count) in PACKED_RESPONSE_PEERS.items():
+            ipv4_sets = rotate_peers(self.reliable_peers_v4, ipv4_count)
+            ipv6_sets = rotate_peers(self.reliable_peers_v6, ipv6_count)
+            num_responses = min(MAX_PACKED_RESPONSES, max(len(ipv4_sets), len(ipv6_sets)))
+            responses: list[tuple[bytes, int, int]] = []
+            for i in range(num_responses):
+                ipv4_peers = ipv4_sets[i % len(ipv4_sets)] if len(ipv4_sets) > 0 else []
+                ipv6_peers = ipv6_sets[i % len(ipv6_sets)] if len(ipv6_sets) > 0 else []
+                template = DNSRecord(DNSHeader(qr=1, aa=1, ra=0), q=DNSQuestion(self.domain, question_type))
+                self.add_records(template, question_type, DNSLabel(self.domain), PeerList(ipv4_peers, ipv6_peers))
+                packed = template.pack()
+                responses.append((packed[12 + question_length :], len(template.rr), len(template.auth)))
+            packed_responses[question_type] = responses
+        self.packed_responses = packed_responses
+        self.packed_pointers = {}
+
+    def get_packed_response(self, request: DNSRecord) -> bytes | None:
+        """
+        Returns the packed response to a request from the responses packed ahead
+        of time, if it's an A, AAAA or ANY query for our domain, and the
+        response fits. Otherwise returns None.
+        """
+        question: DNSQuestion = request.q
+        responses = self.packed_responses.get(question.qtype)
+        if responses is None or len(responses) == 0 or len(request.questions) != 1:
+            return None
+        if str(question.qname).lower() != self.domain:
+            return None
+        pointer = self.packed_pointers.get(question.qtype, 0)
+        self.packed_pointers[question.qtype] = (pointer + 1) % len(responses)
+        body, answer_count, auth_count = responses[pointer]
+
+        max_size = 512  # 512 is the default max size for DNS
+        additional = b""
+        if len(request.ar) > 0 and request.ar[0].rtype == QTYPE.OPT:  # OPT Means EDNS
+            udp_len = min(4096, request.ar[0].edns_len)
+            max_size = max(max_size, udp_len)
+            # the EDNS0 OPT record: root name, type, udp length as class, ttl and rdlength of 0
+            additional = b"\x00" + struct.pack("!HHIH", QTYPE.OPT, udp_len, 0, 0)
+        # QR, AA and RD are set, like in create_dns_reply()
+        header = struct.pack("!HHHHHH", request.header.id, 0x8500, 1, answer_count, auth_count, 1 if additional else 0)
+        packed_question = encode_name(question.qname.label) + struct.pack("!HH", question.qtype, question.qclass)
+        response = header + packed_question + body + additional
+        if len(response) > max_size:
+            # it will have to be truncated
+            return None
+        return response
 
     async def get_peers_to_respond(self, ipv4_count: int, ipv6_count: int) -> PeerList:
         async with self.lock:
@@ -500,11 +595,14 @@ class DNSServer:
                 self.pointer_v6 = (self.pointer_v6 + ipv6_count) % size  # mark where we left off
             return PeerList(ipv4_peers, ipv6_peers)
 
-    async def dns_response(self, request: DNSRecord) -> DNSRecord:
+    async def dns_response(self, request: DNSRecord) -> DNSRecord | bytes:
         """
         This function is called when a DNS request is received, and it returns a DNS response.
         It does not catch any errors as it is called from within a try-except block.
         """
+        packed_response = self.get_packed_response(request)
+        if packed_response is not None:
+            return packed_response
         reply = create_dns_reply(request)
         dns_question: DNSQuestion = request.q  # this is the question / request
         question_type: int = dns_question.qtype  # the type of the record being requested
@@ -523,9 +621,6 @@ class DNSServer:
             reply.header.rcode = RCODE.REFUSED
             return reply
 
-        ttl: int = self.ttl
-        # we add these to the list as it will allow us to respond to ns and soa requests
-        ips: list[RD] = [self.soa_record, *self.ns_records]
         ipv4_count = 0
         ipv6_count = 0
         if question_type is QTYPE.A:
@@ -540,6 +635,18 @@ class DNSServer:
         peers: PeerList = await self.get_peers_to_respond(ipv4_count, ipv6_count)
         if peers.no_peers:
             log.error("No peers found, returning SOA and NS records only.")
+        self.add_records(reply, question_type, qname, peers)
+        return reply
+
+    def add_records(self, reply: DNSRecord, question_type: int, qname: DNSLabel, peers: PeerList) -> None:
+        """
+        Adds the answer and authority records, and the response code, to the reply.
+        """
+        qname_str = str(qname).lower()
+        ttl: int = self.ttl
+        # we add these to the list as it will allow us to respond to ns and soa requests
+        ips: list[RD] = [self.soa_record, *self.ns_records]
+        if peers.no_peers:
             ttl = 60  # 1 minute as we should have some peers very soon
         # we always return the SOA and NS records, so we continue even if there are no peers
         ips.extend([A(str(peer)) for peer in peers.ipv4])
@@ -563,7 +670,25 @@ class DNSServer:
         for nameserver in self.ns_records:
             reply.add_auth(RR(rname=self.domain, rtype=QTYPE.NS, rclass=1, ttl=ttl, rdata=nameserver))
         reply.add_auth(RR(rname=self.domain, rtype=QTYPE.SOA, rclass=1, ttl=ttl, rdata=self.soa_record))
-        return reply
+
+
+def rotate_peers(peers: list[IPv4Address] | list[IPv6Address], count: int) -> list[list[Any]]:
+    """
+    Returns the successive sets of count peers, wrapping around the list.
+    """
+    size = len(peers)
+    if count == 0 or size == 0:
+        return []
+    if size <= count:
+        return [list(peers)]
+    return [[peers[(start + i) % size] for i in range(count)] for start in range(0, size, count)]
+
+
+def encode_name(labels: tuple[bytes, ...]) -> bytes:
+    """
+    Encodes a domain name in wire format, without compression.
+    """
+    return b"".join(bytes([len(label)]) + label for label in labels) + b"\x00"
 
 
 async def run_dns_server(dns_server: DNSServer) -> None:  # pragma: no cover
@@ -4,7 +4,9 @@ import functools
 import io
 import logging
 import math
+import os
 import time
+from array import array
 from asyncio import Lock
 from dataclasses import dataclass, field
 from ipaddress import IPv4Address, IPv6Address, ip_address
@@ -14,10 +16,12 @@ from secrets import randbits
 from timeit import default_timer as timer
 
 import aiofiles
-from chia_rs.sized_ints import uint16, uint32, uint64
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint8, uint16, uint32, uint64
 
 from chia.server.address_manager_store import PeerDataSerialization
 from chia.types.peer_info import PeerInfo, TimestampedPeerInfo
+from chia.util.files import write_file_async
 from chia.util.hash import std_hash
 from chia.util.ip_address import IPAddress
 
@@ -35,6 +39,13 @@ HORIZON_DAYS = 30
 MAX_RETRIES = 3
 MIN_FAIL_DAYS = 7
 MAX_FAILURES = 10
+# The journal is compacted into the peers file once it grows larger than the
+# peers file (and at least this size).
+MIN_JOURNAL_COMPACTION_SIZE = 64 * 1024
+# journal record types
+JOURNAL_REMOVED = 0
+JOURNAL_NEW = 1
+JOURNAL_TRIED = 2
 
 log = logging.getLogger(__name__)
 
@@ -214,12 +225,55 @@ class ExtendedPeerInfo:
         return chance
 
 
-def create_tried_matrix() -> list[list[int]]:
-    return [[-1 for x in range(BUCKET_SIZE)] for y in range(TRIED_BUCKET_COUNT)]
+# The tables are flat arrays of node IDs (-1 for an empty position), indexed
+# by bucket * BUCKET_SIZE + position.
+def create_tried_matrix() -> array[int]:
+    return array("q", [-1]) * (TRIED_BUCKET_COUNT * BUCKET_SIZE)
 
 
-def create_new_matrix() -> list[list[int]]:
-    return [[-1 for x in range(BUCKET_SIZE)] for y in range(NEW_BUCKET_COUNT)]
+def create_new_matrix() -> array[int]:
+    return array("q", [-1]) * (NEW_BUCKET_COUNT * BUCKET_SIZE)
+
+
+@dataclass
+class TablePositions:
+    """
+    The used positions of a table, supporting O(1) updates and picking a random
+    position.
+    """
+
+    positions: array[int] = field(default_factory=lambda: array("q"))
+    index: dict[int, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, position: int) -> None:
+        if position in self.index:
+            return
+        self.index[position] = len(self.positions)
+        self.positions.append(position)
+
+    def remove(self, position: int) -> None:
+        idx = self.index.pop(position, None)
+        if idx is None:
+            return
+        last = self.positions.pop()
+        if last != position:
+            self.positions[idx] = last
+            self.index[last] = idx
+
+    def random(self) -> int:
+        return self.positions[randrange(len(self.positions))]
+
+
+def get_journal_path(peers_file_path: Path) -> Path:
+    return peers_file_path.with_name(peers_file_path.name + ".journal")
+
+
+def encode_host(host: str) -> bytes:
+    ip = IPAddress.create(host)
+    return ExtendedPeerInfo.encode_ip_type(ip) + ip.packed
 
 
 # This is a Python port from 'CAddrMan' class from Bitcoin core code.
@@ -228,23 +282,34 @@ class AddressManager:
     id_count: int = 0
     key: int = field(default_factory=functools.partial(randbits, 256))
     random_pos: list[int] = field(default_factory=list)
-    tried_matrix: list[list[int]] = field(default_factory=create_tried_matrix)
-    new_matrix: list[list[int]] = field(default_factory=create_new_matrix)
+    tried_matrix: array[int] = field(default_factory=create_tried_matrix)
+    new_matrix: array[int] = field(default_factory=create_new_matrix)
     tried_count: int = 0
     new_count: int = 0
     map_addr: dict[str, int] = field(default_factory=dict)
     map_info: dict[int, ExtendedPeerInfo] = field(default_factory=dict)
     last_good: int = 1
     tried_collisions: list[int] = field(default_factory=list)
-    used_new_matrix_positions: set[tuple[int, int]] = field(default_factory=set)
-    used_tried_matrix_positions: set[tuple[int, int]] = field(default_factory=set)
+    used_new_matrix_positions: TablePositions = field(default_factory=TablePositions)
+    used_tried_matrix_positions: TablePositions = field(default_factory=TablePositions)
+    # node_id -> its positions in the new table
+    node_new_positions: dict[int, list[int]] = field(default_factory=dict)
     allow_private_subnets: bool = False
     lock: Lock = field(default_factory=Lock)
+    # Between the (periodic) compactions into the peers file, the changes are
+    # appended to a journal. It starts with the hash of the peers file it
+    # applies to, followed by one batch of records per save, for the hosts that
+    # changed since the previous save.
+    dirty_hosts: set[str] = field(default_factory=set)
+    snapshot_hash: bytes32 | None = None
+    snapshot_size: int = 0
+    journal_size: int = 0
 
     @classmethod
     async def create_address_manager(cls, peers_file_path: Path) -> AddressManager:
         """
-        Create an address manager using data deserialized from a peers file.
+        Create an address manager using data deserialized from a peers file, and
+        the journal of the changes since.
         """
         address_manager: AddressManager | None = None
         if peers_file_path.exists():
@@ -256,7 +321,10 @@ class AddressManager:
                 try:
                     # try using the new method
                     async with aiofiles.open(peers_file_path, "rb") as f:
-                        address_manager = cls.deserialize_bytes(io.BytesIO(await f.read()))
+                        data = await f.read()
+                    address_manager = cls.deserialize_bytes(io.BytesIO(data))
+                    address_manager.snapshot_hash = std_hash(data)
+                    address_manager.snapshot_size = len(data)
                 except Exception:
                     log.exception(f"Unable to create address_manager from {peers_file_path}")
 
@@ -264,8 +332,165 @@ class AddressManager:
             log.info("Creating new address_manager")
             address_manager = AddressManager()
 
+        journal_path = get_journal_path(peers_file_path)
+        if journal_path.exists():
+            async with aiofiles.open(journal_path, "rb") as f:
+                journal = await f.read()
+            if address_manager.snapshot_hash is not None and journal[:32] == address_manager.snapshot_hash:
+                address_manager.replay_journal(journal)
+                address_manager.journal_size = len(journal)
+            else:
+                # it doesn't apply to this peers file
+                log.warning(f"Ignoring stale peers journal {journal_path}")
+                os.remove(journal_path)
+
         return address_manager
 
+    async def save(self, peers_file_path: Path) -> None:
+        """
+        Appends the changes since the last save to the journal, or if it got
+        too large, compacts everything into a new peers file.
+        """
+        async with self.lock:
+            compact = self.snapshot_hash is None or self.journal_size > max(
+                self.snapshot_size, MIN_JOURNAL_COMPACTION_SIZE
+            )
+            if compact:
+                data = self.serialize_bytes()
+                self.dirty_hosts.clear()
+            else:
+                data = self.serialize_journal_batch()
+        journal_path = get_journal_path(peers_file_path)
+        try:
+            if compact:
+                await write_file_async(peers_file_path, data, file_mode=0o644)
+                self.snapshot_hash = std_hash(data)
+                self.snapshot_size = len(data)
+                await write_file_async(journal_path, self.snapshot_hash, file_mode=0o644)
+                self.journal_size = len(self.snapshot_hash)
+            elif len(data) > 0:
+                async with aiofiles.open(journal_path, "ab") as f:
+                    await f.write(data)
+                self.journal_size += len(data)
+        except Exception:
+            # the changes may not have been saved, write everything next time
+            self.snapshot_hash = None
+            raise
+
+    def serialize_journal_batch(self) -> bytes:
+        """
+        Returns the journal batch with the current state of the hosts that
+        changed since the last save, or empty bytes if none did.
+        """
+        if len(self.dirty_hosts) == 0:
+            return b""
+        out = io.BytesIO()
+        uint32(len(self.dirty_hosts)).stream(out)
+        for host in self.dirty_hosts:
+            node_id = self.map_addr.get(host)
+            info = None if node_id is None else self.map_info.get(node_id)
+            if info is None or node_id is None:
+                uint8(JOURNAL_REMOVED).stream(out)
+                out.write(encode_host(host))
+            elif info.is_tried:
+                uint8(JOURNAL_TRIED).stream(out)
+                info.stream(out)
+            else:
+                uint8(JOURNAL_NEW).stream(out)
+                info.stream(out)
+                positions = self.node_new_positions.get(node_id, [])
+                uint8(len(positions)).stream(out)
+                for position in positions:
+                    uint16(position // BUCKET_SIZE).stream(out)
+        self.dirty_hosts.clear()
+        return out.getvalue()
+
+    def replay_journal(self, journal: bytes) -> None:
+        """
+        Applies the batches of the journal (after its 32 bytes header). A
+        batch that can't be parsed, normally because it was only partially
+        written, ends the replay.
+        """
+        data = io.BytesIO(journal)
+        data.seek(32)
+        batches = 0
+        while data.tell() < len(journal):
+            try:
+                records: list[tuple[int, str, ExtendedPeerInfo | None, list[int]]] = []
+                for _ in range(uint32.parse(data)):
+                    record_type = int(uint8.parse(data))
+                    if record_type == JOURNAL_REMOVED:
+                        records.append((record_type, ExtendedPeerInfo.decode_ip(data), None, []))
+                        continue
+                    info = ExtendedPeerInfo.parse(data)
+                    buckets: list[int] = []
+                    if record_type == JOURNAL_NEW:
+                        buckets = [uint16.parse(data) for _ in range(uint8.parse(data))]
+                    elif record_type != JOURNAL_TRIED:
+                        raise ValueError(f"Unknown journal record type {record_type}")
+                    records.append((record_type, info.peer_info.host, info, buckets))
+            except Exception:
+                log.warning(f"Ignoring incomplete peers journal batch, after {batches} batches")
+                break
+            # The records are the final states of all the hosts that changed, so
+            # all of them are removed before any is placed again.
+            for _, host, _, _ in records:
+                node_id = self.map_addr.get(host)
+                if node_id is not None:
+                    self.remove_node_(node_id)
+            for record_type, _, record_info, buckets in records:
+                if record_info is not None:
+                    self.place_node_(record_info, record_type == JOURNAL_TRIED, buckets)
+            batches += 1
+        self.dirty_hosts.clear()
+        log.info(f"Replayed {batches} peers journal batches")
+
+    def remove_node_(self, node_id: int) -> None:
+        info = self.map_info[node_id]
+        if info.is_tried:
+            tried_bucket = info.get_tried_bucket(self.key)
+            tried_bucket_pos = info.get_bucket_position(self.key, False, tried_bucket)
+            if self.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos] == node_id:
+                self._set_tried_matrix(tried_bucket, tried_bucket_pos, -1)
+            self.tried_count -= 1
+        else:
+            for position in list(self.node_new_positions.get(node_id, [])):
+                self._set_new_matrix(position // BUCKET_SIZE, position % BUCKET_SIZE, -1)
+            self.new_count -= 1
+        assert info.random_pos is not None
+        self.swap_random_(info.random_pos, len(self.random_pos) - 1)
+        self.random_pos.pop()
+        del self.map_addr[info.peer_info.host]
+        del self.map_info[node_id]
+
+    def place_node_(self, info: ExtendedPeerInfo, is_tried: bool, buckets: list[int]) -> None:
+        self.id_count += 1
+        node_id = self.id_count
+        if is_tried:
+            tried_bucket = info.get_tried_bucket(self.key)
+            tried_bucket_pos = info.get_bucket_position(self.key, False, tried_bucket)
+            if self.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos] != -1:
+                return
+            info.is_tried = True
+            self._set_tried_matrix(tried_bucket, tried_bucket_pos, node_id)
+            self.tried_count += 1
+        else:
+            for bucket in buckets:
+                bucket_pos = info.get_bucket_position(self.key, True, bucket)
+                if (
+                    self.new_matrix[bucket * BUCKET_SIZE + bucket_pos] == -1
+                    and info.ref_count < NEW_BUCKETS_PER_ADDRESS
+                ):
+                    info.ref_count += 1
+                    self._set_new_matrix(bucket, bucket_pos, node_id)
+            if info.ref_count == 0:
+                return
+            self.new_count += 1
+        self.map_info[node_id] = info
+        self.map_addr[info.peer_info.host] = node_id
+        info.random_pos = len(self.random_pos)
+        self.random_pos.append(node_id)
+
     def serialize_bytes(self) -> bytes:
         out = io.BytesIO()
         nodes = io.BytesIO()
@@ -281,18 +506,17 @@ class AddressManager:
                 info.stream(nodes)
                 count_ids += 1
             if info.is_tried:
-                info.stream(nodes)
+                info.stream(trieds)
 
         out.write(self.key.to_bytes(32, byteorder="big"))
         uint64(count_ids).stream(out)
 
         count = 0
-        for bucket in range(NEW_BUCKET_COUNT):
-            for i in range(BUCKET_SIZE):
-                if self.new_matrix[bucket][i] != -1:
-                    count += 1
-                    uint64(unique_ids[self.new_matrix[bucket][i]]).stream(new_table)
-                    uint64(bucket).stream(new_table)
+        for position, node_id in enumerate(self.new_matrix):
+            if node_id != -1:
+                count += 1
+                uint64(unique_ids[node_id]).stream(new_table)
+                uint64(position // BUCKET_SIZE).stream(new_table)
 
         # give ourselves a clue how long the new_table is
         uint32(count).stream(out)
@@ -334,14 +558,14 @@ class AddressManager:
                 # we're a tried node
                 tried_bucket = info.get_tried_bucket(address_manager.key)
                 tried_bucket_pos = info.get_bucket_position(address_manager.key, False, tried_bucket)
-                if address_manager.tried_matrix[tried_bucket][tried_bucket_pos] == -1:
+                if address_manager.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos] == -1:
                     info.random_pos = len(address_manager.random_pos)
                     info.is_tried = True
                     id_count = address_manager.id_count
                     address_manager.random_pos.append(id_count)
                     address_manager.map_info[id_count] = info
                     address_manager.map_addr[info.peer_info.host] = id_count
-                    address_manager.tried_matrix[tried_bucket][tried_bucket_pos] = id_count
+                    address_manager._set_tried_matrix(tried_bucket, tried_bucket_pos, id_count)
                     address_manager.id_count += 1
                     address_manager.tried_count += 1
 
@@ -350,14 +574,16 @@ class AddressManager:
             if node_id >= 0 and node_id < address_manager.new_count:
                 info = address_manager.map_info[node_id]
                 bucket_pos = info.get_bucket_position(address_manager.key, True, bucket)
-                if address_manager.new_matrix[bucket][bucket_pos] == -1 and info.ref_count < NEW_BUCKETS_PER_ADDRESS:
+                if (
+                    address_manager.new_matrix[bucket * BUCKET_SIZE + bucket_pos] == -1
+                    and info.ref_count < NEW_BUCKETS_PER_ADDRESS
+                ):
                     info.ref_count += 1
-                    address_manager.new_matrix[bucket][bucket_pos] = node_id
+                    address_manager._set_new_matrix(bucket, bucket_pos, node_id)
 
         # remove deads
         address_manager.prune_dead_peers()
-
-        address_manager.load_used_table_positions()
+        address_manager.dirty_hosts.clear()
 
         return address_manager
 
@@ -366,33 +592,52 @@ class AddressManager:
 
     # Use only this method for modifying new matrix.
     def _set_new_matrix(self, row: int, col: int, value: int) -> None:
-        self.new_matrix[row][col] = value
+        position = row * BUCKET_SIZE + col
+        old_value = self.new_matrix[position]
+        if old_value == value:
+            return
+        self.new_matrix[position] = value
+        if old_value != -1:
+            self.node_new_positions[old_value].remove(position)
+            if len(self.node_new_positions[old_value]) == 0:
+                del self.node_new_positions[old_value]
+            self.mark_dirty_(old_value)
         if value == -1:
-            if (row, col) in self.used_new_matrix_positions:
-                self.used_new_matrix_positions.remove((row, col))
-        elif (row, col) not in self.used_new_matrix_positions:
-            self.used_new_matrix_positions.add((row, col))
+            self.used_new_matrix_positions.remove(position)
+        else:
+            self.used_new_matrix_positions.add(position)
+            self.node_new_positions.setdefault(value, []).append(position)
+            self.mark_dirty_(value)
 
     # Use only this method for modifying tried matrix.
     def _set_tried_matrix(self, row: int, col: int, value: int) -> None:
-        self.tried_matrix[row][col] = value
+        position = row * BUCKET_SIZE + col
+        old_value = self.tried_matrix[position]
+        self.tried_matrix[position] = value
+        if old_value != -1:
+            self.mark_dirty_(old_value)
         if value == -1:
-            if (row, col) in self.used_tried_matrix_positions:
-                self.used_tried_matrix_positions.remove((row, col))
-        elif (row, col) not in self.used_tried_matrix_positions:
-            self.used_tried_matrix_positions.add((row, col))
+            self.used_tried_matrix_positions.remove(position)
+        else:
+            self.used_tried_matrix_positions.add(position)
+            self.mark_dirty_(value)
+
+    def mark_dirty_(self, node_id: int) -> None:
+        info = self.map_info.get(node_id)
+        if info is not None:
+            self.dirty_hosts.add(info.peer_info.host)
 
     def load_used_table_positions(self) -> None:
-        self.used_new_matrix_positions = set()
-        self.used_tried_matrix_positions = set()
-        for bucket in range(NEW_BUCKET_COUNT):
-            for pos in range(BUCKET_SIZE):
-                if self.new_matrix[bucket][pos] != -1:
-                    self.used_new_matrix_positions.add((bucket, pos))
-        for bucket in range(TRIED_BUCKET_COUNT):
-            for pos in range(BUCKET_SIZE):
-                if self.tried_matrix[bucket][pos] != -1:
-                    self.used_tried_matrix_positions.add((bucket, pos))
+        self.used_new_matrix_positions = TablePositions()
+        self.used_tried_matrix_positions = TablePositions()
+        self.node_new_positions = {}
+        for position, node_id in enumerate(self.new_matrix):
+            if node_id != -1:
+                self.used_new_matrix_positions.add(position)
+                self.node_new_positions.setdefault(node_id, []).append(position)
+        for position, node_id in enumerate(self.tried_matrix):
+            if node_id != -1:
+                self.used_tried_matrix_positions.add(position)
 
     def prune_dead_peers(self) -> None:
         for id, info in list(self.map_info.items()):
@@ -406,6 +651,7 @@ class AddressManager:
         self.map_addr[addr.host] = node_id
         self.map_info[node_id].random_pos = len(self.random_pos)
         self.random_pos.append(node_id)
+        self.dirty_hosts.add(addr.host)
         return (self.map_info[node_id], node_id)
 
     def find_(self, addr: PeerInfo) -> tuple[ExtendedPeerInfo | None, int | None]:
@@ -428,18 +674,16 @@ class AddressManager:
         self.random_pos[rand_pos_2] = node_id_1
 
     def make_tried_(self, info: ExtendedPeerInfo, node_id: int) -> None:
-        for bucket in range(NEW_BUCKET_COUNT):
-            pos = info.get_bucket_position(self.key, True, bucket)
-            if self.new_matrix[bucket][pos] == node_id:
-                self._set_new_matrix(bucket, pos, -1)
-                info.ref_count -= 1
+        for position in list(self.node_new_positions.get(node_id, [])):
+            self._set_new_matrix(position // BUCKET_SIZE, position % BUCKET_SIZE, -1)
+            info.ref_count -= 1
         assert info.ref_count == 0
         self.new_count -= 1
         cur_bucket = info.get_tried_bucket(self.key)
         cur_bucket_pos = info.get_bucket_position(self.key, False, cur_bucket)
-        if self.tried_matrix[cur_bucket][cur_bucket_pos] != -1:
+        if self.tried_matrix[cur_bucket * BUCKET_SIZE + cur_bucket_pos] != -1:
             # Evict the old node from the tried table.
-            node_id_evict = self.tried_matrix[cur_bucket][cur_bucket_pos]
+            node_id_evict = self.tried_matrix[cur_bucket * BUCKET_SIZE + cur_bucket_pos]
             assert node_id_evict in self.map_info
             old_info = self.map_info[node_id_evict]
             old_info.is_tried = False
@@ -457,8 +701,8 @@ class AddressManager:
         info.is_tried = True
 
     def clear_new_(self, bucket: int, pos: int) -> None:
-        if self.new_matrix[bucket][pos] != -1:
-            delete_id = self.new_matrix[bucket][pos]
+        if self.new_matrix[bucket * BUCKET_SIZE + pos] != -1:
+            delete_id = self.new_matrix[bucket * BUCKET_SIZE + pos]
             delete_info = self.map_info[delete_id]
             assert delete_info.ref_count > 0
             delete_info.ref_count -= 1
@@ -490,18 +734,8 @@ class AddressManager:
         if info.is_tried:
             return None
 
-        # find a bucket it is in now
-        bucket_rand = randrange(NEW_BUCKET_COUNT)
-        new_bucket = -1
-        for n in range(NEW_BUCKET_COUNT):
-            cur_new_bucket = (n + bucket_rand) % NEW_BUCKET_COUNT
-            cur_new_bucket_pos = info.get_bucket_position(self.key, True, cur_new_bucket)
-            if self.new_matrix[cur_new_bucket][cur_new_bucket_pos] == node_id:
-                new_bucket = cur_new_bucket
-                break
-
-        # if no bucket is found, something bad happened;
-        if new_bucket == -1:
+        # if it isn't in any bucket, something bad happened;
+        if node_id not in self.node_new_positions:
             return None
 
         # NOTE(Florin): Double check this. It's not used anywhere else.
@@ -511,7 +745,7 @@ class AddressManager:
         tried_bucket_pos = info.get_bucket_position(self.key, False, tried_bucket)
 
         # Will moving this address into tried evict another entry?
-        if test_before_evict and self.tried_matrix[tried_bucket][tried_bucket_pos] != -1:
+        if test_before_evict and self.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos] != -1:
             if len(self.tried_collisions) < TRIED_COLLISION_SIZE:
                 if node_id not in self.tried_collisions:
                     self.tried_collisions.append(node_id)
@@ -523,7 +757,8 @@ class AddressManager:
         if info is None or info.random_pos is None:
             return None
         self.swap_random_(info.random_pos, len(self.random_pos) - 1)
-        self.random_pos = self.random_pos[:-1]
+        self.random_pos.pop()
+        self.dirty_hosts.add(info.peer_info.host)
         del self.map_addr[info.peer_info.host]
         del self.map_info[node_id]
         self.new_count -= 1
@@ -548,6 +783,7 @@ class AddressManager:
                 info.timestamp > 0 or info.timestamp < addr.timestamp - update_interval - penalty
             ):
                 info.timestamp = max(0, addr.timestamp - penalty)
+                self.dirty_hosts.add(addr.host)
 
             # do not update if no new information is present
             if addr.timestamp == 0 or (info.timestamp > 0 and addr.timestamp <= info.timestamp):
@@ -573,10 +809,10 @@ class AddressManager:
 
         new_bucket = info.get_new_bucket(self.key, source)
         new_bucket_pos = info.get_bucket_position(self.key, True, new_bucket)
-        if self.new_matrix[new_bucket][new_bucket_pos] != node_id:
-            add_to_new = self.new_matrix[new_bucket][new_bucket_pos] == -1
+        if self.new_matrix[new_bucket * BUCKET_SIZE + new_bucket_pos] != node_id:
+            add_to_new = self.new_matrix[new_bucket * BUCKET_SIZE + new_bucket_pos] == -1
             if not add_to_new:
-                info_existing = self.map_info[self.new_matrix[new_bucket][new_bucket_pos]]
+                info_existing = self.map_info[self.new_matrix[new_bucket * BUCKET_SIZE + new_bucket_pos]]
                 if info_existing.is_terrible() or (info_existing.ref_count > 1 and info.ref_count == 0):
                     add_to_new = True
             if add_to_new:
@@ -611,62 +847,27 @@ class AddressManager:
 
         # Use a 50% chance for choosing between tried and new table entries.
         if not new_only and self.tried_count > 0 and (self.new_count == 0 or randrange(2) == 0):
-            chance = 1.0
-            start = time.time()
-            cached_tried_matrix_positions: list[tuple[int, int]] = []
-            if len(self.used_tried_matrix_positions) < math.sqrt(TRIED_BUCKET_COUNT * BUCKET_SIZE):
-                cached_tried_matrix_positions = list(self.used_tried_matrix_positions)
-            while True:
-                if len(self.used_tried_matrix_positions) < math.sqrt(TRIED_BUCKET_COUNT * BUCKET_SIZE):
-                    if len(self.used_tried_matrix_positions) == 0:
-                        log.error(f"Empty tried table, but tried_count shows {self.tried_count}.")
-                        return None
-                    # The table is sparse, randomly pick from positions list.
-                    index = randrange(len(cached_tried_matrix_positions))
-                    tried_bucket, tried_bucket_pos = cached_tried_matrix_positions[index]
-                else:
-                    # The table is dense, randomly trying positions is faster than loading positions list.
-                    tried_bucket = randrange(TRIED_BUCKET_COUNT)
-                    tried_bucket_pos = randrange(BUCKET_SIZE)
-                    while self.tried_matrix[tried_bucket][tried_bucket_pos] == -1:
-                        tried_bucket = (tried_bucket + randbits(LOG_TRIED_BUCKET_COUNT)) % TRIED_BUCKET_COUNT
-                        tried_bucket_pos = (tried_bucket_pos + randbits(LOG_BUCKET_SIZE)) % BUCKET_SIZE
-
-                node_id = self.tried_matrix[tried_bucket][tried_bucket_pos]
-                assert node_id != -1
-                info = self.map_info[node_id]
-                if randbits(30) < (chance * info.get_selection_chance() * (1 << 30)):
-                    end = time.time()
-                    log.debug(f"address_manager.select_peer took {(end - start):.2e} seconds in tried table.")
-                    return info
-                chance *= 1.2
+            table_name = "tried"
+            matrix = self.tried_matrix
+            positions = self.used_tried_matrix_positions
         else:
-            chance = 1.0
-            start = time.time()
-            cached_new_matrix_positions: list[tuple[int, int]] = []
-            if len(self.used_new_matrix_positions) < math.sqrt(NEW_BUCKET_COUNT * BUCKET_SIZE):
-                cached_new_matrix_positions = list(self.used_new_matrix_positions)
-            while True:
-                if len(self.used_new_matrix_positions) < math.sqrt(NEW_BUCKET_COUNT * BUCKET_SIZE):
-                    if len(self.used_new_matrix_positions) == 0:
-                        log.error(f"Empty new table, but new_count shows {self.new_count}.")
-                        return None
-                    index = randrange(len(cached_new_matrix_positions))
-                    new_bucket, new_bucket_pos = cached_new_matrix_positions[index]
-                else:
-                    new_bucket = randrange(NEW_BUCKET_COUNT)
-                    new_bucket_pos = randrange(BUCKET_SIZE)
-                    while self.new_matrix[new_bucket][new_bucket_pos] == -1:
-                        new_bucket = (new_bucket + randbits(LOG_NEW_BUCKET_COUNT)) % NEW_BUCKET_COUNT
-                        new_bucket_pos = (new_bucket_pos + randbits(LOG_BUCKET_SIZE)) % BUCKET_SIZE
-                node_id = self.new_matrix[new_bucket][new_bucket_pos]
-                assert node_id != -1
-                info = self.map_info[node_id]
-                if randbits(30) < chance * info.get_selection_chance() * (1 << 30):
-                    end = time.time()
-                    log.debug(f"address_manager.select_peer took {(end - start):.2e} seconds in new table.")
-                    return info
-                chance *= 1.2
+            table_name = "new"
+            matrix = self.new_matrix
+            positions = self.used_new_matrix_positions
+        if len(positions) == 0:
+            log.error(f"Empty {table_name} table, but counts show {self.tried_count} tried, {self.new_count} new.")
+            return None
+        chance = 1.0
+        start = time.time()
+        while True:
+            node_id = matrix[positions.random()]
+            assert node_id != -1
+            info = self.map_info[node_id]
+            if randbits(30) < chance * info.get_selection_chance() * (1 << 30):
+                end = time.time()
+                log.debug(f"address_manager.select_peer took {(end - start):.2e} seconds in {table_name} table.")
+                return info
+            chance *= 1.2
 
     def resolve_tried_collisions_(self) -> None:
         for node_id in self.tried_collisions[:]:
@@ -678,8 +879,8 @@ class AddressManager:
                 peer = info.peer_info
                 tried_bucket = info.get_tried_bucket(self.key)
                 tried_bucket_pos = info.get_bucket_position(self.key, False, tried_bucket)
-                if self.tried_matrix[tried_bucket][tried_bucket_pos] != -1:
-                    old_id = self.tried_matrix[tried_bucket][tried_bucket_pos]
+                if self.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos] != -1:
+                    old_id = self.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos]
                     old_info = self.map_info[old_id]
                     if time.time() - old_info.last_success < 4 * 60 * 60:
                         resolved = True
@@ -707,7 +908,7 @@ class AddressManager:
         tried_bucket = new_info.get_tried_bucket(self.key)
         tried_bucket_pos = new_info.get_bucket_position(self.key, False, tried_bucket)
 
-        old_id = self.tried_matrix[tried_bucket][tried_bucket_pos]
+        old_id = self.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos]
         return self.map_info[old_id]
 
     def get_peers_(self) -> list[TimestampedPeerInfo]:
@@ -734,16 +935,16 @@ class AddressManager:
 
     def cleanup(self, max_timestamp_difference: int, max_consecutive_failures: int) -> None:
         now = math.floor(time.time())
-        for bucket in range(NEW_BUCKET_COUNT):
-            for pos in range(BUCKET_SIZE):
-                if self.new_matrix[bucket][pos] != -1:
-                    node_id = self.new_matrix[bucket][pos]
-                    cur_info = self.map_info[node_id]
-                    if (
-                        cur_info.timestamp < now - max_timestamp_difference
-                        and cur_info.num_attempts >= max_consecutive_failures
-                    ):
-                        self.clear_new_(bucket, pos)
+        for position in sorted(self.used_new_matrix_positions.positions):
+            node_id = self.new_matrix[position]
+            if node_id == -1:
+                continue
+            cur_info = self.map_info[node_id]
+            if (
+                cur_info.timestamp < now - max_timestamp_difference
+                and cur_info.num_attempts >= max_consecutive_failures
+            ):
+                self.clear_new_(position // BUCKET_SIZE, position % BUCKET_SIZE)
 
     def connect_(self, addr: PeerInfo, timestamp: int) -> None:
         info, _ = self.find_(addr)
@@ -757,6 +958,7 @@ class AddressManager:
         update_interval = 20 * 60
         if timestamp - info.timestamp > update_interval:
             info.timestamp = timestamp
+            self.dirty_hosts.add(addr.host)
 
     async def size(self) -> int:
         async with self.lock:
@@ -862,14 +1064,14 @@ class AddressManager:
             for node_id, info in tried_table_nodes:
                 tried_bucket = info.get_tried_bucket(address_manager.key)
                 tried_bucket_pos = info.get_bucket_position(address_manager.key, False, tried_bucket)
-                if address_manager.tried_matrix[tried_bucket][tried_bucket_pos] == -1:
+                if address_manager.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos] == -1:
                     info.random_pos = len(address_manager.random_pos)
                     info.is_tried = True
                     id_count = address_manager.id_count
                     address_manager.random_pos.append(id_count)
                     address_manager.map_info[id_count] = info
                     address_manager.map_addr[info.peer_info.host] = id_count
-                    address_manager.tried_matrix[tried_bucket][tried_bucket_pos] = id_count
+                    address_manager.tried_matrix[tried_bucket * BUCKET_SIZE + tried_bucket_pos] = id_count
                     address_manager.id_count += 1
                     address_manager.tried_count += 1
                 # else:
@@ -881,15 +1083,16 @@ class AddressManager:
                     info = address_manager.map_info[node_id]
                     bucket_pos = info.get_bucket_position(address_manager.key, True, bucket)
                     if (
-                        address_manager.new_matrix[bucket][bucket_pos] == -1
+                        address_manager.new_matrix[bucket * BUCKET_SIZE + bucket_pos] == -1
                         and info.ref_count < NEW_BUCKETS_PER_ADDRESS
                     ):
                         info.ref_count += 1
-                        address_manager.new_matrix[bucket][bucket_pos] = node_id
+                        address_manager.new_matrix[bucket * BUCKET_SIZE + bucket_pos] = node_id
 
             address_manager.prune_dead_peers()
 
             address_manager.load_used_table_positions()
+            address_manager.dirty_hosts.clear()
 
         return address_manager
 
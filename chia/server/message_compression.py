@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from functools import cached_property
+
+import zstd
+
+from chia.protocols.outbound_message import Message
+from chia.protocols.protocol_message_types import ProtocolMessageTypes
+
+# When both peers advertise Capability.COMPRESSED_MESSAGES, the data of these
+# (large) message types is always sent zstd compressed.
+COMPRESSED_MESSAGE_TYPES: frozenset[int] = frozenset(
+    message_type.value
+    for message_type in (
+        ProtocolMessageTypes.respond_block,
+        ProtocolMessageTypes.respond_blocks,
+        ProtocolMessageTypes.respond_unfinished_block,
+        ProtocolMessageTypes.respond_proof_of_weight,
+    )
+)
+
+# compressed messages may not expand beyond the largest message we accept
+# uncompressed (see max_message_size in chia/server/server.py)
+max_decompressed_size = 50 * 1024 * 1024  # 50MB
+
+_ZSTD_MAGIC = 0xFD2FB528
+_SKIPPABLE_MAGIC_MASK = 0xFFFFFFF0
+_SKIPPABLE_MAGIC = 0x184D2A50
+
+
+def zstd_decompressed_size(blob: bytes) -> int:
+    """
+    Returns the total size of the content of all the zstd frames in blob, as
+    declared by their frame headers, without decompressing anything. This lets
+    us reject oversized payloads before allocating memory for them. Raises
+    ValueError if blob is not a sequence of well-formed frames, or if any frame
+    doesn't declare its content size.
+    """
+    view = memoryview(blob)
+    offset = 0
+    total = 0
+    while offset < len(view):
+        if len(view) - offset < 4:
+            raise ValueError("truncated zstd frame")
+        magic = int.from_bytes(view[offset : offset + 4], "little")
+        offset += 4
+        if magic & _SKIPPABLE_MAGIC_MASK == _SKIPPABLE_MAGIC:
+            if len(view) - offset < 4:
+                raise ValueError("truncated zstd skippable frame")
+            offset += 4 + int.from_bytes(view[offset : offset + 4], "little")
+            continue
+        if magic != _ZSTD_MAGIC:
+            raise ValueError("invalid zstd frame magic")
+
+        if offset >= len(view):
+            raise ValueError("truncated zstd frame header")
+        descriptor = view[offset]
+        offset += 1
+        fcs_flag = descriptor >> 6
+        single_segment = (descriptor >> 5) & 1
+        has_checksum = (descriptor >> 2) & 1
+        dict_id_size = (0, 1, 2, 4)[descriptor & 3]
+        fcs_size = (single_segment, 2, 4, 8)[fcs_flag]
+        if fcs_size == 0:
+            raise ValueError("zstd frame does not declare its content size")
+
+        offset += (1 - single_segment) + dict_id_size
+        if offset + fcs_size > len(view):
+            raise ValueError("truncated zstd frame header")
+        content_size = int.from_bytes(view[offset : offset + fcs_size], "little")
+        if fcs_size == 2:
+            content_size += 256
+        offset += fcs_size
+        total += content_size
+
+        # skip over the blocks, the last one has the low bit of its header set
+        while True:
+            if offset + 3 > len(view):
+                raise ValueError("truncated zstd block header")
+            block_header = int.from_bytes(view[offset : offset + 3], "little")
+            offset += 3
+            block_type = (block_header >> 1) & 3
+            if block_type == 3:
+                raise ValueError("invalid zstd block type")
+            # RLE blocks are a single byte repeated block_size times
+            offset += 1 if block_type == 1 else block_header >> 3
+            if block_header & 1:
+                break
+        offset += 4 * has_checksum
+
+    if offset != len(view):
+        raise ValueError("truncated zstd frame")
+    return total
+
+
+def is_passthrough_compatible(blob: bytes) -> bool:
+    """
+    Returns True if blob is zstd compressed data that can be sent to a peer
+    as-is, as part of a CompressedMessage.
+    """
+    try:
+        zstd_decompressed_size(blob)
+    except ValueError:
+        return False
+    return True
+
+
+class CompressedMessage(Message):
+    """
+    A Message whose data is zstd compressed, as sent on the wire to peers that
+    negotiated Capability.COMPRESSED_MESSAGES. Message handlers may return one
+    of these directly, e.g. to pass through blocks as they're stored in the
+    BlockStore, without decompressing and compressing them again.
+    """
+
+    @cached_property
+    def decompressed_size(self) -> int:
+        return zstd_decompressed_size(self.data)
+
+
+def compress_message(message: Message) -> CompressedMessage:
+    return CompressedMessage(message.type, message.id, zstd.compress(message.data))
+
+
+def decompress_message(message: Message, max_size: int = max_decompressed_size) -> Message:
+    """
+    The inverse of compress_message(). Raises ValueError if the data is not
+    valid zstd, or if it would decompress to more than max_size bytes.
+    """
+    size = zstd_decompressed_size(message.data)
+    if size > max_size:
+        raise ValueError(f"compressed message too large: {size} > {max_size}")
+    try:
+        data: bytes = zstd.decompress(message.data)
+    except zstd.Error as e:
+        raise ValueError(f"invalid compressed message: {e}") from e
+    if len(data) != size:
+        raise ValueError("compressed message size mismatch")
+    return Message(message.type, message.id, data)
@@ -24,7 +24,6 @@ from chia.server.address_manager import AddressManager, ExtendedPeerInfo
 from chia.server.server import ChiaServer
 from chia.server.ws_connection import WSChiaConnection
 from chia.types.peer_info import PeerInfo, TimestampedPeerInfo, UnresolvedPeerInfo
-from chia.util.files import write_file_async
 from chia.util.hash import std_hash
 from chia.util.ip_address import IPAddress
 from chia.util.network import resolve
@@ -412,9 +411,7 @@ class FullNodeDiscovery:
                 continue
             serialize_interval = random.randint(15 * 60, 30 * 60)
             await asyncio.sleep(serialize_interval)
-            async with self.address_manager.lock:
-                serialised_bytes = self.address_manager.serialize_bytes()
-            await write_file_async(self.peers_file_path, serialised_bytes, file_mode=0o644)
+            await self.address_manager.save(self.peers_file_path)
 
     async def _periodically_cleanup(self) -> None:
         while not self.is_closed:
@@ -25,6 +25,8 @@ class RateLimiter:
     non_tx_message_counts: int = 0
     non_tx_cumulative_size: int = 0
     get_time: Callable[[], float]
+    _rate_limits_key: tuple[tuple[Capability, ...], tuple[Capability, ...]] | None
+    _rate_limits: tuple[dict[ProtocolMessageTypes, RLSettings | Unlimited], RLSettings] | None
 
     def __init__(
         self,
@@ -50,15 +52,41 @@ class RateLimiter:
         self.percentage_of_limit = percentage_of_limit
         self.non_tx_message_counts = 0
         self.non_tx_cumulative_size = 0
+        self._rate_limits_key = None
+        self._rate_limits = None
+
+    def get_rate_limits(
+        self, our_capabilities: list[Capability], peer_capabilities: list[Capability]
+    ) -> tuple[dict[ProtocolMessageTypes, RLSettings | Unlimited], RLSettings]:
+        """
+        Returns the rate limit table (and aggregate limit) to use for the
+        specified capabilities. A rate limiter belongs to a single connection,
+        whose capabilities are fixed once the handshake completes, so the table
+        is only looked up again if the capabilities change.
+        """
+        key = (tuple(our_capabilities), tuple(peer_capabilities))
+        if self._rate_limits is None or key != self._rate_limits_key:
+            self._rate_limits = get_rate_limits_to_use(our_capabilities, peer_capabilities)
+            self._rate_limits_key = key
+        return self._rate_limits
 
     def process_msg_and_check(
-        self, message: Message, our_capabilities: list[Capability], peer_capabilities: list[Capability]
+        self,
+        message: Message,
+        our_capabilities: list[Capability],
+        peer_capabilities: list[Capability],
+        *,
+        data_size: int | None = None,
     ) -> str | None:
         """
         Returns a string indicating which limit was hit if a rate limit is
         exceeded, and the message should be blocked. Returns None if the limit was not
         hit and the message is good to be sent or received.
+        data_size overrides the size of the message data, e.g. to apply the
+        limits to the decompressed size of a compressed message.
         """
+        if data_size is None:
+            data_size = len(message.data)
 
         current_slot = int(self.get_time() // self.reset_seconds)
         if current_slot != self.current_slot:
@@ -74,14 +102,14 @@ class RateLimiter:
             return None
 
         new_message_counts: int = self.message_counts[message_type] + 1
-        new_cumulative_size: int = self.message_cumulative_sizes[message_type] + len(message.data)
+        new_cumulative_size: int = self.message_cumulative_sizes[message_type] + data_size
         new_non_tx_count: int = self.non_tx_message_counts
         new_non_tx_size: int = self.non_tx_cumulative_size
         proportion_of_limit: float = self.percentage_of_limit / 100
 
         ret: bool = False
         rate_limits: dict[ProtocolMessageTypes, RLSettings | Unlimited]
-        rate_limits, agg_limit = get_rate_limits_to_use(our_capabilities, peer_capabilities)
+        rate_limits, agg_limit = self.get_rate_limits(our_capabilities, peer_capabilities)
 
         try:
             limits: RLSettings | Unlimited = rate_limits[message_type]
@@ -90,7 +118,7 @@ class RateLimiter:
                 assert agg_limit.max_total_size is not None
                 non_tx_max_total_size = agg_limit.max_total_size
                 new_non_tx_count = self.non_tx_message_counts + 1
-                new_non_tx_size = self.non_tx_cumulative_size + len(message.data)
+                new_non_tx_size = self.non_tx_cumulative_size + data_size
                 if new_non_tx_count > non_tx_freq * proportion_of_limit:
                     return " ".join(
                         [
@@ -112,8 +140,8 @@ class RateLimiter:
                 # this message type is not rate limited. This is used for
                 # response messages and must be combined with banning peers
                 # sending unsolicited responses of this type
-                if len(message.data) > limits.max_size:
-                    return f"message size: {len(message.data)} > {limits.max_size}"
+                if data_size > limits.max_size:
+                    return f"message size: {data_size} > {limits.max_size}"
                 ret = True
                 return None
             elif isinstance(limits, RLSettings):
@@ -129,8 +157,8 @@ class RateLimiter:
                             f"(scale factor: {proportion_of_limit})",
                         ]
                     )
-                if len(message.data) > limits.max_size:
-                    return f"message size: {len(message.data)} > {limits.max_size}"
+                if data_size > limits.max_size:
+                    return f"message size: {data_size} > {limits.max_size}"
                 if new_cumulative_size > limits.max_total_size * proportion_of_limit:
                     return " ".join(
                         [
@@ -51,6 +51,33 @@ else:
 max_message_size = 50 * 1024 * 1024  # 50MB
 
 
+@dataclass
+class BroadcastMetrics:
+    """
+    Accumulated cost of broadcasting one message type to all matching peers,
+    i.e. serializing the message and queuing it to each connection.
+    """
+
+    count: int = 0
+    peers: int = 0
+    total_seconds: float = 0
+    max_seconds: float = 0
+
+    def add(self, peers: int, seconds: float) -> None:
+        self.count += 1
+        self.peers += peers
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def to_json_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "peers": self.peers,
+            "average_seconds": self.total_seconds / self.count if self.count > 0 else 0,
+            "max_seconds": self.max_seconds,
+        }
+
+
 def ssl_context_for_server(
     ca_cert: Path,
     ca_key: Path,
@@ -137,6 +164,7 @@ class ChiaServer:
     received_message_callback: ConnectionCallback | None = None
     banned_peers: dict[str, float] = field(default_factory=dict)
     invalid_protocol_ban_seconds: int = INVALID_PROTOCOL_BAN_SECONDS
+    broadcast_metrics: dict[ProtocolMessageTypes, BroadcastMetrics] = field(default_factory=dict)
 
     @classmethod
     def create(
@@ -621,11 +649,7 @@ class ChiaServer:
         node_type: NodeType,
         exclude: bytes32 | None = None,
     ) -> None:
-        await self.validate_broadcast_message_type(messages, node_type)
-        for _, connection in self.all_connections.items():
-            if connection.connection_type is node_type and connection.peer_node_id != exclude:
-                for message in messages:
-                    await connection.send_message(message)
+        await self.broadcast(messages, node_type, exclude=exclude)
 
     async def send_to_all_if(
         self,
@@ -634,11 +658,42 @@ class ChiaServer:
         predicate: Callable[[WSChiaConnection], bool],
         exclude: bytes32 | None = None,
     ) -> None:
+        await self.broadcast(messages, node_type, predicate=predicate, exclude=exclude)
+
+    async def broadcast(
+        self,
+        messages: list[Message],
+        node_type: NodeType,
+        *,
+        predicate: Callable[[WSChiaConnection], bool] | None = None,
+        exclude: bytes32 | None = None,
+    ) -> None:
+        """
+        Sends the messages to all connections of the specified node type. Each
+        message is serialized once, up-front, and the same (immutable) encoding
+        is shared by all the connections it's queued to.
+        """
         await self.validate_broadcast_message_type(messages, node_type)
-        for _, connection in self.all_connections.items():
-            if connection.connection_type is node_type and connection.peer_node_id != exclude and predicate(connection):
-                for message in messages:
-                    await connection.send_message(message)
+        start = time.monotonic()
+        encoded_size = sum(len(message.encoded) for message in messages)
+        peers = 0
+        for connection in list(self.all_connections.values()):
+            if connection.connection_type is not node_type or connection.peer_node_id == exclude:
+                continue
+            if predicate is not None and not predicate(connection):
+                continue
+            peers += 1
+            for message in messages:
+                await connection.send_message(message)
+
+        duration = time.monotonic() - start
+        for message in messages:
+            message_type = ProtocolMessageTypes(message.type)
+            self.broadcast_metrics.setdefault(message_type, BroadcastMetrics()).add(peers, duration)
+        self.log.debug(
+            f"broadcast {', '.join(ProtocolMessageTypes(m.type).name for m in messages)} "
+            f"({encoded_size} bytes) to {peers} peers in {duration:0.4f}s"
+        )
 
     async def send_to_specific(self, messages: list[Message], node_id: bytes32) -> None:
         if node_id in self.all_connections:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import logging
 import math
 import time
@@ -32,6 +33,12 @@ from chia.protocols.protocol_timing import (
 from chia.protocols.shared_protocol import Capability, Error, Handshake, protocol_version
 from chia.server.api_protocol import ApiMetadata, ApiProtocol
 from chia.server.capabilities import known_active_capabilities
+from chia.server.message_compression import (
+    COMPRESSED_MESSAGE_TYPES,
+    CompressedMessage,
+    compress_message,
+    decompress_message,
+)
 from chia.server.rate_limits import RateLimiter
 from chia.types.peer_info import PeerInfo
 from chia.util.errors import ApiError, ConsensusError, Err, ProtocolError, TimestampError
@@ -480,7 +487,8 @@ class WSChiaConnection:
             )
 
             if response is not None:
-                response_message = Message(response.type, full_message.id, response.data)
+                # this preserves the message class, in case the response is already compressed
+                response_message = dataclasses.replace(response, id=full_message.id)
                 await self.send_message(response_message)
             # todo uncomment when enabling none response capability
             # check that this call needs a reply
@@ -637,11 +645,21 @@ class WSChiaConnection:
             return None
 
     async def _send_message(self, message: Message) -> None:
-        encoded: bytes = bytes(message)
+        if self.compression_enabled() and message.type in COMPRESSED_MESSAGE_TYPES:
+            if not isinstance(message, CompressedMessage):
+                message = await asyncio.to_thread(compress_message, message)
+        elif isinstance(message, CompressedMessage):
+            message = decompress_message(message)
+
+        encoded: bytes = message.encoded
         size = len(encoded)
         assert len(encoded) < (2 ** (LENGTH_BYTES * 8))
+        # rate limits always apply to the decompressed size of the message
         limiter_msg = self.outbound_rate_limiter.process_msg_and_check(
-            message, self.local_capabilities, self.peer_capabilities
+            message,
+            self.local_capabilities,
+            self.peer_capabilities,
+            data_size=message.decompressed_size if isinstance(message, CompressedMessage) else None,
         )
         if limiter_msg is not None:
             if not is_localhost(self.peer_info.host) and not is_in_network(
@@ -717,6 +735,14 @@ class WSChiaConnection:
                 message_type = ProtocolMessageTypes(full_message_loaded.type).name
             except Exception:
                 message_type = "Unknown"
+            if self.compression_enabled() and full_message_loaded.type in COMPRESSED_MESSAGE_TYPES:
+                try:
+                    full_message_loaded = decompress_message(full_message_loaded)
+                except ValueError as e:
+                    self.log.error(f"Invalid compressed {message_type} from {self.peer_info.host}: {e}")
+                    create_referenced_task(self.close(RATE_LIMITER_BAN_SECONDS), known_unreferenced=True)
+                    await asyncio.sleep(3)
+                    return None
             limiter_msg = self.inbound_rate_limiter.process_msg_and_check(
                 full_message_loaded, self.local_capabilities, self.peer_capabilities
             )
@@ -783,3 +809,13 @@ class WSChiaConnection:
 
     def has_capability(self, capability: Capability) -> bool:
         return capability in self.peer_capabilities
+
+    def compression_enabled(self) -> bool:
+        """
+        Returns True if both we and the peer support sending the large message
+        types compressed, see Capability.COMPRESSED_MESSAGES.
+        """
+        return (
+            Capability.COMPRESSED_MESSAGES in self.local_capabilities
+            and Capability.COMPRESSED_MESSAGES in self.peer_capabilities
+        )
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from collections import deque
+
+from chia.protocols.timelord_protocol import RequestCompactProofOfTime
+
+# work older than this can safely be assumed to be from the previous batch,
+# and is dropped
+BLUEBOX_WORK_MAX_AGE = 5
+
+
+class BlueboxQueue:
+    """
+    The compact proof of time requests waiting for a bluebox, in the order
+    they were received, indexed by the VDF field they are for.
+    """
+
+    def __init__(self, max_age: float = BLUEBOX_WORK_MAX_AGE) -> None:
+        self.max_age = max_age
+        self.by_field_vdf: dict[int, deque[tuple[float, RequestCompactProofOfTime]]] = {}
+
+    def add(self, now: float, request: RequestCompactProofOfTime) -> None:
+        self.age_out(now)
+        self.by_field_vdf.setdefault(request.field_vdf, deque()).append((now, request))
+
+    def age_out(self, now: float) -> None:
+        for field_vdf, requests in list(self.by_field_vdf.items()):
+            while len(requests) > 0 and now - requests[0][0] > self.max_age:
+                requests.popleft()
+            if len(requests) == 0:
+                del self.by_field_vdf[field_vdf]
+
+    def pop(self, field_vdf: int) -> RequestCompactProofOfTime | None:
+        """
+        Removes and returns the oldest request for `field_vdf`, or the oldest
+        request of any field if there's none for `field_vdf`.
+        """
+        if field_vdf not in self.by_field_vdf:
+            if len(self.by_field_vdf) == 0:
+                return None
+            field_vdf = min(self.by_field_vdf, key=lambda f: self.by_field_vdf[f][0][0])
+        requests = self.by_field_vdf[field_vdf]
+        _, request = requests.popleft()
+        if len(requests) == 0:
+            del self.by_field_vdf[field_vdf]
+        return request
+
+    def __len__(self) -> int:
+        return sum(len(requests) for requests in self.by_field_vdf.values())
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import dataclasses
+import heapq
 import io
 import logging
 import os
@@ -10,7 +11,7 @@ import random
 import tempfile
 import time
 import traceback
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import IO, TYPE_CHECKING, Any, ClassVar, cast
@@ -36,6 +37,7 @@ from chia.protocols.protocol_message_types import ProtocolMessageTypes
 from chia.rpc.rpc_server import StateChangedProtocol, default_get_connections
 from chia.server.server import ChiaServer
 from chia.server.ws_connection import WSChiaConnection
+from chia.timelord.bluebox_queue import BlueboxQueue
 from chia.timelord.iters_from_block import iters_from_block
 from chia.timelord.timelord_state import LastState
 from chia.timelord.types import Chain, IterationType, StateType
@@ -120,7 +122,10 @@ class Timelord:
         self.signage_point_iters: list[tuple[uint64, uint8]] = []
         # For each chain, send those info when the process spawns.
         self.iters_to_submit: dict[Chain, list[uint64]] = {}
-        self.iters_submitted: dict[Chain, list[uint64]] = {}
+        self.iters_submitted: dict[Chain, set[uint64]] = {}
+        # Reward chain iterations submitted and not finished yet, as a heap. Finished iterations are dropped once
+        # they reach the top.
+        self.iters_in_progress: list[uint64] = []
         self.iters_finished: set[uint64] = set()
         # For each iteration submitted, know if it's a signage point, an infusion point or an end of slot.
         self.iteration_to_proof_type: dict[uint64, IterationType] = {}
@@ -146,7 +151,9 @@ class Timelord:
         # Support backwards compatibility for the old `config.yaml` that has field `sanitizer_mode`.
         if not self.bluebox_mode:
             self.bluebox_mode = self.config.get("sanitizer_mode", False)
-        self.pending_bluebox_info: list[tuple[float, timelord_protocol.RequestCompactProofOfTime]] = []
+        self.pending_bluebox_info = BlueboxQueue()
+        # Set by `_notify_work()`, when there's something new for `_manage_chains()` to process.
+        self.has_new_work = False
         self.last_active_time = time.time()
         self.max_allowed_inactivity_time = 60
         self._executor_shutdown_tempfile: IO[bytes] | None = None
@@ -155,6 +162,8 @@ class Timelord:
     @contextlib.asynccontextmanager
     async def manage(self) -> AsyncIterator[None]:
         self.lock: asyncio.Lock = asyncio.Lock()
+        # Notified, with the lock held, whenever the state the main loops act on changes.
+        self.new_work = asyncio.Condition(self.lock)
         self.vdf_server = await asyncio.start_server(
             self._handle_client,
             self.config["vdf_server"]["host"],
@@ -229,11 +238,27 @@ class Timelord:
                 should_close = True
             else:
                 self.free_clients.append((client_ip, reader, writer))
+                self._notify_work()
                 log.debug(f"Added new VDF client {client_ip}.")
         if should_close:
             writer.close()
             await writer.wait_closed()
 
+    def _notify_work(self) -> None:
+        """
+        Wakes up the loops waiting for work. Must be called with `self.lock` held.
+        """
+        self.has_new_work = True
+        self.new_work.notify_all()
+
+    async def _wait_for_work(self, predicate: Callable[[], bool], timeout: float | None = None) -> None:
+        """
+        Waits until `predicate` is true, checking it each time `_notify_work()` is called, or until `timeout` seconds
+        have passed. Must be called with `self.lock` held, it's released while waiting.
+        """
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.new_work.wait_for(predicate), timeout)
+
     async def _stop_chain(self, chain: Chain) -> None:
         try:
             _, _, stop_writer = self.chain_type_to_stream.pop(chain)
@@ -339,7 +364,8 @@ class Timelord:
         self.num_resets += 1
         for chain in [Chain.CHALLENGE_CHAIN, Chain.REWARD_CHAIN, Chain.INFUSED_CHALLENGE_CHAIN]:
             self.iters_to_submit[chain] = []
-            self.iters_submitted[chain] = []
+            self.iters_submitted[chain] = set()
+        self.iters_in_progress = []
         self.iteration_to_proof_type = {}
         if not only_eos:
             for block in self.unfinished_blocks + self.overflow_blocks:
@@ -383,6 +409,7 @@ class Timelord:
         for chain, iters in self.iters_to_submit.items():
             for iteration in iters:
                 assert iteration > 0
+        self._notify_work()
 
     async def _handle_new_peak(self) -> None:
         assert self.new_peak is not None
@@ -453,10 +480,13 @@ class Timelord:
         for chain in [Chain.CHALLENGE_CHAIN, Chain.REWARD_CHAIN, Chain.INFUSED_CHALLENGE_CHAIN]:
             if chain in self.allows_iters:
                 _, _, writer = self.chain_type_to_stream[chain]
-                for iteration in self.iters_to_submit[chain]:
+                while len(self.iters_to_submit[chain]) > 0:
+                    iteration = self.iters_to_submit[chain].pop(0)
                     if iteration in self.iters_submitted[chain]:
                         continue
-                    self.iters_submitted[chain].append(iteration)
+                    self.iters_submitted[chain].add(iteration)
+                    if chain == Chain.REWARD_CHAIN:
+                        heapq.heappush(self.iters_in_progress, iteration)
                     log.debug(f"Submitting iterations to {chain}: {iteration}")
                     assert iteration > 0
                     prefix = str(len(str(iteration)))
@@ -908,8 +938,10 @@ class Timelord:
             await self._reset_chains(first_run=True)
         while not self._shut_down:
             try:
-                await asyncio.sleep(0.1)
                 async with self.lock:
+                    # Wake up at least once a second, to detect stalled chains in `_handle_failures()`.
+                    await self._wait_for_work(lambda: self.has_new_work, timeout=1)
+                    self.has_new_work = False
                     await self._handle_failures()
                     # We've got a new peak, process it.
                     if self.new_peak is not None:
@@ -920,13 +952,11 @@ class Timelord:
                     # Submit pending iterations.
                     await self._submit_iterations()
 
-                    not_finished_iters = [
-                        it for it in self.iters_submitted[Chain.REWARD_CHAIN] if it not in self.iters_finished
-                    ]
-                    if len(not_finished_iters) == 0:
-                        await asyncio.sleep(0.1)
+                    while len(self.iters_in_progress) > 0 and self.iters_in_progress[0] in self.iters_finished:
+                        heapq.heappop(self.iters_in_progress)
+                    if len(self.iters_in_progress) == 0:
                         continue
-                    selected_iter = min(not_finished_iters)
+                    selected_iter = self.iters_in_progress[0]
 
                     # Check for new infusion point and broadcast it if present.
                     await self._check_for_new_ip(selected_iter)
@@ -934,6 +964,9 @@ class Timelord:
                     await self._check_for_new_sp(selected_iter)
                     # Check for end of subslot, respawn chains and build EndOfSubslotBundle.
                     await self._check_for_end_of_subslot(selected_iter)
+                    if selected_iter in self.iters_finished:
+                        # The proofs of the next iteration may be there already.
+                        self._notify_work()
 
             except Exception:
                 tb = traceback.format_exc()
@@ -987,6 +1020,7 @@ class Timelord:
                 async with self.lock:
                     self.vdf_failures.append((chain, proof_label))
                     self.vdf_failures_count += 1
+                    self._notify_work()
                 return
 
             if ok.decode() != "OK":
@@ -996,6 +1030,7 @@ class Timelord:
             if not self.bluebox_mode:
                 async with self.lock:
                     self.allows_iters.append(chain)
+                    self._notify_work()
             else:
                 async with self.lock:
                     assert chain is Chain.BLUEBOX
@@ -1020,6 +1055,7 @@ class Timelord:
                     async with self.lock:
                         self.vdf_failures.append((chain, proof_label))
                         self.vdf_failures_count += 1
+                        self._notify_work()
                     break
 
                 if data == b"STOP":
@@ -1042,6 +1078,7 @@ class Timelord:
                     async with self.lock:
                         self.vdf_failures.append((chain, proof_label))
                         self.vdf_failures_count += 1
+                        self._notify_work()
                     break
 
                 iterations_needed = uint64(int.from_bytes(stdout_bytes_io.read(8), "big", signed=True))
@@ -1086,6 +1123,7 @@ class Timelord:
                     async with self.lock:
                         assert proof_label is not None
                         self.proofs_finished.append((chain, vdf_info, vdf_proof, proof_label))
+                        self._notify_work()
                     self.state_changed(
                         "finished_pot",
                         {
@@ -1121,69 +1159,55 @@ class Timelord:
     async def _manage_discriminant_queue_sanitizer(self) -> None:
         while not self._shut_down:
             async with self.lock:
+                await self._wait_for_work(lambda: len(self.pending_bluebox_info) > 0 and len(self.free_clients) > 0)
                 try:
                     while len(self.pending_bluebox_info) > 0 and len(self.free_clients) > 0:
                         # Select randomly the field_vdf we're creating a compact vdf for.
                         # This is done because CC_SP and CC_IP are more frequent than
                         # CC_EOS and ICC_EOS. This guarantees everything is picked uniformly.
-                        target_field_vdf = random.randint(1, 4)
-                        info = next(
-                            (info for info in self.pending_bluebox_info if info[1].field_vdf == target_field_vdf),
-                            None,
-                        )
-                        if info is None:
-                            # Nothing found with target_field_vdf, just pick the first VDFInfo.
-                            info = self.pending_bluebox_info[0]
+                        # If there's nothing for the target field_vdf, the oldest request is picked.
+                        info = self.pending_bluebox_info.pop(random.randint(1, 4))
+                        assert info is not None
                         ip, reader, writer = self.free_clients[0]
                         self.process_communication_tasks.append(
                             create_referenced_task(
                                 self._do_process_communication(
                                     Chain.BLUEBOX,
-                                    info[1].new_proof_of_time.challenge,
+                                    info.new_proof_of_time.challenge,
                                     ClassgroupElement.get_default_element(),
                                     ip,
                                     reader,
                                     writer,
-                                    info[1].new_proof_of_time.number_of_iterations,
-                                    info[1].header_hash,
-                                    info[1].height,
-                                    info[1].field_vdf,
+                                    info.new_proof_of_time.number_of_iterations,
+                                    info.header_hash,
+                                    info.height,
+                                    info.field_vdf,
                                 )
                             )
                         )
-                        self.pending_bluebox_info.remove(info)
                         self.free_clients = self.free_clients[1:]
                 except Exception as e:
                     log.error(f"Exception manage discriminant queue: {e}")
-            await asyncio.sleep(0.1)
 
     async def _start_manage_discriminant_queue_sanitizer_slow(self, pool: ThreadPoolExecutor, counter: int) -> None:
         tasks = []
         for _ in range(counter):
             tasks.append(create_referenced_task(self._manage_discriminant_queue_sanitizer_slow(pool)))
-        for task in tasks:
-            await task
+        # Cancelling the gathering cancels all the tasks.
+        await asyncio.gather(*tasks)
 
     async def _manage_discriminant_queue_sanitizer_slow(self, pool: ThreadPoolExecutor) -> None:
         log.info("Started task for managing bluebox queue.")
         while not self._shut_down:
             picked_info = None
             async with self.lock:
+                await self._wait_for_work(lambda: len(self.pending_bluebox_info) > 0)
                 try:
-                    if len(self.pending_bluebox_info) > 0:
-                        # Select randomly the field_vdf we're creating a compact vdf for.
-                        # This is done because CC_SP and CC_IP are more frequent than
-                        # CC_EOS and ICC_EOS. This guarantees everything is picked uniformly.
-                        target_field_vdf = random.randint(1, 4)
-                        info = next(
-                            (info for info in self.pending_bluebox_info if info[1].field_vdf == target_field_vdf),
-                            None,
-                        )
-                        if info is None:
-                            # Nothing found with target_field_vdf, just pick the first VDFInfo.
-                            info = self.pending_bluebox_info[0]
-                        self.pending_bluebox_info.remove(info)
-                        picked_info = info[1]
+                    # Select randomly the field_vdf we're creating a compact vdf for.
+                    # This is done because CC_SP and CC_IP are more frequent than
+                    # CC_EOS and ICC_EOS. This guarantees everything is picked uniformly.
+                    # If there's nothing for the target field_vdf, the oldest request is picked.
+                    picked_info = self.pending_bluebox_info.pop(random.randint(1, 4))
                 except Exception as e:
                     log.error(f"Exception manage discriminant queue: {e}")
             if picked_info is not None:
@@ -1241,4 +1265,3 @@ class Timelord:
                     log.error(f"Exception manage discriminant queue: {e}")
                     tb = traceback.format_exc()
                     log.error(f"Error while handling message: {tb}")
-            await asyncio.sleep(0.1)
@@ -52,6 +52,7 @@ class TimelordAPI:
                 # no known peak
                 log.info("no last known peak, switching to new peak")
                 self.timelord.new_peak = new_peak
+                self.timelord._notify_work()
                 self.timelord.state_changed("new_peak", {"height": new_peak.reward_chain_block.height})
                 return
 
@@ -69,6 +70,7 @@ class TimelordAPI:
                     f"new peak rh: {new_peak.reward_chain_block.get_hash()}"
                 )
                 self.timelord.new_peak = new_peak
+                self.timelord._notify_work()
                 self.timelord.state_changed("new_peak", {"height": new_peak.reward_chain_block.height})
                 return
 
@@ -89,6 +91,7 @@ class TimelordAPI:
                     f"{new_peak.reward_chain_block.weight} rh {new_peak.reward_chain_block.get_hash()}"
                 )
                 self.timelord.new_peak = new_peak
+                self.timelord._notify_work()
                 self.timelord.state_changed("new_peak", {"height": new_peak.reward_chain_block.height})
                 return
 
@@ -154,6 +157,7 @@ class TimelordAPI:
                         self.timelord.iters_to_submit[Chain.INFUSED_CHALLENGE_CHAIN].append(new_block_iters)
                     self.timelord.iteration_to_proof_type[new_block_iters] = IterationType.INFUSION_POINT
                     self.timelord.total_unfinished += 1
+                    self.timelord._notify_work()
                     log.debug(f"Non-overflow unfinished block, total {self.timelord.total_unfinished}")
 
     @metadata.request()
@@ -161,8 +165,5 @@ class TimelordAPI:
         async with self.timelord.lock:
             if not self.timelord.bluebox_mode:
                 return None
-            now = time.time()
-            # work older than 5s can safely be assumed to be from the previous batch, and needs to be cleared
-            while self.timelord.pending_bluebox_info and (now - self.timelord.pending_bluebox_info[0][0] > 5):
-                del self.timelord.pending_bluebox_info[0]
-            self.timelord.pending_bluebox_info.append((now, vdf_info))
+            self.timelord.pending_bluebox_info.add(time.time(), vdf_info)
+            self.timelord._notify_work()
@@ -8,7 +8,7 @@ import functools
 import secrets
 import sqlite3
 import sys
-from collections.abc import AsyncIterator, Iterable, Iterator
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -189,6 +189,9 @@ class DBWrapper2:
     _in_use: dict[asyncio.Task[object], aiosqlite.Connection] = field(default_factory=dict)
     _current_writer: asyncio.Task[object] | None = None
     _savepoint_name: int = 0
+    # the callbacks to call if the changes made in each of the open savepoints
+    # are rolled back, innermost last
+    _rollback_callbacks: list[dict[Callable[[], None], None]] = field(default_factory=list)
 
     async def add_connection(self, c: aiosqlite.Connection) -> None:
         # this guarantees that reader connections can only be used for reading
@@ -309,6 +312,19 @@ class DBWrapper2:
             if self._log_file is not None:
                 self._log_file.close()
 
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        """
+        Calls `callback` if the changes made so far in the current write
+        transaction are rolled back, by this or by any enclosing transaction.
+        It's for keeping in-memory state in step with the database. It's
+        not called if the transaction commits. The same callback is only
+        called once.
+        """
+        task = asyncio.current_task()
+        assert task is not None
+        assert self._current_writer == task, "on_rollback() must be called from within a write transaction"
+        self._rollback_callbacks[-1][callback] = None
+
     def _next_savepoint(self) -> str:
         name = f"s{self._savepoint_name}"
         self._savepoint_name += 1
@@ -334,6 +350,7 @@ class DBWrapper2:
         # The ROLLBACK/RELEASE cleanup IS protected (via
         # _suppress_task_cancellation) because it must complete to avoid
         # orphan savepoints even when _must_cancel is True.
+        self._rollback_callbacks.append({})
         try:
             await self._write_connection.execute(f"SAVEPOINT {name}")
             yield
@@ -346,7 +363,15 @@ class DBWrapper2:
                 # created (e.g. CancelledError interrupted execute before
                 # aiosqlite ran it). All other errors are propagated.
                 pass
+            for callback in self._rollback_callbacks.pop():
+                callback()
             raise
+        else:
+            # the changes are now part of the enclosing savepoint, if any,
+            # and are rolled back with it
+            callbacks = self._rollback_callbacks.pop()
+            if len(self._rollback_callbacks) > 0:
+                self._rollback_callbacks[-1].update(callbacks)
         finally:
             # rollback to a savepoint doesn't cancel the transaction, it
             # just rolls back the state. We need to cancel it regardless
@@ -1,31 +1,58 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Callable
 from typing import Any
 
 from aiohttp import web
 
 
+def to_json_dict(o: Any) -> Any:
+    return o.to_json_dict()
+
+
+def bytes_to_hex(o: Any) -> str:
+    return f"0x{bytes(o).hex()}"
+
+
+# EnhancedJSONEncoder.default() is called for each object the json module can't
+# encode itself, often many of the same few types in a response. The way to
+# convert them is looked up once per type.
+_converters: dict[type, Callable[[Any], Any] | None] = {}
+
+
+def converter_for_type(t: type) -> Callable[[Any], Any] | None:
+    if hasattr(t, "to_json_dict"):
+        return to_json_dict
+    elif hasattr(t, "__bytes__") or issubclass(t, bytes):
+        return bytes_to_hex
+    return None
+
+
 class EnhancedJSONEncoder(json.JSONEncoder):
     """
     Encodes bytes as hex strings with 0x, and converts all dataclasses to json.
     """
 
     def default(self, o: Any) -> Any:
-        if hasattr(type(o), "to_json_dict"):
-            return o.to_json_dict()
-        elif hasattr(type(o), "__bytes__"):
-            return f"0x{bytes(o).hex()}"
-        elif isinstance(o, bytes):
-            return f"0x{o.hex()}"
-        return super().default(o)
+        t = type(o)
+        try:
+            converter = _converters[t]
+        except KeyError:
+            converter = _converters[t] = converter_for_type(t)
+        if converter is None:
+            return super().default(o)
+        return converter(o)
+
+
+_encoder = EnhancedJSONEncoder(sort_keys=True)
 
 
 def dict_to_json_str(o: Any) -> str:
     """
     Converts a python object into json.
     """
-    json_str = json.dumps(o, cls=EnhancedJSONEncoder, sort_keys=True)
+    json_str = _encoder.encode(o)
     return json_str
 
 
@@ -305,6 +305,9 @@ def recurse_jsonify(
     Makes bytes objects into strings with 0x, and makes large ints into strings.
     """
     if next_recursion_step is None:
+        if isinstance(d, Streamable):
+            # the specialized version of the code below, generated by the streamable decorator
+            return d._streamable_to_json()
         next_recursion_step = recurse_jsonify
     if getattr(d, "json_serialization_override", None) is not None:
         return d.json_serialization_override(d)
@@ -567,6 +570,256 @@ def function_to_stream_one_item(f_type: type[Any]) -> StreamFunctionType:
         raise UnsupportedType(f"can't stream {f_type}")
 
 
+# The generic (de)serialization goes through the streamable fields one by one,
+# calling a chain of small functions (and lambdas) for each one. Instead, the
+# streamable decorator generates the source of flat parse, stream and post-init
+# functions for each class, specialized for the types of its fields. The
+# per-field functions are still used for the types not worth specializing
+# (dicts, enums, ...). Likewise, a to_json function is generated as the
+# specialized version of recurse_jsonify().
+
+
+class _GeneratedCode:
+    """
+    Collects the lines and the global names of a generated function.
+    """
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.namespace: dict[str, object] = {
+            "_parse_bool": parse_bool,
+            "_parse_bytes": parse_bytes,
+            "_parse_rust": parse_rust,
+            "_parse_str": parse_str,
+            "_parse_uint32": parse_uint32,
+            "_stream_bool": stream_bool,
+            "_stream_bytes": stream_bytes,
+            "_stream_str": stream_str,
+            "_write_uint32": write_uint32,
+            "_uint32": uint32,
+            "_post_init_process_item": post_init_process_item,
+            "_check_list": check_list,
+            "_recurse_jsonify": recurse_jsonify,
+        }
+        self.counter = 0
+
+    def add_global(self, value: object) -> str:
+        name = f"_g{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def new_local(self) -> str:
+        self.counter += 1
+        return f"v{self.counter}"
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def compile(self, name: str, qualname: str) -> Callable[..., Any]:
+        source = "\n".join(self.lines)
+        # the source is generated from the type hints of the class, not from any input
+        exec(compile(source, f"<streamable {qualname}.{name}>", "exec"), self.namespace)  # noqa: S102
+        function: Callable[..., Any] = self.namespace[name]  # type: ignore[assignment]
+        function.__qualname__ = f"{qualname}.{name}"
+        return function
+
+
+def check_list(items: Any) -> list[Any]:
+    if not isinstance(items, list):
+        raise InvalidTypeError(list, type(items))
+    return items
+
+
+def generate_parse_item(code: _GeneratedCode, f_type: type[Any], target: str, indent: int) -> None:
+    """
+    Emits the code parsing a value of the given type from `f` into the local
+    variable `target`. Mirrors function_to_parse_one_item().
+    """
+    if f_type is bool:
+        code.emit(indent, f"{target} = _parse_bool(f)")
+    elif is_type_SpecificOptional(f_type):
+        present = code.new_local()
+        code.emit(indent, f"{present} = f.read(1)")
+        code.emit(indent, f"assert {present} is not None and len({present}) == 1")
+        code.emit(indent, f"if {present} == b'\\x00':")
+        code.emit(indent + 1, f"{target} = None")
+        code.emit(indent, f"elif {present} == b'\\x01':")
+        generate_parse_item(code, get_args(f_type)[0], target, indent + 1)
+        code.emit(indent, "else:")
+        code.emit(indent + 1, "raise ValueError('Optional must be 0 or 1')")
+    elif hasattr(f_type, "parse_rust"):
+        code.emit(indent, f"{target} = _parse_rust(f, {code.add_global(f_type)})")
+    elif hasattr(f_type, "parse"):
+        code.emit(indent, f"{target} = {code.add_global(f_type.parse)}(f)")
+    elif f_type is bytes:
+        code.emit(indent, f"{target} = _parse_bytes(f)")
+    elif is_type_List(f_type):
+        items = code.new_local()
+        item = code.new_local()
+        code.emit(indent, f"{items} = []")
+        code.emit(indent, "for _ in range(_parse_uint32(f)):")
+        generate_parse_item(code, get_args(f_type)[0], item, indent + 1)
+        code.emit(indent + 1, f"{items}.append({item})")
+        code.emit(indent, f"{target} = {items}")
+    elif is_type_Tuple(f_type):
+        items_list = []
+        for inner_type in get_args(f_type):
+            item = code.new_local()
+            generate_parse_item(code, inner_type, item, indent)
+            items_list.append(item)
+        code.emit(indent, f"{target} = ({''.join(item + ', ' for item in items_list)})")
+    elif f_type is str:
+        code.emit(indent, f"{target} = _parse_str(f)")
+    else:
+        code.emit(indent, f"{target} = {code.add_global(function_to_parse_one_item(f_type))}(f)")
+
+
+def generate_stream_item(code: _GeneratedCode, f_type: type[Any], value: str, indent: int) -> None:
+    """
+    Emits the code streaming the local variable `value`, of the given type,
+    into `f`. Mirrors function_to_stream_one_item().
+    """
+    if is_type_SpecificOptional(f_type):
+        code.emit(indent, f"if {value} is None:")
+        code.emit(indent + 1, "f.write(b'\\x00')")
+        code.emit(indent, "else:")
+        code.emit(indent + 1, "f.write(b'\\x01')")
+        generate_stream_item(code, get_args(f_type)[0], value, indent + 1)
+    elif f_type is bytes:
+        code.emit(indent, f"_stream_bytes({value}, f)")
+    elif isinstance(f_type, type) and issubclass(f_type, bytes) and hasattr(f_type, "stream"):
+        # sized bytes, e.g. bytes32, are streamed as is
+        code.emit(indent, f"f.write({value})")
+    elif isinstance(f_type, type) and issubclass(f_type, int) and hasattr(f_type, "SIZE") and hasattr(f_type, "stream"):
+        # sized ints, e.g. uint64
+        code.emit(indent, f"f.write({value}.to_bytes({f_type.SIZE}, 'big', signed={getattr(f_type, 'SIGNED')}))")
+    elif hasattr(f_type, "stream"):
+        code.emit(indent, f"{value}.stream(f)")
+    elif hasattr(f_type, "__bytes__"):
+        code.emit(indent, f"f.write({value}.__bytes__())")
+    elif is_type_List(f_type):
+        item = code.new_local()
+        code.emit(indent, f"_write_uint32(f, _uint32(len({value})))")
+        code.emit(indent, f"for {item} in {value}:")
+        generate_stream_item(code, get_args(f_type)[0], item, indent + 1)
+    elif is_type_Tuple(f_type):
+        inner_types = get_args(f_type)
+        code.emit(indent, f"assert len({value}) == {len(inner_types)}")
+        for i, inner_type in enumerate(inner_types):
+            item = code.new_local()
+            code.emit(indent, f"{item} = {value}[{i}]")
+            generate_stream_item(code, inner_type, item, indent)
+    elif f_type is str:
+        code.emit(indent, f"_stream_str({value}, f)")
+    elif f_type is bool:
+        code.emit(indent, f"_stream_bool({value}, f)")
+    else:
+        code.emit(indent, f"{code.add_global(function_to_stream_one_item(f_type))}({value}, f)")
+
+
+def generate_post_init_item(code: _GeneratedCode, f_type: type[Any], value: str) -> str:
+    """
+    Returns the expression checking and converting the local variable `value`
+    to the given type. Mirrors function_to_post_init_process_one_item().
+    """
+    if is_type_SpecificOptional(f_type):
+        return f"(None if {value} is None else {generate_post_init_item(code, get_args(f_type)[0], value)})"
+    if is_type_List(f_type):
+        item = code.new_local()
+        inner = generate_post_init_item(code, get_args(f_type)[0], item)
+        return f"[{inner} for {item} in _check_list({value})]"
+    if is_type_Tuple(f_type) or is_type_Dict(f_type):
+        return f"{code.add_global(function_to_post_init_process_one_item(f_type))}({value})"
+    name = code.add_global(f_type)
+    return f"({value} if isinstance({value}, {name}) else _post_init_process_item({name}, {value}))"
+
+
+def generate_to_json_item(code: _GeneratedCode, f_type: type[Any], value: str) -> str:
+    """
+    Returns the expression converting the local variable `value`, of the given
+    type, to json. Mirrors recurse_jsonify().
+    """
+    if is_type_SpecificOptional(f_type):
+        return f"(None if {value} is None else {generate_to_json_item(code, get_args(f_type)[0], value)})"
+    if is_type_List(f_type):
+        item = code.new_local()
+        return f"[{generate_to_json_item(code, get_args(f_type)[0], item)} for {item} in {value}]"
+    if f_type is bool:
+        return value
+    if f_type is str:
+        return f"({value} if type({value}) is str else _recurse_jsonify({value}))"
+    if isinstance(f_type, type) and not issubclass(f_type, Enum):
+        if issubclass(f_type, bytes):
+            return f"'0x' + {value}.hex()"
+        if issubclass(f_type, int) and hasattr(f_type, "SIZE"):
+            return f"int({value})"
+        if issubclass(f_type, Streamable):
+            return f"{value}._streamable_to_json()"
+    return f"_recurse_jsonify({value})"
+
+
+def generate_parse_function(cls: type[Streamable]) -> Callable[[type[Any], BinaryIO], Any]:
+    code = _GeneratedCode()
+    code.emit(0, "def parse(cls, f):")
+    code.emit(1, "obj = _new(cls)")
+    code.emit(1, "d = obj.__dict__")
+    code.namespace["_new"] = object.__new__
+    for field in cls.streamable_fields():
+        value = code.new_local()
+        generate_parse_item(code, field.type, value, 1)
+        code.emit(1, f"d[{field.name!r}] = {value}")
+    code.emit(1, "return obj")
+    return code.compile("parse", cls.__qualname__)
+
+
+def generate_stream_function(cls: type[Streamable]) -> Callable[[Any, BinaryIO], None]:
+    code = _GeneratedCode()
+    code.emit(0, "def stream(self, f):")
+    code.emit(1, "d = self.__dict__")
+    for field in cls.streamable_fields():
+        value = code.new_local()
+        code.emit(1, f"{value} = d[{field.name!r}]")
+        generate_stream_item(code, field.type, value, 1)
+    code.emit(1, "pass")
+    return code.compile("stream", cls.__qualname__)
+
+
+def generate_post_init_function(cls: type[Streamable]) -> Callable[[Any], None]:
+    code = _GeneratedCode()
+    code.emit(0, "def post_init(self):")
+    code.emit(1, "d = self.__dict__")
+    for field in cls._streamable_fields:
+        value = code.new_local()
+        code.emit(1, f"{value} = d[{field.name!r}]")
+        code.emit(1, f"d[{field.name!r}] = {generate_post_init_item(code, field.type, value)}")
+    code.emit(1, "pass")
+    return code.compile("post_init", cls.__qualname__)
+
+
+def generate_to_json_function(cls: type[Streamable]) -> Callable[[Any], Any]:
+    code = _GeneratedCode()
+    code.namespace["_cls"] = cls
+    code.namespace["_jsonify_fields"] = jsonify_fields
+    code.emit(0, "def to_json(self):")
+    code.emit(1, "if getattr(self, 'json_serialization_override', None) is not None:")
+    code.emit(2, "return self.json_serialization_override(self)")
+    # subclasses which aren't streamable themselves may have more fields
+    code.emit(1, "if type(self) is not _cls:")
+    code.emit(2, "return _jsonify_fields(self)")
+    code.emit(1, "d = self.__dict__")
+    items = []
+    for field in cls._streamable_fields:
+        value = code.new_local()
+        code.emit(1, f"{value} = d[{field.name!r}]")
+        items.append(f"{field.name!r}: {generate_to_json_item(code, field.type, value)}")
+    code.emit(1, f"return {{{', '.join(items)}}}")
+    return code.compile("to_json", cls.__qualname__)
+
+
+def jsonify_fields(d: Any) -> dict[str, Any]:
+    return {field.name: recurse_jsonify(getattr(d, field.name)) for field in dataclasses.fields(d)}
+
+
 def streamable(cls: type[_T_Streamable]) -> type[_T_Streamable]:
     """
     This decorator forces correct streamable protocol syntax/usage and populates the caches for types hints and
@@ -599,6 +852,10 @@ def streamable(cls: type[_T_Streamable]) -> type[_T_Streamable]:
         raise DefinitionError("Streamable inheritance required.", cls)
 
     cls._streamable_fields = create_fields(cls)
+    setattr(cls, "_streamable_parse", classmethod(generate_parse_function(cls)))
+    setattr(cls, "_streamable_stream", generate_stream_function(cls))
+    setattr(cls, "_streamable_post_init", generate_post_init_function(cls))
+    setattr(cls, "_streamable_to_json", generate_to_json_function(cls))
 
     return cls
 
@@ -648,33 +905,33 @@ class Streamable:
     """
 
     _streamable_fields: ClassVar[StreamableFields]
+    # generated by the streamable decorator, specialized for the fields
+    _streamable_parse: ClassVar[Callable[[BinaryIO], Any]]
+    _streamable_stream: ClassVar[Callable[[Any, BinaryIO], None]]
+    _streamable_post_init: ClassVar[Callable[[Any], None]]
+    _streamable_to_json: ClassVar[Callable[[Any], Any]]
 
     @classmethod
     def streamable_fields(cls) -> StreamableFields:
         return cls._streamable_fields
 
     def __post_init__(self) -> None:
-        data = self.__dict__
         try:
-            for field in self._streamable_fields:
-                object.__setattr__(self, field.name, field.post_init_function(data[field.name]))
+            self._streamable_post_init()
         except TypeError as e:
-            missing_fields = [field.name for field in self._streamable_fields if field.name not in data]
+            missing_fields = [field.name for field in self._streamable_fields if field.name not in self.__dict__]
             if len(missing_fields) > 0:
                 raise ParameterMissingError(type(self), missing_fields) from e
             raise
 
     @classmethod
     def parse(cls, f: BinaryIO) -> Self:
-        # Create the object without calling __init__() to avoid unnecessary post-init checks in strictdataclass
-        obj: Self = object.__new__(cls)
-        for field in cls.streamable_fields():
-            object.__setattr__(obj, field.name, field.parse_function(f))
+        # Creates the object without calling __init__() to avoid unnecessary post-init checks in strictdataclass
+        obj: Self = cls._streamable_parse(f)
         return obj
 
     def stream(self, f: BinaryIO) -> None:
-        for field in self.streamable_fields():
-            field.stream_function(getattr(self, field.name), f)
+        self._streamable_stream(f)
 
     def get_hash(self) -> bytes32:
         return std_hash(bytes(self), skip_bytes_conversion=True)
@@ -703,7 +960,7 @@ class Streamable:
         return pp.pformat(recurse_jsonify(self))
 
     def to_json_dict(self) -> dict[str, Any]:
-        ret: dict[str, Any] = recurse_jsonify(self)
+        ret: dict[str, Any] = self._streamable_to_json()
         return ret
 
     @classmethod
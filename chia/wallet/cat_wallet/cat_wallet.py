@@ -486,8 +486,8 @@ class CATWallet:
         Note: Must be called under wallet state manager lock
         """
         spendable_amount: uint128 = await self.get_spendable_balance()
-        spendable_coins: list[WalletCoinRecord] = list(
-            await self.wallet_state_manager.get_spendable_coins_for_wallet(self.id(), in_one_block=True)
+        spendable_coins: dict[bytes32, WalletCoinRecord] = await self.wallet_state_manager.get_spendable_coins_by_id(
+            self.id(), in_one_block=True
         )
 
         # Try to use coins from the store, if there isn't enough of "unused"
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 import random
+from collections.abc import Iterable
 
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint64, uint128
@@ -14,13 +15,14 @@ from chia.wallet.wallet_coin_record import WalletCoinRecord
 async def select_coins(
     spendable_amount: uint128,
     coin_selection_config: CoinSelectionConfig,
-    spendable_coins: list[WalletCoinRecord],
+    spendable_coins: list[WalletCoinRecord] | dict[bytes32, WalletCoinRecord],
     unconfirmed_removals: dict[bytes32, Coin],
     log: logging.Logger,
     amount: uint128,
 ) -> set[Coin]:
     """
     Returns a set of coins that can be used for generating a new transaction.
+    spendable_coins may be passed by coin ID, to save computing the IDs.
     """
     if amount > spendable_amount:
         error_msg = (
@@ -35,8 +37,13 @@ async def select_coins(
     sum_spendable_coins = 0
     valid_spendable_coins: list[Coin] = []
 
-    for coin_record in spendable_coins:  # remove all the unconfirmed coins, excluded coins and dust.
-        coin_name: bytes32 = coin_record.coin.name()
+    named_coins: Iterable[tuple[bytes32, WalletCoinRecord]]
+    if isinstance(spendable_coins, dict):
+        named_coins = spendable_coins.items()
+    else:
+        named_coins = ((coin_record.coin.name(), coin_record) for coin_record in spendable_coins)
+
+    for coin_name, coin_record in named_coins:  # remove all the unconfirmed coins, excluded coins and dust.
         if coin_name in unconfirmed_removals:
             continue
         if coin_name in coin_selection_config.excluded_coin_ids:
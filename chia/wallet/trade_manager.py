@@ -16,6 +16,7 @@ from chia.types.blockchain_format.coin import Coin, coin_as_list
 from chia.types.blockchain_format.program import Program, run
 from chia.util.db_wrapper import DBWrapper2
 from chia.util.hash import std_hash
+from chia.util.lru_cache import LRUCache
 from chia.wallet.cat_wallet.cat_wallet import CATWallet
 from chia.wallet.conditions import (
     AssertCoinAnnouncement,
@@ -52,6 +53,11 @@ if TYPE_CHECKING:
     from chia.wallet.wallet_state_manager import WalletStateManager
 from chia.wallet.wallet_spend_bundle import WalletSpendBundle
 
+OFFER_CACHE_SIZE = 1000
+
+# offered, requested, infos and valid times, as returned by Offer.summary()
+OfferSummaryResult = tuple[dict[str, str], dict[str, str], dict[str, PuzzleInfo], ConditionValidTimes]
+
 
 class TradeManager:
     """
@@ -94,6 +100,13 @@ class TradeManager:
     log: logging.Logger
     trade_store: TradeStore
     most_recently_deserialized_trade: tuple[bytes32, Offer] | None
+    # Market makers and aggregators inspect (and take) the same offers over
+    # and over. These caches save parsing them and computing their summaries
+    # every time. Whether an offer is still valid depends on the coin set, so
+    # those results are only kept until the next peak.
+    parsed_offer_cache: LRUCache[bytes32, Offer]
+    offer_summary_cache: LRUCache[bytes32, OfferSummaryResult]
+    offer_validity_cache: LRUCache[bytes32, bool]
 
     @staticmethod
     async def create(
@@ -110,8 +123,34 @@ class TradeManager:
         self.wallet_state_manager = wallet_state_manager
         self.trade_store = await TradeStore.create(db_wrapper)
         self.most_recently_deserialized_trade = None
+        self.parsed_offer_cache = LRUCache(OFFER_CACHE_SIZE)
+        self.offer_summary_cache = LRUCache(OFFER_CACHE_SIZE)
+        self.offer_validity_cache = LRUCache(OFFER_CACHE_SIZE)
         return self
 
+    def new_peak(self) -> None:
+        self.offer_validity_cache.cache.clear()
+
+    def get_parsed_offer(self, offer_bech32: str) -> Offer:
+        key = std_hash(offer_bech32.encode())
+        offer = self.parsed_offer_cache.get(key)
+        if offer is None:
+            offer = Offer.from_bech32(offer_bech32)
+            self.parsed_offer_cache.put(key, offer)
+        return offer
+
+    def get_offer_summary(self, offer: Offer) -> OfferSummaryResult:
+        """
+        Returns offer.summary(), cached by offer ID. The returned dicts are
+        shared, and must not be modified.
+        """
+        offer_id = offer.name()
+        summary = self.offer_summary_cache.get(offer_id)
+        if summary is None:
+            summary = offer.summary()
+            self.offer_summary_cache.put(offer_id, summary)
+        return summary
+
     async def get_offers_with_status(self, status: TradeStatus) -> list[TradeRecord]:
         records = await self.trade_store.get_trade_record_with_status(status)
         return records
@@ -668,16 +707,38 @@ class TradeManager:
                 await wsm.create_wallet_for_puzzle_info(offer.driver_dict[key])
 
     async def check_offer_validity(self, offer: Offer, peer: WSChiaConnection) -> bool:
-        all_removals: list[Coin] = offer.removals()
-        all_removal_names: list[bytes32] = [c.name() for c in all_removals]
-        non_ephemeral_removals: list[Coin] = list(
-            filter(lambda c: c.parent_coin_info not in all_removal_names, all_removals)
-        )
-        coin_states = await self.wallet_state_manager.wallet_node.get_coin_state(
-            [c.name() for c in non_ephemeral_removals], peer=peer
-        )
+        [valid] = await self.check_offers_validity([offer], peer)
+        return valid
 
-        return len(coin_states) == len(non_ephemeral_removals) and all([cs.spent_height is None for cs in coin_states])
+    async def check_offers_validity(self, offers: list[Offer], peer: WSChiaConnection) -> list[bool]:
+        """
+        Returns whether each offer is still valid, i.e. whether all of the
+        coins it spends exist and are unspent. The coin states for all the
+        offers that aren't cached are requested from the peer at once.
+        """
+        offer_ids: list[bytes32] = [offer.name() for offer in offers]
+        results: dict[bytes32, bool] = {}
+        to_check: dict[bytes32, list[bytes32]] = {}
+        for offer_id, offer in zip(offer_ids, offers):
+            valid = self.offer_validity_cache.get(offer_id)
+            if valid is not None:
+                results[offer_id] = valid
+                continue
+            all_removals: list[Coin] = offer.removals()
+            all_removal_names: set[bytes32] = {c.name() for c in all_removals}
+            to_check[offer_id] = [c.name() for c in all_removals if c.parent_coin_info not in all_removal_names]
+
+        if len(to_check) > 0:
+            coin_names: set[bytes32] = {name for names in to_check.values() for name in names}
+            coin_states = await self.wallet_state_manager.wallet_node.get_coin_state(list(coin_names), peer=peer)
+            unspent: set[bytes32] = {cs.coin.name() for cs in coin_states if cs.spent_height is None}
+            for offer_id, names in to_check.items():
+                # an offer spending the same coin twice is not valid
+                valid = len(set(names)) == len(names) and all(name in unspent for name in names)
+                self.offer_validity_cache.put(offer_id, valid)
+                results[offer_id] = valid
+
+        return [results[offer_id] for offer_id in offer_ids]
 
     async def calculate_tx_records_for_offer(self, offer: Offer, validate: bool) -> list[TransactionRecord]:
         if validate:
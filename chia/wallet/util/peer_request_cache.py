@@ -19,6 +19,7 @@ class PeerRequestCache:
     _blocks_validated: LRUCache[bytes32, uint32]  # header_hash -> height
     _block_signatures_validated: LRUCache[bytes32, uint32]  # sig_hash -> height
     _additions_in_block: LRUCache[tuple[bytes32, bytes32], uint32]  # header_hash, puzzle_hash -> height
+    _removals_in_block: LRUCache[tuple[bytes32, bytes32], uint32]  # header_hash, coin_name -> height
     # The wallet gets the state update before receiving the block. In untrusted mode the block is required for the
     # coin state validation, so we cache them before we apply them once we received the block.
     _race_cache: dict[uint32, set[CoinState]]
@@ -31,6 +32,7 @@ class PeerRequestCache:
         self._blocks_validated = LRUCache(1000)
         self._block_signatures_validated = LRUCache(1000)
         self._additions_in_block = LRUCache(200)
+        self._removals_in_block = LRUCache(200)
         self._race_cache = {}
 
     def get_block(self, height: uint32) -> HeaderBlock | None:
@@ -91,6 +93,12 @@ class PeerRequestCache:
     def in_additions_in_block(self, header_hash: bytes32, addition_ph: bytes32) -> bool:
         return self._additions_in_block.get((header_hash, addition_ph)) is not None
 
+    def add_to_removals_in_block(self, header_hash: bytes32, coin_name: bytes32, height: uint32) -> None:
+        self._removals_in_block.put((header_hash, coin_name), height)
+
+    def in_removals_in_block(self, header_hash: bytes32, coin_name: bytes32) -> bool:
+        return self._removals_in_block.get((header_hash, coin_name)) is not None
+
     def add_states_to_race_cache(self, coin_states: list[CoinState]) -> None:
         for coin_state in coin_states:
             created_height = 0 if coin_state.created_height is None else coin_state.created_height
@@ -156,6 +164,12 @@ class PeerRequestCache:
                 new_additions_in_block.put((hh, ph), h)
         self._additions_in_block = new_additions_in_block
 
+        new_removals_in_block: LRUCache[tuple[bytes32, bytes32], uint32] = LRUCache(self._removals_in_block.capacity)
+        for (hh, name), h in self._removals_in_block.cache.items():
+            if h <= height:
+                new_removals_in_block.put((hh, name), h)
+        self._removals_in_block = new_removals_in_block
+
 
 def can_use_peer_request_cache(
     coin_state: CoinState, peer_request_cache: PeerRequestCache, fork_height: uint32 | None
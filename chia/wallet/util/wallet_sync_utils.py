@@ -194,8 +194,15 @@ def validate_removals(
 
 
 async def request_and_validate_removals(
-    peer: WSChiaConnection, height: uint32, header_hash: bytes32, coin_name: bytes32, removals_root: bytes32
+    peer: WSChiaConnection,
+    peer_request_cache: PeerRequestCache,
+    height: uint32,
+    header_hash: bytes32,
+    coin_name: bytes32,
+    removals_root: bytes32,
 ) -> bool:
+    if peer_request_cache.in_removals_in_block(header_hash, coin_name):
+        return True
     removals_request = RequestRemovals(height, header_hash, [coin_name])
 
     removals_res: RespondRemovals | RejectRemovalsRequest | None = await peer.call_api(
@@ -231,6 +238,92 @@ async def request_and_validate_additions(
     return result
 
 
+async def prefetch_header_blocks(
+    peer: WSChiaConnection, peer_request_cache: PeerRequestCache, heights: set[uint32]
+) -> None:
+    """
+    Requests the header blocks at the given heights that aren't cached yet,
+    one request per range of (at most 32) heights, and caches them.
+    """
+    missing = sorted(height for height in heights if peer_request_cache.get_block(height) is None)
+    ranges: list[tuple[uint32, uint32]] = []
+    for height in missing:
+        if len(ranges) > 0 and height - ranges[-1][0] < 32:
+            ranges[-1] = (ranges[-1][0], height)
+        else:
+            ranges.append((height, height))
+
+    async def fetch_range(start: uint32, end: uint32) -> None:
+        blocks = await request_header_blocks(peer, start, end)
+        if blocks is None:
+            return
+        for block in blocks:
+            if block.height in heights:
+                peer_request_cache.add_to_blocks(block)
+
+    await asyncio.gather(*(fetch_range(start, end) for start, end in ranges))
+
+
+async def prefetch_additions_and_removals(
+    peer: WSChiaConnection,
+    peer_request_cache: PeerRequestCache,
+    additions: dict[uint32, set[bytes32]],
+    removals: dict[uint32, set[bytes32]],
+) -> None:
+    """
+    Requests and validates the proofs of the additions (by puzzle hash) and
+    removals (by coin name) at each height, with one request per block, and
+    caches the ones proven to be included. The header blocks must already be
+    cached. Anything that isn't cached is requested individually again during
+    validation, which also handles invalid proofs.
+    """
+
+    async def fetch_additions(height: uint32, puzzle_hashes: set[bytes32]) -> None:
+        block = peer_request_cache.get_block(height)
+        if block is None or block.foliage_transaction_block is None:
+            return
+        to_request = [ph for ph in puzzle_hashes if not peer_request_cache.in_additions_in_block(block.header_hash, ph)]
+        if len(to_request) == 0:
+            return
+        res: RespondAdditions | RejectAdditionsRequest | None = await peer.call_api(
+            FullNodeAPI.request_additions, RequestAdditions(height, block.header_hash, to_request)
+        )
+        if res is None or isinstance(res, RejectAdditionsRequest):
+            return
+        if not validate_additions(res.coins, res.proofs, block.foliage_transaction_block.additions_root):
+            return
+        included = {ph for ph, coins in res.coins if len(coins) > 0}
+        for ph in to_request:
+            if ph in included:
+                peer_request_cache.add_to_additions_in_block(block.header_hash, ph, height)
+
+    async def fetch_removals(height: uint32, coin_names: set[bytes32]) -> None:
+        block = peer_request_cache.get_block(height)
+        if block is None or block.foliage_transaction_block is None:
+            return
+        to_request = [
+            name for name in coin_names if not peer_request_cache.in_removals_in_block(block.header_hash, name)
+        ]
+        if len(to_request) == 0:
+            return
+        res: RespondRemovals | RejectRemovalsRequest | None = await peer.call_api(
+            FullNodeAPI.request_removals, RequestRemovals(height, block.header_hash, to_request)
+        )
+        if res is None or isinstance(res, RejectRemovalsRequest):
+            return
+        if not validate_removals(res.coins, res.proofs, block.foliage_transaction_block.removals_root):
+            return
+        included = {name for name, coin in res.coins if coin is not None}
+        for name in to_request:
+            if name in included:
+                peer_request_cache.add_to_removals_in_block(block.header_hash, name, height)
+
+    await asyncio.gather(
+        *(fetch_additions(height, puzzle_hashes) for height, puzzle_hashes in additions.items()),
+        *(fetch_removals(height, coin_names) for height, coin_names in removals.items()),
+    )
+
+
 def last_change_height_cs(cs: CoinState) -> uint32:
     if cs.spent_height is not None:
         return uint32(cs.spent_height)
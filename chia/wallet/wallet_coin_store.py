@@ -6,6 +6,7 @@ from enum import IntEnum
 
 from chia_rs.sized_bytes import bytes32
 from chia_rs.sized_ints import uint8, uint32, uint64
+from sortedcontainers import SortedKeyList
 
 from chia.types.blockchain_format.coin import Coin
 from chia.util.db_wrapper import DBWrapper2, execute_fetchone
@@ -52,6 +53,37 @@ class GetCoinRecordsResult:
     total_count: uint32 | None
 
 
+class UnspentCoinIndex:
+    """
+    The unspent coins of one wallet and coin type, keyed by coin ID and
+    ordered by descending amount (ties are broken by coin ID).
+    """
+
+    records: dict[bytes32, WalletCoinRecord]
+    _by_amount: SortedKeyList[tuple[bytes32, WalletCoinRecord]]
+
+    def __init__(self) -> None:
+        self.records = {}
+        self._by_amount = SortedKeyList(key=lambda item: (-item[1].coin.amount, item[0]))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, coin_name: bytes32, record: WalletCoinRecord) -> None:
+        self.remove(coin_name)
+        self.records[coin_name] = record
+        self._by_amount.add((coin_name, record))
+
+    def remove(self, coin_name: bytes32) -> None:
+        record = self.records.pop(coin_name, None)
+        if record is not None:
+            self._by_amount.remove((coin_name, record))
+
+    def by_amount(self) -> list[tuple[bytes32, WalletCoinRecord]]:
+        """Returns (coin ID, record) pairs, largest amount first"""
+        return list(self._by_amount)
+
+
 class WalletCoinStore:
     """
     This object handles CoinRecords in DB used by wallet.
@@ -59,6 +91,14 @@ class WalletCoinStore:
 
     db_wrapper: DBWrapper2
     total_count_cache: LRUCache[bytes32, uint32]
+    # The unspent coins of each (wallet_id, coin_type) that has been queried,
+    # kept up to date as coins are added, spent and rolled back. This saves
+    # loading (and hashing) every unspent coin each time a wallet selects
+    # coins. Indexes are loaded lazily, and cleared on rollbacks, both of the
+    # chain and of any write transaction that changed them.
+    unspent_indexes: dict[tuple[int, CoinType], UnspentCoinIndex]
+    # maps coin IDs in the unspent indexes to the index they're in
+    unspent_index_keys: dict[bytes32, tuple[int, CoinType]]
 
     @classmethod
     async def create(cls, wrapper: DBWrapper2):
@@ -66,6 +106,8 @@ class WalletCoinStore:
 
         self.db_wrapper = wrapper
         self.total_count_cache = LRUCache(100)
+        self.unspent_indexes = {}
+        self.unspent_index_keys = {}
 
         async with self.db_wrapper.writer_maybe_transaction() as conn:
             await conn.execute(
@@ -119,6 +161,7 @@ class WalletCoinStore:
             name = record.name()
         assert record.spent == (record.spent_block_height != 0)
         async with self.db_wrapper.writer_maybe_transaction() as conn:
+            self.db_wrapper.on_rollback(self.clear_unspent_indexes)
             await conn.execute_insert(
                 "INSERT OR REPLACE INTO coin_record ("
                 "coin_name, confirmed_height, spent_height, spent, coinbase, puzzle_hash, coin_parent, amount, "
@@ -139,16 +182,26 @@ class WalletCoinStore:
                 ),
             )
         self.total_count_cache.cache.clear()
+        self._remove_from_unspent_index(name)
+        if not record.spent:
+            key = (record.wallet_id, record.coin_type)
+            index = self.unspent_indexes.get(key)
+            if index is not None:
+                index.add(name, record)
+                self.unspent_index_keys[name] = key
 
     # Sometimes we realize that a coin is actually not interesting to us so we need to delete it
     async def delete_coin_record(self, coin_name: bytes32) -> None:
         async with self.db_wrapper.writer_maybe_transaction() as conn:
+            self.db_wrapper.on_rollback(self.clear_unspent_indexes)
             await (await conn.execute("DELETE FROM coin_record WHERE coin_name=?", (coin_name.hex(),))).close()
         self.total_count_cache.cache.clear()
+        self._remove_from_unspent_index(coin_name)
 
     # Update coin_record to be spent in DB
     async def set_spent(self, coin_name: bytes32, height: uint32) -> None:
         async with self.db_wrapper.writer_maybe_transaction() as conn:
+            self.db_wrapper.on_rollback(self.clear_unspent_indexes)
             await conn.execute_insert(
                 "UPDATE coin_record SET spent_height=?,spent=? WHERE coin_name=?",
                 (
@@ -158,6 +211,21 @@ class WalletCoinStore:
                 ),
             )
         self.total_count_cache.cache.clear()
+        self._remove_from_unspent_index(coin_name)
+
+    def _remove_from_unspent_index(self, coin_name: bytes32) -> None:
+        key = self.unspent_index_keys.pop(coin_name, None)
+        if key is not None:
+            self.unspent_indexes[key].remove(coin_name)
+
+    def clear_unspent_indexes(self) -> None:
+        """
+        Drops the in-memory unspent coin indexes, to be reloaded from the
+        database. It's called when a transaction that modified coin records,
+        or loaded an index, is rolled back.
+        """
+        self.unspent_indexes.clear()
+        self.unspent_index_keys.clear()
 
     def coin_record_from_row(self, row: sqlite3.Row) -> WalletCoinRecord:
         coin = Coin(bytes32.fromhex(row[6]), bytes32.fromhex(row[5]), uint64.from_bytes(row[7]))
@@ -291,16 +359,42 @@ class WalletCoinStore:
 
         return None
 
-    async def get_unspent_coins_for_wallet(
-        self, wallet_id: int, coin_type: CoinType = CoinType.NORMAL
-    ) -> set[WalletCoinRecord]:
-        """Returns set of CoinRecords that have not been spent yet for a wallet."""
-        async with self.db_wrapper.reader_no_transaction() as conn:
+    async def get_unspent_coin_index(self, wallet_id: int, coin_type: CoinType = CoinType.NORMAL) -> UnspentCoinIndex:
+        """
+        Returns the index of the coins that have not been spent yet for a
+        wallet. The index is owned by the store, and must not be modified.
+        """
+        key = (wallet_id, coin_type)
+        index = self.unspent_indexes.get(key)
+        if index is not None:
+            return index
+
+        # the index is loaded under the write lock, so no other task can have
+        # uncommitted changes to the coin records that the index would miss.
+        # This task may have though, the index is dropped if they're rolled back
+        async with self.db_wrapper.writer_maybe_transaction() as conn:
+            index = self.unspent_indexes.get(key)
+            if index is not None:
+                return index
+            self.db_wrapper.on_rollback(self.clear_unspent_indexes)
             rows = await conn.execute_fetchall(
                 "SELECT * FROM coin_record WHERE coin_type=? AND wallet_id=? AND spent_height=0",
                 (coin_type, wallet_id),
             )
-        return {self.coin_record_from_row(row) for row in rows}
+            index = UnspentCoinIndex()
+            for row in rows:
+                coin_name = bytes32.fromhex(row[0])
+                index.add(coin_name, self.coin_record_from_row(row))
+                self.unspent_index_keys[coin_name] = key
+            self.unspent_indexes[key] = index
+        return index
+
+    async def get_unspent_coins_for_wallet(
+        self, wallet_id: int, coin_type: CoinType = CoinType.NORMAL
+    ) -> set[WalletCoinRecord]:
+        """Returns set of CoinRecords that have not been spent yet for a wallet."""
+        index = await self.get_unspent_coin_index(wallet_id, coin_type)
+        return set(index.records.values())
 
     async def get_all_unspent_coins(self, coin_type: CoinType = CoinType.NORMAL) -> set[WalletCoinRecord]:
         """Returns set of CoinRecords that have not been spent yet for a wallet."""
@@ -343,9 +437,11 @@ class WalletCoinStore:
                 )
             ).close()
         self.total_count_cache.cache.clear()
+        self.clear_unspent_indexes()
 
     async def delete_wallet(self, wallet_id: uint32) -> None:
         async with self.db_wrapper.writer_maybe_transaction() as conn:
             cursor = await conn.execute("DELETE FROM coin_record WHERE wallet_id=?", (wallet_id,))
             await cursor.close()
         self.total_count_cache.cache.clear()
+        self.clear_unspent_indexes()
@@ -45,7 +45,7 @@ from chia.types.mempool_inclusion_status import MempoolInclusionStatus
 from chia.types.weight_proof import WeightProof
 from chia.util.batches import to_batches
 from chia.util.config import lock_and_load_config, process_config_start_method, save_config
-from chia.util.db_wrapper import manage_connection
+from chia.util.db_wrapper import SQLITE_MAX_VARIABLE_NUMBER, manage_connection
 from chia.util.errors import KeychainIsEmpty, KeychainIsLocked, KeychainKeyNotFound, KeychainProxyConnectionFailure
 from chia.util.hash import std_hash
 from chia.util.keychain import Keychain
@@ -57,9 +57,12 @@ from chia.wallet.puzzles.clawback.metadata import AutoClaimSettings
 from chia.wallet.transaction_record import TransactionRecord
 from chia.wallet.util.new_peak_queue import NewPeakItem, NewPeakQueue, NewPeakQueueTypes
 from chia.wallet.util.peer_request_cache import PeerRequestCache, can_use_peer_request_cache
+from chia.wallet.util.query_filter import HashFilter
 from chia.wallet.util.wallet_sync_utils import (
     PeerRequestException,
     fetch_header_blocks_in_range,
+    prefetch_additions_and_removals,
+    prefetch_header_blocks,
     request_and_validate_additions,
     request_and_validate_removals,
     request_header_blocks,
@@ -68,6 +71,7 @@ from chia.wallet.util.wallet_sync_utils import (
     subscribe_to_phs,
 )
 from chia.wallet.util.wallet_types import CoinType, WalletType
+from chia.wallet.wallet_coin_record import WalletCoinRecord
 from chia.wallet.wallet_spend_bundle import WalletSpendBundle
 from chia.wallet.wallet_state_manager import WalletStateManager
 from chia.wallet.wallet_weight_proof_handler import WalletWeightProofHandler, get_wp_fork_point
@@ -930,6 +934,7 @@ class WalletNode:
             try:
                 assert self.validation_semaphore is not None
                 async with self.validation_semaphore:
+                    await self.prefetch_state_proofs(inner_states, peer, cache, fork_height)
                     valid_states = [
                         inner_state
                         for inner_state in inner_states
@@ -1475,6 +1480,7 @@ class WalletNode:
 
                 validate_removals_result: bool = await request_and_validate_removals(
                     peer,
+                    peer_request_cache,
                     current.spent_block_height,
                     spent_state_block.header_hash,
                     coin_state.coin.name(),
@@ -1505,6 +1511,7 @@ class WalletNode:
             assert spent_state_block.foliage_transaction_block is not None
             validate_removals_result = await request_and_validate_removals(
                 peer,
+                peer_request_cache,
                 spent_state_block.height,
                 spent_state_block.header_hash,
                 coin_state.coin.name(),
@@ -1521,6 +1528,69 @@ class WalletNode:
 
         return True
 
+    async def prefetch_state_proofs(
+        self,
+        coin_states: list[CoinState],
+        peer: WSChiaConnection,
+        peer_request_cache: PeerRequestCache,
+        fork_height: uint32 | None,
+    ) -> None:
+        """
+        Fetches the header blocks and the addition and removal proofs needed to
+        validate the coin states with one request per block (or range of
+        blocks), rather than one per coin state, and caches them for
+        validate_received_state_from_peer(). This is only an optimization, any
+        failure here is left for the validation to detect.
+        """
+        states = [
+            coin_state
+            for coin_state in coin_states
+            if coin_state.created_height is not None
+            and not can_use_peer_request_cache(coin_state, peer_request_cache, fork_height)
+        ]
+        if len(states) == 0:
+            return
+        local_records: dict[bytes32, WalletCoinRecord] = {}
+        for batch in to_batches(states, SQLITE_MAX_VARIABLE_NUMBER):
+            result = await self.wallet_state_manager.coin_store.get_coin_records(
+                coin_id_filter=HashFilter.include([coin_state.coin.name() for coin_state in batch.entries])
+            )
+            local_records.update(result.coin_id_to_record)
+
+        heights: set[uint32] = set()
+        additions: dict[uint32, set[bytes32]] = {}
+        removals: dict[uint32, set[bytes32]] = {}
+        for coin_state in states:
+            assert coin_state.created_height is not None
+            coin_name = coin_state.coin.name()
+            current = local_records.get(coin_name)
+            current_spent_height = None
+            if current is not None and current.spent_block_height != 0:
+                current_spent_height = current.spent_block_height
+            # Same as current state, nothing to validate
+            if (
+                current is not None
+                and current_spent_height == coin_state.spent_height
+                and current.confirmed_block_height == coin_state.created_height
+            ):
+                continue
+            created_height = uint32(coin_state.created_height)
+            heights.add(created_height)
+            additions.setdefault(created_height, set()).add(coin_state.coin.puzzle_hash)
+            if coin_state.spent_height is not None:
+                spent_height = uint32(coin_state.spent_height)
+                heights.add(spent_height)
+                removals.setdefault(spent_height, set()).add(coin_name)
+            elif current_spent_height is not None:
+                # the coin got un-spent, the old spend is validated as well
+                heights.add(current_spent_height)
+                removals.setdefault(current_spent_height, set()).add(coin_name)
+
+        if len(heights) == 0:
+            return
+        await prefetch_header_blocks(peer, peer_request_cache, heights)
+        await prefetch_additions_and_removals(peer, peer_request_cache, additions, removals)
+
     async def validate_block_inclusion(
         self, block: HeaderBlock, peer: WSChiaConnection, peer_request_cache: PeerRequestCache
     ) -> bool:
@@ -1678,14 +1748,16 @@ class WalletNode:
 
         if not self.is_trusted(peer):
             valid_list = []
+            requested = set(coin_names)
             for coin in coin_state.coin_states:
-                if coin.coin.name() not in coin_names:
+                if coin.coin.name() not in requested:
                     await peer.close(9999)
                     self.log.warning(f"Peer {peer.peer_node_id} sent us an unrequested coin state. Banning.")
                     raise PeerRequestException(f"Peer sent us unrequested coin state {coin}")
-                valid = await self.validate_received_state_from_peer(
-                    coin, peer, self.get_cache_for_peer(peer), fork_height
-                )
+            request_cache = self.get_cache_for_peer(peer)
+            await self.prefetch_state_proofs(coin_state.coin_states, peer, request_cache, fork_height)
+            for coin in coin_state.coin_states:
+                valid = await self.validate_received_state_from_peer(coin, peer, request_cache, fork_height)
                 if valid:
                     valid_list.append(coin)
             return valid_list
@@ -1701,6 +1773,7 @@ class WalletNode:
 
         if not self.is_trusted(peer):
             request_cache = self.get_cache_for_peer(peer)
+            await self.prefetch_state_proofs(response.coin_states, peer, request_cache, fork_height)
             validated = []
             for state in response.coin_states:
                 valid = await self.validate_received_state_from_peer(state, peer, request_cache, fork_height)
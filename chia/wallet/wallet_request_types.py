@@ -757,6 +757,19 @@ class CheckOfferValidityResponse(Streamable):
     id: bytes32
 
 
+@streamable
+@dataclass(kw_only=True, frozen=True)
+class CheckOffersValidity(Streamable):
+    offers: list[str]
+
+
+@streamable
+@dataclass(kw_only=True, frozen=True)
+class CheckOffersValidityResponse(Streamable):
+    valid: list[bool]
+    ids: list[bytes32]
+
+
 @streamable
 @dataclass(kw_only=True, frozen=True)
 class DIDSetWalletName(Streamable):
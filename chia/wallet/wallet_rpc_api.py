@@ -111,6 +111,8 @@ from chia.wallet.wallet_request_types import (
     CATSpendResponse,
     CheckDeleteKey,
     CheckDeleteKeyResponse,
+    CheckOffersValidity,
+    CheckOffersValidityResponse,
     CheckOfferValidity,
     CheckOfferValidityResponse,
     CombineCoins,
@@ -623,6 +625,7 @@ class WalletRpcApi:
             "/create_offer_for_ids": self.create_offer_for_ids,
             "/get_offer_summary": self.get_offer_summary,
             "/check_offer_validity": self.check_offer_validity,
+            "/check_offers_validity": self.check_offers_validity,
             "/take_offer": self.take_offer,
             "/get_offer": self.get_offer,
             "/get_all_offers": self.get_all_offers,
@@ -2017,29 +2020,29 @@ class WalletRpcApi:
 
     @marshal
     async def get_offer_summary(self, request: GetOfferSummary) -> GetOfferSummaryResponse:
+        trade_manager = self.service.wallet_state_manager.trade_manager
+        offer = trade_manager.get_parsed_offer(request.offer)
         dl_summary = None
         if not request.advanced:
-            dl_summary = await self.service.wallet_state_manager.trade_manager.get_dl_offer_summary(
-                request.parsed_offer
-            )
+            dl_summary = await trade_manager.get_dl_offer_summary(offer)
         if dl_summary is not None:
             response = GetOfferSummaryResponse(
                 data_layer_summary=dl_summary,
-                id=request.parsed_offer.name(),
+                id=offer.name(),
             )
         else:
-            offered, requested, infos, valid_times = request.parsed_offer.summary()
+            offered, requested, infos, valid_times = trade_manager.get_offer_summary(offer)
             response = GetOfferSummaryResponse(
                 summary=OfferSummary(
                     offered=offered,
                     requested=requested,
-                    fees=uint64(request.parsed_offer.fees()),
+                    fees=uint64(offer.fees()),
                     infos=infos,
-                    additions=[c.name() for c in request.parsed_offer.additions()],
-                    removals=[c.name() for c in request.parsed_offer.removals()],
+                    additions=[c.name() for c in offer.additions()],
+                    removals=[c.name() for c in offer.removals()],
                     valid_times=valid_times.only_absolutes(),
                 ),
-                id=request.parsed_offer.name(),
+                id=offer.name(),
             )
 
         # This is a bit of a hack in favor of returning some more manageable information about CR-CATs
@@ -2073,13 +2076,24 @@ class WalletRpcApi:
 
     @marshal
     async def check_offer_validity(self, request: CheckOfferValidity) -> CheckOfferValidityResponse:
-        offer = Offer.from_bech32(request.offer)
+        trade_manager = self.service.wallet_state_manager.trade_manager
+        offer = trade_manager.get_parsed_offer(request.offer)
         peer = self.service.get_full_node_peer()
         return CheckOfferValidityResponse(
-            valid=(await self.service.wallet_state_manager.trade_manager.check_offer_validity(offer, peer)),
+            valid=(await trade_manager.check_offer_validity(offer, peer)),
             id=offer.name(),
         )
 
+    @marshal
+    async def check_offers_validity(self, request: CheckOffersValidity) -> CheckOffersValidityResponse:
+        trade_manager = self.service.wallet_state_manager.trade_manager
+        offers = [trade_manager.get_parsed_offer(offer) for offer in request.offers]
+        peer = self.service.get_full_node_peer()
+        return CheckOffersValidityResponse(
+            valid=await trade_manager.check_offers_validity(offers, peer),
+            ids=[offer.name() for offer in offers],
+        )
+
     @tx_endpoint(push=True)
     @marshal
     async def take_offer(
@@ -2089,8 +2103,9 @@ class WalletRpcApi:
         extra_conditions: tuple[Condition, ...] = tuple(),
     ) -> TakeOfferResponse:
         peer = self.service.get_full_node_peer()
+        offer = self.service.wallet_state_manager.trade_manager.get_parsed_offer(request.offer)
         trade_record = await self.service.wallet_state_manager.trade_manager.respond_to_offer(
-            request.parsed_offer,
+            offer,
             peer,
             action_scope,
             fee=request.fee,
@@ -2100,7 +2115,7 @@ class WalletRpcApi:
 
         async with action_scope.use() as interface:
             interface.side_effects.signing_responses.append(
-                SigningResponse(bytes(request.parsed_offer._bundle.aggregated_signature), trade_record.trade_id)
+                SigningResponse(bytes(offer._bundle.aggregated_signature), trade_record.trade_id)
             )
 
         # tx_endpoint will fill in this default value
@@ -31,6 +31,8 @@ from chia.wallet.wallet_request_types import (
     CATSpendResponse,
     CheckDeleteKey,
     CheckDeleteKeyResponse,
+    CheckOffersValidity,
+    CheckOffersValidityResponse,
     CheckOfferValidity,
     CheckOfferValidityResponse,
     CombineCoins,
@@ -601,6 +603,11 @@ class WalletRpcClient(RpcClient):
             await self.fetch("check_offer_validity", request.to_json_dict())
         )
 
+    async def check_offers_validity(self, request: CheckOffersValidity) -> CheckOffersValidityResponse:
+        return CheckOffersValidityResponse.from_json_dict(
+            await self.fetch("check_offers_validity", request.to_json_dict())
+        )
+
     async def take_offer(
         self,
         request: TakeOffer,
@@ -2580,29 +2580,15 @@ class WalletStateManager:
         pending_removals: set[bytes32] | None = None,
         in_one_block: bool = False,
     ) -> set[WalletCoinRecord]:
-        wallet = self.wallets[uint32(wallet_id)]
-        wallet_type = wallet.type()
         if records is None:
-            if wallet_type == WalletType.CRCAT:
-                records = await self.coin_store.get_unspent_coins_for_wallet(wallet_id, CoinType.CRCAT)
-            else:
-                records = await self.coin_store.get_unspent_coins_for_wallet(wallet_id)
-
-        # Coins that are currently part of a transaction
-        if pending_removals is None:
-            pending_removals = {
-                coin.name()
-                for coin in await self.unconfirmed_additions_or_removals_for_wallet(
-                    wallet_id=uint32(wallet_id), get="removals"
-                )
-            }
-
-        # Coins that are part of the trade
-        offer_locked_coins: dict[bytes32, WalletCoinRecord] = await self.trade_manager.get_locked_coins()
+            spendable = await self.get_spendable_coins_by_id(wallet_id, pending_removals, in_one_block)
+            return set(spendable.values())
 
+        wallet = self.wallets[uint32(wallet_id)]
+        excluded = await self._get_unspendable_coin_ids(wallet_id, pending_removals)
         filtered = set()
         for record in records:
-            if record.coin.name() in {*offer_locked_coins.keys(), *pending_removals}:
+            if record.coin.name() in excluded:
                 continue
             if hasattr(wallet, "is_coin_spendable") and not await wallet.is_coin_spendable(record):
                 continue
@@ -2615,11 +2601,57 @@ class WalletStateManager:
 
         return filtered
 
+    async def get_spendable_coins_by_id(
+        self,
+        wallet_id: int,
+        pending_removals: set[bytes32] | None = None,
+        in_one_block: bool = False,
+    ) -> dict[bytes32, WalletCoinRecord]:
+        """
+        Returns the spendable coins of the wallet, by coin ID, ordered by
+        descending amount. The coins are read from the coin store's unspent
+        coin index, so they don't need to be loaded from the database (or
+        hashed).
+        """
+        wallet = self.wallets[uint32(wallet_id)]
+        coin_type = CoinType.CRCAT if wallet.type() == WalletType.CRCAT else CoinType.NORMAL
+        index = await self.coin_store.get_unspent_coin_index(wallet_id, coin_type)
+        excluded = await self._get_unspendable_coin_ids(wallet_id, pending_removals)
+
+        max_coins = wallet.max_send_quantity if hasattr(wallet, "max_send_quantity") and in_one_block else None
+        spendable: dict[bytes32, WalletCoinRecord] = {}
+        for coin_name, record in index.by_amount():
+            if max_coins is not None and len(spendable) >= max_coins:
+                break
+            if coin_name in excluded:
+                continue
+            if hasattr(wallet, "is_coin_spendable") and not await wallet.is_coin_spendable(record):
+                continue
+            spendable[coin_name] = record
+
+        return spendable
+
+    async def _get_unspendable_coin_ids(self, wallet_id: int, pending_removals: set[bytes32] | None) -> set[bytes32]:
+        # Coins that are currently part of a transaction
+        if pending_removals is None:
+            pending_removals = {
+                coin.name()
+                for coin in await self.unconfirmed_additions_or_removals_for_wallet(
+                    wallet_id=uint32(wallet_id), get="removals"
+                )
+            }
+
+        # Coins that are part of the trade
+        offer_locked_coins: dict[bytes32, WalletCoinRecord] = await self.trade_manager.get_locked_coins()
+
+        return {*offer_locked_coins.keys(), *pending_removals}
+
     async def new_peak(self, height: uint32) -> None:
         for wallet_id, wallet in self.wallets.items():
             if wallet.type() == WalletType.POOLING_WALLET:
                 assert isinstance(wallet, PoolWallet)
                 await wallet.new_peak(height)
+        self.trade_manager.new_peak()
         current_time = int(time.time())
 
         if self.wallet_node.last_wallet_tx_resend_time < current_time - self.wallet_node.wallet_tx_resend_timeout_secs:
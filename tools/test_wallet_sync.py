@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import asyncio
+import random
+import resource
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any
+
+import click
+import zstd
+from chia_rs import AugSchemeMPL, FullBlock, SpendBundle
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+
+from chia._tests.util.constants import test_constants
+from chia._tests.util.setup_nodes import setup_simulators_and_wallets
+from chia.protocols.outbound_message import NodeType
+from chia.server.ws_connection import WSChiaConnection
+from chia.simulator.add_blocks_in_batches import add_blocks_in_batches
+from chia.simulator.block_tools import create_block_tools
+from chia.simulator.keyring import TempKeyring
+from chia.simulator.wallet_tools import WalletTool
+from chia.types.blockchain_format.coin import Coin
+from chia.types.peer_info import PeerInfo
+from chia.util.hash import std_hash
+from chia.util.keychain import bytes_to_mnemonic, mnemonic_to_seed
+
+# The wallet being synced is created from this seed, so the chain can be
+# generated ahead of time with coins for it.
+KEY_SEED = std_hash(b"wallet sync benchmark")
+# the coins are sent between this many puzzle hashes, all within the range
+# the wallet derives up front
+NUM_PUZZLE_HASHES = 50
+INITIAL_NUM_PUBLIC_KEYS = 100
+
+
+@click.group()
+def main() -> None:
+    pass
+
+
+@main.command("generate", help="generate a blockchain db with coins for the benchmark wallet")
+@click.argument("file", type=click.Path(), required=True)
+@click.option("--length", type=int, default=300, help="the number of blocks to generate")
+@click.option("--spends-per-block", type=int, default=20, help="the number of wallet coins spent per tx block")
+def generate(file: str, length: int, spends_per_block: int) -> None:
+    random.seed(1337)
+    root_path = Path("./test-chain").resolve()
+    root_path.mkdir(parents=True, exist_ok=True)
+    with (
+        TempKeyring() as keychain,
+        create_block_tools(constants=test_constants, root_path=root_path, keychain=keychain) as bt,
+        closing(sqlite3.connect(file)) as db,
+    ):
+        db.execute("DROP TABLE IF EXISTS full_blocks")
+        db.execute("DROP TABLE IF EXISTS metadata")
+        db.execute(
+            "CREATE TABLE full_blocks("
+            "header_hash blob PRIMARY KEY,"
+            "prev_hash blob,"
+            "height bigint,"
+            "in_main_chain tinyint,"
+            "block blob)"
+        )
+        db.execute("CREATE TABLE metadata(name text PRIMARY KEY, value text)")
+
+        master_sk = AugSchemeMPL.key_gen(mnemonic_to_seed(bytes_to_mnemonic(KEY_SEED)))
+        wallet = WalletTool(bt.constants, master_sk)
+        puzzle_hashes = [wallet.get_new_puzzlehash() for _ in range(NUM_PUZZLE_HASHES)]
+        wallet_puzzle_hashes = set(puzzle_hashes)
+
+        blocks: list[FullBlock] = []
+        unspent_coins: dict[bytes32, Coin] = {}
+        spend_bundles: list[SpendBundle] = []
+        num_spends = 0
+        while len(blocks) < length:
+            prev_num_blocks = len(blocks)
+            blocks = bt.get_consecutive_blocks(
+                1,
+                blocks,
+                farmer_reward_puzzle_hash=random.choice(puzzle_hashes),
+                pool_reward_puzzle_hash=random.choice(puzzle_hashes),
+                guarantee_transaction_block=True,
+                genesis_timestamp=uint64(1234567890),
+                transaction_data=SpendBundle.aggregate(spend_bundles) if len(spend_bundles) > 0 else None,
+            )
+            for b in blocks[prev_num_blocks:]:
+                for coin in b.get_included_reward_coins():
+                    if coin.puzzle_hash in wallet_puzzle_hashes:
+                        unspent_coins[coin.name()] = coin
+                db.execute(
+                    "INSERT INTO full_blocks VALUES(?, ?, ?, ?, ?)",
+                    (b.header_hash, b.prev_header_hash, b.height, 1, zstd.compress(bytes(b))),
+                )
+            for bundle in spend_bundles:
+                for coin in bundle.removals():
+                    del unspent_coins[coin.name()]
+                for coin in bundle.additions():
+                    unspent_coins[coin.name()] = coin
+            num_spends += len(spend_bundles)
+
+            # split some of the coins in two, for the next block
+            candidates = sorted((c for c in unspent_coins.values() if c.amount > 1), key=lambda c: c.name())
+            spend_bundles = []
+            for coin in random.sample(candidates, min(spends_per_block, len(candidates))):
+                # distinct puzzle hashes, as the two outputs may have the same amount
+                receiver_1, receiver_2 = random.sample(puzzle_hashes, 2)
+                spend_bundles.append(
+                    wallet.generate_signed_transaction(
+                        uint64(coin.amount // 2),
+                        receiver_1,
+                        coin,
+                        additional_outputs=[(receiver_2, coin.amount - coin.amount // 2)],
+                    )
+                )
+            print(f"\rheight {blocks[-1].height} unspent coins: {len(unspent_coins)}    ", end="")
+
+        metadata = {
+            "balance": sum(c.amount for c in unspent_coins.values()),
+            "unspent_coins": len(unspent_coins),
+            "spends": num_spends,
+        }
+        db.executemany("INSERT INTO metadata VALUES(?, ?)", [(k, str(v)) for k, v in metadata.items()])
+        db.commit()
+        print(f"\nwrote {len(blocks)} blocks to {file}: {metadata}")
+
+
+@contextmanager
+def count_wallet_requests() -> Iterator[Counter[str]]:
+    """
+    Counts the requests (round-trips) made by the wallet to its peers, by
+    request type.
+    """
+    counts: Counter[str] = Counter()
+    original_call_api = WSChiaConnection.call_api
+
+    async def call_api(
+        self: WSChiaConnection, request_method: Callable[..., Awaitable[Any]], message: Any, timeout: int = 60
+    ) -> Any:
+        if self.local_type == NodeType.WALLET:
+            counts[request_method.__name__] += 1
+        return await original_call_api(self, request_method, message, timeout)
+
+    WSChiaConnection.call_api = call_api  # type: ignore[method-assign]
+    try:
+        yield counts
+    finally:
+        WSChiaConnection.call_api = original_call_api  # type: ignore[method-assign]
+
+
+async def run_wallet_sync(blocks: list[FullBlock], metadata: dict[str, int], trusted: bool, timeout: int) -> None:
+    async with setup_simulators_and_wallets(
+        1,
+        1,
+        test_constants,
+        spam_filter_after_n_txs=2**32,
+        key_seed=KEY_SEED,
+        initial_num_public_keys=INITIAL_NUM_PUBLIC_KEYS,
+    ) as env:
+        full_node = env.simulators[0].node
+        full_node_server = env.simulators[0].peer_server
+        wallet_node = env.wallets[0].node
+        wallet_server = env.wallets[0].peer_server
+        await add_blocks_in_batches(blocks, full_node)
+        peak_height = blocks[-1].height
+
+        if trusted:
+            wallet_node.config["trusted_peers"] = {full_node_server.node_id.hex(): full_node_server.node_id.hex()}
+        else:
+            wallet_node.config["trusted_peers"] = {}
+
+        mode = "trusted" if trusted else "untrusted"
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with count_wallet_requests() as requests:
+            start = time.monotonic()
+            await wallet_server.start_client(PeerInfo(env.bt.config["self_hostname"], full_node_server.get_port()))
+            wsm = wallet_node.wallet_state_manager
+            # the chain is too old for wsm.synced(), it's done once it has
+            # processed the peak
+            while await wsm.blockchain.get_finished_sync_up_to() < peak_height:
+                if time.monotonic() - start > timeout:
+                    raise RuntimeError(f"{mode} wallet sync didn't finish within {timeout}s")
+                await asyncio.sleep(0.05)
+            sync_time = time.monotonic() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        balance = await wsm.get_confirmed_balance_for_wallet(1)
+        unspent_coins = len(await wsm.coin_store.get_all_unspent_coins())
+        print(f"\n{mode} sync of {peak_height + 1} blocks")
+        print(f"  time: {sync_time:0.2f}s")
+        print(f"  peak RSS: {rss_after / 1024:0.1f} MiB (+{(rss_after - rss_before) / 1024:0.1f} MiB during sync)")
+        print(f"  requests: {sum(requests.values())}")
+        for name, count in sorted(requests.items()):
+            print(f"    {name}: {count}")
+        if balance != metadata["balance"] or unspent_coins != metadata["unspent_coins"]:
+            raise RuntimeError(
+                f"{mode} wallet has {unspent_coins} coins, balance {balance}, expected "
+                f"{metadata['unspent_coins']} coins, balance {metadata['balance']}"
+            )
+
+
+@main.command("run", help="sync a wallet from a db created by the generate command")
+@click.argument("file", type=click.Path(exists=True), required=True)
+@click.option("--mode", type=click.Choice(["trusted", "untrusted", "both"]), default="both", help="the sync modes")
+@click.option("--timeout", type=int, default=1800, help="give up on a sync after this many seconds")
+def run(file: str, mode: str, timeout: int) -> None:
+    with closing(sqlite3.connect(file)) as db:
+        blocks = [
+            FullBlock.from_bytes_unchecked(zstd.decompress(row[0]))
+            for row in db.execute("SELECT block FROM full_blocks WHERE in_main_chain=1 ORDER BY height")
+        ]
+        metadata = {name: int(value) for name, value in db.execute("SELECT name, value FROM metadata")}
+    for trusted in [True, False]:
+        if mode == "both" or (mode == "trusted") == trusted:
+            asyncio.run(run_wallet_sync(blocks, metadata, trusted, timeout))
+
+
+main.add_command(generate)
+main.add_command(run)
+
+if __name__ == "__main__":
+    main()
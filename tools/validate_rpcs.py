@@ -4,12 +4,12 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import mmap
 import time
 from itertools import chain
 from pathlib import Path
 from typing import Any
 
-import aiofiles
 import click
 from chia_rs.sized_bytes import bytes32
 
@@ -35,16 +35,17 @@ def get_height_to_hash_filename(root_path: Path, config: dict[str, Any]) -> Path
     return db_directory / f"height-to-hash{suffix}"
 
 
-async def get_height_to_hash_bytes(root_path: Path, config: dict[str, Any]) -> bytes:
+def get_height_to_hash_bytes(root_path: Path, config: dict[str, Any]) -> mmap.mmap:
     """
-    Load the height-to-hash database file into a bytearray.
+    Map the height-to-hash database file, read-only. It's shared with the full
+    node, rather than read into memory.
     """
     height_to_hash_filename: Path = get_height_to_hash_filename(root_path, config)
-    async with aiofiles.open(height_to_hash_filename, "rb") as f:
-        return await f.read()
+    with open(height_to_hash_filename, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
 
-def get_block_hash_for_height(height: int, height_to_hash: bytes) -> bytes32:
+def get_block_hash_for_height(height: int, height_to_hash: mmap.mmap) -> bytes32:
     """
     Get the block header hash from the height-to-hash database.
     """
@@ -221,7 +222,7 @@ async def cli_async(
 
         print("Connected to Full Node")
 
-        height_to_hash_bytes: bytes = await get_height_to_hash_bytes(root_path=root_path, config=config)
+        height_to_hash_bytes = get_height_to_hash_bytes(root_path=root_path, config=config)
 
         log.info("block header hashes loaded from height-to-hash file.")
 